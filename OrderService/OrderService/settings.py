@@ -1,6 +1,7 @@
 from pathlib import Path
 import os
 from dotenv import load_dotenv
+from ordersapp.db.strategies import configure as configure_database
 
 # --- Load environment variables ---
 load_dotenv()
@@ -8,8 +9,12 @@ load_dotenv()
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 # --- Prometheus (local safe directory) ---
+# Exported so prometheus_client runs in multiprocess mode: every worker process writes its
+# samples here and /metrics aggregates them. gunicorn.conf.py sets it before workers fork
+# and clears the directory at startup.
 PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR", str(BASE_DIR / "prometheus_data"))
 os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+os.environ["PROMETHEUS_MULTIPROC_DIR"] = PROMETHEUS_MULTIPROC_DIR
 
 # --- Security ---
 SECRET_KEY = os.getenv('SECRET_KEY', 'a@w-vlr#hv&y68_n7f$a4$&+p&^cay-=pw0r^%xjs(w*0@_(5x)')
@@ -48,6 +53,7 @@ INSTALLED_APPS = [
 # --- Middleware ---
 MIDDLEWARE = [
     'django_prometheus.middleware.PrometheusBeforeMiddleware',
+    'ordersapp.db.query_metrics.QueryMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -55,6 +61,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'ordersapp.db.replicas.ReplicaPinMiddleware',
     'django_prometheus.middleware.PrometheusAfterMiddleware',
 ]
 
@@ -91,6 +98,40 @@ DATABASES = {
     }
 }
 
+# --- Database connection strategy ---
+# per-request | persistent (CONN_MAX_AGE + health checks) | pool (process-wide pool) | pgbouncer
+# (point DB_HOST/DB_PORT at PgBouncer in transaction mode). See ordersapp/db/strategies.py.
+DB_CONN_STRATEGY = os.getenv("DB_CONN_STRATEGY", "persistent")
+DATABASES['default'] = configure_database(
+    DATABASES['default'], DB_CONN_STRATEGY,
+    conn_max_age=int(os.getenv("DB_CONN_MAX_AGE", "60")),
+    pool_min_size=int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+    pool_max_size=int(os.getenv("DB_POOL_MAX_SIZE", "20")),      # per worker process
+    pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "10")),      # wait for a free connection
+    pool_max_idle=float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+    pool_check_after=float(os.getenv("DB_POOL_CHECK_AFTER", "30")),
+)
+
+# --- Read replica ---
+# Set DB_REPLICA_HOST to send read-only endpoints (order details, history, list, dashboard) to a
+# streaming replica, using the same connection strategy. Clients are pinned to the primary for
+# REPLICA_STICKY_SECONDS after their own writes; a replica lagging more than REPLICA_MAX_LAG
+# seconds (checked every REPLICA_LAG_CHECK_INTERVAL) is bypassed. See ordersapp/db/replicas.py.
+if os.getenv("DB_REPLICA_HOST"):
+    DATABASES['replica'] = dict(
+        DATABASES['default'],
+        NAME=os.getenv('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        USER=os.getenv('DB_REPLICA_USER', DATABASES['default']['USER']),
+        PASSWORD=os.getenv('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        HOST=os.getenv('DB_REPLICA_HOST'),
+        PORT=os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        TEST={'MIRROR': 'default'},
+    )
+DATABASE_ROUTERS = ['ordersapp.db.replicas.PrimaryReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+REPLICA_MAX_LAG = float(os.getenv("REPLICA_MAX_LAG", "2"))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "1"))
+
 
 # --- Authentication ---
 AUTH_PASSWORD_VALIDATORS = [
@@ -124,3 +165,146 @@ USE_MOCK_USER = os.getenv("USE_MOCK_USER", "True").lower() == "true"
 USE_MOCK_INVENTORY = os.getenv("USE_MOCK_INVENTORY", "True").lower() == "true"
 USE_MOCK_PAYMENT = os.getenv("USE_MOCK_PAYMENT", "True").lower() == "true"
 USE_MOCK_SHIPPING = os.getenv("USE_MOCK_SHIPPING", "True").lower() == "true"
+
+# --- Mock shipping state (USE_MOCK_SHIPPING) ---
+MOCK_SHIPPING_STORE = os.getenv("MOCK_SHIPPING_STORE", "memory")              # memory | sqlite (shared by all workers)
+MOCK_SHIPPING_DB_PATH = os.getenv("MOCK_SHIPPING_DB_PATH", "")                  # sqlite file; default under /dev/shm
+MOCK_SHIPPING_MAX_ENTRIES = int(os.getenv("MOCK_SHIPPING_MAX_ENTRIES", "100000"))
+MOCK_SHIPPING_TTL = int(os.getenv("MOCK_SHIPPING_TTL", "86400"))
+MOCK_SHIPPING_PROGRESSION = os.getenv("MOCK_SHIPPING_PROGRESSION", "random")  # random | timed
+MOCK_SHIPPING_SHIP_AFTER = float(os.getenv("MOCK_SHIPPING_SHIP_AFTER", "86400"))       # timed: seconds after placement
+MOCK_SHIPPING_DELIVER_AFTER = float(os.getenv("MOCK_SHIPPING_DELIVER_AFTER", "345600"))
+MOCK_SHIPPING_FAILURE_RATE = float(os.getenv("MOCK_SHIPPING_FAILURE_RATE", "0.02"))
+MOCK_SHIPPING_NOW = os.getenv("MOCK_SHIPPING_NOW", "")                          # timed: frozen ISO clock for repeatable runs
+
+# --- Shipping status fetch (bulk endpoint, else bounded concurrent fallback) ---
+SHIPPING_BULK_STATUS_ENABLED = os.getenv("SHIPPING_BULK_STATUS_ENABLED", "True").lower() == "true"
+SHIPPING_BULK_BATCH_SIZE = int(os.getenv("SHIPPING_BULK_BATCH_SIZE", "100"))
+SHIPPING_BULK_REPROBE_SECONDS = float(os.getenv("SHIPPING_BULK_REPROBE_SECONDS", "300"))  # retry the bulk endpoint after it was rejected
+SHIPPING_FETCH_CONCURRENCY = int(os.getenv("SHIPPING_FETCH_CONCURRENCY", "16"))
+SHIPPING_BATCH_DEADLINE = float(os.getenv("SHIPPING_BATCH_DEADLINE", "5"))
+SHIPPING_REQUEST_TIMEOUT = float(os.getenv("SHIPPING_REQUEST_TIMEOUT", "5"))
+
+# --- Local shipping status (pushed by the shipping service; in-flight ones re-fetched after a TTL) ---
+SHIPPING_STATUS_TTL = int(os.getenv("SHIPPING_STATUS_TTL", "900"))
+SHIPPING_STATUS_FETCH_ON_READ = os.getenv("SHIPPING_STATUS_FETCH_ON_READ", "True").lower() == "true"
+SHIPPING_WEBHOOK_SECRET = os.getenv("SHIPPING_WEBHOOK_SECRET", "")   # HMAC-SHA256 key for X-Shipping-Signature; unset = webhook refused
+SHIPPING_WEBHOOK_MAX_BATCH = int(os.getenv("SHIPPING_WEBHOOK_MAX_BATCH", "1000"))
+
+# --- Outbound HTTP (shared keep-alive pool for all downstream clients) ---
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))  # number of per-host pools kept
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))          # connections kept per host
+HTTP_POOL_BLOCK = os.getenv("HTTP_POOL_BLOCK", "True").lower() == "true"
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "5"))          # wait for a free connection
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "2"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "5"))
+
+# --- Inventory reservation (bulk endpoint, else parallel per-line fallback) ---
+INVENTORY_BULK_RESERVE_ENABLED = os.getenv("INVENTORY_BULK_RESERVE_ENABLED", "True").lower() == "true"
+INVENTORY_RESERVE_CONCURRENCY = int(os.getenv("INVENTORY_RESERVE_CONCURRENCY", "8"))
+INVENTORY_RESERVE_DEADLINE = float(os.getenv("INVENTORY_RESERVE_DEADLINE", "5"))
+INVENTORY_BULK_REPROBE_SECONDS = float(os.getenv("INVENTORY_BULK_REPROBE_SECONDS", "300"))  # retry the bulk endpoints after they were rejected
+
+# --- Downstream resilience (payment/inventory circuit breakers, adaptive timeouts, hedging) ---
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))        # open at this error rate...
+BREAKER_SLOW_CALL_RATE = float(os.getenv("BREAKER_SLOW_CALL_RATE", "0.5"))    # ...or this share of slow calls
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "2"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "10"))                # calls needed before judging
+BREAKER_WINDOW_SECONDS = float(os.getenv("BREAKER_WINDOW_SECONDS", "30"))
+BREAKER_WINDOW_SIZE = int(os.getenv("BREAKER_WINDOW_SIZE", "100"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "10"))        # open -> half-open after this
+BREAKER_HALF_OPEN_CALLS = int(os.getenv("BREAKER_HALF_OPEN_CALLS", "3"))     # probe calls in half-open
+ADAPTIVE_TIMEOUT_PERCENTILE = float(os.getenv("ADAPTIVE_TIMEOUT_PERCENTILE", "99"))
+ADAPTIVE_TIMEOUT_MULTIPLIER = float(os.getenv("ADAPTIVE_TIMEOUT_MULTIPLIER", "3"))
+ADAPTIVE_TIMEOUT_MIN = float(os.getenv("ADAPTIVE_TIMEOUT_MIN", "0.5"))       # max is HTTP_READ_TIMEOUT
+ADAPTIVE_TIMEOUT_WINDOW_SECONDS = float(os.getenv("ADAPTIVE_TIMEOUT_WINDOW_SECONDS", "60"))  # latency samples kept this long
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.05"))
+HEDGE_CONCURRENCY = int(os.getenv("HEDGE_CONCURRENCY", "32"))
+INVENTORY_HEDGE_ENABLED = os.getenv("INVENTORY_HEDGE_ENABLED", "False").lower() == "true"
+PAYMENT_HEDGE_ENABLED = os.getenv("PAYMENT_HEDGE_ENABLED", "False").lower() == "true"
+
+# --- Async (ASGI) request path ---
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", "200"))  # per worker, all hosts
+ASYNC_DB_CONCURRENCY = int(os.getenv("ASYNC_DB_CONCURRENCY", "16"))              # DB phases per worker
+
+# --- Outbox worker (post-commit shipment creation & notifications) ---
+NOTIFICATION_SERVICE_URL = os.getenv("NOTIFICATION_SERVICE_URL", "http://notification-service:5000/v1/notifications")
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", "2"))
+OUTBOX_BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX", "300"))
+OUTBOX_LEASE_SECONDS = int(os.getenv("OUTBOX_LEASE_SECONDS", "60"))     # per event; renewed before each delivery
+
+# --- Checkout saga (parallel inventory reservation + payment authorization hold) ---
+PAYMENT_PREAUTH_ENABLED = os.getenv("PAYMENT_PREAUTH_ENABLED", "True").lower() == "true"  # False: reserve, then charge
+CHECKOUT_CONCURRENCY = int(os.getenv("CHECKOUT_CONCURRENCY", "32"))  # threads running reservations alongside authorization
+
+# --- Idempotency-Key on order creation ---
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", "86400"))            # seconds a key's response is replayed
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))   # duplicates wait this long for the original
+IDEMPOTENCY_CLAIM_TIMEOUT = int(os.getenv("IDEMPOTENCY_CLAIM_TIMEOUT", "120"))  # unfinished claims older than this are taken over
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))      # completed responses kept in-process
+
+# --- Batch order creation (POST v1/orders/batch/) ---
+ORDER_BATCH_MAX_SIZE = int(os.getenv("ORDER_BATCH_MAX_SIZE", "1000"))
+ORDER_BATCH_CONCURRENCY = int(os.getenv("ORDER_BATCH_CONCURRENCY", "16"))
+
+# --- Bulk status transitions (POST v1/orders/bulk-transition/) ---
+ORDER_BULK_TRANSITION_CHUNK_SIZE = int(os.getenv("ORDER_BULK_TRANSITION_CHUNK_SIZE", "500"))   # orders per transaction
+ORDER_BULK_TRANSITION_MAX_ORDERS = int(os.getenv("ORDER_BULK_TRANSITION_MAX_ORDERS", "50000"))
+INVENTORY_BULK_RELEASE_ENABLED = os.getenv("INVENTORY_BULK_RELEASE_ENABLED", "True").lower() == "true"
+INVENTORY_BULK_RELEASE_BATCH_SIZE = int(os.getenv("INVENTORY_BULK_RELEASE_BATCH_SIZE", "100"))
+PAYMENT_BULK_REFUND_ENABLED = os.getenv("PAYMENT_BULK_REFUND_ENABLED", "True").lower() == "true"
+PAYMENT_BULK_REFUND_BATCH_SIZE = int(os.getenv("PAYMENT_BULK_REFUND_BATCH_SIZE", "100"))
+PAYMENT_BULK_REPROBE_SECONDS = float(os.getenv("PAYMENT_BULK_REPROBE_SECONDS", "300"))  # retry the bulk endpoint after it was rejected
+PAYMENT_REFUND_CONCURRENCY = int(os.getenv("PAYMENT_REFUND_CONCURRENCY", "8"))  # per-order fallback threads
+
+# --- Order list export (streamed in chunks) ---
+ORDER_EXPORT_CHUNK_SIZE = int(os.getenv("ORDER_EXPORT_CHUNK_SIZE", "1000"))
+
+# --- Order detail read-through cache ---
+# Invalidation only reaches processes sharing the cache, and orders are written by every gunicorn
+# worker and by the outbox worker. The order cache is therefore on only when CACHE_REDIS_URL gives
+# it a shared backend; "lru" (in-process) is for single-process deployments.
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "")
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_REDIS_URL,
+    } if CACHE_REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'order-service',
+    }
+}
+ORDER_CACHE_BACKEND = os.getenv("ORDER_CACHE_BACKEND", "django" if CACHE_REDIS_URL else "none")  # django | lru | none
+ORDER_CACHE_TTL = int(os.getenv("ORDER_CACHE_TTL", "30"))
+ORDER_CACHE_MAX_ENTRIES = int(os.getenv("ORDER_CACHE_MAX_ENTRIES", "10000"))
+ORDER_CACHE_ALIAS = os.getenv("ORDER_CACHE_ALIAS", "default")
+
+# --- Logging (JSON lines on stdout, sampled, written off the request thread) ---
+# WARNING and above are always kept; LOG_SAMPLE_RATE of lower-level ordersapp records are.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "json": {"()": "ordersapp.structured_logging.JsonFormatter"},
+    },
+    "filters": {
+        "sampled": {"()": "ordersapp.structured_logging.SamplingFilter", "rate": LOG_SAMPLE_RATE},
+    },
+    "handlers": {
+        "structured": {
+            "()": "ordersapp.structured_logging.NonBlockingHandler",
+            "maxsize": LOG_QUEUE_SIZE,
+            "formatter": "json",
+            "filters": ["sampled"],
+        },
+    },
+    "loggers": {
+        "ordersapp": {"handlers": ["structured"], "level": LOG_LEVEL, "propagate": False},
+    },
+}
@@ -1,7 +1,9 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from ordersapp.views import (OrderViewSet, order_history, get_order_details, health_check, root_view)
+from ordersapp import async_views
+from ordersapp.views import (OrderViewSet, order_history, get_order_details, customer_dashboard,
+                             shipping_status_webhook, health_check, root_view)
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
@@ -28,6 +30,13 @@ urlpatterns = [
     path('v1/', include(router.urls)),
     path('v1/orders/<int:pk>/details/', get_order_details, name='order-details'),
     path('v1/orders/my-orders/<int:customer_id>/', order_history, name='order-history'),
+    path('v1/orders/my-orders/<int:customer_id>/dashboard/', customer_dashboard, name='customer-dashboard'),
+    path('v1/shipping/status-updates/', shipping_status_webhook, name='shipping-status-webhook'),
+
+    # Async (ASGI) variants of the checkout / details / history paths
+    path('v1/async/orders/create/', async_views.create_order, name='async-order-create'),
+    path('v1/async/orders/<int:pk>/details/', async_views.get_order_details, name='async-order-details'),
+    path('v1/async/orders/my-orders/<int:customer_id>/', async_views.order_history, name='async-order-history'),
 
     # Documentation & Health
     path('orders-doc/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
@@ -0,0 +1,30 @@
+# Gunicorn settings shared by the WSGI and ASGI (UvicornWorker) deployments; picked up
+# automatically when gunicorn is started from this directory.
+import os
+import shutil
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# prometheus_client picks single- or multi-process mode when first imported, so the
+# directory has to be in the environment before anything imports it.
+PROMETHEUS_MULTIPROC_DIR = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", str(Path(__file__).resolve().parent / "prometheus_data")
+)
+
+from prometheus_client import multiprocess  # noqa: E402
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8001")
+workers = int(os.getenv("GUNICORN_WORKERS", "4"))
+
+
+def on_starting(server):
+    # Samples left by a previous run would otherwise be added to this one's
+    shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+
+def child_exit(server, worker):
+    # Drop the dead worker's live gauges (breaker state, timeouts, replica lag)
+    multiprocess.mark_process_dead(worker.pid)
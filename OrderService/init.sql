@@ -6,6 +6,12 @@ TRUNCATE TABLE ordersapp_order CASCADE;
 COPY ordersapp_order(order_id, customer_id, order_status, payment_status, order_total, created_at) 
 FROM '/app/seed_data/eci_orders.csv' DELIMITER ',' CSV HEADER;
 
--- Load Order Items
-COPY ordersapp_orderitem(order_item_id, order_id, product_id, sku, quantity, unit_price) 
+-- Load Order Items (staged, then joined to their orders for the order_created_at partition key)
+CREATE TEMP TABLE seed_order_items (
+    order_item_id bigint, order_id bigint, product_id bigint, sku varchar(100), quantity integer, unit_price numeric(10, 2)
+);
+COPY seed_order_items(order_item_id, order_id, product_id, sku, quantity, unit_price) 
 FROM '/app/seed_data/eci_order_items.csv' DELIMITER ',' CSV HEADER;
+INSERT INTO ordersapp_orderitem(order_item_id, order_id, product_id, sku, quantity, unit_price, order_created_at)
+SELECT s.order_item_id, s.order_id, s.product_id, s.sku, s.quantity, s.unit_price, o.created_at
+FROM seed_order_items s JOIN ordersapp_order o ON o.order_id = s.order_id;
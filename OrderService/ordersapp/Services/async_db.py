@@ -0,0 +1,41 @@
+import asyncio
+from contextlib import asynccontextmanager
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+
+# Under ASGI, Django runs each request's sync ORM work in a per-request thread with its own
+# connection, kept until the request ends. An async checkout spends most of its time awaiting
+# downstream services, so without this every in-flight request would pin a Postgres connection.
+# With DB_CONN_STRATEGY=pool, close() hands the connection back to the process pool instead.
+DB_CONCURRENCY = getattr(settings, "ASYNC_DB_CONCURRENCY", 16)
+
+_slots = {}
+
+
+def _slot():
+    loop = asyncio.get_running_loop()
+    slot = _slots.get(loop)
+    if slot is None:
+        slot = _slots[loop] = asyncio.Semaphore(DB_CONCURRENCY)
+    return slot
+
+
+@asynccontextmanager
+async def db_phase():
+    """
+    Wrap each burst of DB work in an async view: at most DB_CONCURRENCY phases run at once
+    per worker, and the request's connections are closed afterwards, before the next await
+    on the network.
+    """
+    async with _slot():
+        try:
+            yield
+        finally:
+            await sync_to_async(_release)()
+
+
+def _release():
+    # Resolve the connections inside the worker thread; they are per-thread (primary and replica).
+    for conn in connections.all(initialized_only=True):
+        conn.close()
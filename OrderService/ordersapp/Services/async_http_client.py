@@ -0,0 +1,75 @@
+import asyncio
+import time
+import httpx
+from django.conf import settings
+from . import http_client, telemetry
+
+# Async counterpart of http_client for the ASGI request path.
+# One httpx.AsyncClient (keep-alive pool) per event loop: under Uvicorn that is one per
+# worker process; sync callers going through async_to_sync get their own short-lived loop.
+LIMITS = httpx.Limits(
+    max_connections=getattr(settings, "ASYNC_HTTP_MAX_CONNECTIONS", 200),
+    max_keepalive_connections=http_client.POOL_MAXSIZE,
+)
+DEFAULT_TIMEOUT = httpx.Timeout(
+    http_client.READ_TIMEOUT, connect=http_client.CONNECT_TIMEOUT, pool=http_client.POOL_TIMEOUT
+)
+
+# Same base class as the sync client's errors, so callers catch one family per path
+RequestError = httpx.HTTPError
+
+_clients = {}
+
+
+def get_client():
+    """The AsyncClient bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        for stale in [l for l in _clients if l.is_closed()]:
+            del _clients[stale]
+        client = httpx.AsyncClient(limits=LIMITS, timeout=DEFAULT_TIMEOUT)
+        _clients[loop] = client
+    return client
+
+
+async def aclose():
+    """Close this loop's client (ASGI lifespan shutdown / end of a script)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _timeout(timeout):
+    """Accept the sync client's (connect, read) tuples as well as plain numbers."""
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect, pool=http_client.POOL_TIMEOUT)
+    return timeout
+
+
+async def request(method, url, timeout=None, **kwargs):
+    if timeout is not None:
+        kwargs["timeout"] = _timeout(timeout)
+    start, status = time.perf_counter(), "error"
+    try:
+        response = await get_client().request(method, url, **kwargs)
+        status = response.status_code
+        return response
+    except httpx.TimeoutException:
+        status = "timeout"
+        raise
+    finally:
+        telemetry.record_downstream(method, url, status, time.perf_counter() - start)
+
+
+async def get(url, **kwargs):
+    return await request("GET", url, **kwargs)
+
+
+async def post(url, **kwargs):
+    return await request("POST", url, **kwargs)
+
+
+async def patch(url, **kwargs):
+    return await request("PATCH", url, **kwargs)
@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import transaction
+from ..models import Order, OrderItem
+from .order_services import OrderService
+from .checkout import CheckoutSaga, CONFIRMED, OUTCOME_STATUSES, OUTCOME_ERRORS
+from .outbox import enqueue_orders_confirmed
+from . import order_cache, customer_summary
+
+MAX_BATCH_SIZE = getattr(settings, "ORDER_BATCH_MAX_SIZE", 1000)
+CHECKOUT_CONCURRENCY = getattr(settings, "ORDER_BATCH_CONCURRENCY", 16)
+
+
+def create_orders_batch(validated_orders):
+    """
+    Create many validated orders at once.
+    Orders and items go in with two bulk INSERTs, orders are checked out concurrently (one
+    CheckoutSaga each), and the outcomes are written back with one UPDATE per outcome.
+    Returns one result dict per input order, in input order.
+    """
+    orders, items_by_order = _insert_orders(validated_orders)
+    sagas = [CheckoutSaga(order, items) for order, items in zip(orders, items_by_order)]
+
+    with ThreadPoolExecutor(max_workers=CHECKOUT_CONCURRENCY, thread_name_prefix="batch-checkout") as pool:
+        outcomes = list(pool.map(CheckoutSaga.run, sagas))
+
+    try:
+        _apply_outcomes(orders, outcomes)
+    except Exception:
+        # Outcomes not recorded: compensate every confirmed checkout
+        for saga in sagas:
+            saga.compensate()
+        raise
+
+    results = []
+    for order, outcome in zip(orders, outcomes):
+        result = {
+            "order_id": order.order_id,
+            "order_status": order.order_status,
+            "payment_status": order.payment_status,
+            "order_total": str(order.order_total),
+        }
+        if outcome != CONFIRMED:
+            result["error"] = OUTCOME_ERRORS[outcome]
+        results.append(result)
+    return results
+
+
+def _insert_orders(validated_orders):
+    """Bulk INSERT orders (totals precomputed) and then all of their items."""
+    orders, items_by_order = [], []
+    for data in validated_orders:
+        data = dict(data)
+        items = data.pop("items", [])
+        data["order_total"] = OrderService.calculate_order_total(items)
+        orders.append(Order(**data))
+        items_by_order.append(items)
+
+    with transaction.atomic():
+        Order.objects.bulk_create(orders)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, **item)
+            for order, items in zip(orders, items_by_order)
+            for item in items
+        ])
+    return orders, items_by_order
+
+
+def _apply_outcomes(orders, outcomes):
+    """One UPDATE per outcome group, plus the outbox rows and customer summary upsert."""
+    with transaction.atomic():
+        for outcome, (order_status, payment_status) in OUTCOME_STATUSES.items():
+            group = [o for o, result in zip(orders, outcomes) if result == outcome]
+            if not group:
+                continue
+            changes = {"order_status": order_status}
+            if payment_status:
+                changes["payment_status"] = payment_status
+            Order.objects.filter(order_id__in=[o.order_id for o in group]).update(**changes)
+            order_cache.invalidate(*[o.order_id for o in group])
+            for order in group:
+                for field, value in changes.items():
+                    setattr(order, field, value)
+
+        confirmed = [o for o, result in zip(orders, outcomes) if result == CONFIRMED]
+        if confirmed:
+            enqueue_orders_confirmed(confirmed)
+        customer_summary.record_created(orders)
@@ -0,0 +1,155 @@
+"""
+Bulk status transitions (POST /v1/orders/bulk-transition/), e.g. cancelling every pending
+order of a customer or marking a day's shipments delivered.
+
+Orders are processed CHUNK_SIZE at a time, each chunk in its own transaction:
+
+  * The chunk's rows are locked with SELECT ... FOR UPDATE SKIP LOCKED, so orders being
+    changed by another request are reported as locked instead of waited for.
+  * Every order is checked with the same rules as update_order (OrderService.transition_error).
+  * The changes are written with one UPDATE per target status, limited to the chunk's
+    created_at range so only its months' partitions are touched, followed by one customer
+    summary upsert per customer and the cache invalidation.
+  * No remote call is made while the rows are locked. Cancellations queue their inventory
+    release, and a refund for PAID orders, in the outbox in the same transaction; the outbox
+    worker delivers them with batched calls. A cancelled order stays PAID until its refund is
+    confirmed, then becomes REFUNDED.
+
+Results stream back as NDJSON, one line per order as each chunk commits, then a summary line.
+"""
+import json
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from ..models import Order, OrderItem
+from ..Status.order_status import OrderStatus
+from ..Status.payment_status import PaymentStatus
+from .order_services import OrderService
+from .outbox import enqueue_cancellations
+from . import order_cache, customer_summary
+
+CHUNK_SIZE = getattr(settings, "ORDER_BULK_TRANSITION_CHUNK_SIZE", 500)
+MAX_ORDERS = getattr(settings, "ORDER_BULK_TRANSITION_MAX_ORDERS", 50000)
+
+
+def stream_transition(order_ids=None, orders_qs=None, order_status=None, payment_status=None,
+                      shipping_status=None, dry_run=False):
+    """
+    Apply the status change to the given order ids, or to every order matching orders_qs (at
+    most MAX_ORDERS), and yield NDJSON result lines. With dry_run nothing is written or called:
+    each line says whether the order would be updated.
+    """
+    encoder = DjangoJSONEncoder()
+    totals = {"requested": 0, "updated": 0, "failed": 0}
+    chunks = _id_chunks(order_ids) if order_ids is not None else _matching_chunks(orders_qs)
+    for chunk in chunks:
+        totals["requested"] += len(chunk)
+        for result in _transition_chunk(chunk, order_status, payment_status, shipping_status, dry_run):
+            totals["failed" if "error" in result else "updated"] += 1
+            yield encoder.encode(result) + "\n"
+    totals["truncated"] = orders_qs is not None and totals["requested"] >= MAX_ORDERS
+    totals["dry_run"] = dry_run
+    yield json.dumps({"summary": totals}) + "\n"
+
+
+def _id_chunks(order_ids):
+    unique = list(dict.fromkeys(order_ids))
+    for start in range(0, len(unique), CHUNK_SIZE):
+        yield unique[start:start + CHUNK_SIZE]
+
+
+def _matching_chunks(orders_qs):
+    """Ids of the matching orders, CHUNK_SIZE at a time (keyset on order_id, so updated rows don't shift pages)."""
+    last, seen = 0, 0
+    while seen < MAX_ORDERS:
+        chunk = list(
+            orders_qs.filter(order_id__gt=last).order_by("order_id")
+            .values_list("order_id", flat=True)[:min(CHUNK_SIZE, MAX_ORDERS - seen)]
+        )
+        if not chunk:
+            return
+        yield chunk
+        last, seen = chunk[-1], seen + len(chunk)
+
+
+def _transition_chunk(order_ids, order_status, payment_status, shipping_status, dry_run):
+    """Lock, validate and update one chunk of orders; returns one result per order id."""
+    with transaction.atomic():
+        locked = {
+            order.order_id: order
+            for order in Order.objects.select_for_update(skip_locked=True).filter(order_id__in=order_ids)
+        }
+        missing = [order_id for order_id in order_ids if order_id not in locked]
+        existing = set(Order.objects.filter(order_id__in=missing).values_list("order_id", flat=True)) if missing else ()
+
+        errors, allowed = {}, []
+        for order_id in order_ids:
+            order = locked.get(order_id)
+            if order is None:
+                errors[order_id] = "Order is locked by another update." if order_id in existing else "Order not found."
+                continue
+            error = OrderService.transition_error(order, order_status, payment_status)
+            if error:
+                errors[order_id] = error
+            else:
+                allowed.append(order)
+
+        queued = {}
+        if not dry_run and allowed:
+            queued = _apply(allowed, order_status, payment_status, shipping_status)
+
+    results = []
+    allowed = {order.order_id: order for order in allowed}
+    for order_id in order_ids:
+        if order_id in errors:
+            results.append({"order_id": order_id, "error": errors[order_id]})
+            continue
+        order = allowed[order_id]
+        result = {"order_id": order_id, "order_status": order.order_status, "payment_status": order.payment_status}
+        if dry_run:
+            result["would_update"] = True
+        if order_id in queued:
+            result["queued"] = queued[order_id]
+        results.append(result)
+    return results
+
+
+def _apply(orders, order_status, payment_status, shipping_status):
+    """
+    Write the new statuses (inside the chunk's transaction) and, for cancellations, queue the
+    inventory releases and refunds. Returns {order_id: [queued follow-ups]}.
+    """
+    queued = {}
+    if order_status == OrderStatus.CANCELLED.value:
+        items = {order.order_id: [] for order in orders}
+        for item in OrderItem.objects.filter(order_id__in=list(items)).within(orders):
+            items[item.order_id].append(item)
+        enqueue_cancellations(orders, items)
+        for order in orders:
+            queued[order.order_id] = ["inventory_release"]
+            if order.payment_status == PaymentStatus.PAID.value:
+                queued[order.order_id].append("refund")
+
+    changes = {"shipping_status": shipping_status, "shipping_synced_at": timezone.now()} if shipping_status else {}
+    groups, previous = {}, []
+    for order in orders:
+        previous.append((order, (order.order_status, order.payment_status)))
+        target = (order_status or order.order_status, payment_status or order.payment_status)
+        groups.setdefault(target, []).append(order)
+
+    for (new_order_status, new_payment_status), group in groups.items():
+        created = [order.created_at for order in group]
+        Order.objects.filter(
+            order_id__in=[order.order_id for order in group],
+            created_at__gte=min(created), created_at__lte=max(created),
+        ).update(order_status=new_order_status, payment_status=new_payment_status, **changes)
+        for order in group:
+            order.order_status, order.payment_status = new_order_status, new_payment_status
+            for field, value in changes.items():
+                setattr(order, field, value)
+
+    customer_summary.record_transitions(previous)
+    order_cache.invalidate(*[order.order_id for order in orders])
+    return queued
+
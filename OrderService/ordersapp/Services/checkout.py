@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from ..Status.order_status import OrderStatus
+from ..Status.payment_status import PaymentStatus
+from .inventory_client import reserve_inventory, release_inventory, areserve_inventory, arelease_inventory
+from .payment_client import (
+    PREAUTH_ENABLED, charge_payment, authorize_payment, capture_payment, void_payment, refund_payment,
+    acharge_payment, aauthorize_payment, acapture_payment, avoid_payment, arefund_payment,
+)
+from .outbox import enqueue_order_confirmed
+from . import order_cache, customer_summary
+
+CHECKOUT_CONCURRENCY = getattr(settings, "CHECKOUT_CONCURRENCY", 32)
+logger = logging.getLogger(__name__)
+
+CONFIRMED = "CONFIRMED"
+INVENTORY_FAILED = "INVENTORY_FAILED"
+PAYMENT_FAILED = "PAYMENT_FAILED"
+
+# (order_status, payment_status) written for each outcome; None leaves the payment status as is
+OUTCOME_STATUSES = {
+    CONFIRMED: (OrderStatus.CONFIRMED.value, PaymentStatus.PAID.value),
+    INVENTORY_FAILED: (OrderStatus.CANCELLED.value, None),
+    PAYMENT_FAILED: (OrderStatus.CANCELLED.value, PaymentStatus.FAILED.value),
+}
+OUTCOME_ERRORS = {
+    INVENTORY_FAILED: "Inventory reservation failed",
+    PAYMENT_FAILED: "Payment failed",
+}
+
+# Compensation steps by name: (sync, async) callables taking the order id and items
+COMPENSATIONS = {
+    "release_inventory": (release_inventory, arelease_inventory),
+    "void_payment": (lambda order_id, items: void_payment(order_id),
+                     lambda order_id, items: avoid_payment(order_id)),
+    "refund_payment": (lambda order_id, items: refund_payment(order_id),
+                       lambda order_id, items: arefund_payment(order_id)),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class CheckoutSaga:
+    """
+    Downstream side of checkout for one order, run as a saga.
+    The inventory reservation and a payment authorization hold go out in parallel, so
+    checkout waits max(inventory, payment) rather than their sum. The hold is captured only
+    when both succeed; otherwise whichever step did succeed is compensated.
+    Every completed step registers its compensation (release_inventory, void_payment, or
+    refund_payment once captured); compensate() runs them newest first, e.g. when the order
+    cannot be committed after a successful checkout.
+    With PAYMENT_PREAUTH_ENABLED off, falls back to reserve-then-charge in sequence.
+    """
+
+    def __init__(self, order, items):
+        self.order = order
+        self.items = items
+        self._compensations = []
+
+    # -------------------- SYNC --------------------
+    def run(self):
+        order = self.order
+        if not PREAUTH_ENABLED:
+            return self._run_sequential()
+
+        reservation = _get_executor().submit(reserve_inventory, order.order_id, self.items)
+        authorized = authorize_payment(order.order_id, order.customer_id, order.order_total)
+        outcome = self._settle_holds(reservation.result(), authorized)
+        if outcome is not None:
+            self.compensate()
+            return outcome
+
+        if not capture_payment(order.order_id):
+            self.compensate()
+            return PAYMENT_FAILED
+        self._captured()
+        return CONFIRMED
+
+    def compensate(self):
+        """Undo completed steps, newest first. Failures are logged; holds also expire downstream."""
+        while self._compensations:
+            name = self._compensations.pop()
+            if not COMPENSATIONS[name][0](self.order.order_id, self.items):
+                logger.warning(
+                    "compensation failed",
+                    extra={"order_id": self.order.order_id, "compensation": name, "sample": False},
+                )
+
+    def _run_sequential(self):
+        order = self.order
+        if not reserve_inventory(order.order_id, self.items):
+            return INVENTORY_FAILED
+        self._compensations.append("release_inventory")
+        if not charge_payment(order.order_id, order.customer_id, order.order_total):
+            self.compensate()
+            return PAYMENT_FAILED
+        self._compensations.append("refund_payment")
+        return CONFIRMED
+
+    # -------------------- ASYNC (ASGI path) --------------------
+    async def arun(self):
+        order = self.order
+        if not PREAUTH_ENABLED:
+            return await self._arun_sequential()
+
+        reserved, authorized = await asyncio.gather(
+            areserve_inventory(order.order_id, self.items),
+            aauthorize_payment(order.order_id, order.customer_id, order.order_total),
+        )
+        outcome = self._settle_holds(reserved, authorized)
+        if outcome is not None:
+            await self.acompensate()
+            return outcome
+
+        if not await acapture_payment(order.order_id):
+            await self.acompensate()
+            return PAYMENT_FAILED
+        self._captured()
+        return CONFIRMED
+
+    async def acompensate(self):
+        while self._compensations:
+            name = self._compensations.pop()
+            if not await COMPENSATIONS[name][1](self.order.order_id, self.items):
+                logger.warning(
+                    "compensation failed",
+                    extra={"order_id": self.order.order_id, "compensation": name, "sample": False},
+                )
+
+    async def _arun_sequential(self):
+        order = self.order
+        if not await areserve_inventory(order.order_id, self.items):
+            return INVENTORY_FAILED
+        self._compensations.append("release_inventory")
+        if not await acharge_payment(order.order_id, order.customer_id, order.order_total):
+            await self.acompensate()
+            return PAYMENT_FAILED
+        self._compensations.append("refund_payment")
+        return CONFIRMED
+
+    # -------------------- internals --------------------
+    def _settle_holds(self, reserved, authorized):
+        """Register compensations for the parallel steps; the failed outcome, or None if both held."""
+        if reserved:
+            self._compensations.append("release_inventory")
+        if authorized:
+            self._compensations.append("void_payment")
+        if not reserved:
+            return INVENTORY_FAILED
+        if not authorized:
+            return PAYMENT_FAILED
+        return None
+
+    def _captured(self):
+        # Once captured, undoing the payment means a refund rather than a void
+        self._compensations[self._compensations.index("void_payment")] = "refund_payment"
+
+
+def finish_order(order, outcome):
+    """
+    Write a single order's checkout outcome: one status UPDATE plus, for confirmed orders,
+    the outbox rows; then the customer summary and cache invalidation. Call inside a transaction.
+    """
+    order_status, payment_status = OUTCOME_STATUSES[outcome]
+    order.order_status = order_status
+    update_fields = ["order_status"]
+    if payment_status:
+        order.payment_status = payment_status
+        update_fields.append("payment_status")
+    order.save(update_fields=update_fields)
+    if outcome == CONFIRMED:
+        enqueue_order_confirmed(order)
+    customer_summary.record_created([order])
+    order_cache.invalidate(order.order_id)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=CHECKOUT_CONCURRENCY, thread_name_prefix="checkout")
+    return _executor
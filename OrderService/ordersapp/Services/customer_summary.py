@@ -0,0 +1,139 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db import connection, transaction
+from django.utils import timezone
+from ..models import CustomerOrderSummary
+from ..Status.order_status import OrderStatus
+from ..Status.payment_status import PaymentStatus
+
+# Materialized per-customer rollup (CustomerOrderSummary).
+# Write paths add deltas with one INSERT ... ON CONFLICT DO UPDATE per call, so concurrent
+# writers increment the same row without read-modify-write races.
+# lifetime_spend is the sum of order_total over orders whose payment_status is PAID.
+TABLE = CustomerOrderSummary._meta.db_table
+STATUS_COLUMNS = {s.value: f"{s.value.lower()}_count" for s in OrderStatus}
+COUNTER_COLUMNS = ["order_count", "lifetime_spend", *STATUS_COLUMNS.values()]
+
+
+def _empty_delta():
+    delta = dict.fromkeys(COUNTER_COLUMNS, 0)
+    delta["lifetime_spend"] = Decimal("0.00")
+    delta["last_order_at"] = None
+    return delta
+
+
+def _spend(payment_status, total):
+    return total if payment_status == PaymentStatus.PAID.value else Decimal("0.00")
+
+
+def record_created(orders):
+    """Count newly created orders in their final (post-checkout) status."""
+    deltas = defaultdict(_empty_delta)
+    for order in orders:
+        delta = deltas[order.customer_id]
+        delta["order_count"] += 1
+        delta["lifetime_spend"] += _spend(order.payment_status, order.order_total)
+        if order.order_status in STATUS_COLUMNS:
+            delta[STATUS_COLUMNS[order.order_status]] += 1
+        if delta["last_order_at"] is None or order.created_at > delta["last_order_at"]:
+            delta["last_order_at"] = order.created_at
+    _apply(deltas)
+
+
+def record_transition(order, previous):
+    """
+    Move an existing order between status buckets.
+    previous: (order_status, payment_status) before the change.
+    """
+    record_transitions([(order, previous)])
+
+
+def record_transitions(changes):
+    """record_transition for many (order, previous) pairs, with one upsert per customer."""
+    deltas = defaultdict(_empty_delta)
+    for order, (old_status, old_payment) in changes:
+        if (old_status, old_payment) == (order.order_status, order.payment_status):
+            continue
+        delta = deltas[order.customer_id]
+        if old_status in STATUS_COLUMNS:
+            delta[STATUS_COLUMNS[old_status]] -= 1
+        if order.order_status in STATUS_COLUMNS:
+            delta[STATUS_COLUMNS[order.order_status]] += 1
+        delta["lifetime_spend"] += (
+            _spend(order.payment_status, order.order_total) - _spend(old_payment, order.order_total)
+        )
+    _apply(deltas)
+
+
+def record_repriced(changes):
+    """
+    Follow rewritten order totals into lifetime_spend.
+    changes: (order, old_total) pairs, order carrying the new order_total.
+    """
+    deltas = defaultdict(_empty_delta)
+    for order, old_total in changes:
+        spend = _spend(order.payment_status, order.order_total) - _spend(order.payment_status, old_total)
+        if spend:
+            deltas[order.customer_id]["lifetime_spend"] += spend
+    _apply(deltas)
+
+
+def _apply(deltas):
+    """Upsert one row per customer (sorted, so concurrent batches lock rows in the same order)."""
+    if not deltas:
+        return
+    now = timezone.now()
+    columns = ["customer_id", "last_order_at", "updated_at", *COUNTER_COLUMNS]
+    rows, params = [], []
+    for customer_id in sorted(deltas):
+        delta = deltas[customer_id]
+        rows.append("(" + ", ".join(["%s"] * len(columns)) + ")")
+        params.extend([customer_id, delta["last_order_at"], now, *(delta[c] for c in COUNTER_COLUMNS)])
+
+    increments = ", ".join(f"{c} = s.{c} + EXCLUDED.{c}" for c in COUNTER_COLUMNS)
+    sql = f"""
+        INSERT INTO {TABLE} AS s ({", ".join(columns)})
+        VALUES {", ".join(rows)}
+        ON CONFLICT (customer_id) DO UPDATE SET
+            {increments},
+            last_order_at = CASE
+                WHEN EXCLUDED.last_order_at IS NULL OR s.last_order_at >= EXCLUDED.last_order_at
+                THEN s.last_order_at ELSE EXCLUDED.last_order_at END,
+            updated_at = EXCLUDED.updated_at
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def get_summary(customer_id):
+    """Primary-key lookup; customers without orders get an all-zero summary."""
+    summary = CustomerOrderSummary.objects.filter(pk=customer_id).first()
+    return summary or CustomerOrderSummary(customer_id=customer_id)
+
+
+def rebuild(customer_ids=None):
+    """Recompute summaries from the orders table (all customers, or only the given ones)."""
+    status_sums = ", ".join(
+        f"SUM(CASE WHEN order_status = %s THEN 1 ELSE 0 END)" for _ in STATUS_COLUMNS
+    )
+    where, where_params = "", []
+    if customer_ids is not None:
+        customer_ids = list(customer_ids)
+        where = "WHERE customer_id IN (" + ", ".join(["%s"] * len(customer_ids)) + ")"
+        where_params = customer_ids
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} {where}", where_params)
+        cursor.execute(
+            f"""
+            INSERT INTO {TABLE} (customer_id, order_count, lifetime_spend, last_order_at, updated_at,
+                                 {", ".join(STATUS_COLUMNS.values())})
+            SELECT customer_id, COUNT(*),
+                   COALESCE(SUM(CASE WHEN payment_status = %s THEN order_total ELSE 0 END), 0),
+                   MAX(created_at), %s, {status_sums}
+            FROM ordersapp_order {where}
+            GROUP BY customer_id
+            """,
+            [PaymentStatus.PAID.value, timezone.now(), *STATUS_COLUMNS, *where_params],
+        )
+        return cursor.rowcount
@@ -0,0 +1,275 @@
+import base64
+import json
+from decimal import Decimal, InvalidOperation
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
+from django.utils.dateparse import parse_datetime
+from ..models import Order, OrderItem
+from ..Status.order_status import SortBy, Direction
+from ..Status.shipping_status import ShippingStatus
+from .async_db import db_phase
+from .order_services import OrderService
+from .pricing import PricingEngine
+from .shipping_sync import shipping_rows, ashipping_rows
+
+# Orders rendered per history page (matches the old Paginator size)
+PAGE_SIZE = getattr(settings, "ORDER_HISTORY_PAGE_SIZE", 3)
+# Upper bound on DB windows scanned per request when filtering on shipping status
+MAX_SCAN_WINDOWS = getattr(settings, "ORDER_HISTORY_MAX_SCAN_WINDOWS", 10)
+
+FORWARD = "n"
+BACKWARD = "p"
+
+
+class HistoryPage:
+    """One keyset page of a customer's order history."""
+
+    def __init__(self, orders, shipping_qs, next_cursor=None, previous_cursor=None):
+        self.orders = orders
+        self.shipping_qs = shipping_qs
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class OrderHistoryService:
+    """
+    Order history engine.
+    Filters, sorting, the page window and order totals run in SQL using keyset pagination
+    on (sort column, order_id); shipping status comes from the orders' stored copy, re-fetched
+    only for scanned rows whose in-flight status is stale (Services/shipping_sync.py).
+    """
+
+    @staticmethod
+    def build_queryset(customer_id, search="", status_filter="", payment_filter=""):
+        """Customer orders with the search/status/payment filters applied in SQL."""
+        orders_qs = Order.objects.filter(customer_id=customer_id)
+
+        if search:
+            sku_match = OrderItem.objects.filter(
+                order=OuterRef("pk"), order_created_at=OuterRef("created_at"), sku__icontains=search
+            )
+            orders_qs = orders_qs.filter(
+                Q(order_id__icontains=search)
+                | Q(order_status__icontains=search)
+                | Q(payment_status__icontains=search)
+                | Exists(sku_match)
+            )
+        if status_filter:
+            orders_qs = orders_qs.filter(order_status__iexact=status_filter)
+        if payment_filter:
+            orders_qs = orders_qs.filter(payment_status__iexact=payment_filter)
+        return orders_qs
+
+    @staticmethod
+    def sort_spec(sort_by, sort_dir):
+        """Return (column, descending) for the requested sort options."""
+        if sort_by == SortBy.DATE.value:
+            return "created_at", sort_dir == Direction.DESC.value
+        if sort_by == SortBy.CREATED_AT.value:
+            return "order_total", sort_dir == Direction.DESC.value
+        return "created_at", True
+
+    # -------------------- CURSORS --------------------
+    @staticmethod
+    def encode_cursor(direction, column, order):
+        raw = json.dumps({
+            "d": direction,
+            "c": column,
+            "v": str(getattr(order, column)),
+            "id": order.order_id,
+        })
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor, column):
+        """Return (direction, value, order_id) or None for a missing/invalid/foreign cursor."""
+        if not cursor:
+            return None
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            if data["c"] != column or data["d"] not in (FORWARD, BACKWARD):
+                return None
+            if column == "created_at":
+                value = parse_datetime(data["v"])
+                if value is None:
+                    return None
+            else:
+                value = Decimal(data["v"])
+            return data["d"], value, int(data["id"])
+        except (ValueError, KeyError, TypeError, InvalidOperation):
+            return None
+
+    @staticmethod
+    def _after(column, descending, value, order_id):
+        """Keyset predicate selecting rows strictly after (value, order_id) in scan order."""
+        op = "lt" if descending else "gt"
+        return Q(**{f"{column}__{op}": value}) | Q(**{column: value, f"order_id__{op}": order_id})
+
+    # -------------------- PAGING --------------------
+    @staticmethod
+    def get_page(customer_id, search="", status_filter="", payment_filter="",
+                 shipping_filter="", sort_by="", sort_dir="", cursor=None, page_size=PAGE_SIZE):
+        """Fetch one page of order history plus cursors for its neighbours."""
+        scan = _HistoryScan(customer_id, search, status_filter, payment_filter,
+                            shipping_filter, sort_by, sort_dir, cursor, page_size)
+        for _ in range(MAX_SCAN_WINDOWS):
+            batch = list(scan.window_queryset())
+            if not scan.advance(batch):
+                break
+            if shipping_filter:
+                batch = scan.filter_shipping(batch, shipping_rows(batch))
+            if scan.collect(batch):
+                break
+
+        orders = scan.page_orders()
+        OrderService.prefetch_items(orders)
+        if not shipping_filter:
+            # Shipping status only for the visible page
+            scan.add_shipping(shipping_rows(orders))
+        page = scan.finish(orders)
+        if page is None:
+            # Nothing before the cursor any more; fall back to the first page.
+            return OrderHistoryService.get_page(
+                customer_id, search, status_filter, payment_filter,
+                shipping_filter, sort_by, sort_dir, None, page_size
+            )
+        return page
+
+    @staticmethod
+    async def aget_page(customer_id, search="", status_filter="", payment_filter="",
+                        shipping_filter="", sort_by="", sort_dir="", cursor=None, page_size=PAGE_SIZE):
+        """Async get_page: async ORM windows and the async shipping client."""
+        scan = _HistoryScan(customer_id, search, status_filter, payment_filter,
+                            shipping_filter, sort_by, sort_dir, cursor, page_size)
+        for _ in range(MAX_SCAN_WINDOWS):
+            async with db_phase():
+                batch = [order async for order in scan.window_queryset()]
+            if not scan.advance(batch):
+                break
+            if shipping_filter:
+                batch = scan.filter_shipping(batch, await ashipping_rows(batch))
+            if scan.collect(batch):
+                break
+
+        orders = scan.page_orders()
+        async with db_phase():
+            await sync_to_async(OrderService.prefetch_items)(orders)
+        if not shipping_filter:
+            scan.add_shipping(await ashipping_rows(orders))
+        page = scan.finish(orders)
+        if page is None:
+            return await OrderHistoryService.aget_page(
+                customer_id, search, status_filter, payment_filter,
+                shipping_filter, sort_by, sort_dir, None, page_size
+            )
+        return page
+
+
+class _HistoryScan:
+    """Keyset scan state for one history page; the sync and async loaders differ only in I/O."""
+
+    def __init__(self, customer_id, search, status_filter, payment_filter,
+                 shipping_filter, sort_by, sort_dir, cursor, page_size):
+        self.column, self.descending = OrderHistoryService.sort_spec(sort_by, sort_dir)
+        self.position = OrderHistoryService.decode_cursor(cursor, self.column)
+        self.direction = self.position[0] if self.position else FORWARD
+        self.shipping_filter = shipping_filter
+        self.page_size = page_size
+
+        # Walking backwards scans in the opposite order, then flips the page.
+        self.scan_desc = self.descending if self.direction == FORWARD else not self.descending
+        prefix = "-" if self.scan_desc else ""
+        self.base_qs = OrderHistoryService.build_queryset(
+            customer_id, search, status_filter, payment_filter
+        ).order_by(f"{prefix}{self.column}", f"{prefix}order_id").annotate(
+            **PricingEngine.sql_annotations()
+        )
+
+        self.window = page_size + 1 if not shipping_filter else page_size * 2
+        self.last = self.position[1:] if self.position else None
+        self.collected, self.shipping_map = [], {}
+        self.exhausted = False
+
+    def window_queryset(self):
+        qs = self.base_qs
+        if self.last:
+            qs = qs.filter(OrderHistoryService._after(self.column, self.scan_desc, *self.last))
+        return qs[:self.window]
+
+    def advance(self, batch):
+        """Move the keyset position past a fetched window; False when it was empty."""
+        if len(batch) < self.window:
+            self.exhausted = True
+        if not batch:
+            return False
+        self.last = (getattr(batch[-1], self.column), batch[-1].order_id)
+        return True
+
+    def filter_shipping(self, batch, ship_rows):
+        """Keep the orders whose shipping status matches the filter."""
+        batch_map = {s["order_id"]: s for s in ship_rows}
+        self.shipping_map.update(batch_map)
+        return [
+            o for o in batch
+            if batch_map.get(o.order_id, {}).get(
+                "shipping_status", ShippingStatus.UNKNOWN.value
+            ).lower() == self.shipping_filter.lower()
+        ]
+
+    def collect(self, batch):
+        """Add a (filtered) window; True when the scan is complete."""
+        self.collected.extend(batch)
+        return len(self.collected) > self.page_size or self.exhausted or not self.shipping_filter
+
+    def page_orders(self):
+        return self.collected[:self.page_size]
+
+    def add_shipping(self, ship_rows):
+        self.shipping_map.update({s["order_id"]: s for s in ship_rows})
+
+    def finish(self, orders):
+        """Build the HistoryPage, or None when a backward cursor has nothing before it."""
+        has_more = len(self.collected) > self.page_size or (bool(self.shipping_filter) and not self.exhausted)
+        shipping_qs = [self.shipping_map[o.order_id] for o in orders if o.order_id in self.shipping_map]
+
+        # calculated_total / items_subtotal / tax_amount come annotated from SQL
+        for order in orders:
+            order.shipping_status = self.shipping_map.get(order.order_id, {}).get(
+                "shipping_status", ShippingStatus.UNKNOWN.value
+            )
+
+        if self.direction == BACKWARD and not orders:
+            return None
+
+        column = self.column
+        if self.direction == BACKWARD:
+            orders.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, self.position is not None
+
+        # A shipping-filtered scan may stop early; continue from the last scanned row.
+        if has_next and self.direction == FORWARD and len(orders) < self.page_size and self.last:
+            tail = Order(order_id=self.last[1], **{column: self.last[0]})
+            next_cursor = OrderHistoryService.encode_cursor(FORWARD, column, tail)
+        elif has_next and orders:
+            next_cursor = OrderHistoryService.encode_cursor(FORWARD, column, orders[-1])
+        else:
+            next_cursor = None
+
+        if has_previous and orders:
+            previous_cursor = OrderHistoryService.encode_cursor(BACKWARD, column, orders[0])
+        else:
+            previous_cursor = None
+
+        return HistoryPage(orders, shipping_qs, next_cursor, previous_cursor)
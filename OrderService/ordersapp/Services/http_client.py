@@ -0,0 +1,164 @@
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from django.conf import settings
+from prometheus_client import Counter, Histogram
+from . import telemetry
+
+# Shared outbound HTTP layer used by every downstream service client.
+# One requests.Session per process, backed by per-host keep-alive connection pools.
+POOL_CONNECTIONS = getattr(settings, "HTTP_POOL_CONNECTIONS", 10)
+POOL_MAXSIZE = getattr(settings, "HTTP_POOL_MAXSIZE", 20)
+POOL_BLOCK = getattr(settings, "HTTP_POOL_BLOCK", True)
+POOL_TIMEOUT = getattr(settings, "HTTP_POOL_TIMEOUT", 5)
+CONNECT_TIMEOUT = getattr(settings, "HTTP_CONNECT_TIMEOUT", 2)
+READ_TIMEOUT = getattr(settings, "HTTP_READ_TIMEOUT", 5)
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+POOL_HITS = Counter(
+    "order_service_http_pool_hits_total",
+    "Outbound requests served by a reused keep-alive connection", ["host"]
+)
+POOL_MISSES = Counter(
+    "order_service_http_pool_misses_total",
+    "Outbound requests that had to open a new connection", ["host"]
+)
+POOL_WAIT = Histogram(
+    "order_service_http_pool_wait_seconds",
+    "Time spent waiting to check a connection out of the pool", ["host"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+)
+
+_session = None
+_session_lock = threading.Lock()
+_stats = {}
+_stats_lock = threading.Lock()
+_checkout = threading.local()
+
+
+# -------------------- POOL INSTRUMENTATION --------------------
+class _InstrumentedPoolMixin:
+    """Counts connection checkouts (hits), new connections (misses) and wait time."""
+
+    def _get_conn(self, timeout=None):
+        # requests never passes a pool timeout; don't block forever on an exhausted pool
+        timeout = POOL_TIMEOUT if timeout is None else timeout
+        _checkout.opened = False
+        start = time.perf_counter()
+        conn = super()._get_conn(timeout)
+        _record(self, "checkouts", wait=time.perf_counter() - start, reused=not _checkout.opened)
+        return conn
+
+    def _new_conn(self):
+        _checkout.opened = True
+        _record(self, "misses")
+        return super()._new_conn()
+
+
+class InstrumentedHTTPConnectionPool(_InstrumentedPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class InstrumentedHTTPSConnectionPool(_InstrumentedPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": InstrumentedHTTPConnectionPool,
+            "https": InstrumentedHTTPSConnectionPool,
+        }
+
+
+def _record(pool, field, wait=None, reused=False):
+    host = f"{pool.host}:{pool.port}"
+    with _stats_lock:
+        entry = _stats.setdefault(host, {"checkouts": 0, "misses": 0, "wait_seconds": 0.0})
+        entry[field] += 1
+        if wait is not None:
+            entry["wait_seconds"] += wait
+    if field == "misses":
+        POOL_MISSES.labels(host=host).inc()
+    else:
+        POOL_WAIT.labels(host=host).observe(wait)
+        if reused:
+            POOL_HITS.labels(host=host).inc()
+
+
+def pool_stats():
+    """Per-host pool statistics: hits, misses, checkouts and total wait time."""
+    with _stats_lock:
+        return {
+            host: {
+                "hits": s["checkouts"] - s["misses"],
+                "misses": s["misses"],
+                "checkouts": s["checkouts"],
+                "wait_seconds": round(s["wait_seconds"], 6),
+            }
+            for host, s in _stats.items()
+        }
+
+
+# -------------------- SESSION --------------------
+def get_session():
+    """Process-wide session; connection pools are thread-safe and shared by all threads."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                # The session is shared by every request thread; never carry cookies across calls.
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                adapter = PooledHTTPAdapter(
+                    pool_connections=POOL_CONNECTIONS,
+                    pool_maxsize=POOL_MAXSIZE,
+                    pool_block=POOL_BLOCK,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def reset_session():
+    """Drop pooled connections (used after fork so workers never share sockets)."""
+    global _session
+    session, _session = _session, None
+    if session is not None:
+        session.close()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_session)
+
+
+def request(method, url, **kwargs):
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    start, status = time.perf_counter(), "error"
+    try:
+        response = get_session().request(method, url, **kwargs)
+        status = response.status_code
+        return response
+    except requests.Timeout:
+        status = "timeout"
+        raise
+    finally:
+        telemetry.record_downstream(method, url, status, time.perf_counter() - start)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def patch(url, **kwargs):
+    return request("PATCH", url, **kwargs)
@@ -0,0 +1,232 @@
+import asyncio
+import hashlib
+import json
+import time
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import OperationalError, connection, transaction
+from django.utils import timezone
+from prometheus_client import Counter
+from ..models import IdempotencyKey, Order
+from ..Status.idempotency_status import IdempotencyStatus
+from ..Status.order_status import OrderStatus
+from .async_db import db_phase
+from .order_cache import LRUCache
+
+# Idempotency-Key support for order creation.
+# Two tiers: the ordersapp_idempotencykey table is the source of truth shared by all workers,
+# and an in-process LRU holds recently completed responses so retry storms are answered
+# without touching the database.
+TTL_SECONDS = getattr(settings, "IDEMPOTENCY_KEY_TTL", 86400)
+WAIT_SECONDS = getattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 10)
+CLAIM_TIMEOUT = getattr(settings, "IDEMPOTENCY_CLAIM_TIMEOUT", 120)
+CACHE_SIZE = getattr(settings, "IDEMPOTENCY_CACHE_SIZE", 10000)
+POLL_INTERVAL = 0.05
+MAX_KEY_LENGTH = IdempotencyKey._meta.get_field("key").max_length
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+TABLE = IdempotencyKey._meta.db_table
+IN_PROGRESS = IdempotencyStatus.IN_PROGRESS.value
+COMPLETED = IdempotencyStatus.COMPLETED.value
+
+REPLAYS = Counter(
+    "order_service_idempotent_replays_total",
+    "Create requests answered with a stored response, by store tier (cache, db)", ["tier"]
+)
+
+# Fresh claim, or take over one whose key expired or whose owner vanished without finishing.
+# While another transaction holds an uncommitted claim on the key, this INSERT waits for it.
+# Taking over an abandoned claim for the same body keeps its order_id, so the retry resumes
+# that PENDING order instead of creating a second one.
+CLAIM_SQL = f"""
+    INSERT INTO {TABLE} AS k (key, request_hash, status, created_at)
+    VALUES (%s, %s, '{IN_PROGRESS}', %s)
+    ON CONFLICT (key) DO UPDATE SET
+        request_hash = EXCLUDED.request_hash, status = EXCLUDED.status,
+        response_status = NULL, response_body = NULL, created_at = EXCLUDED.created_at,
+        order_id = CASE WHEN k.status = '{IN_PROGRESS}' AND k.request_hash = EXCLUDED.request_hash
+                        THEN k.order_id END
+    WHERE k.created_at < %s OR (k.status = '{IN_PROGRESS}' AND k.created_at < %s)
+    RETURNING k.order_id
+"""
+
+_completed = LRUCache(max_entries=CACHE_SIZE, ttl=TTL_SECONDS)
+
+
+class KeyReusedError(Exception):
+    """The key was already used for a request with a different body."""
+
+    def __init__(self, key):
+        super().__init__(key)
+        self.key = key
+
+
+class RequestInProgressError(Exception):
+    """The original request for this key was still running when the wait ran out."""
+
+
+def fingerprint(data):
+    """sha256 of the canonical JSON request body."""
+    return hashlib.sha256(json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode()).hexdigest()
+
+
+def cached(key, request_hash):
+    """Tier 1: the (status, body) of a completed request from this process's LRU, or None."""
+    entry = _completed.get(key)
+    if entry is None:
+        return None
+    REPLAYS.labels(tier="cache").inc()
+    return _replay(key, request_hash, *entry)
+
+
+def claim(key, request_hash, wait=True):
+    """
+    Claim the key inside the caller's transaction (the one that writes the order).
+    Returns (replay, order_id). replay is the (status, body) stored for the original request,
+    or None if this request now owns the key. order_id is the order created under an
+    abandoned claim this request took over, for claimed_order to resume.
+    An uncommitted claim by another request makes the INSERT block until that transaction
+    ends, so in-flight duplicates queue behind the original instead of running alongside it.
+    A committed claim that is still in progress is polled (wait=False raises immediately);
+    either wait is bounded by WAIT_SECONDS and ends in RequestInProgressError. Claims left
+    in progress for CLAIM_TIMEOUT are taken over.
+    """
+    deadline = time.monotonic() + WAIT_SECONDS
+    while True:
+        stored = _stored(key)
+        if stored is not None and not _expired(stored):
+            replay = _settled(key, request_hash, stored)
+            if replay is not None:
+                return replay, None
+            if not _abandoned(stored):
+                if not wait or time.monotonic() >= deadline:
+                    raise RequestInProgressError(key)
+                time.sleep(POLL_INTERVAL)
+                continue
+        claimed, order_id = _insert_claim(key, request_hash, deadline)
+        if claimed:
+            return None, order_id
+
+
+def claimed_order(key, order_id, create):
+    """
+    The order to check out under the claim, in the transaction that claimed it: the PENDING
+    order left by an abandoned claim this request took over (downstream calls are keyed by
+    order_id, so its saga can safely run again), else a new one from create(), recorded on
+    the claim for a later takeover.
+    """
+    if order_id is not None:
+        order = Order.objects.select_for_update().filter(
+            order_id=order_id, order_status=OrderStatus.PENDING.value
+        ).first()
+        if order is not None:
+            return order
+    order = create()
+    if key:
+        IdempotencyKey.objects.filter(key=key).update(order_id=order.order_id)
+    return order
+
+
+def complete(key, request_hash, status, body):
+    """Store the response for the claimed key, in the same transaction as the order."""
+    IdempotencyKey.objects.filter(key=key).update(
+        status=COMPLETED, response_status=status, response_body=body
+    )
+    transaction.on_commit(lambda: _completed.set(key, (request_hash, status, body)))
+
+
+def release(key):
+    """Drop an unfinished claim (committed ahead of checkout) so a retry can run."""
+    IdempotencyKey.objects.filter(key=key, status=IN_PROGRESS).delete()
+
+
+def purge_expired(batch_size=5000):
+    """Delete keys older than TTL_SECONDS in batches. Returns the number of rows deleted."""
+    cutoff = timezone.now() - timedelta(seconds=TTL_SECONDS)
+    deleted = 0
+    while True:
+        keys = list(IdempotencyKey.objects.filter(created_at__lt=cutoff).values_list("key", flat=True)[:batch_size])
+        if not keys:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(key__in=keys, created_at__lt=cutoff).delete()[0]
+
+
+# -------------------- ASYNC (ASGI path) --------------------
+async def await_completion(key, request_hash):
+    """
+    Async wait for a committed in-progress claim: polls the stored row off the event loop
+    until it completes (returns (status, body)) or WAIT_SECONDS pass.
+    """
+    deadline = time.monotonic() + WAIT_SECONDS
+    while time.monotonic() < deadline:
+        async with db_phase():
+            stored = await sync_to_async(_stored)(key)
+        if stored is None:
+            break  # the original gave up and released its claim; the client should retry
+        replay = _settled(key, request_hash, stored)
+        if replay is not None:
+            return replay
+        await asyncio.sleep(POLL_INTERVAL)
+    raise RequestInProgressError(key)
+
+
+# -------------------- internals --------------------
+def _stored(key):
+    return (
+        IdempotencyKey.objects.filter(key=key)
+        .values("request_hash", "status", "response_status", "response_body", "created_at")
+        .first()
+    )
+
+
+def _expired(stored):
+    return stored["created_at"] < timezone.now() - timedelta(seconds=TTL_SECONDS)
+
+
+def _abandoned(stored):
+    """Still in progress after CLAIM_TIMEOUT: its request died before finishing."""
+    return stored["status"] != COMPLETED and stored["created_at"] < timezone.now() - timedelta(seconds=CLAIM_TIMEOUT)
+
+
+def _settled(key, request_hash, stored):
+    """(status, body) if the stored request completed, None while in progress."""
+    if stored["request_hash"] != request_hash:
+        raise KeyReusedError(key)
+    if stored["status"] != COMPLETED:
+        return None
+    entry = (stored["request_hash"], stored["response_status"], stored["response_body"])
+    _completed.set(key, entry)
+    REPLAYS.labels(tier="db").inc()
+    return _replay(key, request_hash, *entry)
+
+
+def _replay(key, request_hash, stored_hash, status, body):
+    if stored_hash != request_hash:
+        raise KeyReusedError(key)
+    return status, body
+
+
+def _insert_claim(key, request_hash, deadline):
+    """
+    (True, order_id of a taken-over claim or None) if claimed; (False, None) if the key is
+    (now) held by a committed claim to re-read.
+    """
+    now = timezone.now()
+    remaining_ms = max(1, int((deadline - time.monotonic()) * 1000))
+    with connection.cursor() as cursor:
+        cursor.execute(f"SET LOCAL lock_timeout = {remaining_ms}")
+        try:
+            cursor.execute(CLAIM_SQL, [
+                key, request_hash, now,
+                now - timedelta(seconds=TTL_SECONDS), now - timedelta(seconds=CLAIM_TIMEOUT),
+            ])
+        except OperationalError as e:
+            if getattr(e.__cause__, "pgcode", None) == "55P03":  # lock_not_available
+                raise RequestInProgressError(key) from e
+            raise
+        row = cursor.fetchone()
+        cursor.execute("SET LOCAL lock_timeout TO DEFAULT")
+    return row is not None, row[0] if row else None
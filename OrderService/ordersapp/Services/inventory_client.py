@@ -1,77 +1,310 @@
+import asyncio
+import logging
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, wait
 from django.conf import settings
-import os
+from . import http_client, async_http_client
+from .resilience import BulkEndpoint, CircuitOpenError, Dependency
+from .telemetry import checkout_stage
 
 # Inventory service base URL (use env var for flexibility in Docker/K8s)
 INVENTORY_SERVICE_URL = getattr(settings, "INVENTORY_SERVICE_URL", "http://inventory:8001/v1/inventory")
 MOCK_INVENTORY = getattr(settings, "USE_MOCK_INVENTORY", True)
+BULK_RESERVE_ENABLED = getattr(settings, "INVENTORY_BULK_RESERVE_ENABLED", True)
+BULK_RELEASE_ENABLED = getattr(settings, "INVENTORY_BULK_RELEASE_ENABLED", True)
+BULK_RELEASE_BATCH_SIZE = getattr(settings, "INVENTORY_BULK_RELEASE_BATCH_SIZE", 100)
+BULK_REPROBE_SECONDS = getattr(settings, "INVENTORY_BULK_REPROBE_SECONDS", 300)
+RESERVE_CONCURRENCY = getattr(settings, "INVENTORY_RESERVE_CONCURRENCY", 8)
+RESERVE_DEADLINE = getattr(settings, "INVENTORY_RESERVE_DEADLINE", 5)
+# Reservations carry an Idempotency-Key, so they are safe to hedge
+HEDGE_RESERVATIONS = getattr(settings, "INVENTORY_HEDGE_ENABLED", False)
 
+INVENTORY = Dependency("inventory", hedge=HEDGE_RESERVATIONS)
+BULK_RESERVE = BulkEndpoint("inventory bulk reserve", enabled=BULK_RESERVE_ENABLED, reprobe_seconds=BULK_REPROBE_SECONDS)
+BULK_RELEASE = BulkEndpoint("inventory bulk release", enabled=BULK_RELEASE_ENABLED, reprobe_seconds=BULK_REPROBE_SECONDS)
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+@checkout_stage("reserve_inventory")
 def reserve_inventory(order_id, items):
     """
-    Reserve stock for an order.
-    items: list of dicts with 'product_id' and 'quantity'
+    Reserve stock for an order (all-or-nothing).
+    items: list of dicts with 'product_id' and 'quantity' (or OrderItem instances)
     Returns True if all items reserved successfully, False otherwise.
     """
     if MOCK_INVENTORY:
-        print("[InventoryClient] Mock mode ON – reservation always succeeds.")
+        logger.debug("inventory mock mode: reservation always succeeds", extra={"order_id": order_id})
         return True
-    payload = [
-            {"product_id": item["product_id"],"warehouse": "WH1", "quantity": item["quantity"]} 
-            for item in items
-        ]
+    lines = _reservation_lines(items)
+    if not lines:
+        return True
+
+    if BULK_RESERVE.available():
+        result = _reserve_bulk(order_id, lines)
+        if result is not None:
+            return result
+        BULK_RESERVE.unsupported()
+    return _reserve_parallel(order_id, lines)
 
+
+def _reserve_bulk(order_id, lines):
+    """
+    POST {INVENTORY_SERVICE_URL}/reserve/bulk/ with every line in one round trip.
+    The service reserves all lines or none. Returns None if the endpoint is unsupported.
+    """
     try:
-        headers = {"Idempotency-Key": str(order_id)}
-        for i in payload:
-            response = requests.post(
-                f"{INVENTORY_SERVICE_URL}/reserve/",
-                json=i,
-                headers=headers,
-                timeout=5
-            )   
-
-            if response.status_code == 200:
-                return True
-            return False
+        response = INVENTORY.call(lambda timeout: http_client.post(
+            f"{INVENTORY_SERVICE_URL}/reserve/bulk/",
+            json={"order_id": order_id, "items": lines},
+            headers={"Idempotency-Key": str(order_id)}, timeout=timeout
+        ))
+    except requests.exceptions.RequestException as e:
+        logger.warning("bulk reservation failed", extra={"order_id": order_id, "error": str(e)})
+        return False
+
+    if response.status_code in (404, 405, 501):
+        return None
+    if response.status_code == 200:
+        return True
+    logger.warning(
+        "bulk reservation rejected", extra={"order_id": order_id, "status_code": response.status_code}
+    )
+    return False
+
+
+def _reserve_parallel(order_id, lines):
+    """
+    Fallback: reserve each line concurrently via /reserve/.
+    On any failure the lines that did succeed are released again.
+    """
+    pool = _get_executor()
+    futures = [pool.submit(_reserve_line, order_id, index, line) for index, line in enumerate(lines)]
+    done, pending = wait(futures, timeout=RESERVE_DEADLINE)
+    for future in pending:
+        if not future.cancel():
+            # Still in flight: release the line if it lands after we gave up on it.
+            line = lines[futures.index(future)]
+            future.add_done_callback(
+                lambda f, line=line: f.result() and release_inventory(order_id, [line])
+            )
+
+    reserved = [lines[i] for i, f in enumerate(futures) if f in done and f.result()]
+    if len(reserved) == len(lines):
+        return True
+
+    if reserved:
+        logger.warning("partial reservation, compensating", extra={"order_id": order_id})
+        release_inventory(order_id, reserved)
+    return False
+
+
+def _reserve_line(order_id, index, line):
+    # One key per line: the order id alone would make the service dedupe lines 2..n.
+    headers = {"Idempotency-Key": f"{order_id}-{index}"}
+    try:
+        response = INVENTORY.call(lambda timeout: http_client.post(
+            f"{INVENTORY_SERVICE_URL}/reserve/", json=line, headers=headers, timeout=timeout
+        ))
+        return response.status_code == 200
     except requests.exceptions.RequestException as e:
-        print(f"[InventoryClient] Reservation failed: {e}")
+        logger.warning("reservation failed", extra={"order_id": order_id, "error": str(e)})
         return False
 
 
+def _reservation_lines(items):
+    return [
+        {"product_id": product_id, "warehouse": "WH1", "quantity": quantity}
+        for product_id, quantity in (_line(item) for item in items)
+    ]
+
+
+def _line(item):
+    """(product_id, quantity) for an item dict or OrderItem instance."""
+    if isinstance(item, dict):
+        return item["product_id"], item["quantity"]
+    return item.product_id, item.quantity
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=RESERVE_CONCURRENCY, thread_name_prefix="inventory-reserve"
+                )
+    return _executor
+
+
+@checkout_stage("release_inventory")
 def release_inventory(order_id, items):
     """
     Release reserved stock for an order.
     items: list of OrderItem instances or dicts with 'product_id' and 'quantity'
     """
     if MOCK_INVENTORY:
-        print("[InventoryClient] Mock mode ON – release always succeeds.")
+        logger.debug("inventory mock mode: release always succeeds", extra={"order_id": order_id})
+        return True
+    payload = _release_payload(order_id, items)
 
+    try:
+        response = INVENTORY.call(
+            lambda timeout: http_client.post(f"{INVENTORY_SERVICE_URL}/release/", json=payload, timeout=timeout),
+            hedge=False
+        )
+        if response.status_code != 200:
+            logger.warning(
+                "inventory release rejected", extra={"order_id": order_id, "status_code": response.status_code}
+            )
+            return False
         return True
-    payload = {
+    except requests.exceptions.RequestException as e:
+        logger.warning("inventory release failed", extra={"order_id": order_id, "error": str(e)})
+        return False
+
+
+def _release_payload(order_id, items):
+    return {
         "order_id": order_id,
-        "items": []
+        "items": [
+            {"product_id": product_id, "quantity": quantity}
+            for product_id, quantity in (_line(item) for item in items)
+        ]
     }
 
-    for item in items:
-        if isinstance(item, dict):
-            payload["items"].append({
-                "product_id": item["product_id"],
-                "quantity": item["quantity"]
-            })
-        else:  # assume OrderItem instance
-            payload["items"].append({
-                "product_id": item.product_id,
-                "quantity": item.quantity
-            })
 
+def release_inventory_bulk(releases):
+    """
+    Release stock for many orders (bulk cancellation): {order_id: items} -> {order_id: released}.
+    One POST /release/bulk/ per BULK_RELEASE_BATCH_SIZE orders, else per-order releases in parallel.
+    """
+    if MOCK_INVENTORY:
+        logger.debug("inventory mock mode: release always succeeds", extra={"orders": len(releases)})
+        return dict.fromkeys(releases, True)
+
+    order_ids, results = list(releases), {}
+    for start in range(0, len(order_ids), BULK_RELEASE_BATCH_SIZE):
+        chunk = order_ids[start:start + BULK_RELEASE_BATCH_SIZE]
+        if BULK_RELEASE.available():
+            released = _release_bulk({order_id: releases[order_id] for order_id in chunk})
+            if released is not None:
+                results.update(released)
+                continue
+            BULK_RELEASE.unsupported()
+        released = _get_executor().map(lambda order_id: release_inventory(order_id, releases[order_id]), chunk)
+        results.update(zip(chunk, released))
+    return results
+
+
+def _release_bulk(releases):
+    """
+    POST {INVENTORY_SERVICE_URL}/release/bulk/ with {"releases": [{"order_id", "items"}, ...]}.
+    Expects 200 {"results": [{"order_id", "released"}, ...]}. Returns None if the endpoint is unsupported.
+    """
+    payload = {"releases": [_release_payload(order_id, items) for order_id, items in releases.items()]}
     try:
-        response = requests.post(f"{INVENTORY_SERVICE_URL}/release/", json=payload, timeout=5)
-        if response.status_code != 200:
-            print(f"[InventoryClient] Failed to release inventory for order {order_id}")
-            return False
-        return True
+        response = INVENTORY.call(
+            lambda timeout: http_client.post(f"{INVENTORY_SERVICE_URL}/release/bulk/", json=payload, timeout=timeout),
+            hedge=False
+        )
     except requests.exceptions.RequestException as e:
-        print(f"[InventoryClient] Release failed: {e}")
+        logger.warning("bulk release failed", extra={"orders": len(releases), "error": str(e)})
+        return dict.fromkeys(releases, False)
+
+    if response.status_code in (404, 405, 501):
+        return None
+    if response.status_code != 200:
+        logger.warning("bulk release rejected", extra={"orders": len(releases), "status_code": response.status_code})
+        return dict.fromkeys(releases, False)
+    try:
+        released = {row.get("order_id"): bool(row.get("released")) for row in response.json().get("results", [])}
+    except ValueError:
+        # Malformed JSON body: nothing confirmed, the outbox retries these releases
+        logger.warning("bulk release returned malformed JSON", extra={"orders": len(releases)})
+        return dict.fromkeys(releases, False)
+    return {order_id: released.get(order_id, False) for order_id in releases}
+
+
+# -------------------- ASYNC (ASGI path) --------------------
+@checkout_stage("reserve_inventory")
+async def areserve_inventory(order_id, items):
+    """Async reserve_inventory: bulk endpoint, else concurrent per-line reservations."""
+    if MOCK_INVENTORY:
+        return True
+    lines = _reservation_lines(items)
+    if not lines:
+        return True
+
+    if BULK_RESERVE.available():
+        result = await _areserve_bulk(order_id, lines)
+        if result is not None:
+            return result
+        BULK_RESERVE.unsupported()
+    return await _areserve_parallel(order_id, lines)
+
+
+async def _areserve_bulk(order_id, lines):
+    try:
+        response = await INVENTORY.acall(lambda timeout: async_http_client.post(
+            f"{INVENTORY_SERVICE_URL}/reserve/bulk/",
+            json={"order_id": order_id, "items": lines},
+            headers={"Idempotency-Key": str(order_id)}, timeout=timeout
+        ))
+    except (async_http_client.RequestError, CircuitOpenError) as e:
+        logger.warning("bulk reservation failed", extra={"order_id": order_id, "error": str(e)})
+        return False
+    if response.status_code in (404, 405, 501):
+        return None
+    return response.status_code == 200
+
+
+async def _areserve_parallel(order_id, lines):
+    tasks = [asyncio.ensure_future(_areserve_line(order_id, index, line)) for index, line in enumerate(lines)]
+    done, pending = await asyncio.wait(tasks, timeout=RESERVE_DEADLINE)
+    for task in pending:
+        # Still in flight: release the line if it lands after we gave up on it.
+        line = lines[tasks.index(task)]
+        task.add_done_callback(
+            lambda t, line=line: not t.cancelled() and t.result()
+            and asyncio.ensure_future(arelease_inventory(order_id, [line]))
+        )
+
+    reserved = [lines[i] for i, task in enumerate(tasks) if task in done and task.result()]
+    if len(reserved) == len(lines):
+        return True
+    if reserved:
+        logger.warning("partial reservation, compensating", extra={"order_id": order_id})
+        await arelease_inventory(order_id, reserved)
+    return False
+
+
+async def _areserve_line(order_id, index, line):
+    headers = {"Idempotency-Key": f"{order_id}-{index}"}
+    try:
+        response = await INVENTORY.acall(lambda timeout: async_http_client.post(
+            f"{INVENTORY_SERVICE_URL}/reserve/", json=line, headers=headers, timeout=timeout
+        ))
+        return response.status_code == 200
+    except (async_http_client.RequestError, CircuitOpenError) as e:
+        logger.warning("reservation failed", extra={"order_id": order_id, "error": str(e)})
         return False
 
 
+@checkout_stage("release_inventory")
+async def arelease_inventory(order_id, items):
+    """Async release_inventory."""
+    if MOCK_INVENTORY:
+        return True
+    payload = _release_payload(order_id, items)
+    try:
+        response = await INVENTORY.acall(
+            lambda timeout: async_http_client.post(f"{INVENTORY_SERVICE_URL}/release/", json=payload, timeout=timeout),
+            hedge=False
+        )
+    except (async_http_client.RequestError, CircuitOpenError) as e:
+        logger.warning("inventory release failed", extra={"order_id": order_id, "error": str(e)})
+        return False
+    return response.status_code == 200
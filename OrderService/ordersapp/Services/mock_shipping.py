@@ -0,0 +1,320 @@
+"""
+Mock Shipping Service backend for shipping_client when USE_MOCK_SHIPPING is on.
+
+Store (MOCK_SHIPPING_STORE), bounded by MOCK_SHIPPING_MAX_ENTRIES and MOCK_SHIPPING_TTL:
+  memory  per-process LRU, one __slots__ record per shipment. Workers don't see each
+          other's shipments.
+  sqlite  one SQLite file (MOCK_SHIPPING_DB_PATH, default in /dev/shm) shared by every
+          worker on the host, so all of them report the same status. Oldest writes are
+          evicted first.
+
+Progression (MOCK_SHIPPING_PROGRESSION):
+  random  every fetch moves a shipment one random step on (Pending -> Shipped/Failed ->
+          Delivered), starting at Pending the first time an order is seen.
+  timed   the status follows the time since the order was placed: Shipped after
+          MOCK_SHIPPING_SHIP_AFTER seconds, Delivered after MOCK_SHIPPING_DELIVER_AFTER. A
+          fixed MOCK_SHIPPING_FAILURE_RATE share of orders, picked by order id, fails instead
+          of shipping. Fetches don't write, and the same orders at the same time give the same
+          statuses on every worker and every run. Set MOCK_SHIPPING_NOW to freeze the clock.
+update_shipment_status() pins a status in either mode.
+"""
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+from prometheus_client import Counter
+from ..Status.shipping_status import ShippingStatus
+
+STORE = getattr(settings, "MOCK_SHIPPING_STORE", "memory")
+DB_PATH = getattr(settings, "MOCK_SHIPPING_DB_PATH", "") or os.path.join(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "order_service_mock_shipping.sqlite3"
+)
+MAX_ENTRIES = getattr(settings, "MOCK_SHIPPING_MAX_ENTRIES", 100000)
+TTL_SECONDS = getattr(settings, "MOCK_SHIPPING_TTL", 86400)
+PROGRESSION = getattr(settings, "MOCK_SHIPPING_PROGRESSION", "random")
+SHIP_AFTER = getattr(settings, "MOCK_SHIPPING_SHIP_AFTER", 86400)
+DELIVER_AFTER = getattr(settings, "MOCK_SHIPPING_DELIVER_AFTER", 4 * 86400)
+FAILURE_RATE = getattr(settings, "MOCK_SHIPPING_FAILURE_RATE", 0.02)
+FROZEN_NOW = getattr(settings, "MOCK_SHIPPING_NOW", "")
+DELIVERY_DAYS = 7        # random mode: expected delivery after a new shipment
+PRUNE_EVERY = 1000       # sqlite: writes per process between bound checks
+
+# Statuses stored as small ints; TIMED marks a shipment whose status follows the clock
+STATUSES = [s.value for s in ShippingStatus]
+STATUS_CODES = {value: code for code, value in enumerate(STATUSES)}
+TIMED = -1
+PENDING, SHIPPED, DELIVERED, FAILED, UNKNOWN = (STATUS_CODES[s.value] for s in (
+    ShippingStatus.PENDING, ShippingStatus.SHIPPED, ShippingStatus.DELIVERED, ShippingStatus.FAILED,
+    ShippingStatus.UNKNOWN,
+))
+TRANSITIONS = {
+    PENDING: (SHIPPED, FAILED),
+    SHIPPED: (DELIVERED, FAILED),
+    DELIVERED: (DELIVERED,),
+    FAILED: (FAILED,),
+    UNKNOWN: (PENDING,),
+}
+
+EVICTIONS = Counter(
+    "order_service_mock_shipping_evictions_total", "Mock shipments evicted from the store", ["reason"]
+)
+
+
+class MockShipment:
+    __slots__ = ("status", "expected_delivery", "started_at", "expires_at")
+
+    def __init__(self, status, expected_delivery, started_at, expires_at=0.0):
+        self.status = status                        # STATUSES index, or TIMED
+        self.expected_delivery = expected_delivery  # date ordinal
+        self.started_at = started_at                # epoch seconds
+        self.expires_at = expires_at
+
+
+# -------------------- STORES --------------------
+class MemoryStore:
+    """Thread-safe in-process LRU with a TTL refreshed on every write."""
+    blocking = False
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, order_ids):
+        with self._lock:
+            return {oid: record for oid in order_ids if (record := self._get(oid)) is not None}
+
+    def transform(self, order_ids, step):
+        """Atomically replace each shipment with step(order_id, current or None); None results aren't stored."""
+        expires_at = time.monotonic() + self.ttl
+        results = {}
+        with self._lock:
+            for oid in order_ids:
+                record = step(oid, self._get(oid))
+                if record is not None:
+                    record.expires_at = expires_at
+                    self._data[oid] = results[oid] = record
+                    self._data.move_to_end(oid)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                EVICTIONS.labels(reason="capacity").inc()
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _get(self, oid):
+        record = self._data.get(oid)
+        if record is None:
+            return None
+        if record.expires_at < time.monotonic():
+            del self._data[oid]
+            EVICTIONS.labels(reason="expired").inc()
+            return None
+        self._data.move_to_end(oid)
+        return record
+
+
+class SqliteStore:
+    """
+    Shipments in a SQLite file shared by all worker processes (WAL, one connection per
+    thread). transform() runs in a write transaction, so concurrent workers never lose
+    each other's updates.
+    """
+    blocking = True
+
+    def __init__(self, path=DB_PATH, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+
+    def get_many(self, order_ids):
+        if not order_ids:
+            return {}
+        db = self._db()
+        rows = []
+        for start in range(0, len(order_ids), 500):
+            chunk = list(order_ids[start:start + 500])
+            rows += db.execute(
+                f"SELECT order_id, status, expected_delivery, started_at FROM mock_shipments "
+                f"WHERE order_id IN ({','.join('?' * len(chunk))}) AND expires_at >= ?",
+                (*chunk, time.time()),
+            ).fetchall()
+        return {row[0]: MockShipment(*row[1:]) for row in rows}
+
+    def transform(self, order_ids, step):
+        db = self._db()
+        expires_at = time.time() + self.ttl
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            current = self.get_many(order_ids)
+            results = {oid: record for oid in order_ids
+                       if (record := step(oid, current.get(oid))) is not None}
+            db.executemany(
+                "INSERT OR REPLACE INTO mock_shipments VALUES (?, ?, ?, ?, ?)",
+                [(oid, r.status, r.expected_delivery, r.started_at, expires_at) for oid, r in results.items()],
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        self._writes += len(results)
+        if self._writes >= PRUNE_EVERY:
+            self._writes = 0
+            self._prune(db)
+        return results
+
+    def clear(self):
+        self._db().execute("DELETE FROM mock_shipments")
+
+    def _prune(self, db):
+        expired = db.execute("DELETE FROM mock_shipments WHERE expires_at < ?", (time.time(),)).rowcount
+        EVICTIONS.labels(reason="expired").inc(max(expired, 0))
+        excess = db.execute("SELECT COUNT(*) FROM mock_shipments").fetchone()[0] - self.max_entries
+        if excess > 0:
+            db.execute(
+                "DELETE FROM mock_shipments WHERE order_id IN "
+                "(SELECT order_id FROM mock_shipments ORDER BY expires_at LIMIT ?)", (excess,)
+            )
+            EVICTIONS.labels(reason="capacity").inc(excess)
+
+    def _db(self):
+        # One connection per thread, reopened in forked workers
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=OFF")   # mock data: no need to survive a crash
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS mock_shipments (order_id INTEGER PRIMARY KEY, status INTEGER, "
+                "expected_delivery INTEGER, started_at REAL, expires_at REAL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS mock_shipments_expires ON mock_shipments (expires_at)")
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+
+def _build_store():
+    if STORE == "sqlite":
+        return SqliteStore()
+    return MemoryStore()
+
+
+_store = _build_store()
+
+
+# -------------------- MOCK SHIPPING API --------------------
+def fetch(order_ids, placed_at=None):
+    """
+    {order_id: {"status", "expected_delivery"}} for the given orders.
+    placed_at: {order_id: epoch seconds the order was placed}, which drives timed mode.
+    """
+    if PROGRESSION == "timed":
+        now, placed_at = _now(), placed_at or {}
+        stored = _store.get_many(order_ids)
+        return {
+            oid: _timed_view(oid, stored.get(oid), placed_at.get(oid, now), now)
+            for oid in order_ids
+        }
+    return {oid: _view(record) for oid, record in _store.transform(order_ids, _random_step).items()}
+
+
+async def afetch(order_ids, placed_at=None):
+    """fetch() for the async path; a blocking store is read off the event loop."""
+    if _store.blocking:
+        return await asyncio.to_thread(fetch, order_ids, placed_at)
+    return fetch(order_ids, placed_at)
+
+
+def create(order_id):
+    """Register a new shipment (Pending) and return {"order_id", "status"}."""
+    if PROGRESSION == "timed":
+        now = _now()
+        _store.transform([order_id], lambda oid, record: MockShipment(TIMED, _delivery_date(now), now))
+    else:
+        _store.transform([order_id], lambda oid, record: _random_step(oid, None))
+    return {"order_id": order_id, "status": ShippingStatus.PENDING.value}
+
+
+def update(order_id, new_status):
+    """Pin a shipment's status (kept until it is evicted). Returns {"order_id", "status"}."""
+    code = STATUS_CODES.get(new_status, UNKNOWN)
+    expected = (date.today() + timedelta(days=3)).toordinal()
+    _store.transform([order_id], lambda oid, record: MockShipment(
+        code, expected, record.started_at if record else _now()
+    ))
+    return {"order_id": order_id, "status": new_status}
+
+
+def clear():
+    _store.clear()
+
+
+# -------------------- PROGRESSION --------------------
+def _random_step(order_id, record):
+    if record is None:
+        return MockShipment(PENDING, (date.today() + timedelta(days=DELIVERY_DAYS)).toordinal(), _now())
+    if record.status != TIMED:
+        record.status = random.choice(TRANSITIONS.get(record.status, (UNKNOWN,)))
+    return record
+
+
+def _timed_view(order_id, record, placed_at, now):
+    if record is not None and record.status != TIMED:
+        return _view(record)
+    started = record.started_at if record is not None else placed_at
+    elapsed = now - started
+    if elapsed < SHIP_AFTER:
+        status = PENDING
+    elif _fails(order_id):
+        status = FAILED
+    elif elapsed < DELIVER_AFTER:
+        status = SHIPPED
+    else:
+        status = DELIVERED
+    return {"status": STATUSES[status], "expected_delivery": _format_date(_delivery_date(started))}
+
+
+def _fails(order_id):
+    # Multiplicative hash: the same orders fail in every process and run
+    return (order_id * 2654435761) % 2**32 < FAILURE_RATE * 2**32
+
+
+def _view(record):
+    status = PENDING if record.status == TIMED else record.status
+    return {"status": STATUSES[status], "expected_delivery": _format_date(record.expected_delivery)}
+
+
+def _delivery_date(started):
+    return datetime.fromtimestamp(started + DELIVER_AFTER).date().toordinal()
+
+
+def _format_date(ordinal):
+    return date.fromordinal(ordinal).strftime("%Y-%m-%d")
+
+
+def _frozen_now():
+    if not FROZEN_NOW:
+        return None
+    moment = parse_datetime(FROZEN_NOW)
+    if moment is None:
+        raise ValueError(f"MOCK_SHIPPING_NOW must be an ISO datetime, got {FROZEN_NOW!r}")
+    return moment.timestamp()
+
+
+_FROZEN = _frozen_now()
+
+
+def _now():
+    return time.time() if _FROZEN is None else _FROZEN
@@ -1,12 +1,26 @@
-import requests
+import logging
 from django.conf import settings
+from . import http_client, async_http_client
 
 NOTIFICATION_URL = getattr(settings, "NOTIFICATION_SERVICE_URL", "http://notification-service:5000/v1/notifications")
+logger = logging.getLogger(__name__)
 
 def send_notification(event_type, data):
+    """Returns True if the Notification Service accepted the event, False otherwise."""
     try:
-        r = requests.post(NOTIFICATION_URL, json={"type": event_type, "data": data}, timeout=5)
-        print(f"[NotificationClient] Sent {event_type}: {r.status_code}")
+        r = http_client.post(NOTIFICATION_URL, json={"type": event_type, "data": data})
+        logger.info("notification sent", extra={"event_type": event_type, "status_code": r.status_code})
+        return 200 <= r.status_code < 300
     except Exception as e:
-        print(f"[NotificationClient] Failed to send {event_type}: {e}")
+        logger.warning("notification failed", extra={"event_type": event_type, "error": str(e)})
+        return False
 
+
+async def asend_notification(event_type, data):
+    """Async send_notification on the shared async HTTP client."""
+    try:
+        r = await async_http_client.post(NOTIFICATION_URL, json={"type": event_type, "data": data})
+        return 200 <= r.status_code < 300
+    except async_http_client.RequestError as e:
+        logger.warning("notification failed", extra={"event_type": event_type, "error": str(e)})
+        return False
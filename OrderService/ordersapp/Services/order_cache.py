@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from prometheus_client import Counter
+from ..db import replicas
+
+# Read-through cache in front of OrderService.get_order_data.
+# ORDER_CACHE_BACKEND: "django" (Django cache framework, shared when it points at Redis),
+# "lru" (in-process LRU + TTL) or "none". invalidate() clears only the caches the writing
+# process can see, so "lru" is safe only when a single process serves and writes orders.
+BACKEND = getattr(settings, "ORDER_CACHE_BACKEND", "none")
+TTL_SECONDS = getattr(settings, "ORDER_CACHE_TTL", 30)
+MAX_ENTRIES = getattr(settings, "ORDER_CACHE_MAX_ENTRIES", 10000)
+DJANGO_CACHE_ALIAS = getattr(settings, "ORDER_CACHE_ALIAS", "default")
+
+# With a read replica, a reader that isn't pinned to the primary could re-cache a just-written
+# order from a replica that hasn't replayed the write yet. invalidate() therefore leaves a
+# tombstone for as long as the replica may lag, and only a primary read (refresh=True) may
+# re-cache the order before it expires.
+WRITE_HOLD_SECONDS = (replicas.MAX_LAG + replicas.LAG_CHECK_INTERVAL) if replicas.replica_enabled() else 0
+_TOMBSTONE = "invalidated"
+
+CACHE_HITS = Counter("order_service_order_cache_hits_total", "Order detail cache hits")
+CACHE_MISSES = Counter("order_service_order_cache_misses_total", "Order detail cache misses")
+CACHE_EVICTIONS = Counter(
+    "order_service_order_cache_evictions_total", "Order detail cache evictions", ["reason"]
+)
+
+
+class LRUCache:
+    """Thread-safe in-process LRU with a per-entry TTL."""
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                CACHE_EVICTIONS.labels(reason="expired").inc()
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                CACHE_EVICTIONS.labels(reason="capacity").inc()
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    # In-memory and non-blocking, so the async path uses the same methods
+    async def aget(self, key):
+        return self.get(key)
+
+    async def aset(self, key, value, ttl=None):
+        self.set(key, value, ttl)
+
+
+class DjangoCache:
+    """Adapter over a Django cache alias (locmem in tests, shared cache in production)."""
+
+    def __init__(self, alias=DJANGO_CACHE_ALIAS, ttl=TTL_SECONDS):
+        self.alias = alias
+        self.ttl = ttl
+
+    @property
+    def _cache(self):
+        return caches[self.alias]
+
+    def get(self, key):
+        return self._cache.get(f"order:{key}")
+
+    def set(self, key, value, ttl=None):
+        self._cache.set(f"order:{key}", value, ttl or self.ttl)
+
+    def delete(self, key):
+        self._cache.delete(f"order:{key}")
+
+    def clear(self):
+        self._cache.clear()
+
+    async def aget(self, key):
+        return await self._cache.aget(f"order:{key}")
+
+    async def aset(self, key, value, ttl=None):
+        await self._cache.aset(f"order:{key}", value, ttl or self.ttl)
+
+
+def _build_backend():
+    if BACKEND == "django":
+        return DjangoCache()
+    if BACKEND == "lru":
+        return LRUCache()
+    return None
+
+
+_backend = _build_backend()
+
+
+def get_or_load(order_id, loader, refresh=False):
+    """
+    Return cached order data, calling loader(order_id) on a miss. None results are not cached.
+    refresh=True skips the lookup and re-caches what the loader returns.
+    """
+    if _backend is None:
+        return loader(order_id)
+    key = int(order_id)
+    cached = None if refresh else _backend.get(key)
+    if cached is not None and cached != _TOMBSTONE:
+        CACHE_HITS.inc()
+        return cached
+    CACHE_MISSES.inc()
+    value = loader(order_id)
+    if value is not None and cached != _TOMBSTONE:
+        _backend.set(key, value)
+    return value
+
+
+async def aget_or_load(order_id, loader, refresh=False):
+    """Async get_or_load; loader is a coroutine function."""
+    if _backend is None:
+        return await loader(order_id)
+    key = int(order_id)
+    cached = None if refresh else await _backend.aget(key)
+    if cached is not None and cached != _TOMBSTONE:
+        CACHE_HITS.inc()
+        return cached
+    CACHE_MISSES.inc()
+    value = await loader(order_id)
+    if value is not None and cached != _TOMBSTONE:
+        await _backend.aset(key, value)
+    return value
+
+
+def invalidate(*order_ids):
+    """
+    Drop cached entries now and again once the surrounding transaction commits,
+    so a concurrent reader can't re-cache the pre-commit row (tombstoned for
+    WRITE_HOLD_SECONDS instead when reads may come from a replica).
+    """
+    if _backend is None:
+        return
+    keys = [int(oid) for oid in order_ids]
+
+    def _drop():
+        for key in keys:
+            if WRITE_HOLD_SECONDS:
+                _backend.set(key, _TOMBSTONE, WRITE_HOLD_SECONDS)
+            else:
+                _backend.delete(key)
+
+    _drop()
+    transaction.on_commit(_drop)
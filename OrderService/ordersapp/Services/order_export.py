@@ -0,0 +1,34 @@
+import json
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from ..serializer import OrderSerializer
+
+# Rows fetched (and items prefetched) per round trip while streaming an export
+EXPORT_CHUNK_SIZE = getattr(settings, "ORDER_EXPORT_CHUNK_SIZE", 1000)
+
+EXPORT_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+
+def stream_orders(orders_qs, export_format):
+    """
+    Yield serialized orders as NDJSON lines or as one JSON array.
+    Uses .iterator(chunk_size=...) so only one chunk (plus its prefetched items)
+    is held in memory at a time.
+    """
+    encoder = DjangoJSONEncoder()
+    rows = (
+        encoder.encode(OrderSerializer(order).data)
+        for order in orders_qs.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    if export_format == "ndjson":
+        for row in rows:
+            yield row + "\n"
+        return
+
+    yield "["
+    for i, row in enumerate(rows):
+        yield row if i == 0 else "," + row
+    yield "]"
@@ -1,4 +1,9 @@
-from ..models import Order
+from django.db.models import Prefetch, prefetch_related_objects
+from ..models import Order, OrderItem
+from ..Status.order_status import OrderStatus
+from ..Status.payment_status import PaymentStatus
+from . import order_cache
+from .async_db import db_phase
 from decimal import Decimal, ROUND_HALF_EVEN
 from urllib.parse import urlencode
 
@@ -7,23 +12,82 @@ class OrderService:
     SHIPPING_COST = Decimal('50.00')  # fixed shipping
     TAX_PERCENT = Decimal('0.05')     # 5% tax
 
+    # Status changes allowed by update_order and the bulk transition endpoint
+    FINAL_STATUSES = (OrderStatus.DELIVERED.value, OrderStatus.CANCELLED.value)
+    ORDER_TRANSITIONS = {
+        OrderStatus.PENDING.value: [OrderStatus.CONFIRMED.value, OrderStatus.CANCELLED.value],
+        OrderStatus.CONFIRMED.value: [OrderStatus.SHIPPED.value, OrderStatus.CANCELLED.value],
+        OrderStatus.SHIPPED.value: [OrderStatus.DELIVERED.value],
+    }
+
+    @staticmethod
+    def transition_error(order, order_status=None, payment_status=None):
+        """Why the requested status change is not allowed for this order, or None if it is."""
+        if order.order_status in OrderService.FINAL_STATUSES:
+            return "Cannot update a delivered or cancelled order."
+        if payment_status and order.payment_status == PaymentStatus.FAILED.value \
+                and payment_status == PaymentStatus.PAID.value:
+            return "Cannot change payment from FAILED to PAID."
+        if order_status and order_status not in OrderService.ORDER_TRANSITIONS.get(order.order_status, []):
+            return f"Invalid transition from {order.order_status} to {order_status}."
+        return None
+
     @staticmethod
     def calculate_order_total(order):
         """
-        Calculate order total from items in DB + 5% tax + $50 shipping.
+        Calculate order total from items + 5% tax + $50 shipping.
+        Accepts an Order instance or an iterable of item dicts / OrderItem instances.
         """
-        items = order
-        subtotal = sum(i["unit_price"] * i["quantity"] for i in items)
+        items = order.items.all() if isinstance(order, Order) else order
+        subtotal = sum(q * price for q, price in map(OrderService.item_values, items))
 
         total = subtotal * (1 + OrderService.TAX_PERCENT) + OrderService.SHIPPING_COST
         return total.quantize(Decimal("0.01"), rounding=ROUND_HALF_EVEN)
-    
+
+    @staticmethod
+    def item_values(item):
+        """(quantity, unit_price) for an item dict or OrderItem instance."""
+        if isinstance(item, dict):
+            return item["quantity"], item["unit_price"]
+        return item.quantity, item.unit_price
+
+    @staticmethod
+    def get_order_data(order_id, refresh=False):
+        """
+        Order details via the read-through cache (invalidated by every write path).
+        refresh=True reads through to the database, e.g. for a client reading its own write.
+        """
+        return order_cache.get_or_load(order_id, OrderService._load_order_data, refresh=refresh)
+
     @staticmethod
-    def get_order_data(order_id):
+    def _load_order_data(order_id):
         try:
             order = Order.objects.get(pk=order_id)
         except Order.DoesNotExist:
             return None
+        return OrderService._order_data(order, order.items.within([order]))
+
+    @staticmethod
+    async def aget_order_data(order_id, refresh=False):
+        """Async get_order_data (async ORM, same cache)."""
+        return await order_cache.aget_or_load(order_id, OrderService._aload_order_data, refresh=refresh)
+
+    @staticmethod
+    async def _aload_order_data(order_id):
+        async with db_phase():
+            try:
+                order = await Order.objects.aget(pk=order_id)
+            except Order.DoesNotExist:
+                return None
+            return OrderService._order_data(order, [i async for i in order.items.within([order])])
+
+    @staticmethod
+    def prefetch_items(orders):
+        """Load the items of a page of orders in one query that reads only the page's monthly partitions."""
+        prefetch_related_objects(orders, Prefetch("items", queryset=OrderItem.objects.within(orders)))
+
+    @staticmethod
+    def _order_data(order, items):
         return {
             "order_id": order.order_id,
             "customer_id": order.customer_id,
@@ -31,7 +95,7 @@ class OrderService:
             "payment_status": order.payment_status,
             "items": [
                 {"sku": i.sku, "quantity": i.quantity, "unit_price": i.unit_price}
-                for i in order.items.all()
+                for i in items
             ],
         }
     
@@ -43,7 +107,7 @@ class OrderService:
         shipping_filter = request.GET.get('shipping_filter', '').strip()
         sort_by = request.GET.get('sort_by', '').strip()
         sort_dir = request.GET.get('sort_dir', '').strip()
-        page = request.GET.get('page', '').strip()
+        cursor = request.GET.get('cursor', '').strip()
 
         # Keep only non-empty filters
         valid_params = {}
@@ -59,8 +123,8 @@ class OrderService:
             valid_params['sort_by'] = sort_by
         if sort_dir:
             valid_params['sort_dir'] = sort_dir
-        if page:
-            valid_params['page'] = page
+        if cursor:
+            valid_params['cursor'] = cursor
 
         # No params? no redirect
         if not request.GET:
@@ -0,0 +1,214 @@
+import random
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from ..models import Order, OutboxEvent
+from ..Status.outbox_status import OutboxStatus, OutboxEventType
+from ..Status.payment_status import PaymentStatus
+from ..Status.shipping_status import ShippingStatus
+from .shipping_client import create_shipment
+from .notification_client import send_notification
+from .inventory_client import release_inventory_bulk
+from .payment_client import refund_payments_bulk
+from . import customer_summary, order_cache, shipping_sync, telemetry
+
+BATCH_SIZE = getattr(settings, "OUTBOX_BATCH_SIZE", 50)
+MAX_ATTEMPTS = getattr(settings, "OUTBOX_MAX_ATTEMPTS", 8)
+BACKOFF_BASE = getattr(settings, "OUTBOX_BACKOFF_BASE", 2)      # seconds
+BACKOFF_MAX = getattr(settings, "OUTBOX_BACKOFF_MAX", 300)      # seconds
+LEASE_SECONDS = getattr(settings, "OUTBOX_LEASE_SECONDS", 60)   # visibility timeout, renewed per event
+
+
+# -------------------- PRODUCER --------------------
+def enqueue_order_confirmed(order):
+    """
+    Queue the shipment and ORDER_CREATED notification for a confirmed order (one INSERT).
+    Call inside the transaction that writes the order so both commit together.
+    """
+    return enqueue_orders_confirmed([order])
+
+
+def enqueue_orders_confirmed(orders):
+    """Outbox rows for many confirmed orders in a single bulk INSERT."""
+    events = []
+    for order in orders:
+        events.append(OutboxEvent(
+            event_type=OutboxEventType.CREATE_SHIPMENT.value,
+            payload={"order_id": order.order_id, "customer_id": order.customer_id},
+        ))
+        events.append(OutboxEvent(
+            event_type=OutboxEventType.SEND_NOTIFICATION.value,
+            payload={
+                "event": "ORDER_CREATED",
+                "data": {"order_id": order.order_id, "order_total": str(order.order_total)},
+            },
+        ))
+    return OutboxEvent.objects.bulk_create(events)
+
+
+def enqueue_cancellations(orders, items):
+    """
+    Outbox rows for orders cancelled in bulk, inserted in the cancelling transaction: one
+    inventory release for all of them and one refund for the PAID ones, each delivered with
+    batched calls. items: {order_id: [OrderItem, ...]}.
+    """
+    events = [OutboxEvent(
+        event_type=OutboxEventType.RELEASE_INVENTORY.value,
+        payload={"releases": {
+            str(order.order_id): [
+                {"product_id": item.product_id, "quantity": item.quantity} for item in items.get(order.order_id, [])
+            ]
+            for order in orders
+        }},
+    )]
+    paid = [order.order_id for order in orders if order.payment_status == PaymentStatus.PAID.value]
+    if paid:
+        events.append(OutboxEvent(event_type=OutboxEventType.REFUND_PAYMENTS.value, payload={"order_ids": paid}))
+    return OutboxEvent.objects.bulk_create(events)
+
+
+# -------------------- WORKER --------------------
+def claim_batch(batch_size=BATCH_SIZE):
+    """
+    Lease up to batch_size due events.
+    Rows are locked with SKIP LOCKED so several workers can drain in parallel; the lease
+    pushes next_attempt_at forward so a crashed worker's events are retried later.
+    process_batch renews each event's lease just before delivering it.
+    """
+    now = timezone.now()
+    lease = now + timedelta(seconds=LEASE_SECONDS)
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxStatus.PENDING.value, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "event_id")[:batch_size]
+        )
+        if events:
+            OutboxEvent.objects.filter(event_id__in=[e.event_id for e in events]).update(next_attempt_at=lease)
+    for event in events:
+        event.next_attempt_at = lease
+    return events
+
+
+def renew_lease(event):
+    """
+    Restart the event's lease before delivering it, so events late in a slow batch are not
+    re-claimed by another worker. False if the lease already lapsed and another worker took it.
+    """
+    lease = timezone.now() + timedelta(seconds=LEASE_SECONDS)
+    renewed = OutboxEvent.objects.filter(
+        event_id=event.event_id, status=OutboxStatus.PENDING.value, next_attempt_at=event.next_attempt_at
+    ).update(next_attempt_at=lease)
+    if renewed:
+        event.next_attempt_at = lease
+    return bool(renewed)
+
+
+def dispatch(event):
+    """Deliver one event. Returns True on success."""
+    payload = event.payload
+    # Downstream call metrics count redeliveries as attempt 2, 3+
+    with telemetry.attempt(event.attempts + 1):
+        if event.event_type == OutboxEventType.CREATE_SHIPMENT.value:
+            return _deliver_shipment(payload, idempotency_key=f"outbox-{event.event_id}")
+        if event.event_type == OutboxEventType.SEND_NOTIFICATION.value:
+            return _deliver_notification(payload)
+        if event.event_type == OutboxEventType.RELEASE_INVENTORY.value:
+            return _deliver_releases(payload)
+        if event.event_type == OutboxEventType.REFUND_PAYMENTS.value:
+            return _deliver_refunds(payload)
+    raise ValueError(f"Unknown outbox event type {event.event_type}")
+
+
+@telemetry.checkout_stage("create_shipment")
+def _deliver_shipment(payload, idempotency_key=None):
+    # The event id is the Idempotency-Key: a redelivery after a lost response creates no second shipment
+    result = create_shipment(payload["order_id"], payload["customer_id"], idempotency_key=idempotency_key)
+    if result.get("status") in (ShippingStatus.FAILED.value, ShippingStatus.UNKNOWN.value):
+        return False
+    # History shows the new shipment from the stored copy until it goes stale
+    shipping_sync.record_shipment_created(payload["order_id"], result.get("status"))
+    return True
+
+
+@telemetry.checkout_stage("send_notification")
+def _deliver_notification(payload):
+    return send_notification(payload["event"], payload["data"])
+
+
+@telemetry.checkout_stage("release_inventory_bulk")
+def _deliver_releases(payload):
+    """Release stock for the listed orders; orders not confirmed released stay in the payload for the retry."""
+    releases = payload["releases"]
+    released = release_inventory_bulk({int(order_id): items for order_id, items in releases.items()})
+    payload["releases"] = {str(order_id): releases[str(order_id)] for order_id, ok in released.items() if not ok}
+    return not payload["releases"]
+
+
+@telemetry.checkout_stage("refund_payments_bulk")
+def _deliver_refunds(payload):
+    """Refund the listed orders and mark the confirmed ones REFUNDED; the rest stay in the payload for the retry."""
+    refunded = refund_payments_bulk(payload["order_ids"])
+    _mark_refunded([order_id for order_id, ok in refunded.items() if ok])
+    payload["order_ids"] = [order_id for order_id, ok in refunded.items() if not ok]
+    return not payload["order_ids"]
+
+
+def _mark_refunded(order_ids):
+    """PAID -> REFUNDED for orders whose refund was confirmed (one UPDATE), with their customer summaries."""
+    if not order_ids:
+        return
+    with transaction.atomic():
+        orders = list(
+            Order.objects.select_for_update()
+            .filter(order_id__in=order_ids, payment_status=PaymentStatus.PAID.value)
+            .only("order_id", "customer_id", "order_status", "payment_status", "order_total", "created_at")
+        )
+        if not orders:
+            return
+        previous = [(order, (order.order_status, order.payment_status)) for order in orders]
+        Order.objects.filter(order_id__in=[order.order_id for order in orders]).update(
+            payment_status=PaymentStatus.REFUNDED.value
+        )
+        for order in orders:
+            order.payment_status = PaymentStatus.REFUNDED.value
+        customer_summary.record_transitions(previous)
+        order_cache.invalidate(*[order.order_id for order in orders])
+
+
+def backoff_delay(attempts):
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** (attempts - 1))))
+
+
+def process_batch(batch_size=BATCH_SIZE):
+    """Claim and deliver one batch. Returns (delivered, retried, failed)."""
+    delivered, retried, failed = 0, 0, 0
+    for event in claim_batch(batch_size):
+        if not renew_lease(event):
+            continue
+        try:
+            ok, error = dispatch(event), "delivery failed"
+        except Exception as e:
+            ok, error = False, str(e)
+
+        event.attempts += 1
+        now = timezone.now()
+        if ok:
+            event.status = OutboxStatus.DONE.value
+            event.processed_at = now
+            event.last_error = ""
+            delivered += 1
+        elif event.attempts >= MAX_ATTEMPTS:
+            event.status = OutboxStatus.FAILED.value
+            event.processed_at = now
+            event.last_error = error
+            failed += 1
+        else:
+            event.next_attempt_at = now + timedelta(seconds=backoff_delay(event.attempts))
+            event.last_error = error
+            retried += 1
+        # payload too: batched deliveries narrow it down to the orders still to retry
+        event.save(update_fields=["status", "attempts", "next_attempt_at", "last_error", "processed_at", "payload"])
+    return delivered, retried, failed
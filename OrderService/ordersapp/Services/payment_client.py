@@ -1,5 +1,10 @@
+import logging
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
+from . import http_client, async_http_client
+from .resilience import BulkEndpoint, CircuitOpenError, Dependency
+from .telemetry import checkout_stage
 import random
 from ..Status.payment_status import PaymentMethod
 
@@ -7,54 +12,265 @@ from ..Status.payment_status import PaymentMethod
 # Base URL of the Payment Service
 PAYMENT_SERVICE_URL = getattr(settings, "PAYMENT_SERVICE_URL", "http://payment-service:8002/v1/payments")
 MOCK_PAYMENT = getattr(settings, "USE_MOCK_PAYMENT", True)
+# Hedge charges only if the payment service deduplicates on Idempotency-Key
+HEDGE_CHARGES = getattr(settings, "PAYMENT_HEDGE_ENABLED", False)
+# Checkout places an authorization hold and captures it, instead of a one-step charge
+PREAUTH_ENABLED = getattr(settings, "PAYMENT_PREAUTH_ENABLED", True)
+BULK_REFUND_ENABLED = getattr(settings, "PAYMENT_BULK_REFUND_ENABLED", True)
+BULK_REFUND_BATCH_SIZE = getattr(settings, "PAYMENT_BULK_REFUND_BATCH_SIZE", 100)
+BULK_REPROBE_SECONDS = getattr(settings, "PAYMENT_BULK_REPROBE_SECONDS", 300)
+REFUND_CONCURRENCY = getattr(settings, "PAYMENT_REFUND_CONCURRENCY", 8)
 
+PAYMENT = Dependency("payment", hedge=HEDGE_CHARGES)
+BULK_REFUND = BulkEndpoint("payment bulk refund", enabled=BULK_REFUND_ENABLED, reprobe_seconds=BULK_REPROBE_SECONDS)
+logger = logging.getLogger(__name__)
 
+
+@checkout_stage("charge_payment")
 def charge_payment(order_id, customer_id, amount):
     """
     Sends a payment charge request to the Payment Service.
     Returns True if successful, False otherwise.
     """
     if MOCK_PAYMENT:
-        print(f"[PaymentClient] Mock mode ON – payment for Order {order_id} always succeeds.")
+        logger.debug("payment mock mode: charge always succeeds", extra={"order_id": order_id})
         return True
 
-    payload = {
-        "order_id": order_id,
-        "customer_id": customer_id,
-        "amount": float(amount),
-        "method": random.choice(list(PaymentMethod)).value
-    }
+    payload = _charge_payload(order_id, customer_id, amount)
 
     try:
-        response = requests.post(f"{PAYMENT_SERVICE_URL}/charge/", json=payload, timeout=5)
+        response = PAYMENT.call(lambda timeout: http_client.post(
+            f"{PAYMENT_SERVICE_URL}/charge/", json=payload,
+            headers={"Idempotency-Key": f"charge-{order_id}"}, timeout=timeout
+        ))
         if response.status_code in (200, 201):
-            print(f"[PaymentClient] Payment successful for Order {order_id}")
+            logger.info("payment successful", extra={"order_id": order_id})
             return True
         else:
-            print(f"[PaymentClient] Payment failed for Order {order_id}: {response.text}")
+            logger.warning(
+                "payment failed", extra={"order_id": order_id, "status_code": response.status_code, "body": response.text}
+            )
             return False
     except requests.exceptions.RequestException as e:
-        print(f"[PaymentClient] Payment request failed for Order {order_id}: {e}")
+        logger.warning("payment request failed", extra={"order_id": order_id, "error": str(e)})
         return False
 
 
+@checkout_stage("refund_payment")
 def refund_payment(order_id):
     """
     Sends a refund request to the Payment Service.
     Returns True if successful, False otherwise.
     """
     if MOCK_PAYMENT:
-        print(f"[PaymentClient] Mock mode ON – refund for Order {order_id} always succeeds.")
+        logger.debug("payment mock mode: refund always succeeds", extra={"order_id": order_id})
         return True
 
     try:
-        response = requests.post(f"{PAYMENT_SERVICE_URL}/{order_id}/refund/", timeout=5)
+        response = PAYMENT.call(
+            lambda timeout: http_client.post(f"{PAYMENT_SERVICE_URL}/{order_id}/refund/", timeout=timeout),
+            hedge=False
+        )
         if response.status_code == 200:
-            print(f"[PaymentClient] Refund successful for Order {order_id}")
+            logger.info("refund successful", extra={"order_id": order_id})
             return True
         else:
-            print(f"[PaymentClient] Refund failed for Order {order_id}: {response.text}")
+            logger.warning(
+                "refund failed", extra={"order_id": order_id, "status_code": response.status_code, "body": response.text}
+            )
             return False
     except requests.exceptions.RequestException as e:
-        print(f"[PaymentClient] Refund request failed for Order {order_id}: {e}")
+        logger.warning("refund request failed", extra={"order_id": order_id, "error": str(e)})
+        return False
+
+
+def refund_payments_bulk(order_ids):
+    """
+    Refund many orders (bulk cancellation): {order_id: refunded}.
+    One POST /refund/bulk/ per BULK_REFUND_BATCH_SIZE orders, else per-order refunds in parallel.
+    """
+    if MOCK_PAYMENT:
+        logger.debug("payment mock mode: refund always succeeds", extra={"orders": len(order_ids)})
+        return dict.fromkeys(order_ids, True)
+
+    results = {}
+    for start in range(0, len(order_ids), BULK_REFUND_BATCH_SIZE):
+        chunk = order_ids[start:start + BULK_REFUND_BATCH_SIZE]
+        if BULK_REFUND.available():
+            refunded = _refund_bulk(chunk)
+            if refunded is not None:
+                results.update(refunded)
+                continue
+            BULK_REFUND.unsupported()
+        with ThreadPoolExecutor(max_workers=REFUND_CONCURRENCY, thread_name_prefix="refund") as pool:
+            results.update(zip(chunk, pool.map(refund_payment, chunk)))
+    return results
+
+
+def _refund_bulk(order_ids):
+    """
+    POST {PAYMENT_SERVICE_URL}/refund/bulk/ with {"order_ids": [...]}.
+    Expects 200 {"results": [{"order_id", "status"}, ...]}. Returns None if the endpoint is unsupported.
+    """
+    try:
+        response = PAYMENT.call(
+            lambda timeout: http_client.post(
+                f"{PAYMENT_SERVICE_URL}/refund/bulk/", json={"order_ids": order_ids}, timeout=timeout
+            ),
+            hedge=False
+        )
+    except requests.exceptions.RequestException as e:
+        logger.warning("bulk refund failed", extra={"orders": len(order_ids), "error": str(e)})
+        return dict.fromkeys(order_ids, False)
+
+    if response.status_code in (404, 405, 501):
+        return None
+    if response.status_code != 200:
+        logger.warning("bulk refund rejected", extra={"orders": len(order_ids), "status_code": response.status_code})
+        return dict.fromkeys(order_ids, False)
+    try:
+        statuses = {row.get("order_id"): row.get("status") for row in response.json().get("results", [])}
+    except ValueError:
+        # Malformed JSON body: nothing confirmed, the outbox retries these refunds
+        logger.warning("bulk refund returned malformed JSON", extra={"orders": len(order_ids)})
+        return dict.fromkeys(order_ids, False)
+    return {order_id: statuses.get(order_id) == "REFUNDED" for order_id in order_ids}
+
+
+@checkout_stage("authorize_payment")
+def authorize_payment(order_id, customer_id, amount):
+    """
+    Places an authorization hold for the order amount (nothing is charged yet).
+    Returns True if the hold was placed, False otherwise.
+    """
+    if MOCK_PAYMENT:
+        logger.debug("payment mock mode: authorization always succeeds", extra={"order_id": order_id})
+        return True
+    return _hold_request(order_id, "authorize", _charge_payload(order_id, customer_id, amount))
+
+
+@checkout_stage("capture_payment")
+def capture_payment(order_id):
+    """Captures the order's authorization hold. Returns True if the payment was taken."""
+    if MOCK_PAYMENT:
+        return True
+    return _hold_request(order_id, "capture")
+
+
+@checkout_stage("void_payment")
+def void_payment(order_id):
+    """Releases the order's authorization hold without charging. Returns True on success."""
+    if MOCK_PAYMENT:
+        return True
+    return _hold_request(order_id, "void")
+
+
+def _hold_request(order_id, step, payload=None):
+    """POST to /authorize/ or /<order_id>/capture|void/, keyed so retries and hedges apply once."""
+    url = f"{PAYMENT_SERVICE_URL}/authorize/" if step == "authorize" else f"{PAYMENT_SERVICE_URL}/{order_id}/{step}/"
+    try:
+        response = PAYMENT.call(lambda timeout: http_client.post(
+            url, json=payload or {"order_id": order_id},
+            headers={"Idempotency-Key": f"{step}-{order_id}"}, timeout=timeout
+        ))
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"payment {step} request failed", extra={"order_id": order_id, "error": str(e)})
         return False
+    if response.status_code in (200, 201):
+        return True
+    logger.warning(
+        f"payment {step} failed",
+        extra={"order_id": order_id, "status_code": response.status_code, "body": response.text},
+    )
+    return False
+
+
+def _charge_payload(order_id, customer_id, amount):
+    return {
+        "order_id": order_id,
+        "customer_id": customer_id,
+        "amount": float(amount),
+        "method": random.choice(list(PaymentMethod)).value
+    }
+
+
+# -------------------- ASYNC (ASGI path) --------------------
+@checkout_stage("charge_payment")
+async def acharge_payment(order_id, customer_id, amount):
+    """Async charge_payment on the shared async HTTP client."""
+    if MOCK_PAYMENT:
+        return True
+    payload = _charge_payload(order_id, customer_id, amount)
+    try:
+        response = await PAYMENT.acall(lambda timeout: async_http_client.post(
+            f"{PAYMENT_SERVICE_URL}/charge/", json=payload,
+            headers={"Idempotency-Key": f"charge-{order_id}"}, timeout=timeout
+        ))
+    except (async_http_client.RequestError, CircuitOpenError) as e:
+        logger.warning("payment request failed", extra={"order_id": order_id, "error": str(e)})
+        return False
+    if response.status_code in (200, 201):
+        return True
+    logger.warning(
+        "payment failed", extra={"order_id": order_id, "status_code": response.status_code, "body": response.text}
+    )
+    return False
+
+
+@checkout_stage("refund_payment")
+async def arefund_payment(order_id):
+    """Async refund_payment."""
+    if MOCK_PAYMENT:
+        return True
+    try:
+        response = await PAYMENT.acall(
+            lambda timeout: async_http_client.post(f"{PAYMENT_SERVICE_URL}/{order_id}/refund/", timeout=timeout),
+            hedge=False
+        )
+    except (async_http_client.RequestError, CircuitOpenError) as e:
+        logger.warning("refund request failed", extra={"order_id": order_id, "error": str(e)})
+        return False
+    return response.status_code == 200
+
+
+@checkout_stage("authorize_payment")
+async def aauthorize_payment(order_id, customer_id, amount):
+    """Async authorize_payment."""
+    if MOCK_PAYMENT:
+        return True
+    return await _ahold_request(order_id, "authorize", _charge_payload(order_id, customer_id, amount))
+
+
+@checkout_stage("capture_payment")
+async def acapture_payment(order_id):
+    """Async capture_payment."""
+    if MOCK_PAYMENT:
+        return True
+    return await _ahold_request(order_id, "capture")
+
+
+@checkout_stage("void_payment")
+async def avoid_payment(order_id):
+    """Async void_payment."""
+    if MOCK_PAYMENT:
+        return True
+    return await _ahold_request(order_id, "void")
+
+
+async def _ahold_request(order_id, step, payload=None):
+    url = f"{PAYMENT_SERVICE_URL}/authorize/" if step == "authorize" else f"{PAYMENT_SERVICE_URL}/{order_id}/{step}/"
+    try:
+        response = await PAYMENT.acall(lambda timeout: async_http_client.post(
+            url, json=payload or {"order_id": order_id},
+            headers={"Idempotency-Key": f"{step}-{order_id}"}, timeout=timeout
+        ))
+    except (async_http_client.RequestError, CircuitOpenError) as e:
+        logger.warning(f"payment {step} request failed", extra={"order_id": order_id, "error": str(e)})
+        return False
+    if response.status_code in (200, 201):
+        return True
+    logger.warning(
+        f"payment {step} failed",
+        extra={"order_id": order_id, "status_code": response.status_code, "body": response.text},
+    )
+    return False
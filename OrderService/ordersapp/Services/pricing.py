@@ -0,0 +1,120 @@
+from decimal import Decimal
+import numpy as np
+from django.db.models import (
+    BigIntegerField, Case, DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Cast, Coalesce, Mod
+from django.db.models.lookups import Exact, GreaterThan
+from ..models import OrderItem
+from .order_services import OrderService
+
+# Pricing in integer cents over columnar arrays.
+# total = round_half_even(subtotal * (1 + TAX_PERCENT)) + SHIPPING_COST, which is exactly what
+# OrderService.calculate_order_total computes with Decimal (tax and shipping are whole-cent/rational).
+_TAX_NUM, _TAX_DEN = (1 + OrderService.TAX_PERCENT).as_integer_ratio()
+_SHIPPING_CENTS = int(OrderService.SHIPPING_COST * 100)
+_CENTS = BigIntegerField()
+_MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+
+def to_cents(amount):
+    """Decimal (2 dp) -> int cents."""
+    return int(Decimal(amount).scaleb(2))
+
+
+def from_cents(cents):
+    """int cents -> Decimal with 2 dp."""
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def _cents(expression):
+    return ExpressionWrapper(expression, output_field=_CENTS)
+
+
+def _money(cents):
+    """SQL int cents -> numeric(12, 2)."""
+    return Cast(ExpressionWrapper(cents / Value(Decimal("100.00")), output_field=_MONEY), _MONEY)
+
+
+def _round_half_even_div(numerator, denominator):
+    """Vectorised round-half-even of numerator / denominator for non-negative int64 arrays."""
+    quotient, remainder = np.divmod(numerator, denominator)
+    twice = remainder * 2
+    round_up = (twice > denominator) | ((twice == denominator) & (quotient % 2 == 1))
+    return quotient + round_up
+
+
+class PricingEngine:
+    """Prices whole batches of orders in one pass over item columns."""
+
+    @staticmethod
+    def price_columns(order_index, quantity, unit_cents, n_orders):
+        """
+        order_index: position (0..n_orders-1) of the order each item belongs to
+        quantity, unit_cents: per-item quantity and unit price in cents
+        Returns int64 arrays (subtotal, tax, shipping, total) in cents, one entry per order.
+        """
+        order_index = np.asarray(order_index, dtype=np.int64)
+        line_cents = np.asarray(quantity, dtype=np.int64) * np.asarray(unit_cents, dtype=np.int64)
+
+        subtotal = np.zeros(n_orders, dtype=np.int64)
+        np.add.at(subtotal, order_index, line_cents)
+
+        taxed = _round_half_even_div(subtotal * _TAX_NUM, _TAX_DEN)
+        shipping = np.full(n_orders, _SHIPPING_CENTS, dtype=np.int64)
+        total = taxed + shipping
+        return subtotal, taxed - subtotal, shipping, total
+
+    @staticmethod
+    def price_orders(item_lists):
+        """
+        Price a list of orders given as item lists (dicts or OrderItem instances).
+        Returns a list of Decimal totals matching OrderService.calculate_order_total.
+        """
+        order_index, quantity, unit_cents = [], [], []
+        for position, items in enumerate(item_lists):
+            for item in items:
+                q, price = OrderService.item_values(item)
+                order_index.append(position)
+                quantity.append(q)
+                unit_cents.append(to_cents(price))
+        *_, total = PricingEngine.price_columns(order_index, quantity, unit_cents, len(item_lists))
+        return [from_cents(cents) for cents in total]
+
+    @staticmethod
+    def sql_annotations():
+        """
+        ORM annotations pricing each order in the database: items_subtotal, tax_amount,
+        shipping_amount and calculated_total (Decimal, 2 dp), using the same round-half-even
+        cents arithmetic as price_columns. Each value is a correlated aggregate over the
+        order's items, so it is evaluated only for the rows a (limited) query returns.
+        """
+        subtotal_cents = Cast(Sum(F("quantity") * F("unit_price")) * Value(100), _CENTS)
+        scaled = _cents(subtotal_cents * Value(_TAX_NUM))
+        quotient = _cents(scaled / Value(_TAX_DEN))
+        twice_remainder = _cents(Mod(scaled, Value(_TAX_DEN)) * Value(2))
+        round_up = Case(
+            When(GreaterThan(twice_remainder, _TAX_DEN), then=Value(1)),
+            When(Exact(twice_remainder, _TAX_DEN) & Exact(Mod(quotient, Value(2)), 1), then=Value(1)),
+            default=Value(0),
+            output_field=_CENTS,
+        )
+        taxed_cents = _cents(quotient + round_up)
+
+        def per_order(cents, empty):
+            items = (
+                # order_created_at lets Postgres prune the subquery to the order's partition
+                OrderItem.objects.filter(order=OuterRef("pk"), order_created_at=OuterRef("created_at")).order_by()
+                .values("order").annotate(value=_money(cents)).values("value")
+            )
+            return Coalesce(Subquery(items, output_field=_MONEY), Value(empty), output_field=_MONEY)
+
+        zero = Decimal("0.00")
+        return {
+            "items_subtotal": per_order(subtotal_cents, zero),
+            "tax_amount": per_order(_cents(taxed_cents - subtotal_cents), zero),
+            "shipping_amount": Value(OrderService.SHIPPING_COST, output_field=_MONEY),
+            "calculated_total": per_order(
+                _cents(taxed_cents + Value(_SHIPPING_CENTS)), OrderService.SHIPPING_COST
+            ),
+        }
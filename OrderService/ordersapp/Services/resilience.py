@@ -0,0 +1,361 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import httpx
+import requests
+from django.conf import settings
+from prometheus_client import Counter, Gauge
+from ..Status.breaker_status import BreakerState
+from . import http_client, telemetry
+
+# Per-dependency circuit breakers, adaptive timeouts and hedged requests for the
+# synchronous downstream clients (payment, inventory).
+FAILURE_RATE = getattr(settings, "BREAKER_FAILURE_RATE", 0.5)
+SLOW_CALL_RATE = getattr(settings, "BREAKER_SLOW_CALL_RATE", 0.5)
+SLOW_CALL_SECONDS = getattr(settings, "BREAKER_SLOW_CALL_SECONDS", 2.0)
+MIN_CALLS = getattr(settings, "BREAKER_MIN_CALLS", 10)
+WINDOW_SECONDS = getattr(settings, "BREAKER_WINDOW_SECONDS", 30)
+WINDOW_SIZE = getattr(settings, "BREAKER_WINDOW_SIZE", 100)
+OPEN_SECONDS = getattr(settings, "BREAKER_OPEN_SECONDS", 10)
+HALF_OPEN_CALLS = getattr(settings, "BREAKER_HALF_OPEN_CALLS", 3)
+TIMEOUT_PERCENTILE = getattr(settings, "ADAPTIVE_TIMEOUT_PERCENTILE", 99)
+TIMEOUT_MULTIPLIER = getattr(settings, "ADAPTIVE_TIMEOUT_MULTIPLIER", 3.0)
+TIMEOUT_MIN = getattr(settings, "ADAPTIVE_TIMEOUT_MIN", 0.5)
+TIMEOUT_WINDOW_SECONDS = getattr(settings, "ADAPTIVE_TIMEOUT_WINDOW_SECONDS", 60)
+HEDGE_PERCENTILE = getattr(settings, "HEDGE_PERCENTILE", 95)
+HEDGE_MIN_DELAY = getattr(settings, "HEDGE_MIN_DELAY", 0.05)
+HEDGE_CONCURRENCY = getattr(settings, "HEDGE_CONCURRENCY", 32)
+
+logger = logging.getLogger(__name__)
+
+BREAKER_STATE = Gauge(
+    "order_service_circuit_breaker_state",
+    "Circuit breaker state (0=closed, 1=half-open, 2=open)", ["dependency"],
+    multiprocess_mode="livemax"
+)
+BREAKER_CALLS = Counter(
+    "order_service_circuit_breaker_calls_total",
+    "Calls through a circuit breaker by outcome (success, failure, rejected)", ["dependency", "outcome"]
+)
+BREAKER_TRANSITIONS = Counter(
+    "order_service_circuit_breaker_transitions_total",
+    "Circuit breaker state changes", ["dependency", "state"]
+)
+ADAPTIVE_TIMEOUT = Gauge(
+    "order_service_dependency_read_timeout_seconds",
+    "Read timeout currently applied to a dependency", ["dependency"],
+    multiprocess_mode="livemax"
+)
+HEDGES = Counter(
+    "order_service_hedged_requests_total",
+    "Hedged requests sent, and how many of them won", ["dependency", "outcome"]
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling a dependency whose breaker is open (handled like any request error)."""
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker over a rolling window of recent calls.
+    Opens when, with at least min_calls in the window, the failure rate or slow-call rate
+    reaches its threshold. After open_seconds it lets half_open_calls probes through;
+    all succeeding closes it, any failure or slow probe re-opens it.
+
+    Latency samples (for adaptive timeouts and hedging) cover the last latency_window_seconds
+    and include read timeouts at the time waited, so a lasting slowdown raises the timeout
+    instead of every call timing out at the old one.
+    """
+
+    def __init__(self, name, failure_rate=FAILURE_RATE, slow_call_rate=SLOW_CALL_RATE,
+                 slow_call_seconds=SLOW_CALL_SECONDS, min_calls=MIN_CALLS,
+                 window_seconds=WINDOW_SECONDS, window_size=WINDOW_SIZE,
+                 open_seconds=OPEN_SECONDS, half_open_calls=HALF_OPEN_CALLS,
+                 latency_window_seconds=TIMEOUT_WINDOW_SECONDS):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call_rate = slow_call_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.latency_window_seconds = latency_window_seconds
+        self._calls = deque(maxlen=window_size)      # (finished_at, ok, duration)
+        self._latencies = deque(maxlen=window_size)  # (finished_at, duration) of successful or timed-out calls
+        self._state = BreakerState.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+        BREAKER_STATE.labels(dependency=name).set(BreakerState.CLOSED.value)
+
+    @property
+    def state(self):
+        with self._lock:
+            self._refresh(time.monotonic())
+            return self._state
+
+    def allow(self):
+        """True if a call may go out now (counts half-open probes)."""
+        with self._lock:
+            self._refresh(time.monotonic())
+            if self._state is BreakerState.CLOSED:
+                return True
+            if self._state is BreakerState.HALF_OPEN and self._probes < self.half_open_calls:
+                self._probes += 1
+                return True
+        BREAKER_CALLS.labels(dependency=self.name, outcome="rejected").inc()
+        return False
+
+    def record(self, ok, duration, timed_out=False):
+        """timed_out: the call failed by hitting its read timeout (still sampled as a latency)."""
+        now = time.monotonic()
+        slow = duration >= self.slow_call_seconds
+        BREAKER_CALLS.labels(dependency=self.name, outcome="success" if ok else "failure").inc()
+        with self._lock:
+            if ok or timed_out:
+                self._latencies.append((now, duration))
+            if self._state is BreakerState.HALF_OPEN:
+                if not ok or slow:
+                    self._transition(BreakerState.OPEN, now)
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_calls:
+                        self._transition(BreakerState.CLOSED, now)
+            elif self._state is BreakerState.CLOSED:
+                self._calls.append((now, ok, duration))
+                if self._tripped(now):
+                    self._transition(BreakerState.OPEN, now)
+
+    def latency_percentile(self, percentile):
+        """Recent latency (s) at the given percentile, or None with fewer than min_calls samples."""
+        cutoff = time.monotonic() - self.latency_window_seconds
+        with self._lock:
+            while self._latencies and self._latencies[0][0] < cutoff:
+                self._latencies.popleft()
+            samples = sorted(duration for _, duration in self._latencies)
+        if len(samples) < self.min_calls:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+        return samples[index]
+
+    def reset(self):
+        with self._lock:
+            self._calls.clear()
+            self._latencies.clear()
+            self._transition(BreakerState.CLOSED, time.monotonic())
+
+    # -------------------- internals (lock held) --------------------
+    def _refresh(self, now):
+        if self._state is BreakerState.OPEN and now - self._opened_at >= self.open_seconds:
+            self._transition(BreakerState.HALF_OPEN, now)
+
+    def _tripped(self, now):
+        while self._calls and self._calls[0][0] < now - self.window_seconds:
+            self._calls.popleft()
+        total = len(self._calls)
+        if total < self.min_calls:
+            return False
+        failures = sum(1 for _, ok, _ in self._calls if not ok)
+        slow = sum(1 for _, _, duration in self._calls if duration >= self.slow_call_seconds)
+        return failures / total >= self.failure_rate or slow / total >= self.slow_call_rate
+
+    def _transition(self, state, now):
+        if state is self._state:
+            return
+        self._state = state
+        self._probes = self._probe_successes = 0
+        if state is BreakerState.OPEN:
+            self._opened_at = now
+        if state is BreakerState.CLOSED:
+            self._calls.clear()
+        BREAKER_STATE.labels(dependency=self.name).set(state.value)
+        BREAKER_TRANSITIONS.labels(dependency=self.name, state=state.name.lower()).inc()
+        logger.warning(
+            "circuit breaker %s -> %s", self.name, state.name,
+            extra={"dependency": self.name, "state": state.name, "sample": False},
+        )
+
+
+class Dependency:
+    """A downstream service guarded by a breaker, with adaptive timeouts and optional hedging."""
+
+    def __init__(self, name, hedge=False, breaker=None):
+        self.name = name
+        self.hedge = hedge
+        self.breaker = breaker or CircuitBreaker(name)
+
+    def read_timeout(self):
+        """TIMEOUT_MULTIPLIER x observed p{TIMEOUT_PERCENTILE}, clamped to [TIMEOUT_MIN, HTTP_READ_TIMEOUT]."""
+        observed = self.breaker.latency_percentile(TIMEOUT_PERCENTILE)
+        if observed is None:
+            timeout = http_client.READ_TIMEOUT
+        else:
+            timeout = min(max(observed * TIMEOUT_MULTIPLIER, TIMEOUT_MIN), http_client.READ_TIMEOUT)
+        ADAPTIVE_TIMEOUT.labels(dependency=self.name).set(timeout)
+        return timeout
+
+    def hedge_delay(self):
+        """Send the hedge once the first attempt outlives p{HEDGE_PERCENTILE}; None until observed."""
+        observed = self.breaker.latency_percentile(HEDGE_PERCENTILE)
+        return None if observed is None else max(observed, HEDGE_MIN_DELAY)
+
+    def call(self, send, hedge=None):
+        """
+        send(timeout) performs one HTTP request and returns the response.
+        Transport errors and 5xx responses count as failures. Only pass hedge=True
+        (or construct with hedge=True) for idempotent requests.
+        Raises CircuitOpenError without calling send when the breaker is open.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        timeout = (http_client.CONNECT_TIMEOUT, self.read_timeout())
+        delay = self.hedge_delay() if (self.hedge if hedge is None else hedge) else None
+        if delay is None:
+            return self._attempt(send, timeout)
+        return self._hedged(send, timeout, delay)
+
+    def _attempt(self, send, timeout, number=None):
+        start = time.perf_counter()
+        try:
+            if number is None:
+                response = send(timeout)
+            else:
+                # Runs on a hedge thread: carry the attempt number over for the downstream metrics
+                with telemetry.attempt(number):
+                    response = send(timeout)
+        except requests.exceptions.RequestException as e:
+            self.breaker.record(
+                False, time.perf_counter() - start, timed_out=isinstance(e, requests.exceptions.ReadTimeout)
+            )
+            raise
+        self.breaker.record(response.status_code < 500, time.perf_counter() - start)
+        return response
+
+    def _hedged(self, send, timeout, delay):
+        """First attempt, plus a second one if the first is still running after `delay`."""
+        number = telemetry.current_attempt()
+        primary = _get_executor().submit(self._attempt, send, timeout, number)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self.breaker.allow():
+            return primary.result()
+
+        HEDGES.labels(dependency=self.name, outcome="sent").inc()
+        pending = {primary, _get_executor().submit(self._attempt, send, timeout, number + 1)}
+        response, error = None, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except requests.exceptions.RequestException as e:
+                    error = e
+                    continue
+                if result.status_code < 500:
+                    if future is not primary:
+                        HEDGES.labels(dependency=self.name, outcome="won").inc()
+                    return result
+                response = result
+        if response is not None:
+            return response
+        raise error
+
+    # -------------------- ASYNC (ASGI path) --------------------
+    async def acall(self, send, hedge=None):
+        """
+        Async call(): send(timeout) is a coroutine function performing one httpx request.
+        Shares the breaker and latency window with the sync path.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        timeout = (http_client.CONNECT_TIMEOUT, self.read_timeout())
+        delay = self.hedge_delay() if (self.hedge if hedge is None else hedge) else None
+        if delay is None:
+            return await self._aattempt(send, timeout)
+        return await self._ahedged(send, timeout, delay)
+
+    async def _aattempt(self, send, timeout, number=None):
+        start = time.perf_counter()
+        try:
+            if number is None:
+                response = await send(timeout)
+            else:
+                with telemetry.attempt(number):
+                    response = await send(timeout)
+        except httpx.HTTPError as e:
+            self.breaker.record(False, time.perf_counter() - start, timed_out=isinstance(e, httpx.ReadTimeout))
+            raise
+        self.breaker.record(response.status_code < 500, time.perf_counter() - start)
+        return response
+
+    async def _ahedged(self, send, timeout, delay):
+        primary = asyncio.ensure_future(self._aattempt(send, timeout))
+        done, _ = await asyncio.wait([primary], timeout=delay)
+        if done or not self.breaker.allow():
+            return await primary
+
+        HEDGES.labels(dependency=self.name, outcome="sent").inc()
+        hedge = self._aattempt(send, timeout, telemetry.current_attempt() + 1)
+        pending = {primary, asyncio.ensure_future(hedge)}
+        response, error = None, None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        result = task.result()
+                    except httpx.HTTPError as e:
+                        error = e
+                        continue
+                    if result.status_code < 500:
+                        if task is not primary:
+                            HEDGES.labels(dependency=self.name, outcome="won").inc()
+                        return result
+                    response = result
+        finally:
+            for task in pending:
+                task.cancel()
+        if response is not None:
+            return response
+        raise error
+
+
+class BulkEndpoint:
+    """
+    A downstream bulk endpoint with a per-item fallback. When the service rejects it
+    (404/405/501), callers use the fallback for reprobe_seconds, then probe it again.
+    """
+
+    def __init__(self, name, enabled=True, reprobe_seconds=300):
+        self.name = name
+        self.enabled = enabled
+        self.reprobe_seconds = reprobe_seconds
+        # Monotonic time before which the endpoint is skipped
+        self._retry_at = 0.0
+
+    def available(self):
+        return self.enabled and time.monotonic() >= self._retry_at
+
+    def unsupported(self):
+        self._retry_at = time.monotonic() + self.reprobe_seconds
+        logger.warning(
+            "%s endpoint unavailable, using fallback", self.name,
+            extra={"endpoint": self.name, "retry_in": self.reprobe_seconds, "sample": False},
+        )
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=HEDGE_CONCURRENCY, thread_name_prefix="hedge")
+    return _executor
@@ -1,137 +1,298 @@
-import random
+import asyncio
+import logging
+import threading
 import requests
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
 from django.conf import settings
+from . import http_client, async_http_client, mock_shipping
+from .resilience import BulkEndpoint
 from ordersapp.Status.shipping_status import ShippingStatus
 
 # Configurable via Django settings
 SHIPPING_URL = getattr(settings, "SHIPPING_SERVICE_URL", "http://shipping-service:8003/v1/shipping")
 USE_MOCK = getattr(settings, "USE_MOCK_SHIPPING", True)
+logger = logging.getLogger(__name__)
 
-# Internal cache for mock mode (simulates background progression)
-_MOCK_SHIPMENTS = {}
+# Batched status fetch tuning
+BULK_STATUS_ENABLED = getattr(settings, "SHIPPING_BULK_STATUS_ENABLED", True)
+BULK_BATCH_SIZE = getattr(settings, "SHIPPING_BULK_BATCH_SIZE", 100)
+FETCH_CONCURRENCY = getattr(settings, "SHIPPING_FETCH_CONCURRENCY", 16)
+BATCH_DEADLINE = getattr(settings, "SHIPPING_BATCH_DEADLINE", 5)
+REQUEST_TIMEOUT = getattr(settings, "SHIPPING_REQUEST_TIMEOUT", 5)
+BULK_REPROBE_SECONDS = getattr(settings, "SHIPPING_BULK_REPROBE_SECONDS", 300)
+
+BULK_STATUS = BulkEndpoint("shipping bulk status", enabled=BULK_STATUS_ENABLED, reprobe_seconds=BULK_REPROBE_SECONDS)
+_executor = None
+_executor_lock = threading.Lock()
 
 
 # -------------------- FETCH SHIPPING DATA --------------------
 def get_shipping_queryset_for_customer(order_qs):
     """Fetch shipping info for a batch of orders."""
-    order_ids = [o.order_id for o in order_qs]
-    data_fetcher = _fetch_mock_data if USE_MOCK else _fetch_real_data
-    data = data_fetcher(order_ids)
+    if USE_MOCK:
+        return _rows(mock_shipping.fetch(*_mock_args(order_qs)))
+    return _rows(_fetch_real_data([o.order_id for o in order_qs]))
+
+
+def _rows(data):
     return [
         {
             "order_id": oid,
             "shipping_status": d.get("status", ShippingStatus.UNKNOWN.value),
-            "expected_delivery": d.get("expected_delivery")
+            "expected_delivery": d.get("expected_delivery"),
+            "unavailable": d.get("unavailable", False),
         }
         for oid, d in data.items()
     ]
 
 
-def _fetch_mock_data(order_ids):
-    """Generate evolving mock shipping data."""
-    today = datetime.now().date()
-    mock = {}
-
-    for oid in order_ids:
-        # Check if this order already has mock data
-        existing = _MOCK_SHIPMENTS.get(oid)
-        if existing:
-            # Occasionally progress to next stage
-            current = existing["status"]
-            next_status = _next_stage(current)
-            existing["status"] = next_status
-            _MOCK_SHIPMENTS[oid] = existing
-        else:
-            # Initialize a new shipment as Pending
-            status = ShippingStatus.PENDING.value
-            date = (today + timedelta(days=7)).strftime("%Y-%m-%d")
-            _MOCK_SHIPMENTS[oid] = {"status": status, "expected_delivery": date}
+def _mock_args(order_qs):
+    # Order ids plus their placement times, which drive the timed mock progression
+    orders = list(order_qs)
+    placed_at = {o.order_id: o.created_at.timestamp() for o in orders if getattr(o, "created_at", None)}
+    return [o.order_id for o in orders], placed_at
 
-        mock[oid] = _MOCK_SHIPMENTS[oid]
 
-    return mock
+def _fetch_real_data(order_ids):
+    """Fetch actual data from Shipping Service (bulk endpoint, else concurrent GETs)."""
+    if not order_ids:
+        return {}
+    if BULK_STATUS.available():
+        data = _fetch_bulk(order_ids)
+        if data is not None:
+            return data
+        BULK_STATUS.unsupported()
+    return _fetch_concurrent(order_ids)
 
 
-def _fetch_real_data(order_ids):
-    """Fetch actual data from Shipping Service."""
+def _fetch_bulk(order_ids):
+    """
+    POST {SHIPPING_URL}/status/bulk/ with {"order_ids": [...]}.
+    Expects 200 {"results": [{"order_id", "status", "expected_delivery"}, ...]}.
+    Returns None when the service does not support the bulk contract.
+    """
     data = {}
-    for oid in order_ids:
+    for start in range(0, len(order_ids), BULK_BATCH_SIZE):
+        chunk = order_ids[start:start + BULK_BATCH_SIZE]
         try:
-            r = requests.get(f"{SHIPPING_URL}/{oid}/status/", timeout=5)
-            data[oid] = r.json() if r.status_code == 200 else _default(ShippingStatus.UNKNOWN.value)
+            r = http_client.post(
+                f"{SHIPPING_URL}/status/bulk/",
+                json={"order_ids": chunk},
+                timeout=REQUEST_TIMEOUT
+            )
         except requests.RequestException:
-            data[oid] = _default(ShippingStatus.FAILED.value)
+            data.update({oid: _default(ShippingStatus.FAILED.value) for oid in chunk})
+            continue
+
+        if r.status_code in (404, 405, 501):
+            return None
+        if r.status_code != 200:
+            data.update({oid: _default(ShippingStatus.UNKNOWN.value) for oid in chunk})
+            continue
+
+        try:
+            results = {row.get("order_id"): row for row in r.json().get("results", [])}
+        except ValueError:
+            data.update({oid: _default(ShippingStatus.UNKNOWN.value) for oid in chunk})
+            continue
+        for oid in chunk:
+            data[oid] = results.get(oid) or results.get(str(oid)) or _default(ShippingStatus.UNKNOWN.value)
+    return data
+
+
+def _fetch_concurrent(order_ids, workers=None, deadline=None):
+    """
+    Fallback: one GET per order on a bounded thread pool.
+    Orders not answered within the batch deadline are reported as Unknown.
+    `workers` runs the batch on a dedicated pool of that size (used by benchmarks).
+    """
+    deadline = BATCH_DEADLINE if deadline is None else deadline
+    pool = ThreadPoolExecutor(max_workers=workers) if workers else _get_executor()
+
+    futures = {pool.submit(_fetch_one, oid): oid for oid in order_ids}
+    done, pending = wait(futures, timeout=deadline)
+    for future in pending:
+        future.cancel()
+    if workers:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    data = {oid: _default(ShippingStatus.UNKNOWN.value) for oid in order_ids}
+    for future in done:
+        data[futures[future]] = future.result()
+    return data
+
+
+def _fetch_one(oid):
+    try:
+        r = http_client.get(f"{SHIPPING_URL}/{oid}/status/", timeout=REQUEST_TIMEOUT)
+        return r.json() if r.status_code == 200 else _default(ShippingStatus.UNKNOWN.value)
+    except ValueError:
+        # Malformed JSON body (requests' JSONDecodeError is also a RequestException, so catch it first)
+        return _default(ShippingStatus.UNKNOWN.value)
+    except requests.RequestException:
+        return _default(ShippingStatus.FAILED.value)
+
+
+# -------------------- ASYNC FETCH (ASGI path) --------------------
+async def aget_shipping_queryset_for_customer(order_qs):
+    """Async get_shipping_queryset_for_customer on the shared async HTTP client."""
+    if USE_MOCK:
+        return _rows(await mock_shipping.afetch(*_mock_args(order_qs)))
+    order_ids = [o.order_id for o in order_qs]
+    if not order_ids:
+        return []
+
+    if BULK_STATUS.available():
+        data = await _afetch_bulk(order_ids)
+        if data is not None:
+            return _rows(data)
+        BULK_STATUS.unsupported()
+    return _rows(await _afetch_concurrent(order_ids))
+
+
+async def _afetch_bulk(order_ids):
+    chunks = [order_ids[i:i + BULK_BATCH_SIZE] for i in range(0, len(order_ids), BULK_BATCH_SIZE)]
+    responses = await asyncio.gather(
+        *(async_http_client.post(f"{SHIPPING_URL}/status/bulk/", json={"order_ids": chunk},
+                                 timeout=REQUEST_TIMEOUT) for chunk in chunks),
+        return_exceptions=True
+    )
+    data = {}
+    for chunk, r in zip(chunks, responses):
+        if isinstance(r, Exception):
+            data.update({oid: _default(ShippingStatus.FAILED.value) for oid in chunk})
+            continue
+        if r.status_code in (404, 405, 501):
+            return None
+        if r.status_code != 200:
+            data.update({oid: _default(ShippingStatus.UNKNOWN.value) for oid in chunk})
+            continue
+        try:
+            results = {row.get("order_id"): row for row in r.json().get("results", [])}
+        except ValueError:
+            data.update({oid: _default(ShippingStatus.UNKNOWN.value) for oid in chunk})
+            continue
+        for oid in chunk:
+            data[oid] = results.get(oid) or results.get(str(oid)) or _default(ShippingStatus.UNKNOWN.value)
+    return data
+
+
+async def _afetch_concurrent(order_ids):
+    """At most FETCH_CONCURRENCY GETs in flight; unanswered orders are Unknown after the deadline."""
+    limit = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+    async def fetch(oid):
+        async with limit:
+            try:
+                r = await async_http_client.get(f"{SHIPPING_URL}/{oid}/status/", timeout=REQUEST_TIMEOUT)
+                return r.json() if r.status_code == 200 else _default(ShippingStatus.UNKNOWN.value)
+            except async_http_client.RequestError:
+                return _default(ShippingStatus.FAILED.value)
+            except ValueError:
+                # Malformed JSON body: report this order unavailable instead of failing the batch
+                return _default(ShippingStatus.UNKNOWN.value)
+
+    tasks = {asyncio.ensure_future(fetch(oid)): oid for oid in order_ids}
+    done, pending = await asyncio.wait(tasks, timeout=BATCH_DEADLINE)
+    for task in pending:
+        task.cancel()
+    data = {oid: _default(ShippingStatus.UNKNOWN.value) for oid in order_ids}
+    for task in done:
+        data[tasks[task]] = task.result()
     return data
 
 
+def _get_executor():
+    """Process-wide pool shared by all request threads."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=FETCH_CONCURRENCY, thread_name_prefix="shipping-fetch"
+                )
+    return _executor
+
+
 # -------------------- CREATE & UPDATE --------------------
-def create_shipment(order_id, customer_id):
-    """POST - Create a new shipment after order confirmation."""
+def create_shipment(order_id, customer_id, idempotency_key=None):
+    """
+    POST - Create a new shipment after order confirmation.
+    idempotency_key is sent as Idempotency-Key so a redelivered request creates one shipment.
+    """
     if USE_MOCK:
-        today = datetime.now().date()
-        status = ShippingStatus.PENDING.value
-        _MOCK_SHIPMENTS[order_id] = {
-            "status": status,
-            "expected_delivery": (today + timedelta(days=7)).strftime("%Y-%m-%d")
-        }
-        return {"order_id": order_id, "status": status}
+        return mock_shipping.create(order_id)
 
-    # Real API payload — match Django Shipping model
-    now = datetime.utcnow().isoformat()
-    payload = {
-        "order_id": order_id,
-        "carrier": "BlueDart",
-        "tracking_no": f"TRK{order_id}",
-        "status": ShippingStatus.PENDING.value.upper(),
-        "shipped_at": now,
-        "delivered_at": now,
-        "created_at": now
-    }
+    payload = _shipment_payload(order_id)
 
     try:
-        r = requests.post(f"{SHIPPING_URL}/create/", json=payload, timeout=5)
+        r = http_client.post(f"{SHIPPING_URL}/create/", json=payload, headers=_idempotency_headers(idempotency_key))
         if r.status_code == 201:
-            print(f"[ShippingClient] Shipment created successfully for Order {order_id}")
+            logger.info("shipment created", extra={"order_id": order_id})
             return r.json()
         else:
-            print(f"[ShippingClient] Failed ({r.status_code}) → {r.text}")
+            logger.warning(
+                "shipment creation failed", extra={"order_id": order_id, "status_code": r.status_code, "body": r.text}
+            )
             return {"order_id": order_id, "status": ShippingStatus.UNKNOWN.value}
     except requests.RequestException as e:
-        print(f"[ShippingClient] Exception: {e}")
+        logger.warning("shipment request failed", extra={"order_id": order_id, "error": str(e)})
         return {"order_id": order_id, "status": ShippingStatus.FAILED.value}
 
 
 def update_shipment_status(order_id, new_status):
     """PATCH - Update shipment status if needed."""
     if USE_MOCK:
-        _MOCK_SHIPMENTS[order_id] = {
-            "status": new_status,
-            "expected_delivery": (datetime.now().date() + timedelta(days=3)).strftime("%Y-%m-%d")
-        }
-        return {"order_id": order_id, "status": new_status}
+        return mock_shipping.update(order_id, new_status)
 
     payload = {"shipping_status": new_status}
     try:
-        r = requests.patch(f"{SHIPPING_URL}/{order_id}/status/", json=payload, timeout=5)
+        r = http_client.patch(f"{SHIPPING_URL}/{order_id}/status/", json=payload)
         return r.json() if r.status_code == 200 else {"error": "Failed to update"}
     except requests.RequestException:
         return {"error": "Connection error"}
 
 
+async def acreate_shipment(order_id, customer_id, idempotency_key=None):
+    """Async create_shipment."""
+    if USE_MOCK:
+        return create_shipment(order_id, customer_id)
+    try:
+        r = await async_http_client.post(
+            f"{SHIPPING_URL}/create/", json=_shipment_payload(order_id), headers=_idempotency_headers(idempotency_key)
+        )
+    except async_http_client.RequestError as e:
+        logger.warning("shipment request failed", extra={"order_id": order_id, "error": str(e)})
+        return {"order_id": order_id, "status": ShippingStatus.FAILED.value}
+    if r.status_code == 201:
+        return r.json()
+    logger.warning(
+        "shipment creation failed", extra={"order_id": order_id, "status_code": r.status_code, "body": r.text}
+    )
+    return {"order_id": order_id, "status": ShippingStatus.UNKNOWN.value}
+
+
 # -------------------- INTERNAL HELPERS --------------------
-def _next_stage(current):
-    """Simulate progression of shipment stages randomly."""
-    transitions = {
-        ShippingStatus.PENDING.value: [ShippingStatus.SHIPPED.value, ShippingStatus.FAILED.value],
-        ShippingStatus.SHIPPED.value: [ShippingStatus.DELIVERED.value, ShippingStatus.FAILED.value],
-        ShippingStatus.DELIVERED.value: [ShippingStatus.DELIVERED.value],
-        ShippingStatus.FAILED.value: [ShippingStatus.FAILED.value],
-        ShippingStatus.UNKNOWN.value: [ShippingStatus.PENDING.value],
+
+def _idempotency_headers(key):
+    return {"Idempotency-Key": key} if key else {}
+
+
+def _shipment_payload(order_id):
+    # Real API payload — match Django Shipping model
+    now = datetime.utcnow().isoformat()
+    return {
+        "order_id": order_id,
+        "carrier": "BlueDart",
+        "tracking_no": f"TRK{order_id}",
+        "status": ShippingStatus.PENDING.value.upper(),
+        "shipped_at": now,
+        "delivered_at": now,
+        "created_at": now
     }
-    next_options = transitions.get(current, [ShippingStatus.UNKNOWN.value])
-    return random.choice(next_options)
 
 
 def _default(status):
-    return {"status": status, "expected_delivery": None}
+    # Placeholder when the service didn't answer for an order (never stored locally)
+    return {"status": status, "expected_delivery": None, "unavailable": True}
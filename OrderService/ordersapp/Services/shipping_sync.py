@@ -0,0 +1,276 @@
+"""
+Local copy of each order's shipment status (Order.shipping_status, expected_delivery,
+shipping_synced_at), so history pages don't ask the shipping service every time.
+
+  * The shipping service pushes status changes to the webhook; a pushed batch is applied with
+    one UPDATE per WRITE_CHUNK orders (apply_updates).
+  * Delivered and Failed are final: once stored they are served forever. Any other status,
+    or none yet, is re-fetched (in bulk, for just those orders) when it is older than
+    SHIPPING_STATUS_TTL, and written back. With SHIPPING_STATUS_FETCH_ON_READ off, pages
+    make no remote calls at all and `refresh_shipping_status` keeps in-flight ones current.
+  * A stored final status is only replaced by another final one, and an update older than
+    what is stored is ignored, so late or repeated pushes never move a shipment backwards.
+
+Writes go straight to the primary's connection, so a history page that refreshes a status
+doesn't count as the customer's own write (no read-your-writes pin).
+"""
+import hashlib
+import hmac
+from datetime import date, timedelta, timezone as dt_timezone
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from prometheus_client import Counter
+from ..models import Order
+from ..Status.order_status import OrderStatus
+from ..Status.shipping_status import ShippingStatus
+from .async_db import db_phase
+from .shipping_client import get_shipping_queryset_for_customer, aget_shipping_queryset_for_customer
+
+TTL_SECONDS = getattr(settings, "SHIPPING_STATUS_TTL", 900)
+FETCH_ON_READ = getattr(settings, "SHIPPING_STATUS_FETCH_ON_READ", True)
+WEBHOOK_SECRET = getattr(settings, "SHIPPING_WEBHOOK_SECRET", "")
+WEBHOOK_MAX_BATCH = getattr(settings, "SHIPPING_WEBHOOK_MAX_BATCH", 1000)
+SIGNATURE_HEADER = "X-Shipping-Signature"
+# updated_at may be this far ahead of our clock (then counts as now); later ones are rejected
+MAX_CLOCK_SKEW = timedelta(seconds=60)
+WRITE_CHUNK = 500
+
+FINAL = (ShippingStatus.DELIVERED.value, ShippingStatus.FAILED.value)
+# Matches the partial index order_shipping_unsettled_idx
+UNSETTLED = Q(shipping_status__isnull=True) | Q(shipping_status__in=[
+    ShippingStatus.PENDING.value, ShippingStatus.SHIPPED.value, ShippingStatus.UNKNOWN.value
+])
+# Orders that have (or will have) a shipment
+SHIPPABLE = [OrderStatus.CONFIRMED.value, OrderStatus.SHIPPED.value, OrderStatus.DELIVERED.value]
+_STATUSES = {s.value.lower(): s.value for s in ShippingStatus}
+
+UPDATE_SQL = """
+    UPDATE {table} o
+    SET shipping_status = v.status, expected_delivery = v.expected_delivery, shipping_synced_at = v.at
+    FROM (VALUES {values}) AS v (order_id, created_at, status, expected_delivery, at)
+    WHERE o.order_id = v.order_id {same_partition}
+      AND (o.shipping_synced_at IS NULL OR o.shipping_synced_at <= v.at)
+      AND (o.shipping_status IS NULL OR o.shipping_status NOT IN %s OR v.status IN %s)
+"""
+VALUE_ROW = "(%s::bigint, %s::timestamptz, %s::varchar, %s::date, %s::timestamptz)"
+
+LOOKUPS = Counter(
+    "order_service_shipping_status_lookups_total",
+    "Shipping statuses shown on history pages, by source (stored copy, or fetched from the shipping service)",
+    ["source"]
+)
+UPDATES = Counter(
+    "order_service_shipping_status_updates_total",
+    "Shipping status updates by origin (push, pull, create) and result (applied, ignored)",
+    ["origin", "result"]
+)
+
+
+def normalize_status(value):
+    """The ShippingStatus value for a status in any letter case, else None."""
+    return _STATUSES.get(str(value).strip().lower()) if value is not None else None
+
+
+def is_fresh(order, now=None):
+    """True if the stored status can be shown without asking the shipping service."""
+    if order.shipping_status in FINAL:
+        return True
+    synced = order.shipping_synced_at
+    return synced is not None and synced >= (now or timezone.now()) - timedelta(seconds=TTL_SECONDS)
+
+
+# -------------------- HISTORY --------------------
+def shipping_rows(orders):
+    """{"order_id", "shipping_status", "expected_delivery"} rows for orders, re-fetching only stale ones."""
+    stale = _stale(orders)
+    if stale:
+        _store_fetched(stale, get_shipping_queryset_for_customer(stale))
+    return [_row(order) for order in orders]
+
+
+async def ashipping_rows(orders):
+    """Async shipping_rows."""
+    stale = _stale(orders)
+    if stale:
+        fetched = await aget_shipping_queryset_for_customer(stale)
+        async with db_phase():
+            await sync_to_async(_store_fetched)(stale, fetched)
+    return [_row(order) for order in orders]
+
+
+def _stale(orders):
+    if not FETCH_ON_READ:
+        LOOKUPS.labels(source="stored").inc(len(orders))
+        return []
+    now = timezone.now()
+    stale = [order for order in orders if not is_fresh(order, now)]
+    LOOKUPS.labels(source="stored").inc(len(orders) - len(stale))
+    LOOKUPS.labels(source="fetched").inc(len(stale))
+    return stale
+
+
+def _store_fetched(orders, rows):
+    """Apply fetched rows to the orders (in memory and in the DB). Returns how many were stored."""
+    now = timezone.now()
+    fetched = {row["order_id"]: row for row in rows}
+    updates = []
+    for order in orders:
+        row = fetched.get(order.order_id)
+        if row is None:
+            continue
+        if row.get("unavailable"):
+            # No answer: keep showing the last stored status, if there is one
+            if order.shipping_status is None:
+                order.shipping_status = row["shipping_status"]
+            continue
+        order.shipping_status = normalize_status(row["shipping_status"]) or ShippingStatus.UNKNOWN.value
+        try:
+            order.expected_delivery = _parse_day(row.get("expected_delivery"))
+        except ValueError:
+            order.expected_delivery = None
+        order.shipping_synced_at = now
+        updates.append({
+            "order_id": order.order_id, "created_at": order.created_at, "status": order.shipping_status,
+            "expected_delivery": order.expected_delivery, "at": now,
+        })
+    apply_updates(updates, origin="pull")
+    return len(updates)
+
+
+def _row(order):
+    expected = order.expected_delivery
+    return {
+        "order_id": order.order_id,
+        "shipping_status": order.shipping_status or ShippingStatus.UNKNOWN.value,
+        "expected_delivery": expected.isoformat() if isinstance(expected, date) else expected,
+    }
+
+
+def refresh_stale(batch_size=500, limit=None):
+    """
+    Re-fetch in-flight shipments whose stored status is older than the TTL, batch by batch.
+    Stops early when a whole batch gets no answer. Returns how many orders were refreshed.
+    """
+    refreshed = 0
+    while limit is None or refreshed < limit:
+        cutoff = timezone.now() - timedelta(seconds=TTL_SECONDS)
+        size = batch_size if limit is None else min(batch_size, limit - refreshed)
+        orders = list(
+            Order.objects.filter(UNSETTLED, order_status__in=SHIPPABLE)
+            .filter(Q(shipping_synced_at__isnull=True) | Q(shipping_synced_at__lt=cutoff))
+            .order_by()
+            .only("order_id", "created_at", "shipping_status", "expected_delivery", "shipping_synced_at")[:size]
+        )
+        if not orders:
+            break
+        stored = _store_fetched(orders, get_shipping_queryset_for_customer(orders))
+        if not stored:
+            break
+        refreshed += stored
+    return refreshed
+
+
+# -------------------- PUSHED UPDATES --------------------
+def verify_signature(body, signature):
+    """Check `sha256=<hex HMAC of the body>` against SHIPPING_WEBHOOK_SECRET (never passes if unset)."""
+    if not WEBHOOK_SECRET:
+        return False
+    expected = "sha256=" + hmac.new(WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+
+def parse_updates(entries):
+    """
+    Validate pushed updates ({"order_id", "status", "expected_delivery"?, "updated_at"?}).
+    Returns (updates ready for apply_updates, [{"index", "error"}] for the rejected entries).
+    """
+    now = timezone.now()
+    updates, errors = [], []
+    for index, entry in enumerate(entries):
+        try:
+            if not isinstance(entry, dict):
+                raise ValueError("expected an object")
+            order_id = entry.get("order_id")
+            if isinstance(order_id, bool) or not str(order_id).isdigit() or int(order_id) <= 0:
+                raise ValueError("order_id must be a positive integer")
+            order_id = int(order_id)
+            status = normalize_status(entry.get("status"))
+            if status is None:
+                raise ValueError(f"status must be one of {', '.join(_STATUSES.values())}")
+            expected = _parse_day(entry.get("expected_delivery"))
+            at = now
+            if entry.get("updated_at"):
+                at = parse_datetime(str(entry["updated_at"]))
+                if at is None:
+                    raise ValueError("updated_at must be an ISO datetime")
+                if timezone.is_naive(at):
+                    at = timezone.make_aware(at, dt_timezone.utc)
+                # A future timestamp would make every later (real) update look stale
+                if at > now + MAX_CLOCK_SKEW:
+                    raise ValueError("updated_at is in the future")
+                at = min(at, now)
+        except (TypeError, ValueError) as e:
+            errors.append({"index": index, "error": str(e)})
+            continue
+        updates.append({"order_id": order_id, "status": status, "expected_delivery": expected, "at": at})
+    return updates, errors
+
+
+def record_shipment_created(order_id, status):
+    """Store the status a new shipment was created with (outbox worker)."""
+    status = normalize_status(status)
+    if status:
+        apply_updates(
+            [{"order_id": order_id, "status": status, "expected_delivery": None, "at": timezone.now()}],
+            origin="create",
+        )
+
+
+def apply_updates(updates, origin="push"):
+    """
+    Store status updates: dicts with order_id, status, expected_delivery (date or None), at (when
+    the status was current) and optionally created_at, which lets Postgres go straight to the
+    order's partition. Only the latest update per order is kept. Returns how many orders changed.
+    """
+    latest = {}
+    for update in updates:
+        current = latest.get(update["order_id"])
+        if current is None or update["at"] >= current["at"]:
+            latest[update["order_id"]] = update
+    rows = list(latest.values())
+    applied = 0
+    for start in range(0, len(rows), WRITE_CHUNK):
+        applied += _write(rows[start:start + WRITE_CHUNK])
+    if rows:
+        UPDATES.labels(origin=origin, result="applied").inc(applied)
+        UPDATES.labels(origin=origin, result="ignored").inc(len(updates) - applied)
+    return applied
+
+
+def _write(rows):
+    keyed = all(row.get("created_at") for row in rows)
+    sql = UPDATE_SQL.format(
+        table=Order._meta.db_table,
+        values=", ".join([VALUE_ROW] * len(rows)),
+        same_partition="AND o.created_at = v.created_at" if keyed else "",
+    )
+    params = [
+        value for row in rows
+        for value in (row["order_id"], row.get("created_at"), row["status"], row["expected_delivery"], row["at"])
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + [FINAL, FINAL])
+        return cursor.rowcount
+
+
+def _parse_day(value):
+    if value is None or isinstance(value, date):
+        return value
+    day = parse_date(str(value)[:10])
+    if day is None:
+        raise ValueError("expected_delivery must be an ISO date")
+    return day
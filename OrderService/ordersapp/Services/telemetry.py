@@ -0,0 +1,128 @@
+import contextvars
+import re
+import time
+from contextlib import contextmanager
+from functools import wraps
+from urllib.parse import urlsplit
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from prometheus_client import Histogram
+
+# Checkout stage and downstream call timings. Like every metric here they are written to
+# PROMETHEUS_MULTIPROC_DIR, so /metrics aggregates all Gunicorn workers.
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+CHECKOUT_STAGE = Histogram(
+    "order_service_checkout_stage_seconds",
+    "Duration of each checkout stage by outcome (ok, failed, error)", ["stage", "outcome"],
+    buckets=STAGE_BUCKETS
+)
+DOWNSTREAM_REQUEST = Histogram(
+    "order_service_downstream_request_seconds",
+    "Outbound HTTP calls by service, operation, status (HTTP code, timeout, error) and attempt",
+    ["service", "operation", "status", "attempt"],
+    buckets=STAGE_BUCKETS
+)
+
+# Base URL setting -> service label; other hosts are labelled host:port
+SERVICE_URL_SETTINGS = {
+    "inventory": "INVENTORY_SERVICE_URL",
+    "payment": "PAYMENT_SERVICE_URL",
+    "shipping": "SHIPPING_SERVICE_URL",
+    "notification": "NOTIFICATION_SERVICE_URL",
+    "user": "USER_SERVICE_URL",
+}
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+MAX_ATTEMPT_LABEL = 3
+
+# Which attempt of a logical request the current call is (hedges, outbox redeliveries)
+_attempt = contextvars.ContextVar("downstream_attempt", default=1)
+_services = None
+
+
+# -------------------- CHECKOUT STAGES --------------------
+def checkout_stage(name):
+    """
+    Decorator timing a checkout step (sync or async) into CHECKOUT_STAGE.
+    Outcome: "ok" for a truthy result, "failed" for a falsy one, "error" if it raised.
+    """
+    def decorator(fn):
+        if iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start, outcome = time.perf_counter(), "error"
+                try:
+                    result = await fn(*args, **kwargs)
+                    outcome = "ok" if result else "failed"
+                    return result
+                finally:
+                    CHECKOUT_STAGE.labels(stage=name, outcome=outcome).observe(time.perf_counter() - start)
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start, outcome = time.perf_counter(), "error"
+            try:
+                result = fn(*args, **kwargs)
+                outcome = "ok" if result else "failed"
+                return result
+            finally:
+                CHECKOUT_STAGE.labels(stage=name, outcome=outcome).observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def stage_timer(name):
+    """Time a block (e.g. the ORM writes) as a checkout stage: "ok", or "error" if it raised."""
+    start, outcome = time.perf_counter(), "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        CHECKOUT_STAGE.labels(stage=name, outcome=outcome).observe(time.perf_counter() - start)
+
+
+# -------------------- DOWNSTREAM CALLS --------------------
+@contextmanager
+def attempt(number):
+    """Mark calls made in this block as attempt `number` of their logical request."""
+    token = _attempt.set(number)
+    try:
+        yield
+    finally:
+        _attempt.reset(token)
+
+
+def current_attempt():
+    return _attempt.get()
+
+
+def record_downstream(method, url, status, seconds):
+    """Observe one outbound call; status is the HTTP code, "timeout" or "error"."""
+    service, operation = _route(method, url)
+    number = _attempt.get()
+    DOWNSTREAM_REQUEST.labels(
+        service=service, operation=operation, status=str(status),
+        attempt=str(number) if number < MAX_ATTEMPT_LABEL else f"{MAX_ATTEMPT_LABEL}+",
+    ).observe(seconds)
+
+
+def _route(method, url):
+    """(service, operation) with numeric path segments collapsed, e.g. POST /v1/payments/{id}/capture/."""
+    url = str(url)
+    parts = urlsplit(url)
+    service = next((name for prefix, name in _service_prefixes() if url.startswith(prefix)), parts.netloc)
+    path = _ID_SEGMENT.sub("/{id}", parts.path) or "/"
+    return service, f"{method.upper()} {path}"
+
+
+def _service_prefixes():
+    global _services
+    if _services is None:
+        _services = [
+            (getattr(settings, setting), name)
+            for name, setting in SERVICE_URL_SETTINGS.items()
+            if getattr(settings, setting, None)
+        ]
+    return _services
@@ -0,0 +1,6 @@
+from enum import Enum
+# Circuit breaker states (value = Prometheus gauge value)
+class BreakerState(Enum):
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
@@ -0,0 +1,5 @@
+from enum import Enum
+# Idempotency-Key claim states
+class IdempotencyStatus(Enum):
+    IN_PROGRESS = 'IN_PROGRESS'
+    COMPLETED = 'COMPLETED'
@@ -3,6 +3,7 @@ from enum import Enum
 class OrderStatus(Enum):
     PENDING = 'PENDING'
     CONFIRMED = 'CONFIRMED'
+    SHIPPED = 'SHIPPED'
     CANCELLED = 'CANCELLED'
     DELIVERED = 'DELIVERED'
 
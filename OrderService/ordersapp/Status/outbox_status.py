@@ -0,0 +1,13 @@
+from enum import Enum
+# Outbox delivery statuses
+class OutboxStatus(Enum):
+    PENDING = 'PENDING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+
+# Post-commit side effects drained by the outbox worker
+class OutboxEventType(Enum):
+    CREATE_SHIPMENT = 'CREATE_SHIPMENT'
+    SEND_NOTIFICATION = 'SEND_NOTIFICATION'
+    RELEASE_INVENTORY = 'RELEASE_INVENTORY'
+    REFUND_PAYMENTS = 'REFUND_PAYMENTS'
@@ -0,0 +1,218 @@
+import json
+from urllib.parse import urlencode
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import JsonResponse
+from django.shortcuts import render, redirect
+from rest_framework.utils.encoders import JSONEncoder
+
+# --- Import project modules ---
+from .db.replicas import replica_reads, is_pinned
+from .serializer import OrderSerializer
+from .Services.order_services import OrderService
+from .Services import idempotency
+from .Services.async_db import db_phase
+from .Services.checkout import CheckoutSaga, finish_order, CONFIRMED, OUTCOME_ERRORS
+from .Services.history_service import OrderHistoryService
+from .Services.telemetry import stage_timer
+from .Status.order_status import OrderStatus, SortBy, Direction
+from .Status.payment_status import PaymentStatus
+from .Status.shipping_status import ShippingStatus
+
+# Async (ASGI) variants of the checkout, details and history endpoints.
+# Downstream calls are awaited on the shared async HTTP client, so one worker can keep
+# hundreds of checkouts in flight; DB reads use the async ORM and the short
+# transactional writes run through sync_to_async (Django has no async transactions).
+
+
+# -----------------------------------------------------------------
+# CREATE ORDER (async)
+# -----------------------------------------------------------------
+async def create_order(request):
+    """
+    Same contract as POST v1/orders/create/. The order is inserted as PENDING first and
+    finalised in a second short transaction, so no DB transaction is held open while
+    the checkout saga (parallel reservation + authorization, then capture) is awaited.
+    An Idempotency-Key is claimed with the PENDING insert; duplicates that arrive while
+    the original is running poll for its stored response; one that takes over a claim
+    abandoned mid-checkout resumes its PENDING order.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Method not allowed"}, status=405)
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"error": "Invalid JSON body."}, status=400)
+
+    key = request.headers.get(idempotency.HEADER)
+    request_hash = None
+    if key:
+        if len(key) > idempotency.MAX_KEY_LENGTH:
+            return JsonResponse(
+                {"error": f"{idempotency.HEADER} is longer than {idempotency.MAX_KEY_LENGTH} characters."},
+                status=400
+            )
+        request_hash = idempotency.fingerprint(data)
+        try:
+            replay = idempotency.cached(key, request_hash)
+        except idempotency.KeyReusedError as e:
+            return _key_reused_response(e.key)
+        if replay:
+            return _replayed_response(replay)
+
+    serializer = OrderSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+
+    items = serializer.validated_data.get('items', [])
+    if not items:
+        return JsonResponse({"error": "Cannot create an order without items."}, status=400)
+
+    total = OrderService.calculate_order_total(items)
+    serializer.validated_data['order_total'] = total
+    try:
+        async with db_phase():
+            order, replay = await sync_to_async(_insert_order)(serializer, key, request_hash)
+        if replay is None and order is None:
+            replay = await idempotency.await_completion(key, request_hash)
+    except idempotency.KeyReusedError as e:
+        return _key_reused_response(e.key)
+    except idempotency.RequestInProgressError:
+        return _in_progress_response()
+    if replay:
+        return _replayed_response(replay)
+
+    saga = CheckoutSaga(order, items)
+    outcome = await saga.arun()
+    try:
+        async with db_phase():
+            code, body = await sync_to_async(_finish_order)(order, outcome, key, request_hash)
+    except Exception:
+        # The outcome was not recorded: undo the reservation and payment too, and let retries run
+        await saga.acompensate()
+        if key:
+            async with db_phase():
+                await sync_to_async(idempotency.release)(key)
+        raise
+    return JsonResponse(body, status=code)
+
+
+# Plain async views can't use Django 4.2's csrf_exempt decorator (it wraps them in a sync
+# function); set the flag directly, matching DRF's CSRF-exempt API views.
+create_order.csrf_exempt = True
+
+
+def _insert_order(serializer, key, request_hash):
+    """
+    (order, None) once inserted; (None, (status, body)) for a completed duplicate;
+    (None, None) if the original is still running.
+    """
+    try:
+        with transaction.atomic():
+            resumed = None
+            if key:
+                replay, resumed = idempotency.claim(key, request_hash, wait=False)
+                if replay:
+                    return None, replay
+            with stage_timer("save_order"):
+                return idempotency.claimed_order(key, resumed, serializer.save), None
+    except idempotency.RequestInProgressError:
+        return None, None
+
+
+def _finish_order(order, outcome, key, request_hash):
+    """Final status UPDATE plus outbox rows, customer summary and stored response, in one transaction."""
+    with transaction.atomic():
+        with stage_timer("finalize_order"):
+            finish_order(order, outcome)
+        if outcome == CONFIRMED:
+            code, body = 201, OrderSerializer(order).data
+        else:
+            code, body = 400, {"error": OUTCOME_ERRORS[outcome]}
+        if key:
+            idempotency.complete(key, request_hash, code, body)
+    return code, body
+
+
+def _replayed_response(replay):
+    code, body = replay
+    response = JsonResponse(body, status=code)
+    response[idempotency.REPLAYED_HEADER] = "true"
+    return response
+
+
+def _key_reused_response(key):
+    return JsonResponse(
+        {"error": f"{idempotency.HEADER} {key!r} was already used with a different request body."}, status=422
+    )
+
+
+def _in_progress_response():
+    response = JsonResponse(
+        {"error": f"A request with this {idempotency.HEADER} is still in progress; retry later."}, status=409
+    )
+    response["Retry-After"] = "1"
+    return response
+
+
+# -----------------------------------------------------------------
+# GET ORDER DETAILS (async)
+# -----------------------------------------------------------------
+@replica_reads
+async def get_order_details(request, pk=None):
+    """Get order details by order ID (async ORM behind the read-through cache)."""
+    order_data = await OrderService.aget_order_data(pk, refresh=is_pinned())
+    if not order_data:
+        return JsonResponse({"error": "Order not found"}, status=404)
+    # DRF's encoder, so Decimal prices render as numbers exactly like the sync endpoint
+    return JsonResponse(order_data, encoder=JSONEncoder)
+
+
+# -----------------------------------------------------------------
+# ORDER HISTORY (async)
+# -----------------------------------------------------------------
+@replica_reads
+async def order_history(request, customer_id):
+    """Async order history page; same filters, cursors and template as the sync view."""
+    search = request.GET.get("search", "").strip()
+    status_filter = request.GET.get("status_filter", "").strip()
+    payment_filter = request.GET.get("payment_filter", "").strip()
+    shipping_filter = request.GET.get("shipping_filter", "").strip()
+    sort_by = request.GET.get("sort_by", "").strip()
+    sort_dir = request.GET.get("sort_dir", "").strip()
+
+    redirect_url = OrderService.get_clean_redirect_url(request)
+    if redirect_url:
+        return redirect(redirect_url)
+
+    history_page = await OrderHistoryService.aget_page(
+        customer_id,
+        search=search,
+        status_filter=status_filter,
+        payment_filter=payment_filter,
+        shipping_filter=shipping_filter,
+        sort_by=sort_by,
+        sort_dir=sort_dir,
+        cursor=request.GET.get("cursor"),
+    )
+
+    # Items are prefetched and totals annotated, so rendering does no DB I/O
+    context = {
+        "orders": history_page.orders,
+        "page": history_page,
+        "shipping_qs": history_page.shipping_qs,
+        "search": search,
+        "status_filter": status_filter,
+        "payment_filter": payment_filter,
+        "shipping_filter": shipping_filter,
+        "sort_by": sort_by,
+        "sort_dir": sort_dir,
+        "all_order_statuses": [s.value for s in OrderStatus],
+        "all_payment_statuses": [s.value for s in PaymentStatus],
+        "all_shipping_statuses": [s.value for s in ShippingStatus],
+        "all_sort_by_options": [s.value for s in SortBy],
+        "all_sort_directions": [d.value for d in Direction],
+        "request_path": request.path,
+        "query_without_page": urlencode({k: v for k, v in request.GET.items() if k != "cursor" and v}),
+    }
+    return render(request, "ordersapp/order_history.html", context)
@@ -0,0 +1,474 @@
+"""
+Parallel bulk loading of orders and items (import_orders and generate_orders commands).
+
+Inputs are streamed in chunks: CSV or NDJSON files (optionally gzipped), or Parquet (needs
+pyarrow). Each row is checked with the API serializers' field rules (types, choices, digits,
+and their validate_<field> methods: quantity > 0, prices and totals >= 0), after mapping the
+legacy status names of older exports (CREATED, SUCCESS) to PENDING and PAID. Rejected rows are
+counted and optionally written to a rejects file; the rest are COPYed by a pool of worker
+processes, one connection each, one transaction per chunk.
+
+Orders load first, creating any missing monthly partitions on the way. Items only name their
+order, so they are COPYed into an UNLOGGED staging table and then moved across with a join
+that fills in order_created_at (their partition key), in parallel order_id ranges; items
+whose order does not exist are rejected there.
+
+The partitioned orders table is keyed on (order_id, created_at), so the database would accept
+the same order_id twice in different months. Imported orders carry their own ids: each chunk
+rejects ids it repeats or that are already stored, and after the load the imported id range is
+checked once more for duplicates that parallel chunks wrote at the same time.
+
+With defer_indexes, the secondary indexes and the item foreign key are dropped for the load
+and rebuilt in parallel afterwards, which is much faster than maintaining them row by row.
+Their definitions are logged when dropped in case the load is killed before they are back.
+"""
+import csv
+import gzip
+import io
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from django.db import DatabaseError, connection, connections, transaction
+from rest_framework import serializers
+from . import partitions, synthetic
+from .postgresql_pool.base import close_pools
+from ..serializer import OrderItemSerializer, OrderSerializer
+from ..Status.order_status import OrderStatus
+from ..Status.payment_status import PaymentStatus
+
+ORDER_COLUMNS = ("order_id", "customer_id", "order_status", "payment_status", "order_total", "created_at")
+ITEM_COLUMNS = ("order_item_id", "order_id", "product_id", "sku", "quantity", "unit_price")
+# Items as generated (synthetic.generate_chunk): ids from the database, partition key known
+GENERATED_ITEM_COLUMNS = ("order_id", "product_id", "sku", "quantity", "unit_price", "order_created_at")
+# Ids are read-only in the serializers; imported rows must carry them
+ID_FIELD = serializers.IntegerField(min_value=1)
+# Status names used by older exports (the Seed Data CSVs) -> their current values
+LEGACY_ORDER_VALUES = {
+    "order_status": {"CREATED": OrderStatus.PENDING.value},
+    "payment_status": {"SUCCESS": PaymentStatus.PAID.value},
+}
+MOVE_RANGES_PER_WORKER = 4
+MAINTENANCE_WORK_MEM = "512MB"
+
+logger = logging.getLogger(__name__)
+
+
+class BulkImportError(Exception):
+    """The input cannot be loaded (unknown format, missing optional dependency, failed rebuild)."""
+
+
+# -------------------- reading --------------------
+def read_chunks(path, chunk_size):
+    """Yield lists of row dicts from a .csv, .ndjson/.jsonl (either optionally .gz) or .parquet file."""
+    name = path.lower().removesuffix(".gz")
+    if name.endswith(".parquet"):
+        yield from _parquet_chunks(path, chunk_size)
+        return
+    if not name.endswith((".csv", ".ndjson", ".jsonl")):
+        raise BulkImportError(f"{path}: expected .csv, .ndjson, .jsonl or .parquet (optionally .gz)")
+    opener = gzip.open if path.lower().endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        rows = csv.DictReader(f) if name.endswith(".csv") else (json.loads(line) for line in f if line.strip())
+        while chunk := list(itertools.islice(rows, chunk_size)):
+            yield chunk
+
+
+def _parquet_chunks(path, chunk_size):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise BulkImportError("Reading Parquet needs pyarrow (pip install pyarrow)") from None
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield batch.to_pylist()
+
+
+# -------------------- validation --------------------
+class RowValidator:
+    """Applies a serializer's field rules to raw rows, returning COPY-ready tuples in `columns` order."""
+
+    def __init__(self, serializer, columns, extra_fields, legacy_values=None):
+        self.checks = []
+        legacy_values = legacy_values or {}
+        for name in columns:
+            field = extra_fields.get(name) or serializer.fields[name]
+            self.checks.append((
+                name, field.run_validation, getattr(serializer, f"validate_{name}", None), legacy_values.get(name, {})
+            ))
+
+    def __call__(self, row):
+        """(values, None) for a valid row, else (None, reason)."""
+        values = []
+        for name, run_validation, validate, legacy in self.checks:
+            raw = row.get(name)
+            if legacy and isinstance(raw, str):
+                raw = legacy.get(raw, raw)
+            try:
+                value = run_validation(raw)
+                if validate is not None:
+                    value = validate(value)
+            except serializers.ValidationError as e:
+                return None, f"{name}: {' '.join(map(str, e.detail))}"
+            values.append(value)
+        return values, None
+
+
+_validators = {}
+
+
+def _validator(kind):
+    # Built once per worker process
+    if kind not in _validators:
+        if kind == "orders":
+            _validators[kind] = RowValidator(
+                OrderSerializer(), ORDER_COLUMNS, {"order_id": ID_FIELD}, legacy_values=LEGACY_ORDER_VALUES
+            )
+        else:
+            _validators[kind] = RowValidator(
+                OrderItemSerializer(), ITEM_COLUMNS, {"order_item_id": ID_FIELD, "order_id": ID_FIELD}
+            )
+    return _validators[kind]
+
+
+# -------------------- work units (run in worker processes) --------------------
+class OrdersChunk:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def load(self):
+        valid, rejected = _validate("orders", self.rows)
+        valid = _new_order_ids(valid, rejected)
+        result = _copy_orders(valid, [], rejected)
+        if result.orders:
+            result.ids = (min(order[0] for order in valid), max(order[0] for order in valid))
+        return result
+
+
+class ItemsChunk:
+    def __init__(self, rows, staging):
+        self.rows, self.staging = rows, staging
+
+    def load(self):
+        valid, rejected = _validate("items", self.rows)
+        with transaction.atomic(), connection.cursor() as cursor:
+            _copy(cursor, self.staging, ITEM_COLUMNS, valid)
+        return ChunkResult(0, len(valid), rejected)
+
+
+class SyntheticChunk:
+    def __init__(self, spec, index, offset, count):
+        self.spec, self.index, self.offset, self.count = spec, index, offset, count
+
+    def load(self):
+        orders, items = synthetic.generate_chunk(self.spec, self.index, self.offset, self.count)
+        return _copy_orders(orders, items, [])
+
+
+class ChunkResult:
+    def __init__(self, orders, items, rejected, ids=None):
+        self.orders, self.items, self.rejected = orders, items, rejected
+        # (lowest, highest) order_id loaded from the input, for the duplicate check
+        self.ids = ids
+
+
+def _run_chunk(chunk):
+    return chunk.load()
+
+
+def _validate(kind, rows):
+    validate, valid, rejected = _validator(kind), [], []
+    for row in rows:
+        values, reason = validate(row)
+        if values is None:
+            rejected.append((kind, reason, row))
+        else:
+            valid.append(values)
+    return valid, rejected
+
+
+_known_months = set()
+
+
+def _new_order_ids(orders, rejected):
+    """Drop (as rejected) orders whose order_id repeats within the chunk or is already stored."""
+    ids = [order[0] for order in orders]
+    if not ids:
+        return orders
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT order_id FROM {partitions.ORDERS} WHERE order_id = ANY(%s)", [ids])
+        taken = {row[0] for row in cursor.fetchall()}
+    unique = []
+    for order in orders:
+        if order[0] in taken:
+            rejected.append(("orders", "order_id: already exists", dict(zip(ORDER_COLUMNS, order))))
+        else:
+            taken.add(order[0])
+            unique.append(order)
+    return unique
+
+
+def _copy_orders(orders, items, rejected):
+    """COPY orders (and generated items) in one transaction; on a database error the whole chunk is rejected."""
+    months = {partitions.month_start(order[5]) for order in orders}
+    if not months <= _known_months:
+        partitions.ensure_months(months)
+        _known_months.update(months)
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            _copy(cursor, partitions.ORDERS, ORDER_COLUMNS, orders)
+            _copy(cursor, partitions.ITEMS, GENERATED_ITEM_COLUMNS, items)
+    except DatabaseError as e:
+        reason = str(e).strip().splitlines()[0]
+        rejected += [("orders", reason, dict(zip(ORDER_COLUMNS, order))) for order in orders]
+        rejected += [("items", reason, dict(zip(GENERATED_ITEM_COLUMNS, item))) for item in items]
+        return ChunkResult(0, 0, rejected)
+    return ChunkResult(len(orders), len(items), rejected)
+
+
+def _copy(cursor, table, columns, rows):
+    if not rows:
+        return
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+# -------------------- orchestration --------------------
+class BulkLoader:
+    """
+    with BulkLoader(workers=8) as loader:
+        loader.load_orders(paths); loader.load_items(paths)   # or loader.load_synthetic(spec)
+    On exit: indexes and the foreign key are rebuilt, id sequences moved past the loaded ids
+    and the tables analyzed.
+    """
+
+    def __init__(self, workers=4, chunk_size=10000, defer_indexes=True, rejects_path=None):
+        self.workers, self.chunk_size, self.defer_indexes = workers, chunk_size, defer_indexes
+        self.loaded = Counter()
+        self.rejected = Counter()
+        self._rejects_path = rejects_path
+        self._rejects_file = self._rejects = None
+        self._deferred = []
+        self._pool = None
+        self._imported_ids = None
+
+    def __enter__(self):
+        if self._rejects_path:
+            self._rejects_file = open(self._rejects_path, "w", newline="", encoding="utf-8")
+            self._rejects = csv.writer(self._rejects_file)
+            self._rejects.writerow(["kind", "reason", "row"])
+        if self.defer_indexes:
+            self._deferred = _drop_deferrable()
+        # Forked workers must not share this process's connections: close them, then fork every
+        # worker now (the first submit launches them all) before anything reconnects
+        connections.close_all()
+        close_pools()
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("fork"))
+        self._pool.submit(os.getpid).result()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._pool.shutdown(cancel_futures=exc_type is not None)
+        try:
+            if self._deferred:
+                self._parallel(_restore, self._deferred)
+                logger.info(
+                    "rebuilt deferred indexes and constraints", extra={"count": len(self._deferred), "sample": False}
+                )
+            if exc_type is None:
+                _finish()
+        finally:
+            if self._rejects_file:
+                self._rejects_file.close()
+
+    @staticmethod
+    def truncate():
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE TABLE {partitions.ITEMS}, {partitions.ORDERS} RESTART IDENTITY")
+
+    def load_orders(self, paths):
+        for path in paths:
+            self._run(OrdersChunk(rows) for rows in read_chunks(path, self.chunk_size))
+            logger.info("orders loaded", extra={"path": path, "orders": self.loaded["orders"], "sample": False})
+        self._check_unique_ids()
+
+    def load_items(self, paths):
+        staging = f"ordersapp_import_items_{os.getpid()}"
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE UNLOGGED TABLE {staging} (order_item_id bigint, order_id bigint, product_id bigint, "
+                f"sku varchar(100), quantity integer, unit_price numeric(10, 2))"
+            )
+        try:
+            for path in paths:
+                self._run(ItemsChunk(rows, staging) for rows in read_chunks(path, self.chunk_size))
+                logger.info("items staged", extra={"path": path, "items": self.loaded["items"], "sample": False})
+            self._move_staged_items(staging)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+
+    def load_synthetic(self, spec):
+        self._run(SyntheticChunk(spec, *chunk) for chunk in spec.chunks(self.chunk_size))
+
+    def _run(self, chunks):
+        # At most two chunks per worker in flight, so inputs of any size stream through
+        pending = set()
+        for chunk in chunks:
+            if len(pending) >= self.workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                self._collect(done)
+            pending.add(self._pool.submit(_run_chunk, chunk))
+        self._collect(wait(pending).done)
+
+    def _collect(self, futures):
+        for future in futures:
+            result = future.result()
+            self.loaded.update(orders=result.orders, items=result.items)
+            self._reject(result.rejected)
+            if result.ids:
+                low, high = result.ids
+                if self._imported_ids:
+                    low, high = min(low, self._imported_ids[0]), max(high, self._imported_ids[1])
+                self._imported_ids = (low, high)
+
+    def _reject(self, rejected):
+        for kind, reason, row in rejected:
+            self.rejected[kind, reason] += 1
+            if self._rejects:
+                self._rejects.writerow([kind, reason, json.dumps(row, default=str)])
+
+    def _check_unique_ids(self):
+        """Fail the load if parallel chunks stored the same order_id (in different months)."""
+        if not self._imported_ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT order_id FROM {partitions.ORDERS} WHERE order_id BETWEEN %s AND %s "
+                f"GROUP BY order_id HAVING count(*) > 1 ORDER BY order_id LIMIT 10",
+                list(self._imported_ids),
+            )
+            duplicates = [row[0] for row in cursor.fetchall()]
+        if duplicates:
+            raise BulkImportError(
+                f"order_id must be unique, but these are stored more than once: "
+                f"{', '.join(map(str, duplicates))} (delete the extra rows before using them)"
+            )
+
+    def _move_staged_items(self, staging):
+        """Insert staged items with their order's created_at, in parallel order_id ranges."""
+        self.loaded["items"] = 0
+        with connection.cursor() as cursor:
+            cursor.execute(f"CREATE INDEX ON {staging} (order_id)")
+            cursor.execute(f"ANALYZE {staging}")
+            cursor.execute(f"SELECT min(order_id), max(order_id) FROM {staging}")
+            low, high = cursor.fetchone()
+        if low is None:
+            return
+        step = max(1, (high - low + 1) // (self.workers * MOVE_RANGES_PER_WORKER) + 1)
+        ranges = [(start, start + step) for start in range(low, high + 1, step)]
+        self.loaded["items"] = sum(self._parallel(lambda bounds: _move_items(staging, *bounds), ranges))
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {', '.join(ITEM_COLUMNS)} FROM {staging} s "
+                f"WHERE NOT EXISTS (SELECT 1 FROM {partitions.ORDERS} o WHERE o.order_id = s.order_id)"
+            )
+            while orphans := cursor.fetchmany(self.chunk_size):
+                self._reject(("items", "order_id: order does not exist", dict(zip(ITEM_COLUMNS, row)))
+                             for row in orphans)
+
+    def _parallel(self, fn, args):
+        """Run fn over args on worker threads, each with its own connection."""
+        def run(arg):
+            try:
+                return fn(arg)
+            finally:
+                connection.close()
+        with ThreadPoolExecutor(self.workers) as threads:
+            return list(threads.map(run, args))
+
+
+def _move_items(staging, start, stop):
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {partitions.ITEMS} ({', '.join(ITEM_COLUMNS)}, order_created_at)
+            SELECT {', '.join(f's.{c}' for c in ITEM_COLUMNS)}, o.created_at
+            FROM {staging} s JOIN {partitions.ORDERS} o ON o.order_id = s.order_id
+            WHERE s.order_id >= %s AND s.order_id < %s
+            """,
+            [start, stop],
+        )
+        return cursor.rowcount
+
+
+def _drop_deferrable():
+    """Drop the secondary indexes and the item foreign key; returns (kind, table, name, definition)."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT 'index', i.indrelid::regclass::text, c.relname, pg_get_indexdef(i.indexrelid)
+            FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid IN (%s::regclass, %s::regclass) AND NOT i.indisunique
+            UNION ALL
+            SELECT 'constraint', conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+            FROM pg_constraint WHERE contype = 'f' AND conrelid = %s::regclass AND conparentid = 0
+            """,
+            [partitions.ORDERS, partitions.ITEMS, partitions.ITEMS],
+        )
+        deferred = cursor.fetchall()
+        for kind, table, name, definition in deferred:
+            logger.warning(
+                "dropping %s %s for the load", kind, name, extra={"definition": definition, "sample": False}
+            )
+            if kind == "index":
+                cursor.execute(f"DROP INDEX {name}")
+            else:
+                cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {name}")
+    return deferred
+
+
+def _restore(deferred):
+    kind, table, name, definition = deferred
+    with connection.cursor() as cursor:
+        cursor.execute(f"SET maintenance_work_mem = '{MAINTENANCE_WORK_MEM}'")
+        try:
+            if kind == "index":
+                # A partitioned table's index definition reads "ON ONLY"; rebuild it on every partition
+                cursor.execute(definition.replace(" ON ONLY ", " ON ", 1))
+            else:
+                cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+        except DatabaseError as e:
+            raise BulkImportError(f"Could not rebuild {kind} {name} ({definition}): {e}") from e
+
+
+def _finish():
+    with connection.cursor() as cursor:
+        # Later inserts take ids after the loaded ones
+        for table, column in ((partitions.ORDERS, "order_id"), (partitions.ITEMS, "order_item_id")):
+            cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", [table, column])
+            sequence = cursor.fetchone()[0]
+            cursor.execute(
+                f"SELECT setval(%s, GREATEST(max({column}), (SELECT last_value FROM {sequence}))) FROM {table}",
+                [sequence],
+            )
+        cursor.execute(f"ANALYZE {partitions.ORDERS}, {partitions.ITEMS}")
+
+
+def next_order_id():
+    return _next_id(partitions.ORDERS, "order_id")
+
+
+def next_item_id():
+    return _next_id(partitions.ITEMS, "order_item_id")
+
+
+def _next_id(table, column):
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COALESCE(max({column}), 0) + 1 FROM {table}")
+        return cursor.fetchone()[0]
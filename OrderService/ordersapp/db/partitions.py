@@ -0,0 +1,180 @@
+"""
+Monthly range partitions for ordersapp_order (on created_at) and ordersapp_orderitem (on
+order_created_at, the parent order's created_at carried into every item).
+
+Both tables share the same monthly bounds and items reference orders by (order_id, created_at),
+so a join on both columns pairs partitions one to one. A created_at range (history cursors,
+list date filters, the items of a page of orders) only touches the months it covers.
+Rows outside every monthly partition land in a DEFAULT partition, and create_month() moves
+them out when their month is created.
+"""
+import gzip
+import os
+import re
+from datetime import datetime, timezone as dt_timezone
+from django.db import connection, transaction
+from django.utils import timezone
+from ..Status.order_status import OrderStatus
+
+ORDERS = "ordersapp_order"
+ITEMS = "ordersapp_orderitem"
+# Partitioned table -> partition key; orders first, items reference them
+PARTITION_KEYS = {ORDERS: "created_at", ITEMS: "order_created_at"}
+# Months still holding orders in any other status are not archived
+ARCHIVABLE_STATUSES = (OrderStatus.DELIVERED.value, OrderStatus.CANCELLED.value)
+
+_MONTH_SUFFIX = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+class PartitionNotColdError(Exception):
+    """The month still has orders that are not delivered or cancelled."""
+
+
+def month_start(value):
+    """First instant (UTC) of the month containing value."""
+    return value.astimezone(dt_timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y_%m}"
+
+
+def default_partition(table):
+    return f"{table}_default"
+
+
+def monthly_partitions(table=ORDERS):
+    """Months with a partition attached to table, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    months = []
+    for name in names:
+        match = _MONTH_SUFFIX.search(name)
+        if match:
+            months.append(datetime(int(match[1]), int(match[2]), 1, tzinfo=dt_timezone.utc))
+    return sorted(months)
+
+
+def missing_months(months_ahead):
+    """Months from the current one through months_ahead ahead that have no partition yet."""
+    this_month = month_start(timezone.now())
+    existing = set(monthly_partitions(ORDERS))
+    return [m for m in (add_months(this_month, n) for n in range(months_ahead + 1)) if m not in existing]
+
+
+def months_in_default():
+    """Months with rows sitting in a DEFAULT partition (e.g. after a bulk load), oldest first."""
+    union = " UNION ".join(
+        f"SELECT DISTINCT date_trunc('month', {key}, 'UTC') FROM {default_partition(table)}"
+        for table, key in PARTITION_KEYS.items()
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT * FROM ({union}) months ORDER BY 1")
+        return [month_start(row[0]) for row in cursor.fetchall()]
+
+
+def create_month(month):
+    """Add one month's partition to both tables, moving any rows for it out of the DEFAULT partitions."""
+    bounds = [month, add_months(month, 1)]
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not _default_has_rows(cursor, bounds):
+            for table in PARTITION_KEYS:
+                cursor.execute(
+                    f"CREATE TABLE {partition_name(table, month)} PARTITION OF {table} "
+                    f"FOR VALUES FROM (%s) TO (%s)",
+                    bounds,
+                )
+            return
+        # Build the partitions as plain tables, move the rows in, then attach. Items leave the
+        # DEFAULT partition first, so no item references the orders as they are moved; the
+        # foreign key is checked per statement, not at commit, when the items are back.
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        for table in (ITEMS, ORDERS):
+            key, name = PARTITION_KEYS[table], partition_name(table, month)
+            cursor.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {default_partition(table)} WHERE {key} >= %s AND {key} < %s "
+                f"RETURNING *) INSERT INTO {name} SELECT * FROM moved",
+                bounds,
+            )
+        for table in PARTITION_KEYS:
+            cursor.execute(
+                f"ALTER TABLE {table} ATTACH PARTITION {partition_name(table, month)} "
+                f"FOR VALUES FROM (%s) TO (%s)",
+                bounds,
+            )
+
+
+def ensure_months(months):
+    """Create the partitions of any of the given months that don't exist yet; safe to run concurrently."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [ORDERS])
+        existing = set(monthly_partitions(ORDERS))
+        for month in sorted(set(months) - existing):
+            create_month(month)
+
+
+def cold_months(retain_months):
+    """Monthly partitions that ended more than retain_months months before the current month."""
+    cutoff = add_months(month_start(timezone.now()), -retain_months)
+    return [m for m in monthly_partitions(ORDERS) if add_months(m, 1) <= cutoff]
+
+
+def archive_month(month, archive_dir, lock_timeout_ms=5000):
+    """
+    Write one month of orders and items to gzipped CSV files in archive_dir, then detach and
+    drop both partitions, all in one transaction. Returns [(path, rows), ...].
+    The partitions are locked against writes while they are copied. The brief exclusive lock
+    that DETACH needs on the parent tables gives up after lock_timeout_ms rather than queueing
+    traffic behind it.
+    """
+    paths = []
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            orders, items = partition_name(ORDERS, month), partition_name(ITEMS, month)
+            cursor.execute(f"LOCK TABLE {orders}, {items} IN SHARE MODE")
+            cursor.execute(
+                f"SELECT count(*) FROM {orders} WHERE order_status NOT IN %s", [ARCHIVABLE_STATUSES]
+            )
+            open_orders = cursor.fetchone()[0]
+            if open_orders:
+                raise PartitionNotColdError(f"{orders} still has {open_orders} open orders")
+
+            archived = []
+            for name in (orders, items):
+                path = os.path.join(archive_dir, f"{name}.csv.gz")
+                paths.append(path)
+                with gzip.open(path, "wt", encoding="utf-8") as out:
+                    cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", out)
+                archived.append((path, cursor.rowcount))
+
+            cursor.execute(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}")
+            for table, name in ((ITEMS, items), (ORDERS, orders)):
+                cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+                cursor.execute(f"DROP TABLE {name}")
+        return archived
+    except BaseException:
+        # Nothing was dropped; don't leave files that look like a finished archive
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+
+def _default_has_rows(cursor, bounds):
+    checks = " OR ".join(
+        f"EXISTS (SELECT 1 FROM {default_partition(table)} WHERE {key} >= %s AND {key} < %s)"
+        for table, key in PARTITION_KEYS.items()
+    )
+    cursor.execute(f"SELECT {checks}", bounds * len(PARTITION_KEYS))
+    return cursor.fetchone()[0]
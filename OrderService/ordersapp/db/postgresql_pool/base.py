@@ -0,0 +1,153 @@
+"""
+PostgreSQL backend whose connections come from a process-wide pool (DB_CONN_STRATEGY=pool).
+
+Django 4.2 keeps one connection per thread, so a threaded server, sync_to_async threads and
+ASGI's per-request threads each open their own. Here every DatabaseWrapper borrows a raw
+psycopg2 connection from one pool per process and returns it on close() (end of request,
+with CONN_MAX_AGE = 0), so the number of server connections per worker is capped at
+POOL["MAX_SIZE"] and connection setup is paid once per pooled connection.
+
+POOL settings (see ordersapp.db.strategies.configure):
+    MIN_SIZE     idle connections kept open even when older than MAX_IDLE
+    MAX_SIZE     connections per process; callers wait up to TIMEOUT seconds for one
+    MAX_IDLE     idle connections older than this are closed instead of reused
+    CHECK_AFTER  connections idle longer than this are pinged (SELECT 1) before reuse
+"""
+import os
+import threading
+import time
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from psycopg2 import extensions
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """LIFO pool of open psycopg2 connections; the most recently used one is handed out first."""
+
+    def __init__(self, min_size=2, max_size=20, timeout=10.0, max_idle=300.0, check_after=30.0):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self._idle = []   # (connection, returned_at)
+        self.opened = 0   # server connections opened over the pool's lifetime
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def acquire(self, connect):
+        """A pooled connection, or a new one from connect(); waits while MAX_SIZE are checked out."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise base.Database.OperationalError(
+                f"connection pool exhausted: {self.max_size} connections in use for {self.timeout}s"
+            )
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    connection, returned_at = self._idle.pop()
+                    stale = time.monotonic() - returned_at > self.max_idle and len(self._idle) >= self.min_size
+                if stale or not self._usable(connection, time.monotonic() - returned_at):
+                    self._discard(connection)
+                    continue
+                return connection
+            connection = connect()
+            with self._lock:
+                self.opened += 1
+            return connection
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection):
+        """Return a connection; one left mid-transaction is rolled back, a broken one is closed."""
+        try:
+            if connection.closed:
+                return
+            status = connection.info.transaction_status
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                if status == extensions.TRANSACTION_STATUS_ACTIVE:
+                    self._discard(connection)
+                    return
+                try:
+                    connection.rollback()
+                except base.Database.Error:
+                    self._discard(connection)
+                    return
+            with self._lock:
+                self._idle.append((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close all idle connections (e.g. at shutdown; checked-out ones are unaffected)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def _usable(self, connection, idle_for):
+        if connection.closed:
+            return False
+        if idle_for < self.check_after:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except base.Database.Error:
+            return False
+
+    @staticmethod
+    def _discard(connection):
+        try:
+            connection.close()
+        except base.Database.Error:
+            pass
+
+
+def get_pool(alias, settings_dict):
+    """The pool for a database alias in this process (created lazily, so each forked worker gets its own)."""
+    key = (alias, os.getpid())
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                options = settings_dict.get("POOL", {})
+                pool = _pools[key] = ConnectionPool(
+                    min_size=options.get("MIN_SIZE", 2),
+                    max_size=options.get("MAX_SIZE", 20),
+                    timeout=options.get("TIMEOUT", 10.0),
+                    max_idle=options.get("MAX_IDLE", 300.0),
+                    check_after=options.get("CHECK_AFTER", 30.0),
+                )
+    return pool
+
+
+def close_pools():
+    """Close every pool's idle connections in this process."""
+    with _pools_lock:
+        pools = [pool for (alias, pid), pool in _pools.items() if pid == os.getpid()]
+    for pool in pools:
+        pool.close()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.alias, self.settings_dict)
+        connection = pool.acquire(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        # The base class sets this only for brand-new connections: READ COMMITTED unless OPTIONS says otherwise
+        self.isolation_level = IsolationLevel(
+            self.settings_dict["OPTIONS"].get("isolation_level", IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                get_pool(self.alias, self.settings_dict).release(self.connection)
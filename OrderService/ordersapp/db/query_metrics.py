@@ -0,0 +1,96 @@
+"""
+Per-request database query count and time, by view.
+
+Every connection gets an execute wrapper (installed when the connection opens) that adds to
+the current request's tally, kept in a context variable so it follows the request through
+sync_to_async on the ASGI path. QueryMetricsMiddleware opens the tally and observes it when
+the response is ready; queries outside a request (management commands, the outbox worker,
+the replica lag monitor) are not counted.
+"""
+import contextvars
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db.backends.signals import connection_created
+from prometheus_client import Histogram
+
+QUERIES_PER_REQUEST = Histogram(
+    "order_service_db_queries_per_request",
+    "Database queries executed while serving a request", ["view"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 250)
+)
+QUERY_TIME_PER_REQUEST = Histogram(
+    "order_service_db_time_per_request_seconds",
+    "Total time spent in database queries while serving a request", ["view"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+
+_request = contextvars.ContextVar("db_query_metrics", default=None)
+
+
+class _QueryTally:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+def _observe(execute, sql, params, many, context):
+    tally = _request.get()
+    if tally is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        tally.queries += 1
+        tally.seconds += time.perf_counter() - start
+
+
+def _install(sender, connection, **kwargs):
+    # Fires on every (re)connect of the same wrapper. Kept first in the list: the
+    # connection.execute_wrapper() context manager pops the last entry on exit.
+    if _observe not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _observe)
+
+
+connection_created.connect(_install, dispatch_uid="ordersapp.db.query_metrics")
+
+
+class QueryMetricsMiddleware:
+    """Observes the query count and query time of each request, labelled by resolved view name."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tally = _QueryTally()
+        token = _request.set(tally)
+        try:
+            return self.get_response(request)
+        finally:
+            _request.reset(token)
+            self._record(request, tally)
+
+    async def __acall__(self, request):
+        tally = _QueryTally()
+        token = _request.set(tally)
+        try:
+            return await self.get_response(request)
+        finally:
+            _request.reset(token)
+            self._record(request, tally)
+
+    @staticmethod
+    def _record(request, tally):
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match is not None else "<unresolved>"
+        QUERIES_PER_REQUEST.labels(view=view).observe(tally.queries)
+        QUERY_TIME_PER_REQUEST.labels(view=view).observe(tally.seconds)
@@ -0,0 +1,249 @@
+"""
+Read-replica routing (DATABASES["replica"], set from DB_REPLICA_HOST).
+
+Only views wrapped in @replica_reads (order details, history, list, dashboard) read from the
+replica; every other read, and every write, goes to the primary. Per request:
+
+  * ReplicaPinMiddleware notes whether the request wrote (the router sees every db_for_write).
+    After a write it pins the client to the primary for REPLICA_STICKY_SECONDS with a cookie
+    and an X-Primary-Pin-Until header (epoch seconds) that API clients echo back, so a
+    customer always reads their own writes.
+  * A pinned request, or one arriving while the replica is lagging more than REPLICA_MAX_LAG
+    seconds (or unreachable), reads from the primary instead.
+
+Replica lag is measured by a per-process background thread every REPLICA_LAG_CHECK_INTERVAL
+seconds, so routing decisions never wait on the replica.
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+REPLICA_ALIAS = "replica"
+STICKY_SECONDS = getattr(settings, "REPLICA_STICKY_SECONDS", 10)
+MAX_LAG = getattr(settings, "REPLICA_MAX_LAG", 2.0)
+LAG_CHECK_INTERVAL = getattr(settings, "REPLICA_LAG_CHECK_INTERVAL", 1.0)
+PIN_COOKIE = "order_primary_pin"
+PIN_HEADER = "X-Primary-Pin-Until"
+
+# 0 on a primary or a standby that has replayed everything it received; otherwise the age of
+# the last replayed transaction (which keeps growing on an idle standby, hence the LSN check)
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+READ_ROUTES = Counter(
+    "order_service_read_routing_total",
+    "Replica-eligible requests by where they read (replica, or primary: pinned, lagging, unavailable)",
+    ["decision"]
+)
+REPLICA_LAG = Gauge(
+    "order_service_replica_lag_seconds", "Replica lag at the last check (-1 if unreachable)",
+    multiprocess_mode="livemax"
+)
+
+_request = contextvars.ContextVar("db_routing_request", default=None)
+
+
+class _RequestRouting:
+    __slots__ = ("pinned", "read_alias", "wrote")
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.read_alias = None
+        self.wrote = False
+
+
+class PrimaryReplicaRouter:
+    """Reads go where the current @replica_reads view decided; writes always go to the primary."""
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db   # related lookups stay on the database the instance came from
+        state = _request.get()
+        return state.read_alias if state is not None else None
+
+    def db_for_write(self, model, **hints):
+        state = _request.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA_ALIAS} or None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema by replication
+        return False if db == REPLICA_ALIAS else None
+
+
+def replica_enabled():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def is_pinned():
+    """True if the current request must read its own writes from the primary."""
+    state = _request.get()
+    return state is not None and state.pinned
+
+
+def choose_read_alias():
+    """Where a replica-eligible request should read from right now."""
+    if not replica_enabled():
+        return DEFAULT_DB_ALIAS
+    if is_pinned():
+        READ_ROUTES.labels(decision="pinned").inc()
+        return DEFAULT_DB_ALIAS
+    lag = _monitor().lag
+    if lag is None:
+        READ_ROUTES.labels(decision="unavailable").inc()
+        return DEFAULT_DB_ALIAS
+    if lag > MAX_LAG:
+        READ_ROUTES.labels(decision="lagging").inc()
+        return DEFAULT_DB_ALIAS
+    READ_ROUTES.labels(decision="replica").inc()
+    return REPLICA_ALIAS
+
+
+def replica_reads(view):
+    """Route the ORM reads of a read-only view (sync or async, function or method) to the replica."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            with _reading_from(choose_read_alias()):
+                return await view(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with _reading_from(choose_read_alias()):
+            return view(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def _reading_from(alias):
+    state = _request.get()
+    # Outside ReplicaPinMiddleware (e.g. called directly), scope a state to this call
+    token = _request.set(_RequestRouting()) if state is None else None
+    state = _request.get()
+    previous, state.read_alias = state.read_alias, alias
+    try:
+        yield
+    finally:
+        state.read_alias = previous
+        if token is not None:
+            _request.reset(token)
+
+
+class ReplicaPinMiddleware:
+    """Tracks writes per request and pins the client to the primary for a while after one."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = _RequestRouting(pinned=_pinned_until(request) > time.time())
+        token = _request.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request.reset(token)
+        return self._pin(state, response)
+
+    async def __acall__(self, request):
+        state = _RequestRouting(pinned=_pinned_until(request) > time.time())
+        token = _request.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request.reset(token)
+        return self._pin(state, response)
+
+    @staticmethod
+    def _pin(state, response):
+        if state.wrote and replica_enabled():
+            until = int(time.time() + STICKY_SECONDS)
+            response.set_cookie(PIN_COOKIE, str(until), max_age=STICKY_SECONDS, httponly=True, samesite="Lax")
+            response[PIN_HEADER] = str(until)
+        return response
+
+
+def _pinned_until(request):
+    value = request.headers.get(PIN_HEADER) or request.COOKIES.get(PIN_COOKIE)
+    try:
+        return float(value) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+# -------------------- lag monitor --------------------
+class _LagMonitor:
+    """Background thread keeping `lag` current: seconds behind the primary, or None if unreachable."""
+
+    def __init__(self):
+        self.lag = None
+        self._reachable = None
+        self._thread = threading.Thread(target=self._run, name="replica-lag", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            lag = self._measure()
+            if self._reachable is not (lag is not None):
+                self._reachable = lag is not None
+                logger.warning(
+                    "replica available" if self._reachable else "replica unavailable, reading from primary",
+                    extra={"alias": REPLICA_ALIAS, "sample": False}
+                )
+            self.lag = lag
+            REPLICA_LAG.set(-1 if lag is None else lag)
+            time.sleep(LAG_CHECK_INTERVAL)
+
+    @staticmethod
+    def _measure():
+        replica = connections[REPLICA_ALIAS]
+        try:
+            with replica.cursor() as cursor:
+                cursor.execute(LAG_SQL)
+                return float(cursor.fetchone()[0])
+        except DatabaseError:
+            replica.close()
+            return None
+
+
+_monitors = {}
+_monitors_lock = threading.Lock()
+
+
+def _monitor():
+    # One per process: forked workers don't inherit the parent's thread
+    pid = os.getpid()
+    monitor = _monitors.get(pid)
+    if monitor is None:
+        with _monitors_lock:
+            monitor = _monitors.get(pid)
+            if monitor is None:
+                monitor = _monitors[pid] = _LagMonitor()
+    return monitor
@@ -0,0 +1,44 @@
+"""
+Postgres connection strategies for settings.DATABASES (DB_CONN_STRATEGY).
+
+    per-request  new connection per request, closed when it finishes (Django's default)
+    persistent   connections kept per thread for CONN_MAX_AGE seconds, health-checked before reuse
+    pool         one pool of connections per process, shared by all threads (ordersapp.db.postgresql_pool);
+                 also reuses connections under ASGI, where each request runs in its own thread
+    pgbouncer    persistent connections to PgBouncer in transaction pooling mode: no server-side
+                 cursors, since a cursor cannot outlive the transaction that PgBouncer pins to a server
+
+Kept free of Django imports so settings.py can use it.
+"""
+
+STRATEGIES = ("per-request", "persistent", "pool", "pgbouncer")
+POOL_ENGINE = "ordersapp.db.postgresql_pool"
+
+
+def configure(database, strategy, conn_max_age=60, pool_min_size=2, pool_max_size=20,
+              pool_timeout=10.0, pool_max_idle=300.0, pool_check_after=30.0):
+    """Return a copy of a DATABASES entry set up for the given strategy."""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown DB_CONN_STRATEGY {strategy!r}; expected one of {', '.join(STRATEGIES)}")
+    database = dict(database)
+    if strategy == "per-request":
+        database["CONN_MAX_AGE"] = 0
+    elif strategy == "persistent":
+        database["CONN_MAX_AGE"] = conn_max_age
+        database["CONN_HEALTH_CHECKS"] = True
+    elif strategy == "pool":
+        # Django hands the connection back at the end of each request; the pool keeps it open
+        database["ENGINE"] = POOL_ENGINE
+        database["CONN_MAX_AGE"] = 0
+        database["POOL"] = {
+            "MIN_SIZE": pool_min_size,
+            "MAX_SIZE": pool_max_size,
+            "TIMEOUT": pool_timeout,
+            "MAX_IDLE": pool_max_idle,
+            "CHECK_AFTER": pool_check_after,
+        }
+    elif strategy == "pgbouncer":
+        database["CONN_MAX_AGE"] = conn_max_age
+        database["CONN_HEALTH_CHECKS"] = True
+        database["DISABLE_SERVER_SIDE_CURSORS"] = True
+    return database
@@ -0,0 +1,117 @@
+"""
+Synthetic orders for load testing (generate_orders command).
+
+Orders are spread uniformly over the last `months` months across `customers` customers, with one
+to `max_items` items each from a fixed catalogue of `products` products; totals are priced with
+PricingEngine like real orders. Each chunk is built from (seed, chunk index) alone, so worker
+processes generate their chunks independently and a seed always reproduces the same data.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+import numpy as np
+from ..Services.pricing import PricingEngine
+from ..Status.order_status import OrderStatus
+from ..Status.payment_status import PaymentStatus
+
+ORDER_STATUS_WEIGHTS = {
+    OrderStatus.PENDING.value: 0.10,
+    OrderStatus.CONFIRMED.value: 0.15,
+    OrderStatus.SHIPPED.value: 0.15,
+    OrderStatus.DELIVERED.value: 0.50,
+    OrderStatus.CANCELLED.value: 0.10,
+}
+# Payment status that goes with each order status (cancelled orders: refunded, or failed payment)
+PAYMENT_FOR_STATUS = {
+    OrderStatus.PENDING.value: (PaymentStatus.PENDING.value,),
+    OrderStatus.CONFIRMED.value: (PaymentStatus.PAID.value,),
+    OrderStatus.SHIPPED.value: (PaymentStatus.PAID.value,),
+    OrderStatus.DELIVERED.value: (PaymentStatus.PAID.value,),
+    OrderStatus.CANCELLED.value: (PaymentStatus.REFUNDED.value, PaymentStatus.FAILED.value),
+}
+MAX_QUANTITY = 5
+PRICE_RANGE_CENTS = (199, 99_999)
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    customers: int
+    orders: int
+    first_order_id: int
+    end: datetime
+    first_customer_id: int = 1
+    months: int = 24
+    max_items: int = 5
+    products: int = 500
+    seed: int = 0
+
+    def chunks(self, chunk_size):
+        """(chunk index, first order offset, order count) covering all orders."""
+        for index, offset in enumerate(range(0, self.orders, chunk_size)):
+            yield index, offset, min(chunk_size, self.orders - offset)
+
+    def months_covered(self):
+        """Month starts (UTC) that generated orders can fall in."""
+        start = self.end.timestamp() - self.months * 30.5 * 86400
+        month = datetime.fromtimestamp(start, dt_timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        months = []
+        while month <= self.end:
+            months.append(month)
+            index = month.year * 12 + month.month
+            month = month.replace(year=index // 12, month=index % 12 + 1)
+        return months
+
+
+def catalogue(spec):
+    """(sku, unit price in cents) for product ids 1..products, fixed by the seed."""
+    rng = np.random.default_rng([spec.seed, 0])
+    prices = rng.integers(*PRICE_RANGE_CENTS, size=spec.products + 1)
+    return [f"SKU{product:04d}" for product in range(spec.products + 1)], prices
+
+
+def generate_chunk(spec, index, offset, count):
+    """
+    Build one chunk of orders and their items as COPY-ready tuples:
+      orders: (order_id, customer_id, order_status, payment_status, order_total, created_at)
+      items:  (order_id, product_id, sku, quantity, unit_price, order_created_at)
+    Item ids are left to the database.
+    """
+    skus, prices = catalogue(spec)
+    rng = np.random.default_rng([spec.seed, index + 1])
+    end = spec.end.timestamp()
+    span = int(spec.months * 30.5 * 86400)
+
+    order_ids = np.arange(spec.first_order_id + offset, spec.first_order_id + offset + count)
+    customers = rng.integers(spec.first_customer_id, spec.first_customer_id + spec.customers, size=count)
+    created = end - rng.integers(0, span, size=count)
+    statuses = rng.choice(list(ORDER_STATUS_WEIGHTS), size=count, p=list(ORDER_STATUS_WEIGHTS.values()))
+
+    n_items = rng.integers(1, spec.max_items + 1, size=count)
+    order_index = np.repeat(np.arange(count), n_items)
+    product_ids = rng.integers(1, spec.products + 1, size=len(order_index))
+    quantities = rng.integers(1, MAX_QUANTITY + 1, size=len(order_index))
+    unit_cents = prices[product_ids]
+    *_, totals = PricingEngine.price_columns(order_index, quantities, unit_cents, count)
+
+    created_at = [datetime.fromtimestamp(ts, dt_timezone.utc) for ts in created.tolist()]
+    payment_pick = rng.integers(0, 2, size=count).tolist()
+    orders = [
+        (order_id, customer, status, _pick(PAYMENT_FOR_STATUS[status], pick), _money(total), created_at[i])
+        for i, (order_id, customer, status, total, pick) in enumerate(zip(
+            order_ids.tolist(), customers.tolist(), statuses.tolist(), totals.tolist(), payment_pick
+        ))
+    ]
+    items = [
+        (orders[position][0], product, skus[product], quantity, _money(cents), created_at[position])
+        for position, product, quantity, cents in zip(
+            order_index.tolist(), product_ids.tolist(), quantities.tolist(), unit_cents.tolist()
+        )
+    ]
+    return orders, items
+
+
+def _pick(choices, pick):
+    return choices[pick % len(choices)]
+
+
+def _money(cents):
+    return f"{cents // 100}.{cents % 100:02d}"
@@ -0,0 +1,130 @@
+import random
+import statistics
+import threading
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from ordersapp.db import strategies
+from ordersapp.db.postgresql_pool.base import close_pools, get_pool
+from ordersapp.models import Order
+
+BACKENDS_SQL = (
+    "SELECT count(*) FROM pg_stat_activity "
+    "WHERE datname = current_database() AND backend_type = 'client backend'"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request connection overhead for each DB connection strategy under concurrent load. "
+        "Threads run simulated requests (order + items lookup) with Django's request-start/finish "
+        "connection handling, against the 'default' database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=32, help="Concurrent request threads")
+        parser.add_argument("--requests", type=int, default=100, help="Requests per thread")
+        parser.add_argument("--strategies", default="per-request,persistent,pool",
+                            help=f"Comma-separated subset of: {', '.join(strategies.STRATEGIES)}")
+        parser.add_argument("--pool-size", type=int, default=10, help="POOL MAX_SIZE for the pool strategy")
+        parser.add_argument("--pgbouncer-host", help="PgBouncer host (enables the pgbouncer strategy)")
+        parser.add_argument("--pgbouncer-port", default="6432")
+
+    def handle(self, *args, **opts):
+        default = connections["default"]
+        if default.vendor != "postgresql":
+            raise CommandError("This benchmark needs PostgreSQL.")
+        names = [s.strip() for s in opts["strategies"].split(",") if s.strip()]
+        if "pgbouncer" in names and not opts["pgbouncer_host"]:
+            raise CommandError("The pgbouncer strategy needs --pgbouncer-host.")
+        order_ids = list(Order.objects.values_list("order_id", flat=True).order_by("?")[:1000])
+        if not order_ids:
+            raise CommandError("No orders found; seed the database first.")
+        default.close()
+
+        # The strategy-free base entry; each strategy gets its own alias configured from it
+        base = {k: v for k, v in default.settings_dict.items() if k not in ("POOL", "DISABLE_SERVER_SIDE_CURSORS")}
+        base["ENGINE"] = "django.db.backends.postgresql"
+        self.stdout.write(
+            f"{opts['threads']} threads x {opts['requests']} requests\n"
+            f"{'strategy':<13}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'connect ms/req':>16}"
+            f"{'new conns':>11}{'peak server conns':>19}"
+        )
+        for name in names:
+            database = dict(base)
+            if name == "pgbouncer":
+                database.update(HOST=opts["pgbouncer_host"], PORT=opts["pgbouncer_port"])
+            alias = f"bench_{name.replace('-', '_')}"
+            connections.settings[alias] = strategies.configure(database, name, pool_max_size=opts["pool_size"])
+            self._report(name, alias, self._run(alias, order_ids, opts))
+        close_pools()
+
+    def _run(self, alias, order_ids, opts):
+        created = []
+        on_created = lambda sender, connection, **kwargs: connection.alias == alias and created.append(1)
+        connection_created.connect(on_created, weak=False)
+        stop, peak = threading.Event(), [0]
+        sampler = threading.Thread(target=self._sample_backends, args=(stop, peak))
+        sampler.start()
+        results = []
+        start_gate = threading.Barrier(opts["threads"])
+
+        def worker():
+            local = []
+            start_gate.wait()
+            for _ in range(opts["requests"]):
+                local.append(self._request(alias, random.choice(order_ids)))
+            connections[alias].close()
+            results.extend(local)
+
+        threads = [threading.Thread(target=worker) for _ in range(opts["threads"])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        sampler.join()
+        connection_created.disconnect(on_created)
+
+        is_pool = connections.settings[alias]["ENGINE"] == strategies.POOL_ENGINE
+        opened = get_pool(alias, connections.settings[alias]).opened if is_pool else len(created)
+        # The sampler's own connection is not part of the load
+        return results, elapsed, opened, peak[0] - 1
+
+    @staticmethod
+    def _request(alias, order_id):
+        """One simulated request: (total seconds, seconds spent obtaining a connection)."""
+        connection = connections[alias]
+        start = time.perf_counter()
+        connection.close_if_unusable_or_obsolete()   # request_started
+        connect_start = time.perf_counter()
+        connection.ensure_connection()
+        connect = time.perf_counter() - connect_start
+        order = Order.objects.using(alias).filter(pk=order_id).first()
+        if order is not None:
+            list(order.items.all())
+        connection.close_if_unusable_or_obsolete()   # request_finished
+        return time.perf_counter() - start, connect
+
+    @staticmethod
+    def _sample_backends(stop, peak):
+        connection = connections["default"]
+        while not stop.is_set():
+            with connection.cursor() as cursor:
+                cursor.execute(BACKENDS_SQL)
+                peak[0] = max(peak[0], cursor.fetchone()[0])
+            stop.wait(0.02)
+        connection.close()
+
+    def _report(self, name, alias, run):
+        results, elapsed, opened, peak = run
+        latencies = sorted(total * 1000 for total, _ in results)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        connect_ms = statistics.mean(connect * 1000 for _, connect in results)
+        self.stdout.write(
+            f"{name:<13}{len(results) / elapsed:>9.0f}{statistics.median(latencies):>9.2f}{p99:>9.2f}"
+            f"{connect_ms:>16.3f}{opened:>11}{peak:>19}"
+        )
@@ -0,0 +1,127 @@
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from ordersapp.models import Order, OrderItem
+from ordersapp.Services.history_service import OrderHistoryService
+
+# Indexes added by 0004_order_history_indexes
+NEW_INDEXES = [
+    "order_customer_created_idx",
+    "order_open_customer_idx",
+    "order_open_status_idx",
+    "orderitem_sku_upper_trgm_idx",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a large synthetic dataset (optional) and report query plans and timings for the "
+        "order-history access patterns with and without the history indexes. "
+        "The 'before' run drops the indexes inside a rolled-back transaction, so only use a "
+        "benchmark database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed-orders", type=int, default=0, help="Synthetic orders to insert first")
+        parser.add_argument("--customers", type=int, default=1000)
+        parser.add_argument("--items-per-order", type=int, default=3)
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query")
+        parser.add_argument("--plans", action="store_true", help="Print full EXPLAIN ANALYZE output")
+
+    def handle(self, *args, **opts):
+        if connection.vendor != "postgresql":
+            raise CommandError("This benchmark needs PostgreSQL.")
+        if opts["seed_orders"]:
+            self._seed(opts["seed_orders"], opts["customers"], opts["items_per_order"])
+
+        customer_id = (
+            Order.objects.values_list("customer_id", flat=True).order_by("-created_at").first()
+        )
+        if customer_id is None:
+            raise CommandError("No orders found; use --seed-orders.")
+        queries = self._queries(customer_id)
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for name in NEW_INDEXES:
+                    cursor.execute(f"DROP INDEX IF EXISTS {name}")
+            before = self._measure(queries, opts)
+            transaction.set_rollback(True)
+        after = self._measure(queries, opts)
+
+        self.stdout.write(f"\n{'query':<22}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+        for name in queries:
+            b, a = before[name]["ms"], after[name]["ms"]
+            self.stdout.write(f"{name:<22}{b:>12.3f}{a:>12.3f}{(b / a if a else 0):>9.1f}x")
+        for label, result in (("before", before), ("after", after)):
+            self.stdout.write(f"\n--- plans {label} ---")
+            for name, data in result.items():
+                plan = data["plan"] if opts["plans"] else data["plan"].splitlines()[0]
+                self.stdout.write(f"{name}: {plan}")
+
+    @staticmethod
+    def _queries(customer_id):
+        history = OrderHistoryService.build_queryset(customer_id).order_by("-created_at", "-order_id")
+        pivot = history[50:51].values_list("created_at", "order_id").first()
+        deep = history
+        if pivot:
+            deep = history.filter(OrderHistoryService._after("created_at", True, *pivot))
+        return {
+            "history_first_page": history[:4],
+            "history_keyset_page": deep[:4],
+            "history_open_orders": history.filter(order_status__in=["PENDING", "CONFIRMED"])[:4],
+            "open_orders_by_age": Order.objects.filter(
+                order_status__in=["PENDING", "CONFIRMED"]).order_by("order_status", "created_at")[:100],
+            "sku_search": OrderItem.objects.filter(sku__icontains="KU0042")[:50],
+        }
+
+    @staticmethod
+    def _measure(queries, opts):
+        results = {}
+        for name, qs in queries.items():
+            list(qs.all())  # warm up
+            timings = []
+            for _ in range(opts["repeat"]):
+                start = time.perf_counter()
+                list(qs.all())
+                timings.append((time.perf_counter() - start) * 1000)
+            results[name] = {
+                "ms": statistics.median(timings),
+                "plan": qs.explain(analyze=True, buffers=True),
+            }
+        return results
+
+    def _seed(self, orders, customers, items_per_order):
+        self.stdout.write(f"Seeding {orders} orders x {items_per_order} items for {customers} customers...")
+        start = time.perf_counter()
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SELECT COALESCE(MAX(order_id), 0) FROM ordersapp_order")
+            first_id = cursor.fetchone()[0]
+            cursor.execute(
+                """
+                INSERT INTO ordersapp_order (customer_id, order_status, payment_status, order_total, created_at)
+                SELECT 1 + (g %% %s),
+                       (ARRAY['DELIVERED','DELIVERED','DELIVERED','CANCELLED','PENDING','CONFIRMED'])[1 + ((g / %s) %% 6)],
+                       (ARRAY['PAID','PAID','PAID','REFUNDED','PENDING','PAID'])[1 + ((g / %s) %% 6)],
+                       round((random() * 1000)::numeric, 2),
+                       now() - (random() * interval '730 days')
+                FROM generate_series(1, %s) AS g
+                """,
+                [customers, customers, customers, orders],
+            )
+            cursor.execute(
+                """
+                INSERT INTO ordersapp_orderitem (order_id, product_id, sku, quantity, unit_price)
+                SELECT order_id, p, 'SKU' || lpad(p::text, 4, '0'), 1 + (random() * 4)::int,
+                       round((random() * 500)::numeric, 2)
+                FROM (SELECT o.order_id, 1 + (random() * 9999)::int AS p
+                      FROM ordersapp_order o CROSS JOIN generate_series(1, %s) AS k
+                      WHERE o.order_id > %s) AS lines
+                """,
+                [items_per_order, first_id],
+            )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE ordersapp_order")
+            cursor.execute("ANALYZE ordersapp_orderitem")
+        self.stdout.write(f"Seeded in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,82 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from ordersapp.models import Order, OrderItem
+from ordersapp.serializer import OrderSerializer
+from ordersapp.Services.order_services import OrderService
+from ordersapp.Services.outbox import enqueue_order_confirmed
+from ordersapp.Status.order_status import OrderStatus
+from ordersapp.Status.payment_status import PaymentStatus
+
+
+class Command(BaseCommand):
+    help = "Compare DB statements per order and orders/sec for the old and new order-creation write paths."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=200)
+        parser.add_argument("--items", type=int, default=50, help="Lines per order")
+
+    def handle(self, *args, **opts):
+        payload = {
+            "customer_id": 1,
+            "items": [
+                {"product_id": i, "sku": f"SKU{i:04d}", "quantity": 1 + i % 3, "unit_price": "19.99"}
+                for i in range(opts["items"])
+            ],
+        }
+        for name, fn in (("before", self._legacy_create), ("after", self._bulk_create)):
+            statements, elapsed = self._run(fn, payload, opts["orders"])
+            self.stdout.write(
+                f"{name:<7} {statements / opts['orders']:7.1f} statements/order  "
+                f"{opts['orders'] / elapsed:9.1f} orders/s"
+            )
+
+    @staticmethod
+    def _run(fn, payload, count):
+        """Run count creations inside one transaction that is rolled back afterwards."""
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                for _ in range(count):
+                    fn(payload)
+                elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+        writes = [q for q in ctx.captured_queries if not q["sql"].lstrip().upper().startswith(("SAVEPOINT", "RELEASE"))]
+        return len(writes), elapsed
+
+    @staticmethod
+    def _validated(payload):
+        serializer = OrderSerializer(data=payload)
+        serializer.is_valid(raise_exception=True)
+        return serializer
+
+    def _legacy_create(self, payload):
+        """The original write pattern: per-item INSERT, then repeated full-row saves."""
+        serializer = self._validated(payload)
+        data = dict(serializer.validated_data)
+        items = data.pop("items")
+        data["order_total"] = OrderService.calculate_order_total(items)
+        order = Order.objects.create(**data)
+        total = 0
+        for item_data in items:
+            item = OrderItem.objects.create(order=order, **item_data)
+            total += item.quantity * item.unit_price
+        order.order_total = total
+        order.save()
+        order.order_status = OrderStatus.CONFIRMED.value
+        order.payment_status = PaymentStatus.PAID.value
+        order.save()
+
+    def _bulk_create(self, payload):
+        """The current create_order write path (remote calls excluded)."""
+        serializer = self._validated(payload)
+        serializer.validated_data["order_total"] = OrderService.calculate_order_total(
+            serializer.validated_data["items"]
+        )
+        with transaction.atomic():
+            order = serializer.save()
+            order.order_status = OrderStatus.CONFIRMED.value
+            order.payment_status = PaymentStatus.PAID.value
+            order.save(update_fields=["order_status", "payment_status"])
+            enqueue_order_confirmed(order)
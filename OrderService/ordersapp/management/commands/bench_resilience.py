@@ -0,0 +1,104 @@
+import contextlib
+import io
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from prometheus_client import REGISTRY
+from ordersapp.Services import inventory_client, payment_client
+from ordersapp.standins import inventory_server, payment_server
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive inventory reservation + payment charges through fault-injecting stand-ins "
+        "(healthy, tail latency, brown-out, outage, recovery) and report latency and breaker behaviour."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--calls", type=int, default=200, help="Checkouts per phase")
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--latency", type=float, default=0.02, help="Normal stand-in latency (s)")
+        parser.add_argument("--slow-latency", type=float, default=3.0, help="Latency of slow calls (s)")
+        parser.add_argument("--tail-rate", type=float, default=0.05, help="Share of slow calls in the tail phase")
+        parser.add_argument("--open-seconds", type=float, default=2.0, help="Breaker open -> half-open delay")
+        parser.add_argument("--hedge", action="store_true", help="Hedge reservations and charges")
+
+    def handle(self, *args, **opts):
+        servers = [
+            inventory_server.start(latency=opts["latency"], slow_latency=opts["slow_latency"]),
+            payment_server.start(latency=opts["latency"], slow_latency=opts["slow_latency"]),
+        ]
+        dependencies = [inventory_client.INVENTORY, payment_client.PAYMENT]
+        saved = (inventory_client.INVENTORY_SERVICE_URL, inventory_client.MOCK_INVENTORY,
+                 payment_client.PAYMENT_SERVICE_URL, payment_client.MOCK_PAYMENT)
+        inventory_client.INVENTORY_SERVICE_URL, payment_client.PAYMENT_SERVICE_URL = (s.base_url for s in servers)
+        inventory_client.MOCK_INVENTORY = payment_client.MOCK_PAYMENT = False
+        for dependency in dependencies:
+            dependency.breaker.reset()
+            dependency.breaker.open_seconds = opts["open_seconds"]
+            dependency.hedge = opts["hedge"]
+
+        phases = [
+            ("healthy", {}),
+            ("tail", {"slow_rate": opts["tail_rate"]}),
+            ("brownout", {"slow_rate": 1}),
+            ("outage", {"error_rate": 1}),
+            ("recovery", {}),
+            ("recovered", {}),
+        ]
+        self.stdout.write(
+            f"{'phase':<10}{'ok':>6}{'failed':>8}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+            f"{'rejected':>10}{'inventory':>11}{'payment':>10}{'timeout s':>11}"
+        )
+        try:
+            for name, faults in phases:
+                if name == "recovery":
+                    time.sleep(opts["open_seconds"])
+                for server in servers:
+                    server.set_faults(**{"error_rate": 0, "slow_rate": 0, **faults})
+                self._report(name, self._run(opts), dependencies)
+        finally:
+            (inventory_client.INVENTORY_SERVICE_URL, inventory_client.MOCK_INVENTORY,
+             payment_client.PAYMENT_SERVICE_URL, payment_client.MOCK_PAYMENT) = saved
+            for server in servers:
+                server.shutdown()
+                server.server_close()
+        self.stdout.write(f"stand-in calls: inventory={servers[0].calls} payment={servers[1].calls}")
+
+    @staticmethod
+    def _checkout(order_id):
+        start = time.perf_counter()
+        items = [{"product_id": 1, "quantity": 1}]
+        ok = inventory_client.reserve_inventory(order_id, items) and \
+            payment_client.charge_payment(order_id, 1, 10)
+        return ok, time.perf_counter() - start
+
+    def _run(self, opts):
+        rejected_before = self._rejected()
+        base = int(time.time() * 1000) * 1000
+        with contextlib.redirect_stdout(io.StringIO()), \
+                ThreadPoolExecutor(max_workers=opts["concurrency"]) as pool:
+            results = list(pool.map(self._checkout, range(base, base + opts["calls"])))
+        return results, self._rejected() - rejected_before
+
+    @staticmethod
+    def _rejected():
+        return sum(
+            REGISTRY.get_sample_value(
+                "order_service_circuit_breaker_calls_total", {"dependency": name, "outcome": "rejected"}
+            ) or 0
+            for name in ("inventory", "payment")
+        )
+
+    def _report(self, name, run, dependencies):
+        results, rejected = run
+        latencies = sorted(elapsed * 1000 for _, elapsed in results)
+        ok = sum(1 for success, _ in results if success)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        inventory, payment = (d.breaker.state.name.lower() for d in dependencies)
+        self.stdout.write(
+            f"{name:<10}{ok:>6}{len(results) - ok:>8}{statistics.median(latencies):>9.1f}{p99:>9.1f}"
+            f"{latencies[-1]:>9.1f}{int(rejected):>10}{inventory:>11}{payment:>10}"
+            f"{dependencies[1].read_timeout():>11.2f}"
+        )
@@ -0,0 +1,43 @@
+import time
+from django.core.management.base import BaseCommand
+from ordersapp.Services import shipping_client
+from ordersapp.standins import shipping_server
+
+
+class Command(BaseCommand):
+    help = "Time serial vs concurrent vs bulk shipping-status fetches against a local stand-in."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=100)
+        parser.add_argument("--latency", type=float, default=0.05, help="Stand-in latency per request (s)")
+        parser.add_argument("--workers", type=int, default=shipping_client.FETCH_CONCURRENCY)
+
+    def handle(self, *args, **opts):
+        order_ids = list(range(1, opts["orders"] + 1))
+        server = shipping_server.start(latency=opts["latency"])
+        original_url = shipping_client.SHIPPING_URL
+        shipping_client.SHIPPING_URL = server.base_url
+        try:
+            results = {
+                "serial": self._time(lambda: shipping_client._fetch_concurrent(order_ids, workers=1, deadline=3600)),
+                "concurrent": self._time(lambda: shipping_client._fetch_concurrent(
+                    order_ids, workers=opts["workers"], deadline=3600)),
+                "bulk": self._time(lambda: shipping_client._fetch_bulk(order_ids)),
+            }
+        finally:
+            shipping_client.SHIPPING_URL = original_url
+            server.shutdown()
+            server.server_close()
+
+        baseline = results["serial"]
+        for name, elapsed in results.items():
+            self.stdout.write(
+                f"{name:<11} {elapsed * 1000:9.1f} ms  speedup x{baseline / elapsed if elapsed else 0:.1f}"
+            )
+        self.stdout.write(f"stand-in calls: {server.calls}")
+
+    @staticmethod
+    def _time(fn):
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
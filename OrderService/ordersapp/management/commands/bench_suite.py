@@ -0,0 +1,422 @@
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+import httpx
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from prometheus_client.parser import text_string_to_metric_families
+from ordersapp.models import Order
+from ordersapp.management.commands.loadtest_checkout import ENDPOINTS, create_payload
+
+SEED_ORDERS = os.path.join("Seed Data", "eci_orders.csv")
+SEED_ITEMS = os.path.join("Seed Data", "eci_order_items.csv")
+# Reads first: create adds orders to the dataset being measured
+ENDPOINT_ORDER = ("details", "history", "list", "create")
+METRICS_VIEW = "prometheus-django-metrics"
+PERCENTILES = {"p50": 0.50, "p95": 0.95, "p99": 0.99}
+TARGET_SAMPLE = 2000
+
+
+class Command(BaseCommand):
+    help = (
+        "Reproducible open-loop benchmark of the create, details, history and list endpoints. For each "
+        "--datasets size (seed = the Seed Data CSVs, then e.g. 100k, 1m orders topped up with synthetic "
+        "data) it starts the downstream stand-ins with the given latency/error rate and a Gunicorn "
+        "server, sends requests at a fixed arrival rate and reports p50/p95/p99 latency, throughput, "
+        "errors and DB queries per request. Results are written as JSON (--output); --compare flags "
+        "regressions against an earlier run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--datasets", default="current",
+                            help="Comma-separated dataset sizes in ascending order: current (data as is), "
+                                 "seed, or an order count such as 100000, 100k, 2m. Anything but current "
+                                 "needs --reset-data")
+        parser.add_argument("--reset-data", action="store_true",
+                            help="Allow emptying the order tables of the configured database to build datasets")
+        parser.add_argument("--orders-per-customer", type=int, default=20, help="Synthetic data shape")
+        parser.add_argument("--endpoints", default=",".join(ENDPOINT_ORDER))
+        parser.add_argument("--rate", action="append", default=[],
+                            help="Requests/s offered, e.g. 50, or per endpoint: create=20 (repeatable)")
+        parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds per endpoint")
+        parser.add_argument("--warmup", type=float, default=5.0, help="Seconds of load before measuring")
+        parser.add_argument("--arrivals", choices=["poisson", "uniform"], default="poisson")
+        parser.add_argument("--max-in-flight", type=int, default=512, help="Client connection limit")
+        parser.add_argument("--timeout", type=float, default=30.0)
+        parser.add_argument("--seed", type=int, default=0, help="Seeds data, targets and arrivals")
+        parser.add_argument("--url", help="Benchmark this running service instead of starting one "
+                                          "(stand-in options are then ignored)")
+        parser.add_argument("--server", choices=["wsgi", "asgi"], default="wsgi",
+                            help="Server to start, and which view variant to hit")
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--port", type=int, default=8210)
+        parser.add_argument("--standin-port-base", type=int, default=8220)
+        parser.add_argument("--latency", type=float, default=0.05, help="Stand-in latency (s)")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Stand-in error rate")
+        parser.add_argument("--slow-rate", type=float, default=0.0)
+        parser.add_argument("--slow-latency", type=float, default=2.0)
+        parser.add_argument("--output", default="bench_results.json")
+        parser.add_argument("--compare", help="Earlier --output file to compare against")
+        parser.add_argument("--tolerance", type=float, default=0.10,
+                            help="Relative latency/throughput change counted as a regression")
+
+    def handle(self, *args, **opts):
+        datasets = _parse_datasets(opts["datasets"])
+        if datasets != [("current", None)] and not opts["reset_data"]:
+            raise CommandError("Building datasets empties the order tables: pass --reset-data to confirm.")
+        endpoints = [e.strip() for e in opts["endpoints"].split(",") if e.strip()]
+        unknown = set(endpoints) - set(ENDPOINT_ORDER)
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+        endpoints = [e for e in ENDPOINT_ORDER if e in endpoints]
+        rates = _parse_rates(opts["rate"], endpoints)
+        baseline = _load(opts["compare"]) if opts["compare"] else None
+
+        report = {"meta": _meta(opts, rates), "results": []}
+        standins = None if opts["url"] else self._start_standins(opts)
+        try:
+            for index, (label, size) in enumerate(datasets):
+                orders = Order.objects.count() if label == "current" else self._build(label, size, opts, index == 0)
+                targets = _sample_targets(opts["seed"])
+                server = None if opts["url"] else self._start_server(opts)
+                try:
+                    url = opts["url"] or f"http://127.0.0.1:{opts['port']}"
+                    for endpoint in endpoints:
+                        result = asyncio.run(self._measure(url, endpoint, rates[endpoint], targets, opts))
+                        result.update(dataset=label, orders=orders)
+                        report["results"].append(result)
+                        self._print(result)
+                finally:
+                    if server is not None:
+                        _stop(server)
+        finally:
+            if standins is not None:
+                _stop(standins)
+
+        with open(opts["output"], "w") as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"[Bench] Wrote {len(report['results'])} results to {opts['output']}"))
+        if baseline is not None:
+            self._compare(baseline, report, opts["tolerance"])
+
+    # -------------------- DATA --------------------
+    def _build(self, label, size, opts, fresh):
+        """Grow the data to `size` orders: the seed CSVs first (fresh), then synthetic orders on top."""
+        current = Order.objects.count()
+        if fresh:
+            self.stdout.write(f"[Bench] Loading seed data for dataset {label}")
+            call_command("import_orders", orders=[SEED_ORDERS], items=[SEED_ITEMS], truncate=True,
+                         stdout=self.stdout)
+            current = Order.objects.count()
+        if size is not None and size > current:
+            extra = size - current
+            self.stdout.write(f"[Bench] Generating {extra} synthetic orders for dataset {label}")
+            call_command("generate_orders", orders=extra, seed=opts["seed"],
+                         customers=max(1, extra // opts["orders_per_customer"]), stdout=self.stdout)
+            current = Order.objects.count()
+        elif size is not None and size < current:
+            self.stdout.write(self.style.WARNING(
+                f"[Bench] Dataset {label} asks for {size} orders but {current} exist; using them all"
+            ))
+        return current
+
+    # -------------------- PROCESSES --------------------
+    def _start_standins(self, opts):
+        process = _spawn(
+            [sys.executable, "-m", "ordersapp.standins", "--port-base", str(opts["standin_port_base"]),
+             "--latency", str(opts["latency"]), "--error-rate", str(opts["error_rate"]),
+             "--slow-rate", str(opts["slow_rate"]), "--slow-latency", str(opts["slow_latency"])],
+            os.environ.copy(), "standins"
+        )
+        for offset in range(4):
+            _wait_for_port(opts["standin_port_base"] + offset, process)
+        return process
+
+    def _start_server(self, opts):
+        base = f"http://127.0.0.1:{opts['standin_port_base']}"
+        urls = {name: f"http://127.0.0.1:{opts['standin_port_base'] + offset}/v1/{path}"
+                for offset, (name, path) in enumerate([("INVENTORY", "inventory"), ("PAYMENT", "payments"),
+                                                       ("SHIPPING", "shipping"), ("NOTIFICATION", "notifications")])}
+        env = dict(
+            os.environ, DEBUG="False", USE_MOCK_INVENTORY="False", USE_MOCK_PAYMENT="False",
+            USE_MOCK_SHIPPING="False", PROMETHEUS_MULTIPROC_DIR=tempfile.mkdtemp(prefix="bench-metrics-"),
+            **{f"{name}_SERVICE_URL": url for name, url in urls.items()},
+        )
+        command = [sys.executable, "-m", "gunicorn", f"OrderService.{opts['server']}:application",
+                   "--bind", f"127.0.0.1:{opts['port']}", "--workers", str(opts["workers"])]
+        if opts["server"] == "asgi":
+            command += ["-k", "uvicorn.workers.UvicornWorker"]
+        process = _spawn(command, env, "server")
+        process.metrics_dir = env["PROMETHEUS_MULTIPROC_DIR"]
+        self.stdout.write(f"[Bench] Started {opts['server']} server ({opts['workers']} workers), stand-ins at {base}")
+        _wait_for_url(f"http://127.0.0.1:{opts['port']}/health/", process)
+        return process
+
+    # -------------------- LOAD --------------------
+    async def _measure(self, url, endpoint, rate, targets, opts):
+        """Open loop: requests go out on the arrival schedule whether or not earlier ones finished."""
+        path = ENDPOINTS[(opts["server"], endpoint)]
+        rng = random.Random(f"{opts['seed']}-{endpoint}")
+        limits = httpx.Limits(max_connections=opts["max_in_flight"], max_keepalive_connections=opts["max_in_flight"])
+        latencies, statuses, finished = [], {}, []
+        loop = asyncio.get_running_loop()
+
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=opts["timeout"]) as client:
+            before = await _scrape(client)
+
+            async def send(i, scheduled, measured):
+                order_id, customer_id = targets[i % len(targets)]
+                request_path = path.format(order_id=order_id, customer_id=customer_id)
+                try:
+                    if endpoint == "create":
+                        response = await client.post(request_path, json=create_payload(i, customer_id))
+                    else:
+                        response = await client.get(request_path)
+                    code = response.status_code
+                except httpx.HTTPError as e:
+                    code = type(e).__name__
+                done = loop.time()
+                if measured:
+                    # From the scheduled send time: a backed-up client or server shows up as latency
+                    latencies.append(done - scheduled)
+                    statuses[code] = statuses.get(code, 0) + 1
+                    finished.append(done)
+
+            tasks, offset, i = [], 0.0, 0
+            start = loop.time() + 0.1
+            total = opts["warmup"] + opts["duration"]
+            while offset < total:
+                delay = start + offset - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.ensure_future(send(i, start + offset, offset >= opts["warmup"])))
+                i += 1
+                offset += rng.expovariate(rate) if opts["arrivals"] == "poisson" else 1 / rate
+            await asyncio.gather(*tasks)
+            after = await _scrape(client)
+
+        measured_since = start + opts["warmup"]
+        elapsed = max(opts["duration"], max(finished, default=measured_since) - measured_since)
+        ok = sum(count for code, count in statuses.items() if isinstance(code, int) and code < 400)
+        queries, db_seconds, requests = _db_usage(before, after)
+        latencies.sort()
+        return {
+            "endpoint": endpoint,
+            "server": opts["server"],
+            "offered_rps": rate,
+            "requests": len(latencies),
+            "ok": ok,
+            "error_rate": round(1 - ok / len(latencies), 4) if latencies else None,
+            "achieved_rps": round(ok / elapsed, 2) if elapsed > 0 else None,
+            "latency_ms": {
+                **{name: round(_percentile(latencies, p) * 1000, 2) for name, p in PERCENTILES.items()},
+                "max": round(latencies[-1] * 1000, 2) if latencies else None,
+                "mean": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else None,
+            },
+            "queries_per_request": round(queries / requests, 2) if requests else None,
+            "db_ms_per_request": round(db_seconds / requests * 1000, 3) if requests else None,
+            "statuses": {str(code): count for code, count in sorted(statuses.items(), key=str)},
+        }
+
+    # -------------------- REPORT --------------------
+    def _print(self, r):
+        latency = r["latency_ms"]
+        self.stdout.write(
+            f"[Bench] {r['dataset']:>8} {r['endpoint']:<8} offered {r['offered_rps']:g}/s -> "
+            f"{r['achieved_rps']}/s ok, p50 {latency['p50']} ms, p95 {latency['p95']} ms, "
+            f"p99 {latency['p99']} ms, errors {r['error_rate']}, queries/request {r['queries_per_request']}"
+        )
+
+    def _compare(self, baseline, report, tolerance):
+        """Print changes against the baseline; raise if anything regressed beyond the tolerance."""
+        previous = {(r["dataset"], r["endpoint"]): r for r in baseline["results"]}
+        regressions = []
+        for r in report["results"]:
+            old = previous.get((r["dataset"], r["endpoint"]))
+            if old is None:
+                continue
+            checks = [(f"latency {name}", old["latency_ms"][name], r["latency_ms"][name], 1 + tolerance)
+                      for name in PERCENTILES]
+            checks.append(("throughput", old["achieved_rps"], r["achieved_rps"], 1 - tolerance))
+            for name, was, now, limit in checks:
+                if was and now is not None and (now > was * limit if limit > 1 else now < was * limit):
+                    regressions.append(f"{r['dataset']} {r['endpoint']}: {name} {was} -> {now}")
+            if (r["queries_per_request"] or 0) > (old["queries_per_request"] or 0) + 0.5:
+                regressions.append(f"{r['dataset']} {r['endpoint']}: queries/request "
+                                   f"{old['queries_per_request']} -> {r['queries_per_request']}")
+            if (r["error_rate"] or 0) > (old["error_rate"] or 0) + 0.01:
+                regressions.append(f"{r['dataset']} {r['endpoint']}: error rate {old['error_rate']} -> {r['error_rate']}")
+        for line in regressions:
+            self.stdout.write(self.style.WARNING(f"[Bench] Regression: {line}"))
+        if regressions:
+            raise CommandError(f"{len(regressions)} regression(s) against the baseline")
+        self.stdout.write(self.style.SUCCESS("[Bench] No regressions against the baseline"))
+
+
+def _parse_datasets(value):
+    """[(label, order count or None)]; None for current and seed."""
+    datasets = []
+    for label in (part.strip().lower() for part in value.split(",") if part.strip()):
+        if label in ("current", "seed"):
+            datasets.append((label, None))
+            continue
+        multiplier = {"k": 1_000, "m": 1_000_000}.get(label[-1], 1)
+        try:
+            datasets.append((label, int(float(label.rstrip("km")) * multiplier)))
+        except ValueError:
+            raise CommandError(f"Bad dataset size {label!r}")
+    if ("current", None) in datasets and len(datasets) > 1:
+        raise CommandError("current can't be combined with other datasets.")
+    sizes = [size for _, size in datasets if size is not None]
+    if sizes != sorted(sizes) or ("seed", None) in datasets[1:]:
+        raise CommandError("Datasets must be in ascending order (seed first).")
+    return datasets
+
+
+def _parse_rates(values, endpoints):
+    rates = dict.fromkeys(endpoints, 20.0)
+    for value in values:
+        name, _, rate = value.rpartition("=")
+        try:
+            rate = float(rate)
+        except ValueError:
+            raise CommandError(f"Bad --rate {value!r}")
+        if rate <= 0:
+            raise CommandError("--rate must be positive.")
+        for endpoint in ([name] if name else endpoints):
+            rates[endpoint] = rate
+    return rates
+
+
+def _sample_targets(seed):
+    """Existing (order_id, customer_id) pairs to request, the same ones for the same data and seed."""
+    bounds = Order.objects.aggregate(low=Min("order_id"), high=Max("order_id"))
+    if bounds["low"] is None:
+        raise CommandError("No orders to benchmark against: load data or use --datasets seed --reset-data.")
+    rng = random.Random(seed)
+    ids = {rng.randint(bounds["low"], bounds["high"]) for _ in range(TARGET_SAMPLE)}
+    targets = sorted(Order.objects.filter(order_id__in=ids).values_list("order_id", "customer_id"))
+    rng.shuffle(targets)
+    return targets or [(bounds["low"], Order.objects.get(order_id=bounds["low"]).customer_id)]
+
+
+async def _scrape(client):
+    try:
+        response = await client.get("/metrics")
+        return response.text if response.status_code == 200 else ""
+    except httpx.HTTPError:
+        return ""
+
+
+def _db_usage(before, after):
+    """(queries, seconds, requests) between two /metrics scrapes, all views except /metrics itself."""
+    def totals(text):
+        sums = {}
+        for family in text_string_to_metric_families(text):
+            if family.name not in ("order_service_db_queries_per_request", "order_service_db_time_per_request_seconds"):
+                continue
+            for sample in family.samples:
+                if sample.labels.get("view") != METRICS_VIEW and sample.name.endswith(("_sum", "_count")):
+                    key = (family.name, sample.name.rsplit("_", 1)[1])
+                    sums[key] = sums.get(key, 0) + sample.value
+        return sums
+
+    start, end = totals(before), totals(after)
+    delta = lambda family, kind: end.get((family, kind), 0) - start.get((family, kind), 0)
+    return (delta("order_service_db_queries_per_request", "sum"),
+            delta("order_service_db_time_per_request_seconds", "sum"),
+            delta("order_service_db_queries_per_request", "count"))
+
+
+def _percentile(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p))] if samples else 0.0
+
+
+def _meta(opts, rates):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=settings.BASE_DIR, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "host": {"cpus": os.cpu_count(), "python": platform.python_version(), "platform": platform.platform()},
+        "rates": rates,
+        "options": {name: opts[name] for name in (
+            "datasets", "duration", "warmup", "arrivals", "seed", "server", "workers", "url",
+            "latency", "error_rate", "slow_rate", "slow_latency", "max_in_flight",
+        )},
+    }
+
+
+def _load(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise CommandError(f"Can't read baseline {path}: {e}")
+
+
+def _spawn(command, env, name):
+    log = tempfile.NamedTemporaryFile(prefix=f"bench-{name}-", suffix=".log", delete=False)
+    process = subprocess.Popen(command, cwd=settings.BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    process.log_path = log.name
+    return process
+
+
+def _stop(process, keep_log=False):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    metrics_dir = getattr(process, "metrics_dir", None)
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+    if not keep_log:
+        os.unlink(process.log_path)
+
+
+def _fail(process, message):
+    _stop(process, keep_log=True)
+    raise CommandError(f"{message}; see {process.log_path}")
+
+
+def _wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            _fail(process, "Process exited early")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    _fail(process, f"Nothing listening on port {port} after {timeout}s")
+
+
+def _wait_for_url(url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            _fail(process, "Server exited early")
+        try:
+            if httpx.get(url, timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    _fail(process, f"{url} not healthy after {timeout}s")
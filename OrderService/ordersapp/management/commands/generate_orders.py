@@ -0,0 +1,61 @@
+import csv
+import gzip
+import os
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from ordersapp.db import bulk_import
+from ordersapp.db.synthetic import SyntheticSpec, generate_chunk
+from ordersapp.management.commands.import_orders import add_load_arguments, run_load
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic orders for load testing: --orders orders for --customers customers over the "
+        "last --months months, with 1..--max-items items each. Loads them in parallel like import_orders, "
+        "or writes import_orders-ready orders.csv.gz / order_items.csv.gz to --output-dir. "
+        "Order ids continue from the current maximum; the same --seed gives the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customers", type=int, required=True)
+        parser.add_argument("--orders", type=int, required=True)
+        parser.add_argument("--months", type=int, default=24, help="Spread orders over this many months back")
+        parser.add_argument("--max-items", type=int, default=5)
+        parser.add_argument("--products", type=int, default=500, help="Catalogue size (SKU0001..)")
+        parser.add_argument("--first-customer-id", type=int, default=1)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output-dir", help="Write CSV files here instead of loading the database")
+        add_load_arguments(parser)
+
+    def handle(self, *args, **opts):
+        if min(opts["customers"], opts["orders"], opts["months"], opts["max_items"], opts["products"]) < 1:
+            raise CommandError("--customers, --orders, --months, --max-items and --products must be positive.")
+        first_order_id = 1 if opts["truncate"] and not opts["output_dir"] else bulk_import.next_order_id()
+        spec = SyntheticSpec(
+            customers=opts["customers"], orders=opts["orders"], first_order_id=first_order_id,
+            end=timezone.now(), first_customer_id=opts["first_customer_id"], months=opts["months"],
+            max_items=opts["max_items"], products=opts["products"], seed=opts["seed"],
+        )
+        if opts["output_dir"]:
+            self._write_files(spec, opts)
+        else:
+            run_load(self, opts, lambda loader: loader.load_synthetic(spec))
+
+    def _write_files(self, spec, opts):
+        os.makedirs(opts["output_dir"], exist_ok=True)
+        orders_path = os.path.join(opts["output_dir"], "orders.csv.gz")
+        items_path = os.path.join(opts["output_dir"], "order_items.csv.gz")
+        next_item_id = bulk_import.next_item_id()
+        with gzip.open(orders_path, "wt", newline="") as orders_file, gzip.open(items_path, "wt", newline="") as items_file:
+            orders_out, items_out = csv.writer(orders_file), csv.writer(items_file)
+            orders_out.writerow(bulk_import.ORDER_COLUMNS)
+            items_out.writerow(bulk_import.ITEM_COLUMNS)
+            for chunk in spec.chunks(opts["chunk_size"]):
+                orders, items = generate_chunk(spec, *chunk)
+                orders_out.writerows(orders)
+                # (order_id, product_id, sku, quantity, unit_price, order_created_at) -> ITEM_COLUMNS
+                items_out.writerows((next_item_id + n, *item[:5]) for n, item in enumerate(items))
+                next_item_id += len(items)
+        self.stdout.write(self.style.SUCCESS(
+            f"[Synthetic] Wrote {spec.orders} orders to {orders_path} and their items to {items_path}"
+        ))
@@ -0,0 +1,62 @@
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from ordersapp.db.bulk_import import BulkImportError, BulkLoader
+from ordersapp.Services import customer_summary
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-load orders and order items from CSV / NDJSON (optionally .gz) or Parquet files, "
+        "streamed in chunks and COPYed over parallel connections. Rows are validated with the API "
+        "serializer rules; rejected rows are counted and can be written to --rejects. Files carry the "
+        "seed CSV columns (order_id, customer_id, order_status, payment_status, order_total, created_at / "
+        "order_item_id, order_id, product_id, sku, quantity, unit_price). Appends unless --truncate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", action="append", default=[], help="Orders file (repeatable)")
+        parser.add_argument("--items", action="append", default=[], help="Order items file (repeatable)")
+        add_load_arguments(parser)
+        parser.add_argument("--rejects", help="Write rejected rows to this CSV file")
+
+    def handle(self, *args, **opts):
+        if not opts["orders"] and not opts["items"]:
+            raise CommandError("Nothing to import: pass --orders and/or --items.")
+        for path in opts["orders"] + opts["items"]:
+            if not os.path.exists(path):
+                raise CommandError(f"No such file: {path}")
+        run_load(self, opts, lambda loader: (loader.load_orders(opts["orders"]), loader.load_items(opts["items"])))
+
+
+def add_load_arguments(parser):
+    parser.add_argument("--workers", type=int, default=min(8, os.cpu_count() or 1),
+                        help="Parallel loader processes / connections")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows per COPY")
+    parser.add_argument("--truncate", action="store_true", help="Empty the order tables first")
+    parser.add_argument("--keep-indexes", action="store_true",
+                        help="Maintain indexes during the load (e.g. appending to a live database)")
+    parser.add_argument("--skip-summaries", action="store_true",
+                        help="Don't rebuild the customer order summaries afterwards")
+
+
+def run_load(command, opts, load):
+    """Run load(loader) inside a BulkLoader set up from the shared options, then report."""
+    started = time.perf_counter()
+    try:
+        with BulkLoader(opts["workers"], opts["chunk_size"], not opts["keep_indexes"], opts.get("rejects")) as loader:
+            if opts["truncate"]:
+                loader.truncate()
+            load(loader)
+    except BulkImportError as e:
+        raise CommandError(str(e))
+    elapsed = time.perf_counter() - started
+    rows = loader.loaded["orders"] + loader.loaded["items"]
+    command.stdout.write(command.style.SUCCESS(
+        f"[BulkImport] Loaded {loader.loaded['orders']} orders and {loader.loaded['items']} items "
+        f"in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)"
+    ))
+    for (kind, reason), count in loader.rejected.most_common():
+        command.stdout.write(command.style.WARNING(f"[BulkImport] Rejected {count} {kind}: {reason}"))
+    if not opts["skip_summaries"]:
+        command.stdout.write(f"[CustomerSummary] Rebuilt {customer_summary.rebuild()} customer summaries.")
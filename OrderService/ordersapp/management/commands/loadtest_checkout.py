@@ -0,0 +1,90 @@
+import asyncio
+import statistics
+import time
+import httpx
+from django.core.management.base import BaseCommand
+
+ENDPOINTS = {
+    ("wsgi", "create"): "/v1/orders/create/",
+    ("asgi", "create"): "/v1/async/orders/create/",
+    ("wsgi", "details"): "/v1/orders/{order_id}/details/",
+    ("asgi", "details"): "/v1/async/orders/{order_id}/details/",
+    ("wsgi", "history"): "/v1/orders/my-orders/{customer_id}/",
+    ("asgi", "history"): "/v1/async/orders/my-orders/{customer_id}/",
+    # No async variant: the list view is served by the sync viewset on either server
+    ("wsgi", "list"): "/v1/orders/?customer_id={customer_id}",
+    ("asgi", "list"): "/v1/orders/?customer_id={customer_id}",
+}
+
+
+def create_payload(i, customer_id):
+    """Body of the i-th create request: one item from a 50-product catalogue."""
+    return {
+        "customer_id": customer_id,
+        "items": [{"product_id": 1 + i % 50, "sku": f"SKU{i % 50:04d}",
+                   "quantity": 1 + i % 3, "unit_price": "19.99"}],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Closed-loop load test of a running Order Service: N concurrent clients hitting the "
+        "sync (WSGI) or async (ASGI) create/details/history/list endpoint. Reports throughput and latency. "
+        "For open-loop runs over several dataset sizes with machine-readable output, use bench_suite."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the running service")
+        parser.add_argument("--path", choices=["wsgi", "asgi"], default="asgi", help="Which view variant to hit")
+        parser.add_argument("--endpoint", choices=["create", "details", "history", "list"], default="create")
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=200)
+        parser.add_argument("--customers", type=int, default=1000)
+        parser.add_argument("--order-id", type=int, default=1, help="Order id for the details endpoint")
+        parser.add_argument("--timeout", type=float, default=30.0)
+
+    def handle(self, *args, **opts):
+        path = ENDPOINTS[(opts["path"], opts["endpoint"])]
+        latencies, statuses, elapsed = asyncio.run(self._run(path, opts))
+
+        ok = sum(count for code, count in statuses.items() if isinstance(code, int) and code < 400)
+        latencies.sort()
+        pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+        self.stdout.write(
+            f"{opts['path']} {opts['endpoint']}: {len(latencies)} requests, concurrency {opts['concurrency']}, "
+            f"{elapsed:.2f}s -> {len(latencies) / elapsed:,.1f} req/s"
+        )
+        self.stdout.write(
+            f"latency ms: p50={pct(0.5):.1f} p95={pct(0.95):.1f} p99={pct(0.99):.1f} "
+            f"mean={statistics.mean(latencies) * 1000:.1f}"
+        )
+        self.stdout.write(f"ok={ok} statuses={dict(statuses)}")
+
+    async def _run(self, path, opts):
+        limits = httpx.Limits(max_connections=opts["concurrency"], max_keepalive_connections=opts["concurrency"])
+        queue = asyncio.Queue()
+        for i in range(opts["requests"]):
+            queue.put_nowait(i)
+        latencies, statuses = [], {}
+
+        async with httpx.AsyncClient(base_url=opts["url"], limits=limits, timeout=opts["timeout"]) as client:
+            async def worker():
+                while not queue.empty():
+                    i = queue.get_nowait()
+                    customer_id = 1 + i % opts["customers"]
+                    url = path.format(order_id=opts["order_id"], customer_id=customer_id)
+                    start = time.perf_counter()
+                    try:
+                        if opts["endpoint"] == "create":
+                            response = await client.post(url, json=create_payload(i, customer_id))
+                        else:
+                            response = await client.get(url)
+                        code = response.status_code
+                    except httpx.HTTPError as e:
+                        code = type(e).__name__
+                    latencies.append(time.perf_counter() - start)
+                    statuses[code] = statuses.get(code, 0) + 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(opts["concurrency"])))
+            return latencies, statuses, time.perf_counter() - started
@@ -0,0 +1,50 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError
+from ordersapp.db import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Maintain the monthly partitions of ordersapp_order / ordersapp_orderitem (run daily, e.g. from cron). "
+        "Creates partitions for the coming months and for any month with rows left in the DEFAULT partition. "
+        "With --retain-months, months older than that whose orders are all delivered or cancelled "
+        "are written to gzipped CSV in --archive-dir, then detached and dropped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ahead", type=int, default=3, help="Months ahead of the current one to create")
+        parser.add_argument("--retain-months", type=int, help="Archive months that ended more than this many months ago")
+        parser.add_argument("--archive-dir", default="./archive", help="Where archived months are written")
+        parser.add_argument("--lock-timeout-ms", type=int, default=5000,
+                            help="Give up detaching a month if the tables stay busy this long")
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be done")
+
+    def handle(self, *args, **opts):
+        to_create = sorted(set(partitions.missing_months(opts["ahead"])) | set(partitions.months_in_default()))
+        for month in to_create:
+            if opts["dry_run"]:
+                self.stdout.write(f"[Partitions] Would create {month:%Y-%m}")
+                continue
+            partitions.create_month(month)
+            self.stdout.write(f"[Partitions] Created {month:%Y-%m}")
+
+        if opts["retain_months"] is None:
+            return
+        if opts["retain_months"] < 1:
+            raise CommandError("--retain-months must be at least 1.")
+        os.makedirs(opts["archive_dir"], exist_ok=True)
+        for month in partitions.cold_months(opts["retain_months"]):
+            if opts["dry_run"]:
+                self.stdout.write(f"[Partitions] Would archive {month:%Y-%m}")
+                continue
+            try:
+                archived = partitions.archive_month(month, opts["archive_dir"], opts["lock_timeout_ms"])
+            except partitions.PartitionNotColdError as e:
+                self.stdout.write(self.style.WARNING(f"[Partitions] Skipped {month:%Y-%m}: {e}"))
+                continue
+            except OperationalError as e:
+                self.stdout.write(self.style.WARNING(f"[Partitions] Skipped {month:%Y-%m}, retry later: {e}"))
+                continue
+            files = ", ".join(f"{path} ({rows} rows)" for path, rows in archived)
+            self.stdout.write(self.style.SUCCESS(f"[Partitions] Archived {month:%Y-%m}: {files}"))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from ordersapp.Services import idempotency
+
+
+class Command(BaseCommand):
+    help = "Delete stored Idempotency-Key responses older than IDEMPOTENCY_KEY_TTL (run periodically, e.g. from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **opts):
+        deleted = idempotency.purge_expired(opts["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"[Idempotency] Purged {deleted} expired keys."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from ordersapp.Services import customer_summary
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the materialized customer order summaries from the orders table "
+        "(all customers, or only those passed with --customer)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customer", type=int, action="append", dest="customers",
+                            help="Customer id to rebuild (repeatable)")
+
+    def handle(self, *args, **opts):
+        rebuilt = customer_summary.rebuild(opts["customers"])
+        self.stdout.write(self.style.SUCCESS(f"[CustomerSummary] Rebuilt {rebuilt} customer summaries."))
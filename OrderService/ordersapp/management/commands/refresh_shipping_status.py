@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from ordersapp.Services import shipping_sync
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-fetch stored shipping statuses that are still in flight and older than SHIPPING_STATUS_TTL "
+        "(run periodically, e.g. from cron, when SHIPPING_STATUS_FETCH_ON_READ is off)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Orders per shipping service request")
+        parser.add_argument("--limit", type=int, default=None, help="Stop after this many orders")
+
+    def handle(self, *args, **opts):
+        refreshed = shipping_sync.refresh_stale(opts["batch_size"], opts["limit"])
+        self.stdout.write(self.style.SUCCESS(f"[ShippingStatus] Refreshed {refreshed} orders."))
@@ -0,0 +1,105 @@
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import BigIntegerField, F
+from django.db.models.functions import Cast
+from ordersapp.models import Order, OrderItem
+from ordersapp.Services import customer_summary, order_cache
+from ordersapp.Services.pricing import PricingEngine, from_cents
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute stored order_total (items + tax + shipping) for every order in chunks, "
+        "using the vectorised pricing engine. Orders without items are left untouched. "
+        "Customer summaries' lifetime_spend is adjusted in the same transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=20000)
+        parser.add_argument("--start-after", type=int, default=0, help="Resume after this order_id")
+        parser.add_argument("--dry-run", action="store_true", help="Report differences without writing")
+
+    def handle(self, *args, **opts):
+        last_id, scanned, changed = opts["start_after"], 0, 0
+        started = time.perf_counter()
+
+        while True:
+            chunk = list(
+                Order.objects.filter(order_id__gt=last_id)
+                .order_by("order_id")
+                .annotate(total_cents=Cast(F("order_total") * 100, BigIntegerField()))
+                .values_list("order_id", "total_cents")[:opts["chunk_size"]]
+            )
+            if not chunk:
+                break
+            order_ids = np.fromiter((c[0] for c in chunk), dtype=np.int64, count=len(chunk))
+            stored = np.fromiter((c[1] for c in chunk), dtype=np.int64, count=len(chunk))
+            last_id = int(order_ids[-1])
+
+            ids_to_update, totals = self._reprice_chunk(order_ids, stored)
+            if len(ids_to_update) and not opts["dry_run"]:
+                self._write(ids_to_update, totals)
+
+            scanned += len(chunk)
+            changed += len(ids_to_update)
+            rate = scanned / (time.perf_counter() - started)
+            self.stdout.write(
+                f"[Reprice] up to order {last_id}: scanned={scanned} changed={changed} ({rate:,.0f} orders/s)"
+            )
+
+        verb = "would change" if opts["dry_run"] else "changed"
+        self.stdout.write(self.style.SUCCESS(f"[Reprice] Done: {scanned} orders scanned, {changed} {verb}."))
+
+    @staticmethod
+    def _reprice_chunk(order_ids, stored):
+        """Return (order_ids, totals_in_cents) for orders whose stored total differs."""
+        items = list(
+            OrderItem.objects.filter(order_id__gte=order_ids[0], order_id__lte=order_ids[-1])
+            .annotate(unit_cents=Cast(F("unit_price") * 100, BigIntegerField()))
+            .values_list("order_id", "quantity", "unit_cents")
+        )
+        if not items:
+            return order_ids[:0], stored[:0]
+        columns = np.array(items, dtype=np.int64)
+        order_index = np.searchsorted(order_ids, columns[:, 0])
+
+        *_, total = PricingEngine.price_columns(order_index, columns[:, 1], columns[:, 2], len(order_ids))
+        has_items = np.bincount(order_index, minlength=len(order_ids)) > 0
+        differs = has_items & (total != stored)
+        return order_ids[differs], total[differs]
+
+    @staticmethod
+    def _write(order_ids, totals):
+        new_totals = dict(zip(order_ids.tolist(), totals.tolist()))
+        with transaction.atomic():
+            # Lock the rows first so the summary deltas are taken from the totals being overwritten
+            orders = list(
+                Order.objects.select_for_update()
+                .filter(order_id__in=new_totals)
+                .only("order_id", "customer_id", "payment_status", "order_total")
+            )
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        UPDATE ordersapp_order AS o
+                        SET order_total = v.cents / 100.0
+                        FROM unnest(%s::bigint[], %s::bigint[]) AS v(order_id, cents)
+                        WHERE o.order_id = v.order_id
+                        """,
+                        [order_ids.tolist(), totals.tolist()],
+                    )
+            else:
+                Order.objects.bulk_update(
+                    [Order(order_id=int(oid), order_total=from_cents(c)) for oid, c in zip(order_ids, totals)],
+                    ["order_total"], batch_size=1000,
+                )
+
+            changes = []
+            for order in orders:
+                old_total, order.order_total = order.order_total, from_cents(new_totals[order.order_id])
+                changes.append((order, old_total))
+            customer_summary.record_repriced(changes)
+            order_cache.invalidate(*new_totals)
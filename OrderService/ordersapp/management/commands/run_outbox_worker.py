@@ -0,0 +1,32 @@
+import time
+from django.core.management.base import BaseCommand
+from ordersapp.Services import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Drain the order outbox (shipment creation, notifications, bulk-cancellation releases and refunds) "
+        "with retries and backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=outbox.BATCH_SIZE)
+        parser.add_argument("--interval", type=float, default=1.0, help="Idle sleep between polls (s)")
+        parser.add_argument("--once", action="store_true", help="Drain what is due now, then exit")
+
+    def handle(self, *args, **opts):
+        self.stdout.write(f"[OutboxWorker] Started (batch size {opts['batch_size']})")
+        try:
+            while True:
+                delivered, retried, failed = outbox.process_batch(opts["batch_size"])
+                if delivered or retried or failed:
+                    self.stdout.write(
+                        f"[OutboxWorker] delivered={delivered} retried={retried} failed={failed}"
+                    )
+                    continue
+                if opts["once"]:
+                    break
+                time.sleep(opts["interval"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write("[OutboxWorker] Stopped")
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:02
+
+import logging
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.models.functions import Upper
+
+logger = logging.getLogger(__name__)
+
+SKU_TRGM_INDEX = "orderitem_sku_upper_trgm_idx"
+
+
+def create_sku_trigram_index(apps, schema_editor):
+    """
+    GIN trigram index on UPPER(sku), matching the SQL Django emits for sku__icontains.
+    Skipped when pg_trgm is not available on the server.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            logger.warning("pg_trgm not available; skipping %s", SKU_TRGM_INDEX)
+            return
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {SKU_TRGM_INDEX} "
+            "ON ordersapp_orderitem USING gin (UPPER(sku::text) gin_trgm_ops)"
+        )
+
+
+def drop_sku_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {SKU_TRGM_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built CONCURRENTLY so the tables stay writable during the migration
+    atomic = False
+
+    dependencies = [
+        ('ordersapp', '0003_outboxevent'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(fields=['customer_id', '-created_at', '-order_id'], name='order_customer_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(condition=models.Q(('order_status__in', ['PENDING', 'CONFIRMED'])), fields=['customer_id', '-created_at'], name='order_open_customer_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(condition=models.Q(('order_status__in', ['PENDING', 'CONFIRMED'])), fields=['order_status', 'created_at'], name='order_open_status_idx'),
+        ),
+        # Declared in the migration state (OrderItem.Meta.indexes) so later schema changes know about
+        # it; built in Python because CREATE INDEX CONCURRENTLY can't run inside a guarding DO block
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='orderitem',
+                    index=GinIndex(OpClass(Upper('sku'), name='gin_trgm_ops'), name=SKU_TRGM_INDEX),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_sku_trigram_index, drop_sku_trigram_index),
+            ],
+        ),
+    ]
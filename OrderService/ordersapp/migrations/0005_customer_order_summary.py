@@ -0,0 +1,58 @@
+# Generated by Django 4.2.30 on 2026-10-18 00:44
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.utils.timezone
+
+
+# One-off backfill from existing orders; afterwards the order write paths keep it current.
+BACKFILL_SQL = """
+    INSERT INTO ordersapp_customerordersummary (
+        customer_id, order_count, lifetime_spend, last_order_at, updated_at,
+        pending_count, confirmed_count, shipped_count, cancelled_count, delivered_count
+    )
+    SELECT customer_id, COUNT(*),
+           COALESCE(SUM(CASE WHEN payment_status = 'PAID' THEN order_total ELSE 0 END), 0),
+           MAX(created_at), CURRENT_TIMESTAMP,
+           SUM(CASE WHEN order_status = 'PENDING' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN order_status = 'CONFIRMED' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN order_status = 'SHIPPED' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN order_status = 'CANCELLED' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN order_status = 'DELIVERED' THEN 1 ELSE 0 END)
+    FROM ordersapp_order
+    GROUP BY customer_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ordersapp', '0004_order_history_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerOrderSummary',
+            fields=[
+                ('customer_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('order_count', models.IntegerField(default=0)),
+                ('lifetime_spend', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('last_order_at', models.DateTimeField(blank=True, null=True)),
+                ('pending_count', models.IntegerField(default=0)),
+                ('confirmed_count', models.IntegerField(default=0)),
+                ('shipped_count', models.IntegerField(default=0)),
+                ('cancelled_count', models.IntegerField(default=0)),
+                ('delivered_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'ordersapp_customerordersummary',
+            },
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='order_status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('CONFIRMED', 'Confirmed'), ('SHIPPED', 'Shipped'), ('CANCELLED', 'Cancelled'), ('DELIVERED', 'Delivered')], default='PENDING', max_length=20),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
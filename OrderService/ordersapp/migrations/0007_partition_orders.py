@@ -0,0 +1,176 @@
+from datetime import timezone as dt_timezone
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+# Rebuilds ordersapp_order and ordersapp_orderitem as tables range-partitioned by month on the
+# order's created_at (carried into items as order_created_at), copying every row across.
+# Both tables are rewritten in one transaction: run it in a maintenance window on large data.
+# Later months are added by `python manage.py manage_partitions` (ordersapp/db/partitions.py).
+#
+# A partitioned table's primary key must include the partition key, so the key becomes
+# (order_id, created_at) and the database no longer enforces order_id uniqueness on its own.
+# The ORM still treats order_id as the primary key: ids come only from the identity sequence,
+# and imports with their own ids check them (ordersapp/db/bulk_import.py).
+MONTHS_AHEAD = 3
+SKU_TRGM_INDEX = "orderitem_sku_upper_trgm_idx"
+
+ORDER_COLUMNS = """
+    order_id bigint NOT NULL,
+    customer_id bigint NOT NULL,
+    order_status varchar(20) NOT NULL,
+    payment_status varchar(20) NOT NULL,
+    order_total numeric(10, 2) NOT NULL,
+    created_at timestamp with time zone NOT NULL
+"""
+ITEM_COLUMNS = """
+    order_item_id bigint NOT NULL,
+    product_id bigint NOT NULL,
+    sku varchar(100) NOT NULL,
+    quantity integer NOT NULL,
+    unit_price numeric(10, 2) NOT NULL,
+    order_id bigint NOT NULL
+"""
+# Fill order_created_at from the parent order
+ITEMS_WITH_ORDER_CREATED_AT = """
+    SELECT i.order_item_id, i.product_id, i.sku, i.quantity, i.unit_price, i.order_id, o.created_at
+    FROM ordersapp_orderitem_old i JOIN ordersapp_order_old o ON o.order_id = i.order_id
+"""
+ITEMS_WITHOUT_ORDER_CREATED_AT = """
+    SELECT order_item_id, product_id, sku, quantity, unit_price, order_id FROM ordersapp_orderitem_old
+"""
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _month_start(value):
+    return value.astimezone(dt_timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _has_pg_trgm(schema_editor):
+    """Like 0004: the trigram index is only built where the pg_trgm extension can be installed."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return False
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    return True
+
+
+def _rebuild(apps, schema_editor, partitioned):
+    Order = apps.get_model("ordersapp", "Order")
+    OrderItem = apps.get_model("ordersapp", "OrderItem")
+    execute = schema_editor.execute
+    for table in ("ordersapp_orderitem", "ordersapp_order"):
+        execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+
+    if partitioned:
+        execute(f"CREATE TABLE ordersapp_order ({ORDER_COLUMNS}) PARTITION BY RANGE (created_at)")
+        execute(
+            f"CREATE TABLE ordersapp_orderitem ({ITEM_COLUMNS}, order_created_at timestamp with time zone NOT NULL) "
+            f"PARTITION BY RANGE (order_created_at)"
+        )
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT min(created_at) FROM ordersapp_order_old")
+            first = _month_start(cursor.fetchone()[0] or timezone.now())
+        months = []
+        while first <= _add_months(_month_start(timezone.now()), MONTHS_AHEAD):
+            months.append(first)
+            first = _add_months(first, 1)
+        for table in ("ordersapp_order", "ordersapp_orderitem"):
+            for month in months:
+                execute(
+                    f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)",
+                    [month, _add_months(month, 1)],
+                )
+            execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        items_from = ITEMS_WITH_ORDER_CREATED_AT
+    else:
+        execute(f"CREATE TABLE ordersapp_order ({ORDER_COLUMNS})")
+        execute(f"CREATE TABLE ordersapp_orderitem ({ITEM_COLUMNS})")
+        items_from = ITEMS_WITHOUT_ORDER_CREATED_AT
+
+    execute("INSERT INTO ordersapp_order SELECT * FROM ordersapp_order_old")
+    execute(f"INSERT INTO ordersapp_orderitem {items_from}")
+
+    # Carry the id sequences over: identity columns are re-added once the old tables are gone
+    next_ids = {}
+    with schema_editor.connection.cursor() as cursor:
+        for table, column in (("ordersapp_order", "order_id"), ("ordersapp_orderitem", "order_item_id")):
+            cursor.execute(
+                f"SELECT GREATEST((SELECT max({column}) FROM {table}_old), "
+                f"pg_sequence_last_value(pg_get_serial_sequence('{table}_old', '{column}')), 0) + 1"
+            )
+            next_ids[table, column] = cursor.fetchone()[0]
+    execute("DROP TABLE ordersapp_orderitem_old")
+    execute("DROP TABLE ordersapp_order_old")
+    for (table, column), next_id in next_ids.items():
+        execute(f"ALTER TABLE {table} ALTER COLUMN {column} ADD GENERATED BY DEFAULT AS IDENTITY (START WITH {next_id})")
+
+    # A partitioned table's primary key must include its partition key
+    order_key = "order_id, created_at" if partitioned else "order_id"
+    item_key = "order_item_id, order_created_at" if partitioned else "order_item_id"
+    execute(f"ALTER TABLE ordersapp_order ADD CONSTRAINT ordersapp_order_pkey PRIMARY KEY ({order_key})")
+    execute(f"ALTER TABLE ordersapp_orderitem ADD CONSTRAINT ordersapp_orderitem_pkey PRIMARY KEY ({item_key})")
+    execute("ALTER TABLE ordersapp_orderitem ADD CONSTRAINT ordersapp_orderitem_quantity_check CHECK (quantity >= 0)")
+    for index in Order._meta.indexes:
+        schema_editor.add_index(Order, index)
+    execute("CREATE INDEX ordersapp_orderitem_order_id_a1977ca1 ON ordersapp_orderitem (order_id)")
+    # 0004's SKU trigram index too, rebuilt here while the rewrite already holds both tables, so
+    # it never needs a separate (and non-concurrent) build on the live partitioned table
+    has_pg_trgm = _has_pg_trgm(schema_editor)
+    for index in OrderItem._meta.indexes:
+        if index.name != SKU_TRGM_INDEX or has_pg_trgm:
+            schema_editor.add_index(OrderItem, index)
+    if partitioned:
+        # Items follow their order if its created_at (and so its partition) ever changes
+        execute(
+            "ALTER TABLE ordersapp_orderitem ADD CONSTRAINT ordersapp_orderitem_order_fk "
+            "FOREIGN KEY (order_id, order_created_at) REFERENCES ordersapp_order (order_id, created_at) "
+            "ON UPDATE CASCADE DEFERRABLE INITIALLY DEFERRED"
+        )
+    else:
+        execute(
+            "ALTER TABLE ordersapp_orderitem ADD CONSTRAINT ordersapp_orderitem_order_id_a1977ca1_fk_ordersapp "
+            "FOREIGN KEY (order_id) REFERENCES ordersapp_order (order_id) DEFERRABLE INITIALLY DEFERRED"
+        )
+
+
+def partition_tables(apps, schema_editor):
+    _rebuild(apps, schema_editor, partitioned=True)
+
+
+def unpartition_tables(apps, schema_editor):
+    _rebuild(apps, schema_editor, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ordersapp', '0006_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='orderitem',
+                    name='order_created_at',
+                    field=models.DateTimeField(editable=False),
+                    preserve_default=False,
+                ),
+                migrations.AlterField(
+                    model_name='orderitem',
+                    name='order',
+                    field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE,
+                                            related_name='items', to='ordersapp.order'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(partition_tables, unpartition_tables),
+            ],
+        ),
+    ]
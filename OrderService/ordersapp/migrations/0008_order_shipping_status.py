@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ordersapp', '0007_partition_orders'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='expected_delivery',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='shipping_status',
+            field=models.CharField(blank=True, choices=[('Pending', 'Pending'), ('Shipped', 'Shipped'), ('Delivered', 'Delivered'), ('Failed', 'Failed'), ('Unknown', 'Unknown')], max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='shipping_synced_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('shipping_status__isnull', True), ('shipping_status__in', ['Pending', 'Shipped', 'Unknown']), _connector='OR'), fields=['shipping_synced_at'], name='order_shipping_unsettled_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ordersapp', '0008_order_shipping_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboxevent',
+            name='event_type',
+            field=models.CharField(choices=[('CREATE_SHIPMENT', 'Create Shipment'), ('SEND_NOTIFICATION', 'Send Notification'), ('RELEASE_INVENTORY', 'Release Inventory'), ('REFUND_PAYMENTS', 'Refund Payments')], max_length=40),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ordersapp', '0010_outbox_bulk_cancellation_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idempotencykey',
+            name='order_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
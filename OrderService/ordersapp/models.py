@@ -1,40 +1,176 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils import timezone
 from decimal import Decimal
 from .Status.order_status import OrderStatus
 from .Status.payment_status import PaymentStatus
+from .Status.shipping_status import ShippingStatus
+from .Status.outbox_status import OutboxStatus, OutboxEventType
+from .Status.idempotency_status import IdempotencyStatus
 
 
 class Order(models.Model):
     ORDER_STATUS_CHOICES = [(s.value, s.name.title()) for s in OrderStatus]
     PAYMENT_STATUS_CHOICES = [(s.value, s.name.title()) for s in PaymentStatus]
+    SHIPPING_STATUS_CHOICES = [(s.value, s.name.title()) for s in ShippingStatus]
 
+    # The table's key is (order_id, created_at) (partitioned, 0007), so the database doesn't enforce
+    # order_id uniqueness: ids come only from the identity sequence, imports check theirs
     order_id = models.BigAutoField(primary_key=True)
     customer_id = models.BigIntegerField()
     order_status = models.CharField(max_length=20, choices=ORDER_STATUS_CHOICES, default='PENDING')
     payment_status = models.CharField(max_length=20, choices=PAYMENT_STATUS_CHOICES, default='PENDING')
     order_total = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
     created_at = models.DateTimeField(default=timezone.now)
+    # Local copy of the shipment's status (Services/shipping_sync.py): pushed by the shipping
+    # service's webhook, re-fetched while in flight once older than SHIPPING_STATUS_TTL
+    shipping_status = models.CharField(max_length=20, choices=SHIPPING_STATUS_CHOICES, null=True, blank=True)
+    expected_delivery = models.DateField(null=True, blank=True)
+    shipping_synced_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         db_table = 'ordersapp_order'
         ordering = ['-created_at']
+        indexes = [
+            # Order history: WHERE customer_id = ? ORDER BY created_at DESC, order_id DESC
+            models.Index(fields=['customer_id', '-created_at', '-order_id'], name='order_customer_created_idx'),
+            # Open orders per customer / by age (partial: non-terminal statuses only)
+            models.Index(
+                fields=['customer_id', '-created_at'], name='order_open_customer_idx',
+                condition=models.Q(order_status__in=['PENDING', 'CONFIRMED']),
+            ),
+            models.Index(
+                fields=['order_status', 'created_at'], name='order_open_status_idx',
+                condition=models.Q(order_status__in=['PENDING', 'CONFIRMED']),
+            ),
+            # Shipments not yet Delivered/Failed, oldest sync first (refresh_shipping_status)
+            models.Index(
+                fields=['shipping_synced_at'], name='order_shipping_unsettled_idx',
+                condition=models.Q(shipping_status__isnull=True) | models.Q(shipping_status__in=['Pending', 'Shipped', 'Unknown']),
+            ),
+        ]
 
     def __str__(self):
         return f"Order {self.order_id} - Customer {self.customer_id}"
 
 
+class OrderItemQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for item in objs:
+            item.set_partition_key()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def within(self, orders):
+        """Restrict to the created_at range of the given orders, so only their months' partitions are read."""
+        created = [order.created_at for order in orders]
+        if not created:
+            return self.none()
+        return self.filter(order_created_at__gte=min(created), order_created_at__lte=max(created))
+
+
 class OrderItem(models.Model):
     order_item_id = models.BigAutoField(primary_key=True)
-    order = models.ForeignKey(Order, related_name='items', on_delete=models.CASCADE)
+    # The database enforces (order_id, order_created_at) -> ordersapp_order (order_id, created_at)
+    order = models.ForeignKey(Order, related_name='items', on_delete=models.CASCADE, db_constraint=False)
+    # Partition key: the order's created_at, so items share their order's monthly partition
+    order_created_at = models.DateTimeField(editable=False)
     product_id = models.BigIntegerField()
     sku = models.CharField(max_length=100)
     warehouse = "WH1"
     quantity = models.PositiveIntegerField(default=1)
     unit_price = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
 
+    objects = OrderItemQuerySet.as_manager()
+
     class Meta:
         db_table = 'ordersapp_orderitem'
+        indexes = [
+            # SKU search (sku__icontains); only built where pg_trgm is available (0004, 0007)
+            GinIndex(OpClass(Upper('sku'), name='gin_trgm_ops'), name='orderitem_sku_upper_trgm_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.set_partition_key()
+        super().save(*args, **kwargs)
+
+    def set_partition_key(self):
+        if self.order_created_at is None:
+            self.order_created_at = self.order.created_at
 
     def __str__(self):
         return f"Item {self.order_item_id} (Order {self.order.order_id})"
+
+
+class CustomerOrderSummary(models.Model):
+    """Per-customer order rollup, kept up to date incrementally by the order write paths."""
+    customer_id = models.BigIntegerField(primary_key=True)
+    order_count = models.IntegerField(default=0)
+    lifetime_spend = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    last_order_at = models.DateTimeField(null=True, blank=True)
+    pending_count = models.IntegerField(default=0)
+    confirmed_count = models.IntegerField(default=0)
+    shipped_count = models.IntegerField(default=0)
+    cancelled_count = models.IntegerField(default=0)
+    delivered_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'ordersapp_customerordersummary'
+
+    def status_counts(self):
+        return {s.value: getattr(self, f"{s.value.lower()}_count") for s in OrderStatus}
+
+    def __str__(self):
+        return f"Summary - Customer {self.customer_id} ({self.order_count} orders)"
+
+
+class OutboxEvent(models.Model):
+    """Side effect recorded in the order's transaction and delivered later by the outbox worker."""
+    STATUS_CHOICES = [(s.value, s.name.title()) for s in OutboxStatus]
+    EVENT_TYPE_CHOICES = [(t.value, t.name.replace('_', ' ').title()) for t in OutboxEventType]
+
+    event_id = models.BigAutoField(primary_key=True)
+    event_type = models.CharField(max_length=40, choices=EVENT_TYPE_CHOICES)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(default=timezone.now)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'ordersapp_outboxevent'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"Outbox {self.event_id} - {self.event_type} ({self.status})"
+
+
+class IdempotencyKey(models.Model):
+    """Outcome of a create request sent with an Idempotency-Key header, replayed to its retries."""
+    STATUS_CHOICES = [(s.value, s.name.replace('_', ' ').title()) for s in IdempotencyStatus]
+
+    key = models.CharField(max_length=255, primary_key=True)
+    request_hash = models.CharField(max_length=64)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='IN_PROGRESS')
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    # Order created under the claim; a retry taking over an abandoned claim resumes it
+    order_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'ordersapp_idempotencykey'
+        indexes = [
+            # Expired-key purge
+            models.Index(fields=['created_at'], name='idempotency_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Idempotency key {self.key} ({self.status})"
@@ -1,5 +1,6 @@
+from decimal import Decimal
 from rest_framework import serializers
-from .models import Order, OrderItem
+from .models import Order, OrderItem, CustomerOrderSummary
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -32,14 +33,26 @@ class OrderSerializer(serializers.ModelSerializer):
         return value
 
     def create(self, validated_data):
+        """
+        Insert the order once (total already set) and all items with one bulk INSERT.
+        Callers wrap this in transaction.atomic together with their status update.
+        """
         items_data = validated_data.pop('items', [])
+        if 'order_total' not in validated_data:
+            validated_data['order_total'] = sum(
+                (i['quantity'] * i['unit_price'] for i in items_data), Decimal('0.00')
+            )
         order = Order.objects.create(**validated_data)
+        OrderItem.objects.bulk_create([OrderItem(order=order, **item_data) for item_data in items_data])
+        return order
 
-        total = 0
-        for item_data in items_data:
-            item = OrderItem.objects.create(order=order, **item_data)
-            total += item.quantity * item.unit_price
 
-        order.order_total = total
-        order.save()
-        return order
+class CustomerOrderSummarySerializer(serializers.ModelSerializer):
+    status_counts = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CustomerOrderSummary
+        fields = ['customer_id', 'order_count', 'lifetime_spend', 'last_order_at', 'status_counts']
+
+    def get_status_counts(self, obj):
+        return obj.status_counts()
@@ -0,0 +1,47 @@
+"""
+Run the inventory, payment, shipping and notification stand-ins together in one process, on
+consecutive ports from --port-base, with the same injected latency and error rate
+(bench_suite starts them this way). Faults stay adjustable per service with PUT /_faults/.
+
+    python -m ordersapp.standins --port-base 8102 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import threading
+from . import inventory_server, notification_server, payment_server, shipping_server
+
+# Order of the services on the ports after --port-base
+SERVICES = ("inventory", "payment", "shipping", "notification")
+
+
+def start_all(port_base=0, host="127.0.0.1", latency=0.05, error_rate=0.0, slow_rate=0.0,
+              slow_latency=2.0, hold_latency=None):
+    """Start every stand-in on a background thread; returns {service name: server}."""
+    port = lambda index: port_base + index if port_base else 0
+    servers = {
+        "inventory": inventory_server.InventoryStandIn((host, port(0))),
+        "payment": payment_server.PaymentStandIn((host, port(1)), hold_latency=hold_latency),
+        "shipping": shipping_server.ShippingStandIn((host, port(2))),
+        "notification": notification_server.NotificationStandIn((host, port(3))),
+    }
+    for server in servers.values():
+        server.set_faults(latency=latency, error_rate=error_rate, slow_rate=slow_rate, slow_latency=slow_latency)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    return servers
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="All downstream stand-ins in one process")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port-base", type=int, default=8102,
+                        help="inventory on this port, then payment, shipping, notification")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    parser.add_argument("--hold-latency", type=float, default=None, help="Capture/void latency (default: --latency)")
+    args = parser.parse_args()
+    servers = start_all(args.port_base, args.host, args.latency, args.error_rate, args.slow_rate,
+                        args.slow_latency, args.hold_latency)
+    for name in SERVICES:
+        print(f"[StandIns] {name} listening on {servers[name].base_url}", flush=True)
+    threading.Event().wait()
@@ -0,0 +1,86 @@
+"""Shared scaffolding for the local stand-in services (JSON over threaded HTTP)."""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class JsonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def send_json(self, code, payload):
+        raw = json.dumps(payload).encode()
+        try:
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up (timeout) before the response was written
+
+    def do_PUT(self):
+        """PUT /_faults/ with any of latency, error_rate, slow_rate, slow_latency changes them live."""
+        if self.path.rstrip("/") != "/_faults":
+            return self.send_json(404, {"error": "not found"})
+        self.send_json(200, self.server.set_faults(**self.read_json()))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Threaded server with simulated latency, an error rate and per-route call counts.
+    A slow_rate share of calls takes slow_latency instead (tail latency / brown-outs).
+    """
+    daemon_threads = True
+    request_queue_size = 128
+    path_prefix = ""
+    FAULTS = ("latency", "error_rate", "slow_rate", "slow_latency")
+
+    def __init__(self, address, handler, latency=0.05, error_rate=0.0, slow_rate=0.0, slow_latency=2.0):
+        super().__init__(address, handler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def simulate(self, kind, latency=None):
+        """Sleep for the configured (or given) latency, count the call; True if this call should fail."""
+        if latency is None:
+            latency = self.latency
+        time.sleep(self.slow_latency if random.random() < self.slow_rate else latency)
+        with self._lock:
+            self.calls[kind] = self.calls.get(kind, 0) + 1
+        return random.random() < self.error_rate
+
+    def set_faults(self, **faults):
+        """Change injected faults at runtime; returns the current settings."""
+        for name, value in faults.items():
+            if name in self.FAULTS:
+                setattr(self, name, float(value))
+        return {name: getattr(self, name) for name in self.FAULTS}
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{self.path_prefix}"
+
+
+def start_in_thread(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
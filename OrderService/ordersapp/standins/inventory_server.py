@@ -0,0 +1,75 @@
+"""
+Local fault-injecting stand-in for the Inventory Service.
+Serves POST /v1/inventory/reserve/, /reserve/bulk/ (optional), /release/ and /release/bulk/ (optional) with
+configurable latency, tail latency (slow_rate/slow_latency) and error rate.
+Reservations are deduplicated on Idempotency-Key. Faults can be changed while running
+with PUT /_faults/.
+
+    python -m ordersapp.standins.inventory_server --port 8002 --error-rate 0.3
+"""
+import argparse
+import re
+from .base import JsonHandler, StandInServer, start_in_thread
+
+RESERVE_PATH = re.compile(r"^/v1/inventory/reserve/?$")
+BULK_PATH = re.compile(r"^/v1/inventory/reserve/bulk/?$")
+RELEASE_PATH = re.compile(r"^/v1/inventory/release/?$")
+RELEASE_BULK_PATH = re.compile(r"^/v1/inventory/release/bulk/?$")
+
+
+class InventoryHandler(JsonHandler):
+    server_version = "InventoryStandIn/1.0"
+
+    def do_POST(self):
+        body = self.read_json()
+        if (BULK_PATH.match(self.path) or RELEASE_BULK_PATH.match(self.path)) and not self.server.bulk:
+            return self.send_json(404, {"error": "bulk not supported"})
+        if RESERVE_PATH.match(self.path) or BULK_PATH.match(self.path):
+            kind = "bulk" if BULK_PATH.match(self.path) else "reserve"
+            if self.server.simulate(kind):
+                return self.send_json(503, {"error": "injected failure"})
+            with self.server._lock:
+                self.server.reservations.setdefault(self.headers.get("Idempotency-Key"), body)
+            return self.send_json(200, {"reserved": True})
+        if RELEASE_PATH.match(self.path):
+            if self.server.simulate("release"):
+                return self.send_json(503, {"error": "injected failure"})
+            return self.send_json(200, {"released": True})
+        if RELEASE_BULK_PATH.match(self.path):
+            if self.server.simulate("release_bulk"):
+                return self.send_json(503, {"error": "injected failure"})
+            releases = body.get("releases") or []
+            return self.send_json(200, {"results": [
+                {"order_id": release.get("order_id"), "released": True} for release in releases
+            ]})
+        self.send_json(404, {"error": "not found"})
+
+
+class InventoryStandIn(StandInServer):
+    path_prefix = "/v1/inventory"
+
+    def __init__(self, address, bulk=True, **faults):
+        super().__init__(address, InventoryHandler, **faults)
+        self.bulk = bulk
+        self.reservations = {}
+
+
+def start(port=0, bulk=True, **faults):
+    """Start the stand-in on a background thread and return the server."""
+    return start_in_thread(InventoryStandIn(("127.0.0.1", port), bulk=bulk, **faults))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inventory Service stand-in")
+    parser.add_argument("--port", type=int, default=8002)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    parser.add_argument("--no-bulk", action="store_true")
+    args = parser.parse_args()
+    server = InventoryStandIn(("0.0.0.0", args.port), bulk=not args.no_bulk, latency=args.latency,
+                              error_rate=args.error_rate, slow_rate=args.slow_rate,
+                              slow_latency=args.slow_latency)
+    print(f"[InventoryStandIn] Listening on {server.base_url}")
+    server.serve_forever()
@@ -0,0 +1,47 @@
+"""
+Local stand-in for the Notification Service.
+Accepts POST /v1/notifications with a configurable latency and error rate and keeps
+the received events in memory.
+
+    python -m ordersapp.standins.notification_server --port 5000 --error-rate 0.2
+"""
+import argparse
+from .base import JsonHandler, StandInServer, start_in_thread
+
+
+class NotificationHandler(JsonHandler):
+    server_version = "NotificationStandIn/1.0"
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/v1/notifications":
+            return self.send_json(404, {"error": "not found"})
+        body = self.read_json()
+        if self.server.simulate("notify"):
+            return self.send_json(503, {"error": "injected failure"})
+        with self.server._lock:
+            self.server.received.append(body)
+        self.send_json(202, {"accepted": True})
+
+
+class NotificationStandIn(StandInServer):
+    path_prefix = "/v1/notifications"
+
+    def __init__(self, address, latency=0.01, error_rate=0.0):
+        super().__init__(address, NotificationHandler, latency=latency, error_rate=error_rate)
+        self.received = []
+
+
+def start(port=0, latency=0.01, error_rate=0.0):
+    """Start the stand-in on a background thread and return the server."""
+    return start_in_thread(NotificationStandIn(("127.0.0.1", port), latency=latency, error_rate=error_rate))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Notification Service stand-in")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server = NotificationStandIn(("0.0.0.0", args.port), latency=args.latency, error_rate=args.error_rate)
+    print(f"[NotificationStandIn] Listening on {server.base_url}")
+    server.serve_forever()
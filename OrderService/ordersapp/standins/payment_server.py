@@ -0,0 +1,106 @@
+"""
+Local fault-injecting stand-in for the Payment Service.
+Serves POST /v1/payments/charge/, /v1/payments/authorize/, /v1/payments/<id>/capture|void|refund/
+and /v1/payments/refund/bulk/ with configurable latency, tail latency (slow_rate/slow_latency) and error rate. Charges and
+authorizations are deduplicated on Idempotency-Key, so hedged duplicates only apply once; a hold
+can be captured or voided, not both. Faults can be changed while running with PUT /_faults/.
+
+    python -m ordersapp.standins.payment_server --port 8003 --slow-rate 0.05 --slow-latency 2 --hold-latency 0.01
+"""
+import argparse
+import re
+from .base import JsonHandler, StandInServer, start_in_thread
+
+CHARGE_PATH = re.compile(r"^/v1/payments/charge/?$")
+AUTHORIZE_PATH = re.compile(r"^/v1/payments/authorize/?$")
+HOLD_PATH = re.compile(r"^/v1/payments/(\d+)/(capture|void)/?$")
+REFUND_PATH = re.compile(r"^/v1/payments/(\d+)/refund/?$")
+REFUND_BULK_PATH = re.compile(r"^/v1/payments/refund/bulk/?$")
+# Hold state after each step, and the states it may be applied from (repeats are no-ops)
+HOLD_STEPS = {"capture": ("CAPTURED", "AUTHORIZED"), "void": ("VOIDED", "AUTHORIZED")}
+
+
+class PaymentHandler(JsonHandler):
+    server_version = "PaymentStandIn/1.0"
+
+    def do_POST(self):
+        body = self.read_json()
+        if CHARGE_PATH.match(self.path):
+            if self.server.simulate("charge"):
+                return self.send_json(503, {"error": "injected failure"})
+            key = self.headers.get("Idempotency-Key") or f"charge-{body.get('order_id')}"
+            with self.server._lock:
+                first = key not in self.server.charges
+                self.server.charges.setdefault(key, body)
+            return self.send_json(201 if first else 200, {"order_id": body.get("order_id"), "status": "PAID"})
+        if AUTHORIZE_PATH.match(self.path):
+            if self.server.simulate("authorize"):
+                return self.send_json(503, {"error": "injected failure"})
+            with self.server._lock:
+                self.server.holds.setdefault(int(body.get("order_id")), "AUTHORIZED")
+            return self.send_json(201, {"order_id": body.get("order_id"), "status": "AUTHORIZED"})
+        match = HOLD_PATH.match(self.path)
+        if match:
+            if self.server.simulate(match.group(2), latency=self.server.hold_latency):
+                return self.send_json(503, {"error": "injected failure"})
+            order_id, (target, source) = int(match.group(1)), HOLD_STEPS[match.group(2)]
+            with self.server._lock:
+                current = self.server.holds.get(order_id)
+                if current == source:
+                    self.server.holds[order_id] = current = target
+            if current != target:
+                return self.send_json(409, {"order_id": order_id, "status": current})
+            return self.send_json(200, {"order_id": order_id, "status": target})
+        match = REFUND_PATH.match(self.path)
+        if match:
+            if self.server.simulate("refund"):
+                return self.send_json(503, {"error": "injected failure"})
+            with self.server._lock:
+                if self.server.holds.get(int(match.group(1))) == "CAPTURED":
+                    self.server.holds[int(match.group(1))] = "REFUNDED"
+            return self.send_json(200, {"order_id": int(match.group(1)), "status": "REFUNDED"})
+        if REFUND_BULK_PATH.match(self.path):
+            if self.server.simulate("refund_bulk"):
+                return self.send_json(503, {"error": "injected failure"})
+            order_ids = [int(order_id) for order_id in body.get("order_ids") or []]
+            with self.server._lock:
+                for order_id in order_ids:
+                    if self.server.holds.get(order_id) == "CAPTURED":
+                        self.server.holds[order_id] = "REFUNDED"
+            return self.send_json(200, {"results": [
+                {"order_id": order_id, "status": "REFUNDED"} for order_id in order_ids
+            ]})
+        self.send_json(404, {"error": "not found"})
+
+
+class PaymentStandIn(StandInServer):
+    path_prefix = "/v1/payments"
+    FAULTS = StandInServer.FAULTS + ("hold_latency",)
+
+    def __init__(self, address, hold_latency=None, **faults):
+        super().__init__(address, PaymentHandler, **faults)
+        self.charges = {}
+        self.holds = {}
+        # Capture/void only settle an existing hold (no card network round trip); None = latency
+        self.hold_latency = hold_latency
+
+
+def start(port=0, **faults):
+    """Start the stand-in on a background thread and return the server."""
+    return start_in_thread(PaymentStandIn(("127.0.0.1", port), **faults))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Payment Service stand-in")
+    parser.add_argument("--port", type=int, default=8003)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    parser.add_argument("--hold-latency", type=float, default=None, help="Capture/void latency (default: --latency)")
+    args = parser.parse_args()
+    server = PaymentStandIn(("0.0.0.0", args.port), latency=args.latency, error_rate=args.error_rate,
+                            slow_rate=args.slow_rate, slow_latency=args.slow_latency,
+                            hold_latency=args.hold_latency)
+    print(f"[PaymentStandIn] Listening on {server.base_url}")
+    server.serve_forever()
@@ -0,0 +1,78 @@
+"""
+Local stand-in for the Shipping Service.
+Serves GET /v1/shipping/<id>/status/, POST /v1/shipping/create/ and (optionally)
+POST /v1/shipping/status/bulk/ with a configurable per-request latency, so client
+changes can be timed locally. Shipment creation is deduplicated on Idempotency-Key.
+
+    python -m ordersapp.standins.shipping_server --port 8004 --latency 0.05
+"""
+import argparse
+import re
+from .base import JsonHandler, StandInServer, start_in_thread
+
+STATUS_PATH = re.compile(r"^/v1/shipping/(\d+)/status/?$")
+BULK_PATH = re.compile(r"^/v1/shipping/status/bulk/?$")
+CREATE_PATH = re.compile(r"^/v1/shipping/create/?$")
+
+
+def _status_for(order_id):
+    return {"order_id": order_id, "status": "Shipped", "expected_delivery": "2030-01-01"}
+
+
+class ShippingHandler(JsonHandler):
+    server_version = "ShippingStandIn/1.0"
+
+    def do_GET(self):
+        match = STATUS_PATH.match(self.path)
+        if not match:
+            return self.send_json(404, {"error": "not found"})
+        if self.server.simulate("single"):
+            return self.send_json(503, {"error": "injected failure"})
+        self.send_json(200, _status_for(int(match.group(1))))
+
+    def do_POST(self):
+        body = self.read_json()
+        if BULK_PATH.match(self.path):
+            if not self.server.bulk:
+                return self.send_json(404, {"error": "bulk not supported"})
+            if self.server.simulate("bulk"):
+                return self.send_json(503, {"error": "injected failure"})
+            ids = body.get("order_ids", [])
+            return self.send_json(200, {"results": [_status_for(int(i)) for i in ids]})
+        if CREATE_PATH.match(self.path):
+            if self.server.simulate("create"):
+                return self.send_json(503, {"error": "injected failure"})
+            key = self.headers.get("Idempotency-Key") or f"shipment-{body.get('order_id')}"
+            with self.server._lock:
+                shipment = self.server.shipments.setdefault(key, {"order_id": body.get("order_id"), "status": "PENDING"})
+            return self.send_json(201, shipment)
+        self.send_json(404, {"error": "not found"})
+
+
+class ShippingStandIn(StandInServer):
+    path_prefix = "/v1/shipping"
+
+    def __init__(self, address, latency=0.05, error_rate=0.0, bulk=True):
+        super().__init__(address, ShippingHandler, latency=latency, error_rate=error_rate)
+        self.bulk = bulk
+        self.shipments = {}
+
+
+def start(port=0, latency=0.05, error_rate=0.0, bulk=True):
+    """Start the stand-in on a background thread and return the server."""
+    return start_in_thread(
+        ShippingStandIn(("127.0.0.1", port), latency=latency, error_rate=error_rate, bulk=bulk)
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shipping Service stand-in")
+    parser.add_argument("--port", type=int, default=8004)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--no-bulk", action="store_true")
+    args = parser.parse_args()
+    server = ShippingStandIn(("0.0.0.0", args.port), latency=args.latency,
+                             error_rate=args.error_rate, bulk=not args.no_bulk)
+    print(f"[ShippingStandIn] Listening on {server.base_url}")
+    server.serve_forever()
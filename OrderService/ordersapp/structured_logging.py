@@ -0,0 +1,102 @@
+"""
+JSON, sampled, non-blocking logging for the request path (wired up by settings.LOGGING).
+
+  * JsonFormatter writes one JSON object per line, including any `extra={...}` fields.
+  * SamplingFilter keeps every WARNING and above but only a LOG_SAMPLE_RATE fraction of
+    lower records; pass extra={"sample": False} to always keep a record.
+  * NonBlockingHandler only puts records on a bounded queue; a listener thread does the
+    actual I/O. When the queue is full the record is dropped (and counted) instead of
+    making the request thread wait on stdout.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from prometheus_client import Counter
+
+DROPPED = Counter(
+    "order_service_log_records_dropped_total",
+    "Log records dropped because the log queue was full", ["level"]
+)
+
+# LogRecord attributes that aren't `extra` fields
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "sample"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "pid": record.process,
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RESERVED)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rate=1.0, always_level=logging.WARNING):
+        super().__init__()
+        self.rate = float(rate)
+        self.always_level = always_level
+
+    def filter(self, record):
+        if record.levelno >= self.always_level or getattr(record, "sample", True) is False:
+            return True
+        return self.rate >= 1 or random.random() < self.rate
+
+
+class NonBlockingHandler(QueueHandler):
+    """
+    QueueHandler whose listener thread writes to `stream` (stdout by default) with this
+    handler's formatter (JsonFormatter unless configured).
+    The listener thread is restarted in forked children (Gunicorn workers).
+    """
+
+    def __init__(self, maxsize=10000, stream=None):
+        super().__init__(queue.Queue(maxsize))
+        self._target = logging.StreamHandler(stream or sys.stdout)
+        self._target.setFormatter(JsonFormatter())
+        self._maxsize = maxsize
+        self._listener = None
+        self._start()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._restart)
+        atexit.register(self._stop)
+
+    def setFormatter(self, fmt):
+        # Formatting happens on the listener thread
+        self._target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Format on the listener thread, not here: only make the record safe to hand over
+        record.msg, record.args = record.getMessage(), None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DROPPED.labels(level=record.levelname).inc()
+
+    def _start(self):
+        self._listener = QueueListener(self.queue, self._target, respect_handler_level=True)
+        self._listener.start()
+
+    def _stop(self):
+        if self._listener is not None and self._listener._thread is not None:
+            self._listener.stop()   # drains the queue before returning
+
+    def _restart(self):
+        # The parent's listener thread doesn't exist in the child; its queued records were the parent's
+        self.queue = queue.Queue(self._maxsize)
+        self._start()
@@ -0,0 +1,7 @@
+from types import SimpleNamespace
+from unittest import mock
+
+# With a replica configured, replica-eligible views would start the lag monitor thread, whose
+# connection outlives the test database. Report the replica unavailable for the whole run;
+# tests that exercise routing patch _monitor themselves.
+mock.patch("ordersapp.db.replicas._monitor", return_value=SimpleNamespace(lag=None)).start()
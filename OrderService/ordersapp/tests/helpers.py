@@ -0,0 +1,32 @@
+import json
+from decimal import Decimal
+from django.utils import timezone
+from ..models import Order, OrderItem
+from ..Services.order_services import OrderService
+
+CUSTOMER = 424242
+
+
+def make_order(customer_id=CUSTOMER, created_at=None, items=((1, "9.99"),), **fields):
+    """An order with its items, priced like create_order does."""
+    item_dicts = [{"quantity": quantity, "unit_price": Decimal(price)} for quantity, price in items]
+    order = Order.objects.create(
+        customer_id=customer_id, created_at=created_at or timezone.now(),
+        order_total=OrderService.calculate_order_total(item_dicts), **fields
+    )
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product_id=n, sku=f"SKU{n:04d}", quantity=item["quantity"], unit_price=item["unit_price"])
+        for n, item in enumerate(item_dicts, start=1)
+    ])
+    return order
+
+
+def create_body(customer_id=CUSTOMER, quantity=2):
+    return {
+        "customer_id": customer_id,
+        "items": [{"product_id": 7, "sku": "SKU0007", "quantity": quantity, "unit_price": "12.50"}],
+    }
+
+
+def ndjson(response):
+    return [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
@@ -0,0 +1,48 @@
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from ..models import Order, OutboxEvent
+from ..Services import async_db, idempotency
+from ..Status.order_status import OrderStatus
+from .helpers import CUSTOMER, create_body, make_order
+
+
+# db_phase() closes the request's connections between phases, which would end the test's transaction
+@mock.patch.object(async_db, "_release", lambda: None)
+class AsyncEndpointTests(TestCase):
+    async def create(self, body, headers=None):
+        return await self.async_client.post(
+            "/v1/async/orders/create/", body, content_type="application/json", headers=headers
+        )
+
+    async def test_create_matches_the_sync_contract(self):
+        response = await self.create(create_body())
+        self.assertEqual(response.status_code, 201)
+        order = await Order.objects.aget(pk=response.json()["order_id"])
+        self.assertEqual(order.order_status, OrderStatus.CONFIRMED.value)
+        self.assertEqual(str(order.order_total), response.json()["order_total"])
+        self.assertEqual(await OutboxEvent.objects.acount(), 2)
+
+    async def test_create_rejects_bad_requests(self):
+        self.assertEqual((await self.async_client.get("/v1/async/orders/create/")).status_code, 405)
+        self.assertEqual((await self.create("{not json")).status_code, 400)
+        self.assertEqual((await self.create({"customer_id": CUSTOMER, "items": []})).status_code, 400)
+        self.assertFalse(await Order.objects.aexists())
+
+    async def test_idempotency_key_replays(self):
+        key = {idempotency.HEADER: "async-key"}
+        first = await self.create(create_body(), key)
+        second = await self.create(create_body(), key)
+        self.assertEqual(second.json()["order_id"], first.json()["order_id"])
+        self.assertEqual(second[idempotency.REPLAYED_HEADER], "true")
+        self.assertEqual((await self.create(create_body(quantity=5), key)).status_code, 422)
+
+    async def test_details_and_history(self):
+        order = await sync_to_async(make_order)()
+        details = await self.async_client.get(f"/v1/async/orders/{order.order_id}/details/")
+        self.assertEqual(details.json(), (await self.async_client.get(f"/v1/orders/{order.order_id}/details/")).json())
+        self.assertEqual((await self.async_client.get("/v1/async/orders/999999999/details/")).status_code, 404)
+        history = await self.async_client.get(f"/v1/async/orders/my-orders/{CUSTOMER}/")
+        self.assertEqual(history.status_code, 200)
+        self.assertEqual([o.order_id for o in history.context["page"].orders], [order.order_id])
+
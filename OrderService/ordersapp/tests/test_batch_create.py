@@ -0,0 +1,56 @@
+from unittest import mock
+from django.test import TestCase
+from ..models import Order, OutboxEvent
+from ..Services import checkout
+from ..Status.order_status import OrderStatus
+from ..Status.payment_status import PaymentStatus
+from .helpers import CUSTOMER, create_body
+
+DECLINED = CUSTOMER + 1
+
+
+class BatchCreateTests(TestCase):
+    url = "/v1/orders/batch/"
+
+    def post(self, body):
+        # Payment holds are declined for DECLINED's orders
+        authorize = lambda order_id, customer_id, amount: customer_id != DECLINED
+        with mock.patch.object(checkout, "authorize_payment", side_effect=authorize):
+            return self.client.post(self.url, body, content_type="application/json")
+
+    def test_all_confirmed_is_201(self):
+        response = self.post([create_body(), create_body(quantity=1)])
+        self.assertEqual(response.status_code, 201)
+        results = response.json()["results"]
+        self.assertEqual([r["index"] for r in results], [0, 1])
+        self.assertEqual({(r["order_status"], r["payment_status"]) for r in results},
+                         {(OrderStatus.CONFIRMED.value, PaymentStatus.PAID.value)})
+        self.assertEqual(OutboxEvent.objects.count(), 4)  # shipment and notification per order
+
+    def test_mixed_outcomes_are_207_per_order(self):
+        invalid = create_body()
+        invalid["items"][0]["quantity"] = 0
+        response = self.post([create_body(), invalid, create_body(customer_id=DECLINED), {"customer_id": CUSTOMER}])
+        self.assertEqual(response.status_code, 207)
+        ok, bad, declined, empty = response.json()["results"]
+        self.assertEqual(ok["order_status"], OrderStatus.CONFIRMED.value)
+        self.assertIn("items", bad["errors"])
+        self.assertEqual(
+            (declined["order_status"], declined["payment_status"], declined["error"]),
+            (OrderStatus.CANCELLED.value, PaymentStatus.FAILED.value, "Payment failed"),
+        )
+        self.assertEqual(empty["errors"], {"error": "Cannot create an order without items."})
+
+        stored = dict(Order.objects.values_list("order_id", "order_status"))
+        self.assertEqual(stored, {ok["order_id"]: OrderStatus.CONFIRMED.value,
+                                  declined["order_id"]: OrderStatus.CANCELLED.value})
+        self.assertEqual(
+            set(OutboxEvent.objects.values_list("payload__order_id", flat=True).exclude(payload__order_id=None)),
+            {ok["order_id"]},
+        )
+
+    def test_rejects_empty_or_oversized_batches(self):
+        self.assertEqual(self.post([]).status_code, 400)
+        self.assertEqual(self.post(create_body()).status_code, 400)
+        with mock.patch("ordersapp.views.MAX_BATCH_SIZE", 1):
+            self.assertEqual(self.post([create_body(), create_body()]).status_code, 400)
@@ -0,0 +1,74 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase
+from ..db import bulk_import
+from ..models import Order, OrderItem
+from ..Status.order_status import OrderStatus
+from ..Status.payment_status import PaymentStatus
+from .helpers import make_order
+
+SEED_ORDERS = os.path.join("Seed Data", "eci_orders.csv")
+SEED_ITEMS = os.path.join("Seed Data", "eci_order_items.csv")
+ORDER_ROW = {
+    "order_id": "5", "customer_id": "44", "order_status": "PENDING", "payment_status": "PAID",
+    "order_total": "19.98", "created_at": "2024-09-18 14:40:32",
+}
+
+
+class RowValidationTests(SimpleTestCase):
+    def test_legacy_status_names_are_mapped(self):
+        valid, rejected = bulk_import._validate(
+            "orders", [dict(ORDER_ROW, order_status="CREATED", payment_status="SUCCESS")]
+        )
+        self.assertEqual(rejected, [])
+        self.assertEqual(valid[0][2:4], [OrderStatus.PENDING.value, PaymentStatus.PAID.value])
+
+    def test_rows_breaking_the_serializer_rules_are_rejected_with_a_reason(self):
+        item = {"order_item_id": "1", "order_id": "5", "product_id": "7", "sku": "SKU0007", "unit_price": "1.00"}
+        valid, rejected = bulk_import._validate("items", [dict(item, quantity="0"), dict(item, quantity="2")])
+        self.assertEqual(len(valid), 1)
+        self.assertEqual([reason.split(":")[0] for _, reason, _ in rejected], ["quantity"])
+        valid, rejected = bulk_import._validate("orders", [dict(ORDER_ROW, order_status="LOST")])
+        self.assertEqual(valid, [])
+        self.assertTrue(rejected[0][1].startswith("order_status:"))
+
+    def test_reads_gzipped_csv_and_ndjson_in_chunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path, ndjson_path = os.path.join(directory, "orders.csv.gz"), os.path.join(directory, "orders.ndjson")
+            with gzip.open(csv_path, "wt", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=list(ORDER_ROW))
+                writer.writeheader()
+                writer.writerows([ORDER_ROW] * 5)
+            with open(ndjson_path, "w") as f:
+                f.write("\n".join(json.dumps(ORDER_ROW) for _ in range(5)) + "\n")
+            for path in (csv_path, ndjson_path):
+                self.assertEqual([len(chunk) for chunk in bulk_import.read_chunks(path, 2)], [2, 2, 1])
+                self.assertEqual(next(bulk_import.read_chunks(path, 2))[0], ORDER_ROW)
+            with self.assertRaises(bulk_import.BulkImportError):
+                next(bulk_import.read_chunks(os.path.join(directory, "orders.xlsx"), 2))
+
+
+class ImportOrdersCommandTests(TransactionTestCase):
+    def test_seed_data_loads_without_rejects(self):
+        out = io.StringIO()
+        with self.assertLogs("ordersapp.db.bulk_import", "INFO") as logs:
+            call_command(
+                "import_orders", "--truncate", "--orders", SEED_ORDERS, "--items", SEED_ITEMS,
+                "--workers", "2", "--chunk-size", "100", "--skip-summaries", stdout=out,
+            )
+        self.assertNotIn("Rejected", out.getvalue())
+        self.assertIn("orders loaded", [record.getMessage() for record in logs.records])
+        with open(SEED_ORDERS) as f:
+            self.assertEqual(Order.objects.count(), len(f.readlines()) - 1)
+        with open(SEED_ITEMS) as f:
+            self.assertEqual(OrderItem.objects.count(), len(f.readlines()) - 1)
+        self.assertFalse(Order.objects.filter(order_status="CREATED").exists())
+        self.assertFalse(Order.objects.filter(payment_status="SUCCESS").exists())
+        # The id sequence moved past the imported ids
+        imported = Order.objects.order_by("-order_id")[0].order_id
+        self.assertGreater(make_order().order_id, imported)
@@ -0,0 +1,111 @@
+import threading
+from unittest import mock
+from django.db import connections, transaction
+from django.test import TestCase, TransactionTestCase
+from ..models import CustomerOrderSummary, Order, OutboxEvent
+from ..Services import customer_summary, outbox
+from ..Status.order_status import OrderStatus
+from ..Status.outbox_status import OutboxEventType
+from ..Status.payment_status import PaymentStatus
+from .helpers import CUSTOMER, make_order, ndjson
+
+
+class BulkCancellationOutboxTests(TestCase):
+    def test_partial_refund_narrows_the_payload(self):
+        refunded, unconfirmed = (make_order(payment_status=PaymentStatus.PAID.value) for _ in range(2))
+        for order in (refunded, unconfirmed):
+            order.order_status = OrderStatus.CANCELLED.value
+            order.save()
+        outbox.enqueue_cancellations([refunded, unconfirmed], {})
+        results = {refunded.order_id: True, unconfirmed.order_id: False}
+        with mock.patch.object(outbox, "refund_payments_bulk", return_value=results):
+            self.assertEqual(outbox.process_batch(), (1, 1, 0))  # release delivered, refund retried
+        event = OutboxEvent.objects.get(event_type=OutboxEventType.REFUND_PAYMENTS.value)
+        self.assertEqual(event.payload, {"order_ids": [unconfirmed.order_id]})
+        refunded.refresh_from_db()
+        unconfirmed.refresh_from_db()
+        self.assertEqual(refunded.payment_status, PaymentStatus.REFUNDED.value)
+        self.assertEqual(unconfirmed.payment_status, PaymentStatus.PAID.value)
+
+
+class BulkTransitionTests(TestCase):
+    url = "/v1/orders/bulk-transition/"
+
+    def post(self, body):
+        return self.client.post(self.url, body, content_type="application/json")
+
+    def test_rejects_invalid_requests(self):
+        order = make_order()
+        for body in (
+            {"order_status": OrderStatus.CANCELLED.value},
+            {"order_ids": [order.order_id], "filter": {"customer_id": CUSTOMER}, "order_status": "CANCELLED"},
+            {"order_ids": [order.order_id]},
+            {"order_ids": [order.order_id], "order_status": "LOST"},
+            {"order_ids": [order.order_id], "order_status": "CANCELLED", "payment_status": "REFUNDED"},
+            {"order_ids": [order.order_id], "shipping_status": "teleported"},
+            {"order_ids": [0, True], "order_status": "CANCELLED"},
+            {"filter": {"unknown": 1}, "order_status": "CANCELLED"},
+        ):
+            self.assertEqual(self.post(body).status_code, 400, body)
+
+    def test_per_order_rules_and_summary(self):
+        pending = make_order()
+        delivered = make_order(order_status=OrderStatus.DELIVERED.value)
+        lines = ndjson(self.post({
+            "order_ids": [pending.order_id, delivered.order_id, 999999999], "order_status": OrderStatus.SHIPPED.value,
+        }))
+        self.assertEqual(lines[0]["error"], "Invalid transition from PENDING to SHIPPED.")
+        self.assertEqual(lines[1]["error"], "Cannot update a delivered or cancelled order.")
+        self.assertEqual(lines[2]["error"], "Order not found.")
+        self.assertEqual(lines[3]["summary"]["failed"], 3)
+
+    def test_dry_run_writes_nothing(self):
+        order = make_order()
+        lines = ndjson(self.post({"order_ids": [order.order_id], "order_status": "CONFIRMED", "dry_run": True}))
+        self.assertTrue(lines[0]["would_update"])
+        order.refresh_from_db()
+        self.assertEqual(order.order_status, OrderStatus.PENDING.value)
+
+    def test_cancel_queues_release_and_refund(self):
+        paid = make_order(order_status=OrderStatus.CONFIRMED.value, payment_status=PaymentStatus.PAID.value)
+        unpaid = make_order()
+        customer_summary.record_created([paid, unpaid])
+        lines = ndjson(self.post({"filter": {"customer_id": CUSTOMER}, "order_status": OrderStatus.CANCELLED.value}))
+        by_id = {line["order_id"]: line for line in lines[:-1]}
+        self.assertEqual(by_id[paid.order_id]["queued"], ["inventory_release", "refund"])
+        self.assertEqual(by_id[paid.order_id]["payment_status"], PaymentStatus.PAID.value)  # until refunded
+        self.assertEqual(by_id[unpaid.order_id]["queued"], ["inventory_release"])
+        types = sorted(OutboxEvent.objects.values_list("event_type", flat=True))
+        self.assertEqual(types, [OutboxEventType.REFUND_PAYMENTS.value, OutboxEventType.RELEASE_INVENTORY.value])
+        summary = CustomerOrderSummary.objects.get(customer_id=CUSTOMER)
+        self.assertEqual((summary.cancelled_count, summary.pending_count, summary.confirmed_count), (2, 0, 0))
+
+
+class BulkTransitionLockingTests(TransactionTestCase):
+    def test_rows_locked_elsewhere_are_skipped(self):
+        locked, free = make_order(), make_order()
+        holding, release = threading.Event(), threading.Event()
+
+        def hold_lock():
+            try:
+                with transaction.atomic():
+                    Order.objects.select_for_update().get(order_id=locked.order_id)
+                    holding.set()
+                    release.wait(10)
+            finally:
+                connections.close_all()
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        try:
+            self.assertTrue(holding.wait(10))
+            lines = ndjson(self.client.post(
+                "/v1/orders/bulk-transition/",
+                {"order_ids": [locked.order_id, free.order_id], "order_status": OrderStatus.CONFIRMED.value},
+                content_type="application/json",
+            ))
+        finally:
+            release.set()
+            holder.join()
+        self.assertEqual(lines[0], {"order_id": locked.order_id, "error": "Order is locked by another update."})
+        self.assertEqual(lines[1]["order_status"], OrderStatus.CONFIRMED.value)
@@ -0,0 +1,56 @@
+import time
+from types import SimpleNamespace
+from unittest import mock
+from django.test import SimpleTestCase
+from ..Services import checkout
+
+
+class CheckoutSagaTests(SimpleTestCase):
+    def setUp(self):
+        self.undone = []
+        compensations = {
+            name: (lambda order_id, items, name=name: self.undone.append(name) or True, None)
+            for name in checkout.COMPENSATIONS
+        }
+        patchers = [
+            mock.patch.dict(checkout.COMPENSATIONS, compensations),
+            mock.patch.object(checkout, "PREAUTH_ENABLED", True),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_saga(self, reserved=True, authorized=True, captured=True, delay=0):
+        def step(result):
+            def call(*args):
+                time.sleep(delay)
+                return result
+            return call
+
+        with mock.patch.object(checkout, "reserve_inventory", side_effect=step(reserved)), \
+                mock.patch.object(checkout, "authorize_payment", side_effect=step(authorized)), \
+                mock.patch.object(checkout, "capture_payment", return_value=captured):
+            saga = checkout.CheckoutSaga(SimpleNamespace(order_id=1, customer_id=2, order_total=10), [])
+            return saga, saga.run()
+
+    def test_confirmed_then_compensated_by_a_refund(self):
+        saga, outcome = self.run_saga()
+        self.assertEqual((outcome, self.undone), (checkout.CONFIRMED, []))
+        saga.compensate()
+        self.assertEqual(self.undone, ["refund_payment", "release_inventory"])
+
+    def test_failed_hold_undoes_the_other_one(self):
+        self.assertEqual(self.run_saga(reserved=False)[1], checkout.INVENTORY_FAILED)
+        self.assertEqual(self.undone, ["void_payment"])
+        self.undone.clear()
+        self.assertEqual(self.run_saga(authorized=False)[1], checkout.PAYMENT_FAILED)
+        self.assertEqual(self.undone, ["release_inventory"])
+
+    def test_failed_capture_voids_and_releases(self):
+        self.assertEqual(self.run_saga(captured=False)[1], checkout.PAYMENT_FAILED)
+        self.assertEqual(self.undone, ["void_payment", "release_inventory"])
+
+    def test_reservation_and_hold_run_in_parallel(self):
+        started = time.perf_counter()
+        self.run_saga(delay=0.2)
+        self.assertLess(time.perf_counter() - started, 0.35)
@@ -0,0 +1,52 @@
+from decimal import Decimal
+from django.test import TestCase
+from ..models import CustomerOrderSummary, Order
+from ..Services import customer_summary
+from ..Status.order_status import OrderStatus
+from ..Status.payment_status import PaymentStatus
+from .helpers import CUSTOMER, make_order
+
+
+def snapshot(customer_id=CUSTOMER):
+    summary = CustomerOrderSummary.objects.get(pk=customer_id)
+    return summary.order_count, summary.lifetime_spend, summary.last_order_at, summary.status_counts()
+
+
+class CustomerSummaryTests(TestCase):
+    def test_deltas_match_a_rebuild(self):
+        paid = make_order(items=((2, "10.00"),), order_status=OrderStatus.CONFIRMED.value,
+                          payment_status=PaymentStatus.PAID.value)
+        pending = make_order()
+        customer_summary.record_created([paid, pending])
+
+        previous = (pending.order_status, pending.payment_status)
+        pending.order_status, pending.payment_status = OrderStatus.CONFIRMED.value, PaymentStatus.PAID.value
+        pending.save()
+        customer_summary.record_transition(pending, previous)
+        previous = (paid.order_status, paid.payment_status)
+        paid.order_status, paid.payment_status = OrderStatus.CANCELLED.value, PaymentStatus.REFUNDED.value
+        paid.save()
+        customer_summary.record_transition(paid, previous)
+
+        incremental = snapshot()
+        self.assertEqual(incremental[0], 2)
+        self.assertEqual(incremental[1], pending.order_total)
+        customer_summary.rebuild([CUSTOMER])
+        self.assertEqual(snapshot(), incremental)
+
+    def test_dashboard_reads_the_summary(self):
+        order = make_order(payment_status=PaymentStatus.PAID.value)
+        customer_summary.record_created([order])
+        data = self.client.get(f"/v1/orders/my-orders/{CUSTOMER}/dashboard/").json()
+        self.assertEqual((data["order_count"], Decimal(data["lifetime_spend"])), (1, order.order_total))
+        empty = self.client.get(f"/v1/orders/my-orders/{CUSTOMER + 1}/dashboard/").json()
+        self.assertEqual(empty["order_count"], 0)
+
+    def test_rebuild_only_touches_the_given_customers(self):
+        make_order()
+        other = make_order(customer_id=CUSTOMER + 1)
+        self.assertEqual(customer_summary.rebuild([CUSTOMER]), 1)
+        self.assertFalse(CustomerOrderSummary.objects.filter(pk=other.customer_id).exists())
+        Order.objects.filter(customer_id=CUSTOMER).delete()
+        customer_summary.rebuild([CUSTOMER])
+        self.assertFalse(CustomerOrderSummary.objects.filter(pk=CUSTOMER).exists())
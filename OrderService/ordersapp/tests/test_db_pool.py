@@ -0,0 +1,85 @@
+import psycopg2
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from ..db import strategies
+from ..db.postgresql_pool.base import ConnectionPool, get_pool
+
+
+class ConnectionPoolTests(TestCase):
+    def setUp(self):
+        params = connection.get_connection_params()
+        self.connect = lambda: psycopg2.connect(**params)
+        self.pools = []
+
+    def tearDown(self):
+        for pool in self.pools:
+            pool.close()
+
+    def pool(self, **options):
+        pool = ConnectionPool(**options)
+        self.pools.append(pool)
+        return pool
+
+    def test_released_connection_is_reused(self):
+        pool = self.pool()
+        first = pool.acquire(self.connect)
+        pool.release(first)
+        self.assertIs(pool.acquire(self.connect), first)
+        self.assertEqual(pool.opened, 1)
+
+    def test_exhausted_pool_times_out_until_a_connection_is_released(self):
+        pool = self.pool(max_size=1, timeout=0.05)
+        held = pool.acquire(self.connect)
+        with self.assertRaisesMessage(psycopg2.OperationalError, "connection pool exhausted"):
+            pool.acquire(self.connect)
+        pool.release(held)
+        self.assertIs(pool.acquire(self.connect), held)
+
+    def test_connection_returned_mid_transaction_is_rolled_back(self):
+        pool = self.pool()
+        conn = pool.acquire(self.connect)
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")  # psycopg2 opens a transaction
+        pool.release(conn)
+        self.assertEqual(conn.info.transaction_status, psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+        self.assertIs(pool.acquire(self.connect), conn)
+
+    def test_closed_connection_is_not_pooled(self):
+        pool = self.pool()
+        conn = pool.acquire(self.connect)
+        conn.close()
+        pool.release(conn)
+        self.assertIsNot(pool.acquire(self.connect), conn)
+        self.assertEqual(pool.opened, 2)
+
+    def test_idle_connections_past_max_idle_are_closed_above_min_size(self):
+        pool = self.pool(min_size=0, max_idle=0)
+        conn = pool.acquire(self.connect)
+        pool.release(conn)
+        self.assertIsNot(pool.acquire(self.connect), conn)
+        self.assertTrue(conn.closed)
+
+    def test_one_pool_per_alias(self):
+        settings_dict = {"POOL": {"MAX_SIZE": 3}}
+        self.assertIs(get_pool("pool-test", settings_dict), get_pool("pool-test", settings_dict))
+        self.assertEqual(get_pool("pool-test", settings_dict).max_size, 3)
+
+
+class ConnectionStrategyTests(SimpleTestCase):
+    DATABASE = {"ENGINE": "django.db.backends.postgresql", "NAME": "orders"}
+
+    def test_pool_swaps_the_engine(self):
+        database = strategies.configure(self.DATABASE, "pool", pool_max_size=5)
+        self.assertEqual(database["ENGINE"], strategies.POOL_ENGINE)
+        self.assertEqual(database["CONN_MAX_AGE"], 0)
+        self.assertEqual(database["POOL"]["MAX_SIZE"], 5)
+        self.assertEqual(self.DATABASE["ENGINE"], "django.db.backends.postgresql")
+
+    def test_pgbouncer_disables_server_side_cursors(self):
+        database = strategies.configure(self.DATABASE, "pgbouncer", conn_max_age=30)
+        self.assertTrue(database["DISABLE_SERVER_SIDE_CURSORS"])
+        self.assertEqual(database["CONN_MAX_AGE"], 30)
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            strategies.configure(self.DATABASE, "pooled")
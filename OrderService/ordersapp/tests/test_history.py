@@ -0,0 +1,68 @@
+from datetime import timedelta
+from django.test import Client, TestCase
+from django.utils import timezone
+from ..Services.history_service import OrderHistoryService
+from ..Status.order_status import Direction, OrderStatus, SortBy
+from .helpers import CUSTOMER, make_order
+
+
+class HistoryCursorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        base = timezone.now() - timedelta(days=3)
+        # Two pairs share a created_at, so pages must break ties on order_id
+        offsets = [0, 1, 1, 2, 3, 3, 4, 5]
+        cls.orders = [
+            make_order(created_at=base + timedelta(hours=offset), items=((n + 1, "3.10"),))
+            for n, offset in enumerate(offsets)
+        ]
+        make_order(customer_id=CUSTOMER + 1)
+
+    def walk(self, **options):
+        """Ids of every page, following next cursors from the first page."""
+        pages, cursor = [], None
+        while True:
+            page = OrderHistoryService.get_page(CUSTOMER, cursor=cursor, page_size=3, **options)
+            pages.append(page)
+            if not page.has_next:
+                return pages
+            cursor = page.next_cursor
+
+    def test_forward_pages_follow_created_at_then_order_id(self):
+        pages = self.walk()
+        ids = [order.order_id for page in pages for order in page.orders]
+        expected = sorted(self.orders, key=lambda o: (o.created_at, o.order_id), reverse=True)
+        self.assertEqual(ids, [order.order_id for order in expected])
+        self.assertEqual([len(page.orders) for page in pages], [3, 3, 2])
+        self.assertFalse(pages[0].has_previous)
+
+    def test_previous_cursor_returns_the_same_pages(self):
+        pages = self.walk()
+        for before, page in zip(pages, pages[1:]):
+            previous = OrderHistoryService.get_page(CUSTOMER, cursor=page.previous_cursor, page_size=3)
+            self.assertEqual([o.order_id for o in previous.orders], [o.order_id for o in before.orders])
+
+    def test_ascending_total_sort(self):
+        pages = self.walk(sort_by=SortBy.CREATED_AT.value, sort_dir=Direction.ASC.value)
+        totals = [order.order_total for page in pages for order in page.orders]
+        self.assertEqual(totals, sorted(totals))
+        self.assertEqual(len(totals), len(self.orders))
+
+    def test_invalid_or_foreign_cursor_starts_over(self):
+        first = OrderHistoryService.get_page(CUSTOMER, page_size=3)
+        total_cursor = self.walk(sort_by=SortBy.CREATED_AT.value)[0].next_cursor
+        for cursor in ("not-a-cursor", total_cursor):
+            page = OrderHistoryService.get_page(CUSTOMER, cursor=cursor, page_size=3)
+            self.assertEqual([o.order_id for o in page.orders], [o.order_id for o in first.orders])
+
+    def test_history_view_renders_page(self):
+        response = Client().get(f"/v1/orders/my-orders/{CUSTOMER}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["page"].has_next)
+
+    def test_filters_run_in_sql(self):
+        two_lines = make_order(items=((1, "1.00"), (1, "2.00")), order_status=OrderStatus.CONFIRMED.value)
+        by_sku = OrderHistoryService.build_queryset(CUSTOMER, search="sku0002")
+        self.assertEqual(list(by_sku.values_list("order_id", flat=True)), [two_lines.order_id])
+        confirmed = OrderHistoryService.build_queryset(CUSTOMER, status_filter="confirmed")
+        self.assertEqual(list(confirmed.values_list("order_id", flat=True)), [two_lines.order_id])
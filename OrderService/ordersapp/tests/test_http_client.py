@@ -0,0 +1,56 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.test import SimpleTestCase
+from ..Services import http_client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Set-Cookie", "session=leak")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SharedSessionTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/"
+        cls.host = f"127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def test_session_is_shared(self):
+        self.assertIs(http_client.get_session(), http_client.get_session())
+
+    def test_keep_alive_connections_are_reused(self):
+        http_client.reset_session()
+        before = http_client.pool_stats().get(self.host, {"hits": 0, "misses": 0})
+        for _ in range(3):
+            self.assertEqual(http_client.get(self.url).status_code, 200)
+        after = http_client.pool_stats()[self.host]
+        self.assertEqual((after["hits"] - before["hits"], after["misses"] - before["misses"]), (2, 1))
+
+    def test_cookies_are_not_carried_across_calls(self):
+        http_client.get(self.url)
+        self.assertEqual(len(http_client.get_session().cookies), 0)
+
+    def test_reset_drops_the_session(self):
+        session = http_client.get_session()
+        http_client.reset_session()
+        self.assertIsNot(http_client.get_session(), session)
@@ -0,0 +1,74 @@
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase
+from django.utils import timezone
+from ..models import IdempotencyKey, Order
+from ..Services import idempotency
+from ..Status.order_status import OrderStatus
+from .helpers import CUSTOMER, create_body, make_order
+
+
+class IdempotencyTests(TestCase):
+    def post(self, body, key):
+        return self.client.post(
+            "/v1/orders/create/", body, content_type="application/json", HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_replay_returns_the_original_order(self):
+        first = self.post(create_body(), "replay-key")
+        second = self.post(create_body(), "replay-key")
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.json()["order_id"], first.json()["order_id"])
+        self.assertEqual(second[idempotency.REPLAYED_HEADER], "true")
+        self.assertEqual(Order.objects.filter(customer_id=CUSTOMER).count(), 1)
+
+    def test_key_reused_with_another_body(self):
+        self.post(create_body(), "conflict-key")
+        response = self.post(create_body(quantity=3), "conflict-key")
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Order.objects.filter(customer_id=CUSTOMER).count(), 1)
+
+    def test_in_progress_key_times_out_with_409(self):
+        body = create_body()
+        IdempotencyKey.objects.create(key="busy-key", request_hash=idempotency.fingerprint(body))
+        with mock.patch.object(idempotency, "WAIT_SECONDS", 0.2):
+            response = self.post(body, "busy-key")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertFalse(Order.objects.filter(customer_id=CUSTOMER).exists())
+
+    def test_reuse_error_names_the_key(self):
+        self.post(create_body(), "named-key")
+        with self.assertRaises(idempotency.KeyReusedError) as raised:
+            idempotency.claim("named-key", idempotency.fingerprint(create_body(quantity=3)))
+        self.assertEqual(raised.exception.key, "named-key")
+        self.assertIn("named-key", self.post(create_body(quantity=3), "named-key").json()["error"])
+
+    def test_abandoned_claim_resumes_its_pending_order(self):
+        # The original committed its PENDING order and claim, then died before finishing
+        body = create_body()
+        pending = make_order(items=((2, "12.50"),))
+        IdempotencyKey.objects.create(
+            key="orphan-key", request_hash=idempotency.fingerprint(body), order_id=pending.order_id,
+            created_at=timezone.now() - timedelta(seconds=idempotency.CLAIM_TIMEOUT + 1),
+        )
+        response = self.post(body, "orphan-key")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["order_id"], pending.order_id)
+        self.assertEqual(Order.objects.filter(customer_id=CUSTOMER).count(), 1)
+        pending.refresh_from_db()
+        self.assertEqual(pending.order_status, OrderStatus.CONFIRMED.value)
+        self.assertEqual(IdempotencyKey.objects.get(key="orphan-key").status, idempotency.COMPLETED)
+
+    def test_abandoned_claim_whose_order_moved_on_creates_a_new_one(self):
+        body = create_body()
+        cancelled = make_order(order_status=OrderStatus.CANCELLED.value)
+        IdempotencyKey.objects.create(
+            key="stale-key", request_hash=idempotency.fingerprint(body), order_id=cancelled.order_id,
+            created_at=timezone.now() - timedelta(seconds=idempotency.CLAIM_TIMEOUT + 1),
+        )
+        response = self.post(body, "stale-key")
+        self.assertEqual(response.status_code, 201)
+        self.assertNotEqual(response.json()["order_id"], cancelled.order_id)
+        self.assertEqual(IdempotencyKey.objects.get(key="stale-key").order_id, response.json()["order_id"])
@@ -0,0 +1,26 @@
+from django.db import connection
+from django.test import TestCase
+from ..models import Order, OrderItem
+
+
+class HistoryIndexTests(TestCase):
+    def indexes(self, model):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+        return {name: spec for name, spec in constraints.items() if spec["index"]}
+
+    def test_history_indexes_exist(self):
+        indexes = self.indexes(Order)
+        self.assertEqual(indexes["order_customer_created_idx"]["columns"], ["customer_id", "created_at", "order_id"])
+        self.assertEqual(indexes["order_customer_created_idx"]["orders"], ["ASC", "DESC", "DESC"])
+        self.assertIn("order_open_customer_idx", indexes)
+        self.assertIn("order_open_status_idx", indexes)
+
+    def test_declared_indexes_match_the_database(self):
+        for model in (Order, OrderItem):
+            declared = {index.name for index in model._meta.indexes}
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                if cursor.fetchone() is None:
+                    declared.discard("orderitem_sku_upper_trgm_idx")  # skipped without pg_trgm
+            self.assertLessEqual(declared, set(self.indexes(model)), model.__name__)
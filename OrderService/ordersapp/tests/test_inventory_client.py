@@ -0,0 +1,66 @@
+import time
+from unittest import mock
+from django.test import SimpleTestCase
+from ..Services import inventory_client
+from ..Services.resilience import BulkEndpoint, CircuitBreaker, Dependency
+
+LINES = [{"product_id": 1, "quantity": 2}, {"product_id": 2, "quantity": 1}]
+
+
+def response(status_code=200, body=None):
+    r = mock.Mock(status_code=status_code)
+    r.json.side_effect = ValueError("malformed") if body is None else None
+    r.json.return_value = body
+    return r
+
+
+class InventoryReservationTests(SimpleTestCase):
+    def setUp(self):
+        for name, value in (
+            ("MOCK_INVENTORY", False),
+            ("INVENTORY", Dependency("test-inventory", breaker=CircuitBreaker("test-inventory", min_calls=1000))),
+            ("BULK_RESERVE", BulkEndpoint("test bulk reserve", reprobe_seconds=0.2)),
+            ("BULK_RELEASE", BulkEndpoint("test bulk release", reprobe_seconds=0.2)),
+        ):
+            patcher = mock.patch.object(inventory_client, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.post = self.patch_post(lambda url, **kwargs: response(200, {}))
+
+    def patch_post(self, handler):
+        patcher = mock.patch.object(inventory_client.http_client, "post", side_effect=handler)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def urls(self):
+        return [call.args[0].rsplit("/v1/inventory", 1)[1] for call in self.post.call_args_list]
+
+    def test_all_lines_reserved_in_one_call(self):
+        self.assertTrue(inventory_client.reserve_inventory(5, LINES))
+        self.assertEqual(self.urls(), ["/reserve/bulk/"])
+        self.assertEqual(self.post.call_args.kwargs["json"]["items"][0], {"product_id": 1, "warehouse": "WH1", "quantity": 2})
+
+    def test_unsupported_bulk_falls_back_then_is_probed_again(self):
+        self.post = self.patch_post(lambda url, **kwargs: response(404 if "/bulk/" in url else 200, {}))
+        self.assertTrue(inventory_client.reserve_inventory(5, LINES))
+        self.assertTrue(inventory_client.reserve_inventory(6, LINES))
+        self.assertEqual(sorted(self.urls()), ["/reserve/"] * 4 + ["/reserve/bulk/"])
+        time.sleep(0.25)
+        inventory_client.reserve_inventory(7, LINES)
+        self.assertEqual(self.urls().count("/reserve/bulk/"), 2)
+
+    def test_failed_line_releases_the_reserved_ones(self):
+        self.post = self.patch_post(lambda url, **kwargs: response(
+            404 if "/bulk/" in url else 409 if kwargs.get("json", {}).get("product_id") == 2 else 200, {}
+        ))
+        self.assertFalse(inventory_client.reserve_inventory(5, LINES))
+        release = self.post.call_args_list[-1]
+        self.assertTrue(release.args[0].endswith("/release/"))
+        self.assertEqual(release.kwargs["json"], {"order_id": 5, "items": [{"product_id": 1, "quantity": 2}]})
+
+    def test_bulk_release_results_and_malformed_json(self):
+        self.post = self.patch_post(lambda url, **kwargs: response(200, {"results": [{"order_id": 1, "released": True}]}))
+        self.assertEqual(inventory_client.release_inventory_bulk({1: LINES, 2: LINES}), {1: True, 2: False})
+        self.post = self.patch_post(lambda url, **kwargs: response(200))
+        self.assertEqual(inventory_client.release_inventory_bulk({1: LINES}), {1: False})
+        self.assertTrue(inventory_client.BULK_RELEASE.available())  # a bad body isn't an unsupported endpoint
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import time
+from unittest import mock
+from django.test import SimpleTestCase
+from ..Services import mock_shipping
+from ..Status.shipping_status import ShippingStatus
+
+
+def shipment(status=mock_shipping.PENDING):
+    return mock_shipping.MockShipment(status, 700000, time.time())
+
+
+class MemoryStoreTests(SimpleTestCase):
+    def test_least_recently_used_shipments_are_evicted_at_capacity(self):
+        store = mock_shipping.MemoryStore(max_entries=2)
+        store.transform([1, 2], lambda oid, record: shipment())
+        store.get_many([1])  # 2 is now the least recently used
+        store.transform([3], lambda oid, record: shipment())
+        self.assertEqual(sorted(store.get_many([1, 2, 3])), [1, 3])
+
+    def test_shipments_expire_after_their_last_write(self):
+        store = mock_shipping.MemoryStore(ttl=-1)
+        store.transform([1], lambda oid, record: shipment())
+        self.assertEqual(store.get_many([1]), {})
+
+
+class SqliteStoreTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "shipments.sqlite3")
+
+    def test_workers_share_shipments(self):
+        first, second = mock_shipping.SqliteStore(self.path), mock_shipping.SqliteStore(self.path)
+        first.transform([1], lambda oid, record: shipment(mock_shipping.SHIPPED))
+        self.assertEqual(second.get_many([1])[1].status, mock_shipping.SHIPPED)
+        second.transform([1], lambda oid, record: shipment(record.status + 1))
+        self.assertEqual(first.get_many([1])[1].status, mock_shipping.SHIPPED + 1)
+
+    def test_prune_bounds_the_store(self):
+        store = mock_shipping.SqliteStore(self.path, max_entries=2)
+        with mock.patch.object(mock_shipping, "PRUNE_EVERY", 1):
+            store.transform([1, 2, 3], lambda oid, record: shipment())
+        self.assertEqual(len(store.get_many([1, 2, 3])), 2)
+        expiring = mock_shipping.SqliteStore(self.path, ttl=-1)
+        expiring.transform([4], lambda oid, record: shipment())
+        self.assertEqual(store.get_many([4]), {})
+
+
+class MockShippingTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(mock_shipping, "_store", mock_shipping.MemoryStore())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_random_progression_steps_on_each_fetch(self):
+        self.assertEqual(mock_shipping.create(1)["status"], ShippingStatus.PENDING.value)
+        with mock.patch.object(mock_shipping.random, "choice", side_effect=lambda options: options[0]):
+            statuses = [mock_shipping.fetch([1])[1]["status"] for _ in range(3)]
+        self.assertEqual(statuses, [ShippingStatus.SHIPPED.value] + [ShippingStatus.DELIVERED.value] * 2)
+
+    @mock.patch.object(mock_shipping, "PROGRESSION", "timed")
+    @mock.patch.object(mock_shipping, "FAILURE_RATE", 0)
+    def test_timed_progression_follows_the_clock_without_writing(self):
+        now = 1_700_000_000.0
+        placed = {1: now - 10, 2: now - mock_shipping.SHIP_AFTER - 10, 3: now - mock_shipping.DELIVER_AFTER - 10}
+        with mock.patch.object(mock_shipping, "_FROZEN", now):
+            first = mock_shipping.fetch([1, 2, 3], placed)
+            self.assertEqual(mock_shipping.fetch([1, 2, 3], placed), first)
+        self.assertEqual(
+            [first[oid]["status"] for oid in (1, 2, 3)],
+            [ShippingStatus.PENDING.value, ShippingStatus.SHIPPED.value, ShippingStatus.DELIVERED.value],
+        )
+        self.assertEqual(mock_shipping._store.get_many([1, 2, 3]), {})
+
+    @mock.patch.object(mock_shipping, "PROGRESSION", "timed")
+    def test_update_pins_the_status(self):
+        mock_shipping.create(1)
+        mock_shipping.update(1, ShippingStatus.FAILED.value)
+        self.assertEqual(mock_shipping.fetch([1])[1]["status"], ShippingStatus.FAILED.value)
+
+    def test_failure_rate_picks_a_share_of_order_ids(self):
+        for rate, expected in ((0, 0), (0.25, 250), (1, 1000)):
+            with mock.patch.object(mock_shipping, "FAILURE_RATE", rate):
+                failing = sum(mock_shipping._fails(oid) for oid in range(1, 1001))
+            self.assertAlmostEqual(failing, expected, delta=50)
@@ -0,0 +1,81 @@
+import time
+from unittest import mock
+from django.test import Client, TestCase
+from ..Services import order_cache
+from ..Services.order_services import OrderService
+from ..Status.order_status import OrderStatus
+from .helpers import make_order
+
+
+class OrderCacheTests(TestCase):
+    backend = order_cache.LRUCache
+
+    def setUp(self):
+        patcher = mock.patch.object(order_cache, "_backend", self.backend())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.loader = mock.Mock(side_effect=lambda order_id: {"order_id": order_id})
+
+    def test_read_through(self):
+        for _ in range(3):
+            self.assertEqual(order_cache.get_or_load(1, self.loader), {"order_id": 1})
+        self.loader.assert_called_once_with(1)
+        order_cache.get_or_load(1, self.loader, refresh=True)
+        self.assertEqual(self.loader.call_count, 2)
+        self.assertIsNone(order_cache.get_or_load(2, lambda order_id: None))  # misses aren't cached
+
+    def test_invalidate_drops_the_entry_again_on_commit(self):
+        order_cache.get_or_load(1, self.loader)
+        with self.captureOnCommitCallbacks() as callbacks:
+            order_cache.invalidate(1)
+            order_cache.get_or_load(1, self.loader)  # a reader re-caches the pre-commit row
+        for callback in callbacks:
+            callback()
+        order_cache.get_or_load(1, self.loader)
+        self.assertEqual(self.loader.call_count, 3)
+
+    def test_tombstone_blocks_recaching_until_a_primary_read(self):
+        with mock.patch.object(order_cache, "WRITE_HOLD_SECONDS", 60):
+            order_cache.get_or_load(1, self.loader)
+            order_cache.invalidate(1)
+            order_cache.get_or_load(1, self.loader)
+            order_cache.get_or_load(1, self.loader)
+            self.assertEqual(self.loader.call_count, 3)
+            order_cache.get_or_load(1, self.loader, refresh=True)
+            order_cache.get_or_load(1, self.loader)
+        self.assertEqual(self.loader.call_count, 4)
+
+    def test_update_is_visible_to_other_readers(self):
+        order = make_order()
+        url = f"/v1/orders/{order.order_id}/details/"
+        reader = Client()
+        self.assertEqual(reader.get(url).json()["order_status"], OrderStatus.PENDING.value)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                f"/v1/orders/{order.order_id}/update/", {"order_status": OrderStatus.CONFIRMED.value},
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(reader.get(url).json()["order_status"], OrderStatus.CONFIRMED.value)
+        self.assertEqual(OrderService.get_order_data(order.order_id)["order_status"], OrderStatus.CONFIRMED.value)
+
+
+class DjangoOrderCacheTests(OrderCacheTests):
+    backend = order_cache.DjangoCache
+
+    def setUp(self):
+        super().setUp()
+        order_cache._backend.clear()
+
+
+class LRUCacheTests(TestCase):
+    def test_evicts_least_recently_used_and_expired(self):
+        cache = order_cache.LRUCache(max_entries=2, ttl=60)
+        cache.set(1, "a")
+        cache.set(2, "b")
+        cache.get(1)
+        cache.set(3, "c")
+        self.assertEqual((cache.get(1), cache.get(2), cache.get(3)), ("a", None, "c"))
+        cache.set(4, "d", ttl=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get(4))
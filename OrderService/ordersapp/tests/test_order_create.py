@@ -0,0 +1,36 @@
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from ..models import Order, OrderItem
+from ..serializer import OrderSerializer
+from .helpers import CUSTOMER
+
+
+def order_body(lines):
+    return {
+        "customer_id": CUSTOMER,
+        "items": [
+            {"product_id": n, "sku": f"SKU{n:04d}", "quantity": 2, "unit_price": "1.25"} for n in range(1, lines + 1)
+        ],
+    }
+
+
+class OrderCreateWriteTests(TestCase):
+    def test_serializer_inserts_items_in_one_statement(self):
+        serializer = OrderSerializer(data=order_body(20))
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.assertNumQueries(2):  # the order, then every item
+            order = serializer.save()
+        self.assertEqual(order.order_total, Decimal("50.00"))
+        self.assertEqual(OrderItem.objects.filter(order=order).count(), 20)
+
+    def test_create_order_statements_do_not_grow_with_lines(self):
+        counts = []
+        for lines in (1, 25):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post("/v1/orders/create/", order_body(lines), content_type="application/json")
+            self.assertEqual(response.status_code, 201)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(Order.objects.filter(customer_id=CUSTOMER).count(), 2)
@@ -0,0 +1,56 @@
+import json
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase
+from django.utils import timezone
+from ..Services import order_export
+from ..Status.order_status import OrderStatus
+from .helpers import CUSTOMER, make_order
+
+
+class OrderListTests(TestCase):
+    url = "/v1/orders/"
+
+    @classmethod
+    def setUpTestData(cls):
+        base = timezone.now() - timedelta(days=2)
+        # Two orders share a created_at, so the cursor must break ties on order_id
+        cls.orders = [
+            make_order(created_at=base + timedelta(hours=offset), items=((1, "5.00"), (2, "1.00")))
+            for offset in (0, 1, 1, 2, 3)
+        ]
+        cls.confirmed = make_order(customer_id=CUSTOMER + 1, order_status=OrderStatus.CONFIRMED.value)
+
+    def test_cursor_pages_cover_every_order_once(self):
+        ids, url = [], f"{self.url}?customer_id={CUSTOMER}&page_size=2"
+        while url:
+            page = self.client.get(url).json()
+            self.assertLessEqual(len(page["results"]), 2)
+            ids += [order["order_id"] for order in page["results"]]
+            url = page["next"]
+        expected = sorted(self.orders, key=lambda o: (o.created_at, o.order_id), reverse=True)
+        self.assertEqual(ids, [order.order_id for order in expected])
+
+    def test_filters(self):
+        page = self.client.get(self.url, {"status": "confirmed"}).json()
+        self.assertEqual([order["order_id"] for order in page["results"]], [self.confirmed.order_id])
+        after = self.orders[-1].created_at.isoformat()
+        page = self.client.get(self.url, {"customer_id": CUSTOMER, "created_after": after}).json()
+        self.assertEqual([order["order_id"] for order in page["results"]], [self.orders[-1].order_id])
+        self.assertEqual(self.client.get(self.url, {"created_before": "yesterday"}).status_code, 400)
+
+    def test_ndjson_export_streams_every_order_in_chunks(self):
+        with mock.patch.object(order_export, "EXPORT_CHUNK_SIZE", 2):
+            response = self.client.get(self.url, {"customer_id": CUSTOMER, "export": "ndjson"})
+            self.assertEqual(response["Content-Type"], "application/x-ndjson")
+            rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual({row["order_id"] for row in rows}, {order.order_id for order in self.orders})
+        self.assertTrue(all(len(row["items"]) == 2 for row in rows))
+
+    def test_json_export_is_one_array(self):
+        response = self.client.get(self.url, {"export": "JSON"})
+        rows = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(rows), len(self.orders) + 1)
+        empty = self.client.get(self.url, {"customer_id": 1, "export": "json"})
+        self.assertEqual(json.loads(b"".join(empty.streaming_content)), [])
+        self.assertEqual(self.client.get(self.url, {"export": "csv"}).status_code, 400)
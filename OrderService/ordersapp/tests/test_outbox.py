@@ -0,0 +1,68 @@
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase
+from django.utils import timezone
+from ..models import OutboxEvent
+from ..Services import outbox
+from ..Status.outbox_status import OutboxEventType, OutboxStatus
+from .helpers import CUSTOMER, create_body
+
+
+class OutboxTests(TestCase):
+    def event(self, **fields):
+        return OutboxEvent.objects.create(
+            event_type=OutboxEventType.SEND_NOTIFICATION.value,
+            payload={"event": "ORDER_CREATED", "data": {"order_id": 1}}, **fields
+        )
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        event = self.event()
+        before = timezone.now()
+        with mock.patch.object(outbox, "dispatch", return_value=False):
+            self.assertEqual(outbox.process_batch(), (0, 1, 0))
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts, event.last_error), (OutboxStatus.PENDING.value, 1, "delivery failed"))
+        self.assertGreaterEqual(event.next_attempt_at, before)
+        self.assertLessEqual(event.next_attempt_at, timezone.now() + timedelta(seconds=outbox.BACKOFF_BASE))
+        self.assertEqual(outbox.claim_batch(), [] if event.next_attempt_at > timezone.now() else [event])
+
+    def test_gives_up_after_max_attempts(self):
+        event = self.event(attempts=outbox.MAX_ATTEMPTS - 1)
+        with mock.patch.object(outbox, "dispatch", side_effect=RuntimeError("boom")):
+            self.assertEqual(outbox.process_batch(), (0, 0, 1))
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.last_error), (OutboxStatus.FAILED.value, "boom"))
+
+    def test_delivered(self):
+        event = self.event()
+        with mock.patch.object(outbox, "send_notification", return_value=True) as send:
+            self.assertEqual(outbox.process_batch(), (1, 0, 0))
+        send.assert_called_once_with("ORDER_CREATED", {"order_id": 1})
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxStatus.DONE.value)
+        self.assertIsNotNone(event.processed_at)
+
+    def test_backoff_is_capped_full_jitter(self):
+        for attempts in range(1, 15):
+            cap = min(outbox.BACKOFF_MAX, outbox.BACKOFF_BASE * 2 ** (attempts - 1))
+            self.assertTrue(0 <= outbox.backoff_delay(attempts) <= cap)
+
+    def test_lease_taken_over_by_another_worker_is_skipped(self):
+        event = self.event()
+        claimed, = outbox.claim_batch()
+        OutboxEvent.objects.filter(event_id=event.event_id).update(next_attempt_at=timezone.now())
+        self.assertFalse(outbox.renew_lease(claimed))
+        self.assertTrue(outbox.renew_lease(outbox.claim_batch()[0]))
+
+    def test_created_order_queues_shipment_and_notification(self):
+        response = self.client.post("/v1/orders/create/", create_body(), content_type="application/json")
+        order_id = response.json()["order_id"]
+        events = {event.event_type: event for event in OutboxEvent.objects.all()}
+        self.assertEqual(set(events), {OutboxEventType.CREATE_SHIPMENT.value, OutboxEventType.SEND_NOTIFICATION.value})
+        self.assertEqual(events[OutboxEventType.CREATE_SHIPMENT.value].payload, {"order_id": order_id, "customer_id": CUSTOMER})
+
+        shipment = events[OutboxEventType.CREATE_SHIPMENT.value]
+        with mock.patch.object(outbox, "create_shipment", return_value={"status": "Pending"}) as create:
+            self.assertTrue(outbox.dispatch(shipment))
+        # A redelivery carries the same key, so the shipping service creates one shipment
+        create.assert_called_once_with(order_id, CUSTOMER, idempotency_key=f"outbox-{shipment.event_id}")
@@ -0,0 +1,95 @@
+import gzip
+import os
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from django.db import connection
+from django.test import TestCase
+from ..db import bulk_import, partitions
+from ..models import Order, OrderItem
+from ..Status.order_status import OrderStatus
+from ..Status.payment_status import PaymentStatus
+from .helpers import make_order
+
+# Well before any partition the migrations create, so these orders start in the DEFAULT partitions
+MONTH = datetime(2001, 3, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_of(table, where, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT tableoid::regclass::text FROM {table} WHERE {where}", params)
+        return cursor.fetchone()[0]
+
+
+class PartitionTests(TestCase):
+    def test_create_month_moves_rows_out_of_the_default_partition(self):
+        order = make_order(created_at=MONTH.replace(day=15))
+        self.assertEqual(partitions.months_in_default(), [MONTH])
+        partitions.ensure_months([MONTH])
+        self.assertIn(MONTH, partitions.monthly_partitions())
+        self.assertEqual(partitions.months_in_default(), [])
+        self.assertEqual(
+            partition_of(partitions.ORDERS, "order_id = %s", [order.order_id]),
+            partitions.partition_name(partitions.ORDERS, MONTH),
+        )
+        self.assertEqual(
+            partition_of(partitions.ITEMS, "order_id = %s", [order.order_id]),
+            partitions.partition_name(partitions.ITEMS, MONTH),
+        )
+        self.assertEqual(Order.objects.get(order_id=order.order_id).items.count(), 1)
+
+    def test_upcoming_months_exist(self):
+        self.assertEqual(partitions.missing_months(months_ahead=1), [])
+
+    def test_archive_refuses_a_month_with_open_orders(self):
+        make_order(created_at=MONTH)
+        partitions.ensure_months([MONTH])
+        with tempfile.TemporaryDirectory() as archive_dir:
+            with self.assertRaises(partitions.PartitionNotColdError):
+                partitions.archive_month(MONTH, archive_dir)
+            self.assertEqual(os.listdir(archive_dir), [])
+        self.assertIn(MONTH, partitions.monthly_partitions())
+
+    def test_archive_writes_the_month_and_drops_it(self):
+        order = make_order(created_at=MONTH, order_status=OrderStatus.DELIVERED.value)
+        partitions.ensure_months([MONTH])
+        with tempfile.TemporaryDirectory() as archive_dir:
+            archived = partitions.archive_month(MONTH, archive_dir)
+            self.assertEqual([rows for _, rows in archived], [1, 1])
+            with gzip.open(archived[0][0], "rt") as orders_csv:
+                self.assertIn(str(order.order_id), orders_csv.read())
+        self.assertNotIn(MONTH, partitions.monthly_partitions())
+        self.assertFalse(Order.objects.filter(order_id=order.order_id).exists())
+        self.assertFalse(OrderItem.objects.filter(order_id=order.order_id).exists())
+
+    def test_created_at_range_is_pruned_to_its_month(self):
+        this_month = partitions.month_start(make_order().created_at)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"EXPLAIN SELECT * FROM {partitions.ORDERS} WHERE created_at >= %s AND created_at < %s",
+                [this_month, partitions.add_months(this_month, 1)],
+            )
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        self.assertIn(partitions.partition_name(partitions.ORDERS, this_month), plan)
+        self.assertNotIn(partitions.default_partition(partitions.ORDERS), plan)
+
+
+class OrderIdUniquenessTests(TestCase):
+    def order_row(self, order_id, created_at=MONTH):
+        return (order_id, 1, OrderStatus.PENDING.value, PaymentStatus.PENDING.value, "1.00", created_at)
+
+    def test_import_rejects_stored_and_repeated_ids(self):
+        stored = make_order()
+        rejected = []
+        unique = bulk_import._new_order_ids(
+            [self.order_row(stored.order_id), self.order_row(10**9), self.order_row(10**9)], rejected
+        )
+        self.assertEqual([row[0] for row in unique], [10**9])
+        self.assertEqual([reason for _, reason, _ in rejected], ["order_id: already exists"] * 2)
+
+    def test_duplicates_across_months_fail_the_load(self):
+        first = make_order()
+        make_order(order_id=first.order_id, created_at=MONTH)  # the key is (order_id, created_at)
+        loader = bulk_import.BulkLoader()
+        loader._imported_ids = (first.order_id, first.order_id)
+        with self.assertRaisesMessage(bulk_import.BulkImportError, str(first.order_id)):
+            loader._check_unique_ids()
@@ -0,0 +1,59 @@
+import time
+from unittest import mock
+from django.test import SimpleTestCase
+from ..Services import payment_client
+from ..Services.resilience import BulkEndpoint, CircuitBreaker, Dependency
+
+
+def response(status_code=200, body=None):
+    r = mock.Mock(status_code=status_code, text="")
+    r.json.side_effect = ValueError("malformed") if body is None else None
+    r.json.return_value = body
+    return r
+
+
+class PaymentBulkRefundTests(SimpleTestCase):
+    def setUp(self):
+        for name, value in (
+            ("MOCK_PAYMENT", False),
+            ("PAYMENT", Dependency("test-payment", breaker=CircuitBreaker("test-payment", min_calls=1000))),
+            ("BULK_REFUND", BulkEndpoint("test bulk refund", reprobe_seconds=0.2)),
+            ("BULK_REFUND_BATCH_SIZE", 2),
+        ):
+            patcher = mock.patch.object(payment_client, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def patch_post(self, handler):
+        patcher = mock.patch.object(payment_client.http_client, "post", side_effect=handler)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def urls(self, post):
+        return [call.args[0].rsplit("/v1/payments", 1)[1] for call in post.call_args_list]
+
+    def test_refunds_are_batched(self):
+        post = self.patch_post(lambda url, **kwargs: response(200, {"results": [
+            {"order_id": order_id, "status": "REFUNDED"} for order_id in kwargs["json"]["order_ids"] if order_id != 2
+        ]}))
+        self.assertEqual(payment_client.refund_payments_bulk([1, 2, 3]), {1: True, 2: False, 3: True})
+        self.assertEqual(self.urls(post), ["/refund/bulk/"] * 2)
+        self.assertEqual([call.kwargs["json"] for call in post.call_args_list], [{"order_ids": [1, 2]}, {"order_ids": [3]}])
+
+    def test_unsupported_bulk_falls_back_then_is_probed_again(self):
+        post = self.patch_post(lambda url, **kwargs: response(404 if "/bulk/" in url else 200, {}))
+        self.assertEqual(payment_client.refund_payments_bulk([1, 2, 3]), {1: True, 2: True, 3: True})
+        self.assertEqual(sorted(self.urls(post)), ["/1/refund/", "/2/refund/", "/3/refund/", "/refund/bulk/"])
+        time.sleep(0.25)
+        payment_client.refund_payments_bulk([4])
+        self.assertEqual(self.urls(post).count("/refund/bulk/"), 2)
+
+    def test_malformed_json_confirms_nothing(self):
+        self.patch_post(lambda url, **kwargs: response(200))
+        self.assertEqual(payment_client.refund_payments_bulk([1, 2]), {1: False, 2: False})
+        self.assertTrue(payment_client.BULK_REFUND.available())  # a bad body isn't an unsupported endpoint
+
+    def test_rejected_batch_is_left_for_the_retry(self):
+        self.patch_post(lambda url, **kwargs: response(503, {}))
+        self.assertEqual(payment_client.refund_payments_bulk([1]), {1: False})
+        self.assertTrue(payment_client.BULK_REFUND.available())
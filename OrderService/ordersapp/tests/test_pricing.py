@@ -0,0 +1,71 @@
+import random
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from ..models import CustomerOrderSummary, Order
+from ..Services import customer_summary
+from ..Services.order_services import OrderService
+from ..Services.pricing import PricingEngine
+from ..Status.payment_status import PaymentStatus
+from .helpers import CUSTOMER, make_order
+
+
+class PricingParityTests(TestCase):
+    def test_batch_pricing_matches_calculate_order_total(self):
+        rng = random.Random(7)
+        item_lists = [
+            [{"quantity": rng.randint(1, 9), "unit_price": Decimal(rng.randint(1, 99999)).scaleb(-2)}
+             for _ in range(rng.randint(1, 6))]
+            for _ in range(500)
+        ]
+        # Half-cent tax amounts round to even: 0.105 -> 0.10, 0.315 -> 0.32
+        item_lists += [[{"quantity": 1, "unit_price": Decimal("0.10")}], [{"quantity": 1, "unit_price": Decimal("0.30")}]]
+        expected = [OrderService.calculate_order_total(items) for items in item_lists]
+        self.assertEqual(PricingEngine.price_orders(item_lists), expected)
+        self.assertEqual(expected[-2:], [Decimal("50.10"), Decimal("50.32")])
+
+    def test_sql_annotations_match_calculate_order_total(self):
+        orders = [
+            make_order(items=((3, "19.99"), (1, "0.10"))),
+            make_order(items=((7, "1234.56"),)),
+            make_order(items=((1, "0.30"),)),
+        ]
+        empty = Order.objects.create(customer_id=CUSTOMER)
+        priced = Order.objects.filter(customer_id=CUSTOMER).annotate(**PricingEngine.sql_annotations())
+        totals = {order.order_id: order.calculated_total for order in priced}
+        for order in orders:
+            self.assertEqual(totals[order.order_id], OrderService.calculate_order_total(order))
+        self.assertEqual(totals[empty.order_id], OrderService.SHIPPING_COST)
+
+
+class RepriceOrdersTests(TestCase):
+    def reprice(self, *args):
+        out = StringIO()
+        call_command("reprice_orders", "--chunk-size", "2", *args, stdout=out)
+        return out.getvalue()
+
+    def test_rewrites_stale_totals_only(self):
+        orders = [make_order(items=((n, "4.99"),)) for n in range(1, 6)]
+        stale = orders[2]
+        Order.objects.filter(pk=stale.pk).update(order_total=Decimal("1.00"))
+        empty = Order.objects.create(customer_id=CUSTOMER, order_total=Decimal("7.00"))
+
+        self.assertIn("1 would change", self.reprice("--dry-run"))
+        self.assertEqual(Order.objects.get(pk=stale.pk).order_total, Decimal("1.00"))
+
+        self.assertIn("1 changed", self.reprice())
+        self.assertEqual(Order.objects.get(pk=stale.pk).order_total, stale.order_total)
+        self.assertEqual(Order.objects.get(pk=empty.pk).order_total, Decimal("7.00"))  # no items: untouched
+
+    def test_customer_summaries_follow_the_new_totals(self):
+        paid = [make_order(items=((2, "10.00"),), payment_status=PaymentStatus.PAID.value) for _ in range(2)]
+        pending = make_order(items=((1, "10.00"),))
+        Order.objects.filter(pk__in=[paid[0].pk, pending.pk]).update(order_total=Decimal("1.00"))
+        customer_summary.rebuild([CUSTOMER])
+
+        self.reprice()
+        spend = CustomerOrderSummary.objects.get(pk=CUSTOMER).lifetime_spend
+        self.assertEqual(spend, paid[0].order_total + paid[1].order_total)
+        customer_summary.rebuild([CUSTOMER])
+        self.assertEqual(CustomerOrderSummary.objects.get(pk=CUSTOMER).lifetime_spend, spend)
@@ -0,0 +1,95 @@
+import time
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import Client, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from ..db import replicas
+from ..models import Order
+from .helpers import CUSTOMER, create_body, make_order
+
+
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    router = replicas.PrimaryReplicaRouter()
+
+    def test_reads_follow_the_request_routing(self):
+        self.assertIsNone(self.router.db_for_read(Order))  # outside a request: Django's default
+        with replicas._reading_from(replicas.REPLICA_ALIAS):
+            self.assertEqual(self.router.db_for_read(Order), replicas.REPLICA_ALIAS)
+            loaded = Order()
+            loaded._state.db = DEFAULT_DB_ALIAS
+            self.assertEqual(self.router.db_for_read(Order, instance=loaded), DEFAULT_DB_ALIAS)
+
+    def test_writes_go_to_the_primary_and_are_noted(self):
+        token = replicas._request.set(replicas._RequestRouting())
+        try:
+            self.assertEqual(self.router.db_for_write(Order), DEFAULT_DB_ALIAS)
+            self.assertTrue(replicas._request.get().wrote)
+        finally:
+            replicas._request.reset(token)
+
+    def test_replica_is_never_migrated(self):
+        self.assertFalse(self.router.allow_migrate(replicas.REPLICA_ALIAS, "ordersapp"))
+        self.assertIsNone(self.router.allow_migrate(DEFAULT_DB_ALIAS, "ordersapp"))
+
+
+# Runs when a replica is configured (DB_REPLICA_HOST). Under test the replica alias mirrors the
+# test database over its own connection, which can't see the test's uncommitted rows: those
+# stand in for writes the replica hasn't replayed yet.
+REPLICA_CONFIGURED = replicas.replica_enabled()
+
+
+@skipUnless(REPLICA_CONFIGURED, "no replica database configured (DB_REPLICA_HOST)")
+class ReplicaRoutingTests(TestCase):
+    # The runner sets up every listed alias, skipped classes included
+    databases = {DEFAULT_DB_ALIAS, replicas.REPLICA_ALIAS} if REPLICA_CONFIGURED else {DEFAULT_DB_ALIAS}
+
+    def setUp(self):
+        self.lag = SimpleNamespace(lag=0.0)
+        patcher = mock.patch.object(replicas, "_monitor", return_value=self.lag)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_read_alias_follows_lag_and_pin(self):
+        self.assertEqual(replicas.choose_read_alias(), replicas.REPLICA_ALIAS)
+        self.lag.lag = replicas.MAX_LAG + 1
+        self.assertEqual(replicas.choose_read_alias(), DEFAULT_DB_ALIAS)
+        self.lag.lag = None
+        self.assertEqual(replicas.choose_read_alias(), DEFAULT_DB_ALIAS)
+        self.lag.lag = 0.0
+        token = replicas._request.set(replicas._RequestRouting(pinned=True))
+        try:
+            self.assertEqual(replicas.choose_read_alias(), DEFAULT_DB_ALIAS)
+        finally:
+            replicas._request.reset(token)
+
+    def test_replica_reads_use_the_replica_connection(self):
+        order = make_order()
+        exists = replicas.replica_reads(lambda: Order.objects.filter(order_id=order.order_id).exists())
+        with CaptureQueriesContext(connections[replicas.REPLICA_ALIAS]) as replica_queries:
+            self.assertFalse(exists())  # not "replicated" yet
+        self.assertEqual(len(replica_queries), 1)
+        self.assertTrue(Order.objects.filter(order_id=order.order_id).exists())  # outside: primary
+
+    def test_writes_pin_the_client_to_the_primary(self):
+        client = Client()
+        created = client.post("/v1/orders/create/", create_body(), content_type="application/json")
+        self.assertEqual(created.status_code, 201)
+        self.assertIn(replicas.PIN_HEADER, created)
+        self.assertIn(replicas.PIN_COOKIE, client.cookies)
+        url = f"/v1/orders/{created.json()['order_id']}/details/"
+
+        self.assertEqual(Client().get(url).status_code, 404)  # unpinned: the replica hasn't got it
+        expired = {"HTTP_X_PRIMARY_PIN_UNTIL": str(int(time.time()) - 1)}
+        self.assertEqual(Client().get(url, **expired).status_code, 404)
+        header = {"HTTP_X_PRIMARY_PIN_UNTIL": created[replicas.PIN_HEADER]}
+        self.assertEqual(Client().get(url, **header).status_code, 200)  # header pin: primary
+        self.assertEqual(client.get(url).status_code, 200)  # cookie pin
+
+    def test_reads_do_not_pin(self):
+        response = Client().get(f"/v1/orders/my-orders/{CUSTOMER}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(replicas.PIN_HEADER, response)
+
+    def test_lag_query_runs_on_the_replica(self):
+        self.assertEqual(replicas._LagMonitor._measure(), 0.0)  # a primary reports no lag
@@ -0,0 +1,94 @@
+import time
+from unittest import mock
+from django.test import SimpleTestCase
+from ..Services import http_client
+from ..Services.resilience import CircuitBreaker, CircuitOpenError, Dependency
+from ..Status.breaker_status import BreakerState
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def breaker(self, **options):
+        options = {"min_calls": 4, "failure_rate": 0.5, "open_seconds": 0.05, "half_open_calls": 2, **options}
+        return CircuitBreaker(f"test-{self.id()}", **options)
+
+    def test_opens_on_failure_rate(self):
+        breaker = self.breaker()
+        for ok in (True, True, False):
+            breaker.record(ok, 0.01)
+        self.assertIs(breaker.state, BreakerState.CLOSED)
+        breaker.record(False, 0.01)
+        self.assertIs(breaker.state, BreakerState.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_opens_on_slow_calls(self):
+        breaker = self.breaker(slow_call_seconds=0.5, slow_call_rate=0.5)
+        for duration in (0.01, 0.01, 0.6, 0.7):
+            breaker.record(True, duration)
+        self.assertIs(breaker.state, BreakerState.OPEN)
+
+    def test_half_open_probes_close_it(self):
+        breaker = self.breaker()
+        for _ in range(4):
+            breaker.record(False, 0.01)
+        time.sleep(0.06)
+        self.assertIs(breaker.state, BreakerState.HALF_OPEN)
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # only half_open_calls probes
+        breaker.record(True, 0.01)
+        breaker.record(True, 0.01)
+        self.assertIs(breaker.state, BreakerState.CLOSED)
+
+    def test_failed_probe_reopens(self):
+        breaker = self.breaker()
+        for _ in range(4):
+            breaker.record(False, 0.01)
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        breaker.record(False, 0.01)
+        self.assertIs(breaker.state, BreakerState.OPEN)
+
+    def test_adaptive_timeout_follows_recent_latency(self):
+        breaker = self.breaker(latency_window_seconds=0.1, failure_rate=1.1)
+        dependency = Dependency(breaker.name, breaker=breaker)
+        self.assertEqual(dependency.read_timeout(), http_client.READ_TIMEOUT)  # no samples yet
+        for _ in range(4):
+            breaker.record(True, 0.01)
+        self.assertEqual(dependency.read_timeout(), 0.5)  # 3 x p99, clamped to ADAPTIVE_TIMEOUT_MIN
+        time.sleep(0.11)
+        # Old samples leave the window; read timeouts count at the time waited
+        for _ in range(4):
+            breaker.record(False, 0.4, timed_out=True)
+        self.assertAlmostEqual(dependency.read_timeout(), min(1.2, http_client.READ_TIMEOUT))
+
+
+class DependencyCallTests(SimpleTestCase):
+    def dependency(self, **options):
+        breaker = CircuitBreaker(f"test-{self.id()}", min_calls=2, failure_rate=0.5, open_seconds=60)
+        return Dependency(breaker.name, breaker=breaker, **options)
+
+    def test_server_errors_open_the_breaker(self):
+        dependency = self.dependency()
+        for _ in range(2):
+            self.assertEqual(dependency.call(lambda timeout: mock.Mock(status_code=503)).status_code, 503)
+        send = mock.Mock()
+        with self.assertRaises(CircuitOpenError):
+            dependency.call(send)
+        send.assert_not_called()
+
+    def test_hedge_wins_when_the_first_attempt_is_slow(self):
+        dependency = self.dependency(hedge=True)
+        for _ in range(4):
+            dependency.breaker.record(True, 0.01)
+        calls = []
+
+        def send(timeout):
+            calls.append(timeout)
+            if len(calls) == 1:
+                time.sleep(0.5)  # the first attempt stalls past the hedge delay
+            return mock.Mock(status_code=200, attempt=len(calls))
+
+        started = time.perf_counter()
+        self.assertEqual(dependency.call(send).attempt, 2)
+        self.assertLess(time.perf_counter() - started, 0.4)
+        self.assertEqual(dependency.call(lambda timeout: mock.Mock(status_code=200), hedge=False).status_code, 200)
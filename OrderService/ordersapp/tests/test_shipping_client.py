@@ -0,0 +1,59 @@
+import time
+from unittest import mock
+from django.test import SimpleTestCase
+from ..Services import shipping_client
+from ..Services.resilience import BulkEndpoint
+from ..Status.shipping_status import ShippingStatus
+
+
+def response(status_code=200, body=None):
+    r = mock.Mock(status_code=status_code)
+    r.json.side_effect = ValueError("malformed") if body is None else None
+    r.json.return_value = body
+    return r
+
+
+def bulk_response(order_ids, status="Shipped"):
+    return response(body={"results": [{"order_id": oid, "status": status} for oid in order_ids]})
+
+
+class ShippingFetchTests(SimpleTestCase):
+    def setUp(self):
+        endpoint = BulkEndpoint("test bulk status", reprobe_seconds=0.2)
+        for name, value in (("BULK_STATUS", endpoint), ("BULK_BATCH_SIZE", 2)):
+            patcher = mock.patch.object(shipping_client, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_bulk_endpoint_is_called_per_batch(self):
+        with mock.patch.object(shipping_client.http_client, "post",
+                               side_effect=lambda url, json, timeout: bulk_response(json["order_ids"])) as post, \
+                mock.patch.object(shipping_client.http_client, "get") as get:
+            data = shipping_client._fetch_real_data([1, 2, 3])
+        self.assertEqual(post.call_count, 2)
+        get.assert_not_called()
+        self.assertEqual({oid: row["status"] for oid, row in data.items()}, {1: "Shipped", 2: "Shipped", 3: "Shipped"})
+
+    def test_unsupported_bulk_falls_back_then_is_probed_again(self):
+        get = mock.patch.object(shipping_client.http_client, "get", return_value=response(body={"status": "Pending"}))
+        with get, mock.patch.object(shipping_client.http_client, "post", return_value=response(404)) as post:
+            self.assertEqual(shipping_client._fetch_real_data([1])[1]["status"], "Pending")
+            self.assertEqual(shipping_client._fetch_real_data([1])[1]["status"], "Pending")
+            self.assertEqual(post.call_count, 1)  # skipped until the re-probe interval passes
+            time.sleep(0.25)
+            shipping_client._fetch_real_data([1])
+            self.assertEqual(post.call_count, 2)
+
+    def test_malformed_json_reports_orders_unavailable(self):
+        with mock.patch.object(shipping_client.http_client, "post", return_value=response()):
+            data = shipping_client._fetch_real_data([1, 2])
+        self.assertEqual(data[1], {"status": ShippingStatus.UNKNOWN.value, "expected_delivery": None, "unavailable": True})
+        with mock.patch.object(shipping_client.BULK_STATUS, "enabled", False), \
+                mock.patch.object(shipping_client.http_client, "get", return_value=response()):
+            self.assertTrue(shipping_client._fetch_real_data([1])[1]["unavailable"])
+
+    def test_transport_errors_mark_the_batch_failed(self):
+        error = shipping_client.requests.ConnectionError("refused")
+        with mock.patch.object(shipping_client.http_client, "post", side_effect=error):
+            data = shipping_client._fetch_real_data([1, 2, 3])
+        self.assertEqual({row["status"] for row in data.values()}, {ShippingStatus.FAILED.value})
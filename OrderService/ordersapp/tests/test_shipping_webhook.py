@@ -0,0 +1,119 @@
+import json
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase
+from django.utils import timezone
+from ..Services import shipping_sync
+from ..Status.order_status import OrderStatus
+from ..Status.shipping_status import ShippingStatus
+from .helpers import make_order
+
+
+@mock.patch.object(shipping_sync, "WEBHOOK_SECRET", "test-secret")
+class ShippingWebhookTests(TestCase):
+    url = "/v1/shipping/status-updates/"
+
+    def push(self, updates, secret="test-secret"):
+        body = json.dumps({"updates": updates}).encode()
+        with mock.patch.object(shipping_sync, "WEBHOOK_SECRET", secret):
+            signature = "sha256=" + shipping_sync.hmac.new(secret.encode(), body, shipping_sync.hashlib.sha256).hexdigest()
+        return self.client.post(
+            self.url, body, content_type="application/json", HTTP_X_SHIPPING_SIGNATURE=signature
+        )
+
+    def test_signature_is_required(self):
+        order = make_order()
+        self.assertEqual(self.push([{"order_id": order.order_id, "status": "Shipped"}], secret="wrong").status_code, 403)
+        response = self.client.post(self.url, {"updates": []}, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+
+    def test_refused_without_a_secret(self):
+        order = make_order()
+        with mock.patch.object(shipping_sync, "WEBHOOK_SECRET", ""):
+            response = self.push([{"order_id": order.order_id, "status": "Shipped"}], secret="")
+        self.assertEqual(response.status_code, 403)
+
+    def test_applies_updates(self):
+        order = make_order()
+        response = self.push([{"order_id": order.order_id, "status": "shipped", "expected_delivery": "2030-01-02"}])
+        self.assertEqual(response.json(), {"applied": 1, "ignored": 0, "errors": []})
+        order.refresh_from_db()
+        self.assertEqual((order.shipping_status, str(order.expected_delivery)), (ShippingStatus.SHIPPED.value, "2030-01-02"))
+
+    def test_final_status_is_only_replaced_by_a_final_one(self):
+        order = make_order()
+        self.push([{"order_id": order.order_id, "status": "Delivered"}])
+        self.assertEqual(self.push([{"order_id": order.order_id, "status": "Shipped"}]).json()["ignored"], 1)
+        self.assertEqual(self.push([{"order_id": order.order_id, "status": "Failed"}]).json()["applied"], 1)
+        order.refresh_from_db()
+        self.assertEqual(order.shipping_status, ShippingStatus.FAILED.value)
+
+    def test_older_and_future_updates(self):
+        order = make_order()
+        now = timezone.now()
+        self.push([{"order_id": order.order_id, "status": "Shipped", "updated_at": now.isoformat()}])
+        older = self.push([{
+            "order_id": order.order_id, "status": "Pending", "updated_at": (now - timedelta(hours=1)).isoformat(),
+        }])
+        self.assertEqual(older.json()["ignored"], 1)
+        future = self.push([{
+            "order_id": order.order_id, "status": "Delivered", "updated_at": (now + timedelta(days=1)).isoformat(),
+        }])
+        self.assertEqual(future.status_code, 207)
+        self.assertEqual(future.json()["errors"], [{"index": 0, "error": "updated_at is in the future"}])
+        order.refresh_from_db()
+        self.assertEqual(order.shipping_status, ShippingStatus.SHIPPED.value)
+
+
+class ShippingSyncTests(TestCase):
+    def fetched(self, *rows):
+        return mock.patch.object(shipping_sync, "get_shipping_queryset_for_customer", return_value=list(rows))
+
+    def test_final_and_fresh_statuses_are_not_fetched(self):
+        delivered = make_order(shipping_status=ShippingStatus.DELIVERED.value)
+        fresh = make_order(shipping_status=ShippingStatus.SHIPPED.value, shipping_synced_at=timezone.now())
+        with self.fetched() as fetch:
+            rows = shipping_sync.shipping_rows([delivered, fresh])
+        fetch.assert_not_called()
+        self.assertEqual(
+            [row["shipping_status"] for row in rows], [ShippingStatus.DELIVERED.value, ShippingStatus.SHIPPED.value]
+        )
+
+    def test_stale_statuses_are_fetched_and_stored(self):
+        stale = make_order(
+            shipping_status=ShippingStatus.PENDING.value,
+            shipping_synced_at=timezone.now() - timedelta(seconds=shipping_sync.TTL_SECONDS + 1),
+        )
+        row = {"order_id": stale.order_id, "shipping_status": "shipped", "expected_delivery": "2030-01-02"}
+        with self.fetched(row) as fetch:
+            rows = shipping_sync.shipping_rows([stale])
+        self.assertEqual(fetch.call_args.args[0], [stale])
+        self.assertEqual(rows[0]["shipping_status"], ShippingStatus.SHIPPED.value)
+        stale.refresh_from_db()
+        self.assertEqual((stale.shipping_status, str(stale.expected_delivery)), (ShippingStatus.SHIPPED.value, "2030-01-02"))
+        self.assertTrue(shipping_sync.is_fresh(stale))
+
+    def test_no_answer_keeps_the_stored_status(self):
+        order = make_order(shipping_status=ShippingStatus.SHIPPED.value)
+        row = {"order_id": order.order_id, "shipping_status": ShippingStatus.FAILED.value, "unavailable": True}
+        with self.fetched(row):
+            rows = shipping_sync.shipping_rows([order])
+        self.assertEqual(rows[0]["shipping_status"], ShippingStatus.SHIPPED.value)
+        order.refresh_from_db()
+        self.assertIsNone(order.shipping_synced_at)
+
+    def test_fetch_on_read_can_be_turned_off(self):
+        order = make_order(shipping_status=ShippingStatus.PENDING.value)
+        with self.fetched() as fetch, mock.patch.object(shipping_sync, "FETCH_ON_READ", False):
+            shipping_sync.shipping_rows([order])
+        fetch.assert_not_called()
+
+    def test_refresh_stale_updates_in_flight_shipments(self):
+        in_flight = make_order(order_status=OrderStatus.CONFIRMED.value)
+        make_order(order_status=OrderStatus.CONFIRMED.value, shipping_status=ShippingStatus.DELIVERED.value)
+        row = {"order_id": in_flight.order_id, "shipping_status": "Shipped"}
+        with self.fetched(row) as fetch:
+            self.assertEqual(shipping_sync.refresh_stale(), 1)
+        self.assertEqual([order.order_id for order in fetch.call_args.args[0]], [in_flight.order_id])
+        in_flight.refresh_from_db()
+        self.assertEqual(in_flight.shipping_status, ShippingStatus.SHIPPED.value)
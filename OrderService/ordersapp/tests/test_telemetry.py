@@ -0,0 +1,124 @@
+import asyncio
+import io
+import json
+import logging
+from django.test import SimpleTestCase, TestCase, override_settings
+from ..db.query_metrics import QUERIES_PER_REQUEST, QUERY_TIME_PER_REQUEST
+from ..Services import telemetry
+from ..structured_logging import DROPPED, NonBlockingHandler, SamplingFilter
+from .helpers import CUSTOMER, make_order
+
+
+def observations(metric, **labels):
+    """How many values a histogram (or the counter's total) has recorded for the given labels."""
+    for family in metric.collect():
+        for sample in family.samples:
+            if sample.name.endswith(("_count", "_total")) and sample.labels == labels:
+                return sample.value
+    return 0
+
+
+class CheckoutStageTests(SimpleTestCase):
+    def assertObserved(self, stage, outcome, run):
+        before = observations(telemetry.CHECKOUT_STAGE, stage=stage, outcome=outcome)
+        run()
+        self.assertEqual(observations(telemetry.CHECKOUT_STAGE, stage=stage, outcome=outcome), before + 1)
+
+    def test_outcome_follows_the_result(self):
+        @telemetry.checkout_stage("test_stage")
+        def step(result):
+            if result is None:
+                raise RuntimeError("down")
+            return result
+
+        def fail():
+            with self.assertRaises(RuntimeError):
+                step(None)
+
+        self.assertObserved("test_stage", "ok", lambda: step(True))
+        self.assertObserved("test_stage", "failed", lambda: step(False))
+        self.assertObserved("test_stage", "error", fail)
+
+    def test_async_steps_are_timed(self):
+        @telemetry.checkout_stage("test_async_stage")
+        async def step():
+            return {"status": "ok"}
+
+        self.assertObserved("test_async_stage", "ok", lambda: asyncio.run(step()))
+
+    def test_stage_timer(self):
+        def run():
+            with telemetry.stage_timer("test_block"):
+                pass
+        self.assertObserved("test_block", "ok", run)
+
+
+@override_settings(PAYMENT_SERVICE_URL="http://payments:8000")
+class DownstreamRequestTests(SimpleTestCase):
+    def setUp(self):
+        telemetry._services = None
+        self.addCleanup(setattr, telemetry, "_services", None)
+
+    def test_route_names_the_service_and_folds_ids(self):
+        self.assertEqual(
+            telemetry._route("post", "http://payments:8000/v1/payments/42/capture/"),
+            ("payment", "POST /v1/payments/{id}/capture/"),
+        )
+        self.assertEqual(telemetry._route("get", "http://elsewhere:9000"), ("elsewhere:9000", "GET /"))
+
+    def test_attempts_past_the_third_share_a_label(self):
+        labels = {"service": "payment", "operation": "POST /v1/refunds/", "status": "timeout", "attempt": "3+"}
+        before = observations(telemetry.DOWNSTREAM_REQUEST, **labels)
+        for number in (3, 5):
+            with telemetry.attempt(number):
+                self.assertEqual(telemetry.current_attempt(), number)
+                telemetry.record_downstream("POST", "http://payments:8000/v1/refunds/", "timeout", 0.01)
+        self.assertEqual(telemetry.current_attempt(), 1)
+        self.assertEqual(observations(telemetry.DOWNSTREAM_REQUEST, **labels), before + 2)
+
+
+class QueryMetricsTests(TestCase):
+    def test_request_queries_are_observed_by_view(self):
+        make_order()
+        view = "order-history"
+        before = observations(QUERIES_PER_REQUEST, view=view)
+        response = self.client.get(f"/v1/orders/my-orders/{CUSTOMER}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(observations(QUERIES_PER_REQUEST, view=view), before + 1)
+        self.assertEqual(observations(QUERY_TIME_PER_REQUEST, view=view), before + 1)
+        queries = next(
+            sample.value for family in QUERIES_PER_REQUEST.collect() for sample in family.samples
+            if sample.name.endswith("_sum") and sample.labels == {"view": view}
+        )
+        self.assertGreater(queries, 0)
+
+
+class StructuredLoggingTests(SimpleTestCase):
+    def record(self, level, **extra):
+        return logging.getLogger("ordersapp.test").makeRecord(
+            "ordersapp.test", level, __file__, 1, "checkout %s", ("done",), None, extra=extra
+        )
+
+    def test_sampling_keeps_warnings_and_unsampled_records(self):
+        drop_all = SamplingFilter(rate=0)
+        self.assertFalse(drop_all.filter(self.record(logging.INFO)))
+        self.assertTrue(drop_all.filter(self.record(logging.INFO, sample=False)))
+        self.assertTrue(drop_all.filter(self.record(logging.WARNING)))
+        self.assertTrue(SamplingFilter(rate=1).filter(self.record(logging.DEBUG)))
+
+    def test_records_are_written_as_json_off_the_calling_thread(self):
+        stream = io.StringIO()
+        handler = NonBlockingHandler(stream=stream)
+        handler.handle(self.record(logging.INFO, order_id=7, sample=False))
+        handler._stop()
+        entry = json.loads(stream.getvalue())
+        self.assertEqual((entry["message"], entry["order_id"], entry["level"]), ("checkout done", 7, "INFO"))
+        self.assertNotIn("sample", entry)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = NonBlockingHandler(maxsize=1, stream=io.StringIO())
+        handler._stop()  # nothing drains the queue now
+        before = observations(DROPPED, level="INFO")
+        for _ in range(3):
+            handler.handle(self.record(logging.INFO))
+        self.assertEqual(observations(DROPPED, level="INFO"), before + 2)
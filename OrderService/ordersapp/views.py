@@ -1,27 +1,33 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import action, api_view, authentication_classes, permission_classes
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.shortcuts import render, redirect
-from django.db.models import Q
-from django.core.paginator import Paginator
 from urllib.parse import urlencode
-from django.http import JsonResponse
-from django.db import connection
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime
+from django.db import connection, transaction
 from rest_framework.permissions import AllowAny
 
 # --- Import project modules ---
+from .db.replicas import replica_reads, is_pinned
 from .models import Order
-from .serializer import OrderSerializer
+from .serializer import OrderSerializer, CustomerOrderSummarySerializer
+from .pagination import OrderCursorPagination
+from .Services.order_export import stream_orders, EXPORT_CONTENT_TYPES
 from .Services.order_services import OrderService
-from .Services.inventory_client import reserve_inventory, release_inventory
-from .Services.payment_client import charge_payment
-from .Services.shipping_client import get_shipping_queryset_for_customer, create_shipment
+from .Services import order_cache, customer_summary, idempotency, shipping_sync, bulk_transitions
+from .Services.telemetry import stage_timer
+from .Services.history_service import OrderHistoryService
+from .Services.inventory_client import release_inventory
+from .Services.checkout import CheckoutSaga, finish_order, CONFIRMED, OUTCOME_ERRORS
+from .Services.batch_orders import create_orders_batch, MAX_BATCH_SIZE
 from .Status.order_status import OrderStatus, SortBy, Direction
 from .Status.payment_status import PaymentStatus
 from .Status.shipping_status import ShippingStatus
-from .Services.notification_client import send_notification
 
 
 # --- ViewSet for managing Orders (CRUD operations) ---
@@ -29,71 +35,209 @@ class OrderViewSet(viewsets.GenericViewSet):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
 
+    pagination_class = OrderCursorPagination
+
+    def get_queryset(self):
+        """Orders with customer/status/date-range filters applied in SQL (list only)."""
+        orders = Order.objects.all()
+        if self.action != "list":
+            return orders
+        return _filter_orders(orders, self.request.query_params)
+
     # -------------------------------------------------------------
     # LIST ORDERS
     # -------------------------------------------------------------
     @swagger_auto_schema(
-        operation_summary="List all orders",
-        operation_description="Retrieve all existing orders (JWT required).",
+        operation_summary="List orders",
+        operation_description=(
+            "Cursor-paginated order list (JWT required). Filters: customer_id, status, payment_status, "
+            "created_after, created_before. Pass export=ndjson or export=json to stream every matching "
+            "order instead of a page."
+        ),
+        manual_parameters=[
+            openapi.Parameter('customer_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('status', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=[s.value for s in OrderStatus]),
+            openapi.Parameter('payment_status', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=[s.value for s in PaymentStatus]),
+            openapi.Parameter('created_after', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+            openapi.Parameter('created_before', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+            openapi.Parameter('export', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(EXPORT_CONTENT_TYPES)),
+        ],
         responses={200: OrderSerializer(many=True)}
     )
+    @replica_reads
     def list(self, request):
-        """List all orders."""
-        orders = self.get_queryset()
-        serializer = self.get_serializer(orders, many=True)
-        return Response(serializer.data)
+        """List orders one cursor page at a time, or stream them all as an export."""
+        try:
+            orders = self.get_queryset()
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        export = request.query_params.get("export", "").strip().lower()
+        if export:
+            if export not in EXPORT_CONTENT_TYPES:
+                return Response(
+                    {"error": f"export must be one of {', '.join(EXPORT_CONTENT_TYPES)}."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            # The export streams after the view returns: bind the queryset to this request's read database
+            return StreamingHttpResponse(
+                stream_orders(orders.using(orders.db).prefetch_related("items"), export),
+                content_type=EXPORT_CONTENT_TYPES[export]
+            )
+
+        page = self.paginate_queryset(orders)
+        OrderService.prefetch_items(page)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     # -------------------------------------------------------------
     # CREATE ORDER
     # -------------------------------------------------------------
     @swagger_auto_schema(
         operation_summary="Create a new order",
-        operation_description="Creates an order, reserves inventory, charges payment, and updates status.",
+        operation_description="Creates an order, reserves inventory and authorizes payment in parallel, captures the payment, and updates status. Shipment creation and notification are queued for the outbox worker.",
+        manual_parameters=[openapi.Parameter(
+            idempotency.HEADER, openapi.IN_HEADER, type=openapi.TYPE_STRING, required=False,
+            description="Retries with the same key get the original response instead of a new order",
+        )],
         request_body=OrderSerializer,
-        responses={201: OrderSerializer, 400: "Inventory reservation or payment failed"}
+        responses={
+            201: OrderSerializer, 400: "Inventory reservation or payment failed",
+            409: "The original request with this Idempotency-Key is still running",
+            422: "Idempotency-Key reused with a different request body",
+        }
     )
     @action(detail=False, methods=['post'], url_path='create')
     def create_order(self, request):
         """Create a new order with inventory, payment, and shipment flow."""
+        key = request.headers.get(idempotency.HEADER)
+        if key:
+            if len(key) > idempotency.MAX_KEY_LENGTH:
+                return Response(
+                    {"error": f"{idempotency.HEADER} is longer than {idempotency.MAX_KEY_LENGTH} characters."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            request_hash = idempotency.fingerprint(request.data)
+            try:
+                replay = idempotency.cached(key, request_hash)
+            except idempotency.KeyReusedError as e:
+                return _key_reused_response(e.key)
+            if replay:
+                return _replayed_response(replay)
+
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        items = serializer.validated_data.get('items', [])
-        total = OrderService.calculate_order_total(items) if items else 0
-        serializer.validated_data['order_total'] = total
-
-        order = serializer.save()
         # Handle empty item list
+        items = serializer.validated_data.get('items', [])
         if not items:
             return Response(
-        {"error": "Cannot create an order without items."},
-        status=status.HTTP_400_BAD_REQUEST
-    )
+                {"error": "Cannot create an order without items."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Reserve inventory first
-        if not reserve_inventory(order.order_id, items):
-            order.order_status = OrderStatus.CANCELLED.value
-            order.save()
-            return Response({"error": "Inventory reservation failed"}, status=status.HTTP_400_BAD_REQUEST)
+        total = OrderService.calculate_order_total(items)
+        serializer.validated_data['order_total'] = total
 
-        # Charge payment
-        if not charge_payment(order.order_id, order.customer_id, total):
-            release_inventory(order.order_id, items)
-            order.order_status = OrderStatus.CANCELLED.value
-            order.payment_status = PaymentStatus.FAILED.value
-            order.save()
-            return Response({"error": "Payment failed"}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Create shipment on success
-        create_shipment(order.order_id, order.customer_id)
-        order.order_status = OrderStatus.CONFIRMED.value
-        order.payment_status = PaymentStatus.PAID.value
-        order.save()
-        send_notification("ORDER_CREATED", {
-          "order_id": order.order_id,
-          "order_total": str(order.order_total)
-        })
-        return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
+        # Two short transactions with the checkout saga in between, as in the async path, so no
+        # DB transaction (or pooled connection) is held across the remote calls:
+        #   1. order INSERT + items bulk INSERT (PENDING); an Idempotency-Key is claimed here, so
+        #      retries arriving meanwhile poll for this request's stored response. A retry taking
+        #      over a claim abandoned mid-checkout resumes its PENDING order instead.
+        #   2. the saga: reservation and authorization in parallel, then capture; failed steps
+        #      are compensated inside run().
+        #   3. one status UPDATE (+ outbox INSERT, customer summary upsert, stored response).
+        try:
+            with transaction.atomic():
+                resumed = None
+                if key:
+                    replay, resumed = idempotency.claim(key, request_hash)
+                    if replay:
+                        return _replayed_response(replay)
+                with stage_timer("save_order"):
+                    order = idempotency.claimed_order(key, resumed, serializer.save)
+        except idempotency.KeyReusedError as e:
+            return _key_reused_response(e.key)
+        except idempotency.RequestInProgressError:
+            return _in_progress_response()
+
+        saga = CheckoutSaga(order, items)
+        try:
+            outcome = saga.run()
+            with transaction.atomic():
+                # Confirmed orders queue shipment + notification; the outbox worker delivers them after commit.
+                with stage_timer("finalize_order"):
+                    finish_order(order, outcome)
+                if outcome == CONFIRMED:
+                    body, code = OrderSerializer(order).data, status.HTTP_201_CREATED
+                else:
+                    body, code = {"error": OUTCOME_ERRORS[outcome]}, status.HTTP_400_BAD_REQUEST
+                if key:
+                    idempotency.complete(key, request_hash, code, body)
+        except Exception:
+            # The outcome was not recorded: undo the reservation and payment too, and let retries run
+            saga.compensate()
+            if key:
+                idempotency.release(key)
+            raise
+
+        return Response(body, status=code)
+
+    # -------------------------------------------------------------
+    # BATCH CREATE ORDERS
+    # -------------------------------------------------------------
+    @swagger_auto_schema(
+        operation_summary="Create orders in bulk",
+        operation_description=(
+            "Accepts an array of orders. Valid orders are inserted in bulk and checked out concurrently; "
+            "each order gets its own result (partial success). Returns 201 if every order was confirmed, "
+            "otherwise 207 with per-order errors."
+        ),
+        request_body=OrderSerializer(many=True),
+        responses={201: "All orders created", 207: "Per-order results with some failures", 400: "Invalid batch"}
+    )
+    @action(detail=False, methods=['post'], url_path='batch')
+    def batch_create_orders(self, request):
+        """Create many orders in one request with per-order results."""
+        if not isinstance(request.data, list) or not request.data:
+            return Response({"error": "Expected a non-empty array of orders."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(request.data) > MAX_BATCH_SIZE:
+            return Response(
+                {"error": f"Batch size exceeds the maximum of {MAX_BATCH_SIZE} orders."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = OrderSerializer(data=request.data, many=True)
+        if serializer.is_valid():
+            valid_indexes = list(range(len(request.data)))
+            validated = serializer.validated_data
+            errors = {}
+        else:
+            # Partial success: keep the entries that validated cleanly
+            errors = {i: e for i, e in enumerate(serializer.errors) if e}
+            valid_indexes = [i for i in range(len(request.data)) if i not in errors]
+            retry = OrderSerializer(data=[request.data[i] for i in valid_indexes], many=True)
+            retry.is_valid()
+            validated = retry.validated_data if valid_indexes else []
+
+        for i, data in zip(valid_indexes, validated):
+            if not data.get('items'):
+                errors[i] = {"error": "Cannot create an order without items."}
+        pairs = [(i, data) for i, data in zip(valid_indexes, validated) if i not in errors]
+
+        created = create_orders_batch([data for _, data in pairs]) if pairs else []
+
+        results = [None] * len(request.data)
+        for i, error in errors.items():
+            results[i] = {"index": i, "errors": error}
+        for (i, _), result in zip(pairs, created):
+            results[i] = {"index": i, **result}
+
+        all_ok = not errors and all("error" not in r for r in created)
+        return Response(
+            {"results": results},
+            status=status.HTTP_201_CREATED if all_ok else status.HTTP_207_MULTI_STATUS
+        )
 
     # -------------------------------------------------------------
     # UPDATE ORDER
@@ -126,48 +270,39 @@ class OrderViewSet(viewsets.GenericViewSet):
         Does not change items or trigger external service actions.
         """
         order = self.get_object()
-
-        # 🔒 Block final state updates
-        if order.order_status in [OrderStatus.DELIVERED.value, OrderStatus.CANCELLED.value]:
-            return Response(
-                {"error": "Cannot update a delivered or cancelled order."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
         new_order_status = request.data.get('order_status')
         new_payment_status = request.data.get('payment_status')
         new_shipping_status = request.data.get('shipping_status')
+        if new_shipping_status and shipping_sync.normalize_status(new_shipping_status) is None:
+            return Response(
+                {"error": f"Invalid shipping status {new_shipping_status}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # 🧩 Validate payment status transitions
-        if new_payment_status:
-            if order.payment_status == PaymentStatus.FAILED.value and new_payment_status == PaymentStatus.PAID.value:
-                return Response(
-                    {"error": "Cannot change payment from FAILED to PAID."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            order.payment_status = new_payment_status
-
-        # 🚚 Validate order status transitions
-        if new_order_status:
-            valid_transitions = {
-                OrderStatus.PENDING.value: [OrderStatus.CONFIRMED.value, OrderStatus.CANCELLED.value],
-                OrderStatus.CONFIRMED.value: [OrderStatus.SHIPPED.value, OrderStatus.CANCELLED.value],
-                OrderStatus.SHIPPED.value: [OrderStatus.DELIVERED.value],
-            }
-
-            current = order.order_status
-            if new_order_status not in valid_transitions.get(current, []):
-                return Response(
-                    {"error": f"Invalid transition from {current} to {new_order_status}."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            order.order_status = new_order_status
-
-        # 🧾 Shipping status tracking
-        if new_shipping_status:
-            order.shipping_status = new_shipping_status
+        with transaction.atomic():
+            # Re-read under a row lock: a concurrent update between get_object and save would
+            # otherwise be overwritten and counted twice in the customer summary.
+            order = _lock_order(order)
+            previous = (order.order_status, order.payment_status)
+
+            # 🔒 Final states, FAILED -> PAID payments and order status moves (shared with bulk-transition)
+            error = OrderService.transition_error(order, new_order_status, new_payment_status)
+            if error:
+                return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+            if new_payment_status:
+                order.payment_status = new_payment_status
+            if new_order_status:
+                order.order_status = new_order_status
+
+            # 🧾 Shipping status tracking
+            if new_shipping_status:
+                order.shipping_status = shipping_sync.normalize_status(new_shipping_status)
+                order.shipping_synced_at = timezone.now()
 
-        order.save()
+            order.save()
+            if (order.order_status, order.payment_status) != previous:
+                customer_summary.record_transition(order, previous)
+            order_cache.invalidate(order.order_id)
         return Response(OrderSerializer(order).data, status=status.HTTP_200_OK)
 
     # -------------------------------------------------------------
@@ -182,19 +317,148 @@ class OrderViewSet(viewsets.GenericViewSet):
     def cancel_order(self, request, pk=None):
         """Cancel order, release inventory, and refund payment."""
         order = self.get_object()
-        if order.order_status in [OrderStatus.CANCELLED.value, OrderStatus.DELIVERED.value]:
-            return Response({"error": "Order cannot be cancelled"}, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            # Locked re-read, so two concurrent cancels can't both pass the check below.
+            order = _lock_order(order)
+            if order.order_status in [OrderStatus.CANCELLED.value, OrderStatus.DELIVERED.value]:
+                return Response({"error": "Order cannot be cancelled"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Release reserved inventory
-        release_inventory(order.order_id, order.items.all())
+            previous = (order.order_status, order.payment_status)
+            order.order_status = OrderStatus.CANCELLED.value
+            order.payment_status = PaymentStatus.REFUNDED.value
+            order.save()
+            customer_summary.record_transition(order, previous)
+            order_cache.invalidate(order.order_id)
 
-        # Update order status
-        order.order_status = OrderStatus.CANCELLED.value
-        order.payment_status = PaymentStatus.REFUNDED.value
-        order.save()
+        # Release reserved inventory (after commit, so the row lock isn't held over the remote call)
+        release_inventory(order.order_id, order.items.all())
         return Response({"status": "Order cancelled successfully"}, status=status.HTTP_200_OK)
 
 
+    # -------------------------------------------------------------
+    # BULK STATUS TRANSITION
+    # -------------------------------------------------------------
+    @swagger_auto_schema(
+        operation_summary="Change the status of many orders",
+        operation_description=(
+            "Applies one status change to the orders in order_ids, or to every order matching filter "
+            "(customer_id, status, payment_status, created_after, created_before; at most "
+            f"{bulk_transitions.MAX_ORDERS} orders). Each order is checked with the same rules as the "
+            "single-order update. Cancelling queues the inventory release, and a refund for PAID orders, in "
+            "the outbox; the worker delivers them in batched calls and marks confirmed refunds REFUNDED. Orders being changed by another request are skipped and reported as locked. The response "
+            "streams one NDJSON line per order, then a summary line. Pass dry_run to only validate."
+        ),
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'order_ids': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+                'filter': openapi.Schema(type=openapi.TYPE_OBJECT, properties={
+                    'customer_id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'status': openapi.Schema(type=openapi.TYPE_STRING, enum=[s.value for s in OrderStatus]),
+                    'payment_status': openapi.Schema(type=openapi.TYPE_STRING, enum=[s.value for s in PaymentStatus]),
+                    'created_after': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+                    'created_before': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+                }),
+                'order_status': openapi.Schema(type=openapi.TYPE_STRING, enum=[s.value for s in OrderStatus]),
+                'payment_status': openapi.Schema(type=openapi.TYPE_STRING, enum=[s.value for s in PaymentStatus]),
+                'shipping_status': openapi.Schema(type=openapi.TYPE_STRING, enum=[s.value for s in ShippingStatus]),
+                'dry_run': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+            },
+        ),
+        responses={200: "NDJSON: one result per order, then {\"summary\": {...}}", 400: "Invalid request"}
+    )
+    @action(detail=False, methods=['post'], url_path='bulk-transition')
+    def bulk_transition(self, request):
+        """Change order/payment/shipping status for many orders, streaming per-order results."""
+        data = request.data if isinstance(request.data, dict) else {}
+        order_ids, order_filter = data.get("order_ids"), data.get("filter")
+        if (order_ids is None) == (order_filter is None):
+            return Response({"error": "Pass either order_ids or filter."}, status=status.HTTP_400_BAD_REQUEST)
+
+        new_order_status = data.get("order_status")
+        new_payment_status = data.get("payment_status")
+        new_shipping_status = data.get("shipping_status")
+        if not (new_order_status or new_payment_status or new_shipping_status):
+            return Response(
+                {"error": "Pass at least one of order_status, payment_status, shipping_status."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if new_order_status and new_order_status not in [s.value for s in OrderStatus]:
+            return Response({"error": f"Invalid order status {new_order_status}."}, status=status.HTTP_400_BAD_REQUEST)
+        if new_payment_status and new_payment_status not in [s.value for s in PaymentStatus]:
+            return Response({"error": f"Invalid payment status {new_payment_status}."}, status=status.HTTP_400_BAD_REQUEST)
+        if new_payment_status and new_order_status == OrderStatus.CANCELLED.value:
+            return Response(
+                {"error": "Cancelling sets the payment status itself (PAID orders become REFUNDED once refunded)."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if new_shipping_status:
+            new_shipping_status = shipping_sync.normalize_status(new_shipping_status)
+            if new_shipping_status is None:
+                return Response(
+                    {"error": f"Invalid shipping status {data['shipping_status']}."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        orders_qs = None
+        if order_ids is not None:
+            if not isinstance(order_ids, list) or not order_ids or not all(
+                isinstance(order_id, int) and not isinstance(order_id, bool) and order_id > 0 for order_id in order_ids
+            ):
+                return Response(
+                    {"error": "order_ids must be a non-empty array of positive integers."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if len(order_ids) > bulk_transitions.MAX_ORDERS:
+                return Response(
+                    {"error": f"At most {bulk_transitions.MAX_ORDERS} order_ids per request."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            if not isinstance(order_filter, dict) or not any(order_filter.get(key) for key in ORDER_FILTERS):
+                return Response(
+                    {"error": f"filter needs at least one of {', '.join(ORDER_FILTERS)}."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            try:
+                orders_qs = _filter_orders(Order.objects.all(), order_filter)
+            except (TypeError, ValueError) as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return StreamingHttpResponse(
+            bulk_transitions.stream_transition(
+                order_ids=order_ids, orders_qs=orders_qs, order_status=new_order_status,
+                payment_status=new_payment_status, shipping_status=new_shipping_status,
+                dry_run=bool(data.get("dry_run")),
+            ),
+            content_type="application/x-ndjson"
+        )
+
+
+def _lock_order(order):
+    """The order re-read with SELECT ... FOR UPDATE (created_at keeps the lookup on one partition)."""
+    return Order.objects.select_for_update().get(order_id=order.order_id, created_at=order.created_at)
+
+
+def _replayed_response(replay):
+    code, body = replay
+    return Response(body, status=code, headers={idempotency.REPLAYED_HEADER: "true"})
+
+
+def _key_reused_response(key):
+    return Response(
+        {"error": f"{idempotency.HEADER} {key!r} was already used with a different request body."},
+        status=status.HTTP_422_UNPROCESSABLE_ENTITY
+    )
+
+
+def _in_progress_response():
+    return Response(
+        {"error": f"A request with this {idempotency.HEADER} is still in progress; retry later."},
+        status=status.HTTP_409_CONFLICT, headers={"Retry-After": "1"}
+    )
+
+
 # -----------------------------------------------------------------
 # GET ORDER DETAILS
 # -----------------------------------------------------------------
@@ -205,20 +469,42 @@ class OrderViewSet(viewsets.GenericViewSet):
     responses={200: "Order details retrieved", 404: "Order not found"}
 )
 @api_view(['GET'])
+@replica_reads
 def get_order_details(request, pk=None):
-    """Get order details by order ID."""
-    order_data = OrderService.get_order_data(pk)
+    """Get order details by order ID (a client reading its own recent write bypasses the cache)."""
+    order_data = OrderService.get_order_data(pk, refresh=is_pinned())
     if not order_data:
         return Response({"error": "Order not found"}, status=404)
     return Response(order_data)
 
 
+# -----------------------------------------------------------------
+# CUSTOMER DASHBOARD
+# -----------------------------------------------------------------
+@swagger_auto_schema(
+    method='get',
+    operation_summary="Customer dashboard",
+    operation_description=(
+        "Order count, lifetime spend (PAID orders), last order date and counts by status for a customer. "
+        "Read from the materialized customer summary (a single primary-key lookup)."
+    ),
+    responses={200: CustomerOrderSummarySerializer}
+)
+@api_view(['GET'])
+@replica_reads
+def customer_dashboard(request, customer_id):
+    """Customer order summary from the materialized rollup."""
+    summary = customer_summary.get_summary(customer_id)
+    return Response(CustomerOrderSummarySerializer(summary).data)
+
+
 # -----------------------------------------------------------------
 # ORDER HISTORY (For UI view + pagination)
 # -----------------------------------------------------------------
 @swagger_auto_schema(auto_schema=None)
+@replica_reads
 def order_history(request, customer_id):
-    """Display customer order history with filters and pagination."""
+    """Display customer order history with filters and keyset pagination."""
     search = request.GET.get("search", "").strip()
     status_filter = request.GET.get("status_filter", "").strip()
     payment_filter = request.GET.get("payment_filter", "").strip()
@@ -226,59 +512,27 @@ def order_history(request, customer_id):
     sort_by = request.GET.get("sort_by", "").strip()
     sort_dir = request.GET.get("sort_dir", "").strip()
 
-    # Base queryset
-    orders_qs = Order.objects.filter(customer_id=customer_id).prefetch_related("items")
-
-    # Search filter
-    if search:
-        orders_qs = orders_qs.filter(
-            Q(order_id__icontains=search)
-            | Q(order_status__icontains=search)
-            | Q(payment_status__icontains=search)
-            | Q(items__sku__icontains=search)
-        ).distinct()
-
-    # Status and payment filters
-    if status_filter:
-        orders_qs = orders_qs.filter(order_status__iexact=status_filter)
-    if payment_filter:
-        orders_qs = orders_qs.filter(payment_status__iexact=payment_filter)
-
-    # Fetch shipping info
-    shipping_qs = get_shipping_queryset_for_customer(list(orders_qs))
-    shipping_map = {s["order_id"]: s for s in shipping_qs}
-
-
-    for order in orders_qs:
-        order.calculated_total = OrderService.calculate_order_total(order)
-
-
-    # Merge orders + shipping
-    orders_with_shipping = []
-    for order in orders_qs:
-        ship_info = shipping_map.get(order.order_id, {"shipping_status": "Unknown"})
-        ship_status = ship_info.get("shipping_status", "Unknown")
-        if not shipping_filter or ship_status.lower() == shipping_filter.lower():
-            order.shipping_status = ship_status
-            orders_with_shipping.append(order)
-
-    # Sorting logic
-    reverse = sort_dir == Direction.DESC.value
-    if sort_by == SortBy.DATE.value:
-        orders_with_shipping.sort(key=lambda o: o.created_at, reverse=reverse)
-    elif sort_by == SortBy.CREATED_AT.value:
-        orders_with_shipping.sort(key=lambda o: o.order_total, reverse=reverse)
-    else:
-        orders_with_shipping.sort(key=lambda o: o.created_at, reverse=True)
-
-    # Pagination
-    paginator = Paginator(orders_with_shipping, 3)
-    orders_page = paginator.get_page(request.GET.get("page"))
+    redirect_url = OrderService.get_clean_redirect_url(request)
+    if redirect_url:
+        return redirect(redirect_url)
+
+    # Filters, sort and the page window run in SQL (keyset pagination)
+    history_page = OrderHistoryService.get_page(
+        customer_id,
+        search=search,
+        status_filter=status_filter,
+        payment_filter=payment_filter,
+        shipping_filter=shipping_filter,
+        sort_by=sort_by,
+        sort_dir=sort_dir,
+        cursor=request.GET.get("cursor"),
+    )
 
     # Context for rendering template
     context = {
-        "orders": orders_page,
-        "shipping_qs": shipping_qs,
+        "orders": history_page.orders,
+        "page": history_page,
+        "shipping_qs": history_page.shipping_qs,
         "search": search,
         "status_filter": status_filter,
         "payment_filter": payment_filter,
@@ -291,16 +545,104 @@ def order_history(request, customer_id):
         "all_sort_by_options": [s.value for s in SortBy],
         "all_sort_directions": [d.value for d in Direction],
         "request_path": request.path,
-        "query_without_page": urlencode({k: v for k, v in request.GET.items() if k != "page" and v}),
+        "query_without_page": urlencode({k: v for k, v in request.GET.items() if k != "cursor" and v}),
     }
 
-    redirect_url = OrderService.get_clean_redirect_url(request)
-    if redirect_url:
-        return redirect(redirect_url)
-
     return render(request, "ordersapp/order_history.html", context)
 
 
+# Order list query parameters, also accepted as the bulk-transition filter
+ORDER_FILTERS = ("customer_id", "status", "payment_status", "created_after", "created_before")
+
+
+def _filter_orders(orders, params):
+    """Apply the ORDER_FILTERS present in params (query parameters or a JSON object)."""
+    if params.get("customer_id"):
+        orders = orders.filter(customer_id=params["customer_id"])
+    if params.get("status"):
+        orders = orders.filter(order_status__iexact=params["status"])
+    if params.get("payment_status"):
+        orders = orders.filter(payment_status__iexact=params["payment_status"])
+    if params.get("created_after"):
+        orders = orders.filter(created_at__gte=_parse_date_param(params["created_after"], "created_after"))
+    if params.get("created_before"):
+        orders = orders.filter(created_at__lt=_parse_date_param(params["created_before"], "created_before"))
+    return orders
+
+
+def _parse_date_param(value, name):
+    """Accept an ISO date or datetime query parameter."""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"{name} must be an ISO date or datetime.")
+        parsed = datetime.combine(day, datetime.min.time())
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+# -----------------------------------------------------------------
+# SHIPPING STATUS WEBHOOK (pushed by the Shipping Service)
+# -----------------------------------------------------------------
+@swagger_auto_schema(
+    method='post',
+    operation_summary="Shipping status updates",
+    operation_description=(
+        "Called by the Shipping Service with a batch of status changes, either as an array or as "
+        "{\"updates\": [...]}. Each update has order_id, status, and optionally expected_delivery and "
+        "updated_at. The batch is stored in bulk. Updates older than the stored status are ignored, and so "
+        "is anything that would replace Delivered or Failed with a non-final status; updated_at may not be "
+        "in the future. Requests must be signed with "
+        f"{shipping_sync.SIGNATURE_HEADER}: sha256=<HMAC-SHA256 of the body, keyed with SHIPPING_WEBHOOK_SECRET>. "
+        "Every request is refused while SHIPPING_WEBHOOK_SECRET is unset."
+    ),
+    request_body=openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'order_id': openapi.Schema(type=openapi.TYPE_INTEGER),
+            'status': openapi.Schema(type=openapi.TYPE_STRING, enum=[s.value for s in ShippingStatus]),
+            'expected_delivery': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+            'updated_at': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+        },
+        required=['order_id', 'status'],
+    )),
+    responses={
+        200: "All updates accepted", 207: "Some updates rejected (per-entry errors)",
+        400: "Invalid batch", 403: "Missing or wrong signature, or no SHIPPING_WEBHOOK_SECRET configured",
+    }
+)
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def shipping_status_webhook(request):
+    """Store a batch of shipping status changes pushed by the Shipping Service."""
+    if not shipping_sync.WEBHOOK_SECRET:
+        # Unsigned pushes could set any order's status (and Delivered/Failed are final)
+        return Response(
+            {"error": "Shipping webhook disabled: SHIPPING_WEBHOOK_SECRET is not set."},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    # The signature covers the raw body, so read it before DRF parses it
+    if not shipping_sync.verify_signature(request.body, request.headers.get(shipping_sync.SIGNATURE_HEADER)):
+        return Response({"error": "Invalid signature."}, status=status.HTTP_403_FORBIDDEN)
+
+    entries = request.data.get("updates") if isinstance(request.data, dict) else request.data
+    if not isinstance(entries, list) or not entries:
+        return Response({"error": "Expected a non-empty array of updates."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(entries) > shipping_sync.WEBHOOK_MAX_BATCH:
+        return Response(
+            {"error": f"Batch size exceeds the maximum of {shipping_sync.WEBHOOK_MAX_BATCH} updates."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    updates, errors = shipping_sync.parse_updates(entries)
+    applied = shipping_sync.apply_updates(updates)
+    return Response(
+        {"applied": applied, "ignored": len(updates) - applied, "errors": errors},
+        status=status.HTTP_207_MULTI_STATUS if errors else status.HTTP_200_OK
+    )
+
+
 # -----------------------------------------------------------------
 # HEALTH CHECK (for Docker/Kubernetes readiness probe)
 # -----------------------------------------------------------------